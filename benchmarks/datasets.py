@@ -0,0 +1,100 @@
+# datasets.py
+"""Seeded synthetic generators shaped like the sample files in data/.
+
+Every generator is deterministic for a given (n_rows, seed) pair, so the same
+benchmark size always produces the same frame. Large sizes (10^7-10^8 rows)
+should be written with write_csv(), which streams the frame in chunks instead
+of building it in memory.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+PRODUCTS = {
+    'Electronics': ['Wireless Mouse', 'Smartphone', 'Headphones', 'Laptop', 'Smartwatch', 'Tablet'],
+    'Furniture': ['Office Chair', 'Standing Desk', 'Bookshelf', 'Sofa'],
+    'Home Appliances': ['Kitchen Blender', 'Microwave', 'Air Fryer', 'Vacuum Cleaner'],
+    'Sports': ['Yoga Mat', 'Dumbbells', 'Running Shoes'],
+}
+
+
+def _inject_defects(frame, rng, columns, missing_rate, duplicate_rate):
+    """Blank out a share of values and repeat a share of rows, like real deliveries."""
+    for col in columns:
+        mask = rng.random(len(frame)) < missing_rate
+        frame.loc[mask, col] = np.nan
+    n_duplicates = int(len(frame) * duplicate_rate)
+    if n_duplicates:
+        positions = rng.integers(0, len(frame), n_duplicates)
+        frame.iloc[positions] = frame.iloc[rng.integers(0, len(frame), n_duplicates)].to_numpy()
+    return frame
+
+
+def make_walmart_grocery(n_rows, seed=42, offset=0, missing_rate=0.01, duplicate_rate=0.01):
+    """Weekly sales per store and department, like walmart_grocery_data.csv."""
+    rng = np.random.default_rng([seed, offset])
+    week = (np.arange(offset, offset + n_rows) // 4455) % 520  # 45 stores x 99 departments per week
+    store = rng.integers(1, 46, n_rows)
+    department = rng.integers(1, 100, n_rows)
+    holiday = (rng.random(n_rows) < 0.07).astype('int64')
+    sales = rng.gamma(2.0, 10000.0, n_rows) * (1 + 0.1 * holiday) + store * 50.0
+    frame = pd.DataFrame({
+        'Date': (pd.Timestamp('2010-02-05') + pd.to_timedelta(week * 7, unit='D')).strftime('%Y-%m-%d'),
+        'Store': store,
+        'Department': department,
+        'Weekly_Sales': sales.round(2),
+        'Is_Holiday': holiday,
+    })
+    return _inject_defects(frame, rng, ['Weekly_Sales'], missing_rate, duplicate_rate)
+
+
+def make_customer_churn(n_rows, seed=42, offset=0, missing_rate=0.01, duplicate_rate=0.01):
+    """Customer demographics with a binary churn label, like customer_churn.csv."""
+    rng = np.random.default_rng([seed, offset])
+    age = rng.integers(18, 80, n_rows)
+    income = (rng.normal(60000, 15000, n_rows) + age * 200).round(-2).clip(15000)
+    churn_probability = 1 / (1 + np.exp(-(age - 45) / 10.0))
+    frame = pd.DataFrame({
+        'CustomerID': np.arange(offset + 1, offset + n_rows + 1),
+        'Age': age,
+        'Gender': np.where(rng.random(n_rows) < 0.5, 'Male', 'Female'),
+        'Income': income,
+        'Churn': np.where(rng.random(n_rows) < churn_probability, 'Yes', 'No'),
+    })
+    return _inject_defects(frame, rng, ['Income'], missing_rate, duplicate_rate)
+
+
+def make_market_research(n_rows, seed=42, offset=0, missing_rate=0.01, duplicate_rate=0.01):
+    """Product prices and market share by category, like market_research.csv."""
+    rng = np.random.default_rng([seed, offset])
+    categories = np.array(list(PRODUCTS))
+    names = np.array([[products[i % len(products)] for i in range(6)] for products in PRODUCTS.values()])
+    category_idx = rng.integers(0, len(categories), n_rows)
+    frame = pd.DataFrame({
+        'product_id': np.arange(offset + 1, offset + n_rows + 1),
+        'product_name': names[category_idx, rng.integers(0, 6, n_rows)],
+        'category': categories[category_idx],
+        'price': rng.lognormal(4.5, 1.0, n_rows).round(2),
+        'market_share': rng.integers(1, 40, n_rows),
+    })
+    return _inject_defects(frame, rng, ['price'], missing_rate, duplicate_rate)
+
+
+GENERATORS = {
+    'walmart_grocery': make_walmart_grocery,
+    'customer_churn': make_customer_churn,
+    'market_research': make_market_research,
+}
+
+
+def write_csv(name, n_rows, path, seed=42, chunk_rows=1_000_000):
+    """Stream a generated dataset to CSV chunk by chunk so 10^8 rows never sit in memory."""
+    generator = GENERATORS[name]
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    written = 0
+    with open(path, 'w', newline='') as handle:
+        while written < n_rows:
+            rows = min(chunk_rows, n_rows - written)
+            generator(rows, seed=seed, offset=written).to_csv(handle, index=False, header=written == 0)
+            written += rows
+    return path
@@ -0,0 +1,63 @@
+# load_test.py
+"""Fire concurrent prediction requests at a running `data_vista.py serve` and report latency.
+
+Usage:
+    python src/data_vista.py serve --model model.joblib &
+    python benchmarks/load_test.py --data data/walmart_grocery_data.csv --drop Weekly_Sales
+    python benchmarks/load_test.py --concurrency 32 --requests 2000 --rows-per-request 10
+"""
+import argparse
+import json
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+
+def post(url, payload):
+    request = urllib.request.Request(url, data=payload, headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        response.read()
+    return time.perf_counter() - started
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the DataVista prediction server")
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server address')
+    parser.add_argument('--model', default=None, help='Model name (optional when the server has one model)')
+    parser.add_argument('--data', default='data/walmart_grocery_data.csv', help='CSV the request rows are drawn from')
+    parser.add_argument('--drop', nargs='*', default=[], help='Columns to leave out of the requests, e.g. the target')
+    parser.add_argument('--concurrency', type=int, default=16, help='Requests in flight at once')
+    parser.add_argument('--requests', type=int, default=1000, help='Total requests to send')
+    parser.add_argument('--rows-per-request', type=int, default=1)
+    args = parser.parse_args()
+
+    rows = pd.read_csv(args.data).drop(columns=args.drop).head(10_000)
+    records = json.loads(rows.to_json(orient='records', date_format='iso'))
+    size = args.rows_per_request
+    payloads = [json.dumps(records[(i * size) % len(records):][:size] or records[:size]).encode()
+                for i in range(args.requests)]
+    url = f"{args.url.rstrip('/')}/predict" + (f"/{args.model}" if args.model else '')
+
+    post(url, payloads[0])  # Warm up the connection and the model
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = list(pool.map(lambda payload: post(url, payload), payloads))
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.requests} requests x {size} rows, concurrency {args.concurrency}, {elapsed:.2f}s")
+    print(f"  throughput: {args.requests / elapsed:,.0f} requests/s, {args.requests * size / elapsed:,.0f} rows/s")
+    print(f"  latency:    p50 {percentile(latencies, 50) * 1000:.1f} ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.1f} ms, mean {statistics.mean(latencies) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
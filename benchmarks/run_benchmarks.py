@@ -0,0 +1,260 @@
+# run_benchmarks.py
+"""Time the DataVista pipeline on synthetic data and compare against a stored baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py                          # 10^4 rows, all cases
+    python benchmarks/run_benchmarks.py --sizes 10000 1000000    # several sizes
+    python benchmarks/run_benchmarks.py --cases load clean       # only some cases
+    python benchmarks/run_benchmarks.py --sizes 100000000        # streaming cases only, above --max-frame-rows
+    python benchmarks/run_benchmarks.py --save-baseline          # record a new baseline
+    python benchmarks/run_benchmarks.py --compare                # fail on regressions
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import warnings
+from unittest.mock import patch
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+
+from datasets import GENERATORS, write_csv
+from backends import get_backend, pl
+from data_loader import DataLoader
+from data_cleaner import DataCleaner
+from data_preprocessor import DataPreprocessor
+from statistical_analysis import StatisticalAnalysis
+from machine_learning import MachineLearning
+from visualization import Visualization
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'results', 'baseline.json')
+DATA_CACHE = os.path.join(BENCH_DIR, '.data')
+ARIMA_MAX_ROWS = 5000  # ARIMA cost is dominated by the optimiser, not the frame size
+MAX_FRAME_ROWS = 10_000_000  # Above this, only the cases in STREAMING_CASES run; the others need the whole frame
+STREAMING_CASES = {'load_chunks'}  # Cases that read the CSV in chunks and never hold the full frame
+SKIP = object()  # Returned by a setup when the case does not apply to the dataset
+
+# Numeric target and binary label used by the model cases, per dataset.
+TARGETS = {
+    'walmart_grocery': ('Weekly_Sales', 'Is_Holiday'),
+    'customer_churn': ('Income', 'Churn'),
+    'market_research': ('price', None),
+}
+
+
+class Context(dict):
+    """Inputs of the cases for one dataset and size. The full frame is read from the CSV on first
+    use, so a run of streaming cases never loads it."""
+
+    def __missing__(self, key):
+        if key != 'frame':
+            raise KeyError(key)
+        self['frame'] = pd.read_csv(self['path'])
+        return self['frame']
+
+
+def _chart_input(prompt=''):
+    """Answer the visualisation prompts: no labels, default palette and axis range, don't save."""
+    return '' if 'y value' in prompt else 'n'
+
+
+def _render_chart(frame, columns, chart_type):
+    with patch('builtins.input', side_effect=_chart_input), patch.object(plt, 'show'):
+        Visualization(frame).visualize(columns, chart_type)
+    plt.close('all')
+
+
+def _model_frame(ctx):
+    """Complete rows with the binary label as 0/1, as DataVista.machine_learning would leave them."""
+    frame = ctx['frame'].dropna().copy()
+    _, label = TARGETS[ctx['dataset']]
+    if label and frame[label].dtype.kind not in 'iub':
+        frame[label] = frame[label].astype('category').cat.codes
+    return frame
+
+
+def _classifier(ctx):
+    return MachineLearning(_model_frame(ctx)) if TARGETS[ctx['dataset']][1] else SKIP
+
+
+def _numeric_columns(frame):
+    return frame.select_dtypes(include=['number']).columns.tolist()
+
+
+def _polars(setup):
+    """Setup of a Polars-backend case, skipped when Polars is not installed. Its run gets pandas
+    frames like the pandas case, so the conversion to Polars is part of the timing."""
+    return lambda ctx: SKIP if pl is None else setup(ctx)
+
+
+# Each case is (name, setup, run). setup(ctx) builds the fresh input outside the timed
+# region (or returns SKIP); run(ctx, prepared) is the timed call. Runs only read the frame
+# through their setup, so its first, lazy read is never timed.
+CASES = [
+    ('load', lambda ctx: None,
+     lambda ctx, _: DataLoader(ctx['path']).load()),
+    ('load_chunks', lambda ctx: None,
+     lambda ctx, _: sum(len(chunk) for chunk in DataLoader(ctx['path']).iter_chunks())),
+    ('clean', lambda ctx: ctx['frame'].copy(),
+     lambda ctx, frame: DataCleaner(frame).clean(strategy='fill', fill_method='ffill')),
+    ('dedup', lambda ctx: ctx['frame'].copy(),
+     lambda ctx, frame: frame.drop_duplicates()),
+    ('outliers', lambda ctx: DataPreprocessor(ctx['frame'].dropna(), scale_choice='2', outlier_choice='1', fill_methods={}),
+     lambda ctx, pre: pre.remove_outliers()),
+    ('scaling', lambda ctx: DataPreprocessor(ctx['frame'].dropna(), scale_choice='1', outlier_choice='2', fill_methods={}),
+     lambda ctx, pre: pre.scale_features()),
+    ('describe', lambda ctx: ctx['frame'],
+     lambda ctx, frame: frame[_numeric_columns(frame)].describe()),
+    ('correlation', lambda ctx: StatisticalAnalysis(ctx['frame']),
+     lambda ctx, analysis: analysis.perform_correlation_analysis()),
+    ('clean_polars', _polars(lambda ctx: ctx['frame'].copy()),
+     lambda ctx, frame: DataCleaner(frame, 'polars').clean(strategy='fill', fill_method='ffill')),
+    ('outliers_polars', _polars(lambda ctx: DataPreprocessor(ctx['frame'].dropna(), scale_choice='2', outlier_choice='1',
+                                                              fill_methods={}, backend='polars')),
+     lambda ctx, pre: pre.remove_outliers()),
+    ('describe_polars', _polars(lambda ctx: ctx['frame']),
+     lambda ctx, frame: get_backend('polars').describe(frame, _numeric_columns(frame))),
+    ('correlation_polars', _polars(lambda ctx: StatisticalAnalysis(ctx['frame'], 'polars')),
+     lambda ctx, analysis: analysis.perform_correlation_analysis()),
+    ('linear_regression', lambda ctx: MachineLearning(_model_frame(ctx)),
+     lambda ctx, ml: ml.linear_regression(TARGETS[ctx['dataset']][0])),
+    ('logistic_regression', _classifier,
+     lambda ctx, ml: ml.classification(TARGETS[ctx['dataset']][1], 'logistic_regression')),
+    ('decision_tree', _classifier,
+     lambda ctx, ml: ml.classification(TARGETS[ctx['dataset']][1], 'decision_tree')),
+    ('random_forest', lambda ctx: MachineLearning(ctx['frame']),
+     lambda ctx, ml: ml.trees(TARGETS[ctx['dataset']][0], 'random_forest', 'regression')),
+    ('gradient_boosting', lambda ctx: MachineLearning(ctx['frame']),
+     lambda ctx, ml: ml.trees(TARGETS[ctx['dataset']][0], 'gradient_boosting', 'regression')),
+    ('gradient_boosting_classifier', _classifier,
+     lambda ctx, ml: ml.trees(TARGETS[ctx['dataset']][1], 'gradient_boosting', 'classification')),
+    ('kmeans', lambda ctx: MachineLearning(_model_frame(ctx)),
+     lambda ctx, ml: ml.clustering(4)),
+    ('arima', lambda ctx: MachineLearning(_model_frame(ctx).head(ARIMA_MAX_ROWS).reset_index(drop=True)),
+     lambda ctx, ml: ml.time_series(TARGETS[ctx['dataset']][0], (1, 1, 1))),
+    ('chart_histogram', lambda ctx: ctx['frame'],
+     lambda ctx, frame: _render_chart(frame, [TARGETS[ctx['dataset']][0]], '1')),
+    ('chart_boxplot', lambda ctx: ctx['frame'],
+     lambda ctx, frame: _render_chart(frame, [TARGETS[ctx['dataset']][0]], '2')),
+    ('chart_heatmap', lambda ctx: ctx['frame'][_numeric_columns(ctx['frame'])],
+     lambda ctx, numeric: _render_chart(numeric, numeric.columns.tolist(), '7')),
+]
+
+
+def dataset_path(dataset, n_rows, seed):
+    path = os.path.join(DATA_CACHE, f'{dataset}_{n_rows}_{seed}.csv')
+    if not os.path.exists(path):
+        write_csv(dataset, n_rows, path, seed=seed)
+    return path
+
+
+def time_case(ctx, setup, run, repeat):
+    timings = []
+    for _ in range(repeat):
+        prepared = setup(ctx)
+        if prepared is SKIP:
+            return None
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            run(ctx, prepared)
+            timings.append(time.perf_counter() - start)
+    return {'median_s': statistics.median(timings), 'min_s': min(timings), 'repeat': repeat}
+
+
+def run_benchmarks(datasets, sizes, cases, repeat, seed, max_frame_rows=MAX_FRAME_ROWS):
+    results = {}
+    for dataset in datasets:
+        for n_rows in sizes:
+            path = dataset_path(dataset, n_rows, seed)
+            ctx = Context(dataset=dataset, path=path)
+            for name, setup, run in CASES:
+                if cases and name not in cases:
+                    continue
+                key = f'{name}[{dataset}-{n_rows}]'
+                if n_rows > max_frame_rows and name not in STREAMING_CASES:
+                    print(f"{key:<45}{'skipped':>13} (over --max-frame-rows)")
+                    continue
+                result = time_case(ctx, setup, run, repeat)
+                if result is None:
+                    continue
+                results[key] = result
+                print(f"{key:<45}{results[key]['median_s']:>12.4f}s")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return the cases whose median is slower than the baseline by more than tolerance."""
+    regressions = []
+    print(f"\n{'Case':<45}{'Baseline':>12}{'Current':>12}{'Ratio':>8}")
+    for key, result in results.items():
+        if key not in baseline['results']:
+            continue
+        reference = baseline['results'][key]['median_s']
+        ratio = result['median_s'] / reference if reference else float('inf')
+        flag = '  REGRESSION' if ratio > 1 + tolerance else ''
+        print(f"{key:<45}{reference:>11.4f}s{result['median_s']:>11.4f}s{ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DataVista benchmark suite")
+    parser.add_argument('--datasets', nargs='+', choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10_000], help='Row counts, e.g. 10000 1000000 100000000')
+    parser.add_argument('--cases', nargs='+', choices=[name for name, _, _ in CASES], help='Only run these cases')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-frame-rows', type=int, default=MAX_FRAME_ROWS,
+                        help='Largest size at which cases that load the whole frame run; larger sizes run streaming cases only')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='Merge these results into the baseline file')
+    parser.add_argument('--compare', action='store_true', help='Exit non-zero if a case regressed against the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown before a case counts as a regression')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)  # Pipeline logs would drown the timings
+    warnings.simplefilter('ignore')
+    results = run_benchmarks(args.datasets, args.sizes, args.cases, args.repeat, args.seed, args.max_frame_rows)
+
+    if args.save_baseline:
+        baseline = {'results': {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as handle:
+                baseline = json.load(handle)
+        baseline['meta'] = {'python': platform.python_version(), 'pandas': pd.__version__,
+                            'machine': platform.machine(), 'processor': platform.processor() or platform.machine(),
+                            'cpus': os.cpu_count()}
+        baseline['results'].update(results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as handle:
+            json.dump(baseline, handle, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline}.")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}. Run with --save-baseline first.")
+            sys.exit(1)
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) regressed by more than {args.tolerance:.0%}.")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
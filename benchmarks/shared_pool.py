@@ -0,0 +1,108 @@
+# shared_pool.py
+"""Compare SharedPool with a ProcessPoolExecutor that pickles the data to every task.
+
+Both run the same per-column and per-row-range summaries over the numeric columns of a
+synthetic dataset. The baseline sends the whole frame with each task, as a parallel
+stage would have to without shared memory. SharedPool copies the columns into shared
+memory once and sends only the column name or row range.
+
+Usage:
+    python benchmarks/shared_pool.py                              # 10^6 rows, one worker per CPU
+    python benchmarks/shared_pool.py --rows 5000000 --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+
+from datasets import GENERATORS
+from parallel import SharedPool, shared_columns
+
+
+def column_summary(values):
+    return float(np.nanmean(values)), float(np.nanstd(values)), float(np.nanpercentile(values, 50))
+
+
+def range_summary(frame):
+    return frame.count().to_numpy(), frame.sum().to_numpy()
+
+
+# Baseline tasks receive the frame itself
+def pickled_column(data, column):
+    return column_summary(data[column].to_numpy(dtype='float64', na_value=np.nan))
+
+
+def pickled_range(data, task):
+    start, stop = task
+    return range_summary(data.iloc[start:stop])
+
+
+# SharedPool tasks receive the attached block and a descriptor
+def shared_column(shared, column):
+    return column_summary(shared.column(column))
+
+
+def shared_range(shared, task):
+    start, stop = task
+    return range_summary(shared.frame(start=start, stop=stop))
+
+
+def time_call(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run_pickled(data, workers, ranges):
+    columns = shared_columns(data)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+        by_column = list(pool.map(pickled_column, [data] * len(columns), columns))
+        by_range = list(pool.map(pickled_range, [data] * len(ranges), ranges))
+    return by_column, by_range
+
+
+def run_shared(data, workers, ranges):
+    with SharedPool(data, workers=workers) as pool:
+        by_column = pool.map(shared_column, pool.columns)
+        by_range = pool.map(shared_range, ranges)
+    return by_column, by_range
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SharedPool against a pickling ProcessPoolExecutor")
+    parser.add_argument('--dataset', choices=sorted(GENERATORS), default='walmart_grocery')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=max(os.cpu_count() or 1, 2))
+    parser.add_argument('--ranges', type=int, default=16, help='Row-range tasks per run')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    data = GENERATORS[args.dataset](args.rows, seed=args.seed)
+    size = -(-len(data) // args.ranges)
+    ranges = [(start, min(start + size, len(data))) for start in range(0, len(data), size)]
+    numeric = shared_columns(data)
+    print(f"{args.dataset}: {len(data):,} rows, {len(numeric)} numeric columns, "
+          f"{data[numeric].memory_usage(index=False).sum() / 2**20:.1f} MB shared, {args.workers} workers")
+
+    pickled = time_call(lambda: run_pickled(data, args.workers, ranges), args.repeat)
+    shared = time_call(lambda: run_shared(data, args.workers, ranges), args.repeat)
+    print(f"{'pickled ProcessPoolExecutor':<30}{pickled:>10.3f}s")
+    print(f"{'SharedPool':<30}{shared:>10.3f}s")
+    print(f"{'speedup':<30}{pickled / shared:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+# aggregation.py
+import logging
+import multiprocessing
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from colorama import Fore
+
+DEFAULT_STATS = ('count', 'sum', 'mean', 'min', 'max', 'std')
+
+
+def parse_stat(name):
+    """'p90' -> 0.9 and 'median' -> 0.5 for quantiles; None for the other statistics."""
+    if name == 'median':
+        return 0.5
+    match = re.fullmatch(r'p(\d{1,2}(?:\.\d+)?|100)', name)
+    return float(match.group(1)) / 100 if match else None
+
+
+def _grouped(frame, keys):
+    """Group a state frame by some of its index levels, or into a single group when keys is empty."""
+    if keys:
+        return frame.groupby(level=keys, dropna=False, sort=False)
+    return frame.groupby(np.zeros(len(frame), dtype='int64'), sort=False)
+
+
+class _Totals:
+    """The reductions of a group-by over a single group of every row, without grouping."""
+
+    def __init__(self, frame):
+        self.frame = frame
+
+    def _reduce(self, name, **kwargs):
+        series = getattr(self.frame, name)(**kwargs)
+        return pd.DataFrame({col: [value] for col, value in series.items()}, index=[0], columns=self.frame.columns)
+
+    def count(self):
+        return self._reduce('count')
+
+    def sum(self):
+        return self._reduce('sum')
+
+    def var(self, ddof):
+        return self._reduce('var', ddof=ddof)
+
+    def min(self):
+        return self._reduce('min')
+
+    def max(self):
+        return self._reduce('max')
+
+
+class PartialAggregate:
+    """Mergeable per-group state of a group-by query over some value columns.
+
+    For every group and column it keeps the non-null count, sum, sum of squared deviations
+    (merged with Chan's parallel formula), minimum and maximum. With a sketch it also keeps
+    a bottom-k sample: the ``sketch_size`` rows of each group with the smallest random
+    priority. The union of two bottom-k samples, cut back to k, is the bottom-k sample of
+    the combined data, so quantiles stay mergeable too (exact for groups of at most k rows).
+
+    States built from different chunks, files or worker processes merge into the state of
+    the whole data, and a state can be rolled up to fewer group columns, which is how
+    coarser queries and pivot margins reuse it.
+    """
+
+    MOMENTS = ('count', 'sum', 'm2', 'min', 'max')
+
+    def __init__(self, by, values, sketch_size=None):
+        self.by = list(by)
+        self.values = list(values)
+        self.sketch_size = sketch_size  # None keeps no sample, so quantiles are unavailable
+        self.moments = None  # {moment: DataFrame indexed by group, one column per value}
+        self.sample = None  # Bottom-k rows per group, with their '_priority'
+
+    @classmethod
+    def from_chunk(cls, chunk, by, values, sketch_size=None, priority=None):
+        state = cls(by, values, sketch_size)
+        if state.by:
+            grouped = chunk.groupby(state.by, dropna=False, observed=True, sort=False)[state.values]
+        else:  # One group holding every row, for totals: plain column reductions, as one-row frames
+            grouped = _Totals(chunk[state.values])
+        count = grouped.count()
+        state.moments = {
+            'count': count,
+            'sum': grouped.sum(),
+            'm2': (grouped.var(ddof=0) * count).fillna(0.0),
+            'min': grouped.min(),
+            'max': grouped.max(),
+        }
+        if sketch_size:
+            if priority is None:
+                priority = np.random.default_rng().random(len(chunk))
+            sample = chunk[state.by + state.values].assign(_priority=priority)
+            state.sample = state._bottom_k(sample, state.by)
+        return state
+
+    def _bottom_k(self, sample, keys):
+        if not keys:  # One group: select the k lowest priorities without sorting them
+            if len(sample) <= self.sketch_size:
+                return sample
+            keep = np.argpartition(sample['_priority'].to_numpy(), self.sketch_size - 1)[:self.sketch_size]
+            return sample.iloc[np.sort(keep)]
+        sample = sample.sort_values('_priority', kind='stable')
+        return sample.groupby(keys, dropna=False, sort=False).head(self.sketch_size)
+
+    @staticmethod
+    def _combine(parts, keys):
+        """Moments of the union of several states, grouped by ``keys``."""
+        frames = {moment: pd.concat([part[moment] for part in parts]) for moment in PartialAggregate.MOMENTS}
+        count = _grouped(frames['count'], keys)
+        total = _grouped(frames['sum'], keys)
+        # M2 = sum of each part's M2 plus its count times the squared shift of its mean from the group mean
+        part_mean = frames['sum'] / frames['count'].replace(0, np.nan)
+        group_mean = total.transform('sum') / count.transform('sum').replace(0, np.nan)
+        shift = (frames['count'] * (part_mean - group_mean) ** 2).fillna(0.0)
+        m2 = _grouped(frames['m2'] + shift, keys).sum()
+        return {
+            'count': count.sum(),
+            'sum': total.sum(),
+            'm2': m2,
+            'min': _grouped(frames['min'], keys).min(),
+            'max': _grouped(frames['max'], keys).max(),
+        }
+
+    def merge(self, *others):
+        """Fold other states of the same query into this one. Returns self."""
+        states = [state for state in (self,) + others if state.moments is not None]
+        if len(states) > 1:
+            self.moments = self._combine([state.moments for state in states], self.by)
+            if self.sketch_size:
+                self.sample = self._bottom_k(pd.concat([state.sample for state in states], ignore_index=True), self.by)
+        elif states:
+            self.moments, self.sample = states[0].moments, states[0].sample
+        return self
+
+    def rollup(self, by, values=None):
+        """State of the same data grouped by a subset of the group columns (or none, for totals)."""
+        values = list(values or self.values)
+        state = PartialAggregate(by, values, self.sketch_size)
+        parts = [{moment: frame[values] for moment, frame in self.moments.items()}]
+        state.moments = self._combine(parts, list(by))
+        if self.sketch_size:
+            state.sample = self._bottom_k(self.sample[list(by) + values + ['_priority']], list(by))
+        return state
+
+    def result(self, stats=DEFAULT_STATS):
+        """Statistics per group, as a DataFrame with (value, statistic) columns, ordered by group."""
+        moments = self.moments
+        quantiles = {stat: parse_stat(stat) for stat in stats if parse_stat(stat) is not None}
+        if quantiles and not self.sketch_size:
+            raise ValueError("Quantiles need a state built with a sketch.")
+        count = moments['count']
+        computed = {
+            'count': count,
+            'sum': moments['sum'],
+            'mean': moments['sum'] / count.replace(0, np.nan),
+            'min': moments['min'],
+            'max': moments['max'],
+            'std': np.sqrt(moments['m2'] / (count - 1).where(count > 1)),
+            'var': moments['m2'] / (count - 1).where(count > 1),
+        }
+        if quantiles:
+            grouped = (self.sample.groupby(self.by, dropna=False, sort=False) if self.by
+                       else self.sample.groupby(np.zeros(len(self.sample), dtype='int64'), sort=False))[self.values]
+            for stat, q in quantiles.items():
+                computed[stat] = grouped.quantile(q).reindex(count.index)
+        unknown = [stat for stat in stats if stat not in computed]
+        if unknown:
+            raise ValueError(f"Unknown statistics {unknown}. Use {', '.join(DEFAULT_STATS)}, var, median or pNN.")
+        table = pd.concat({stat: computed[stat] for stat in stats}, axis=1)
+        table = table.swaplevel(axis=1).reindex(columns=pd.MultiIndex.from_product([self.values, list(stats)]))
+        return table.sort_index() if self.by else table.set_axis(['All'])
+
+
+_worker_job = None  # (engine, by, values, sketch, parts), inherited by forked workers
+
+
+def _init_worker(job):
+    global _worker_job
+    _worker_job = job
+
+
+def _run_part(part):
+    engine, by, values, sketch, parts = _worker_job
+    return engine._partial(parts[part], by, values, sketch)
+
+
+class AggregationEngine:
+    """Group-by and pivot queries by hash aggregation over streamed chunks, with a query cache.
+
+    The source is an in-memory DataFrame or a DataLoader. It is processed one chunk at a time
+    into PartialAggregate states, split across forked worker processes (by row range or by
+    file) and merged. Merged states are cached by query; a query grouped by a subset of a
+    cached query's columns is answered by rolling that state up instead of rescanning, and
+    pivot tables and their margins are built from the same states.
+    """
+
+    def __init__(self, data=None, loader=None, chunksize=100_000, max_workers=None, sketch_size=2000,
+                 seed=42, max_entries=16):
+        if (data is None) == (loader is None):
+            raise ValueError("Pass either data or a loader.")
+        self.data = data
+        self.loader = loader
+        self.chunksize = chunksize
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.sketch_size = sketch_size
+        self.seed = seed
+        self.max_entries = max_entries
+        self._cache = OrderedDict()  # (by, values, sketch) -> PartialAggregate
+
+    def _parts(self):
+        """Independent pieces of the source: row ranges of the data, or groups of files."""
+        if self.data is not None:
+            n_parts = max(1, min(self.max_workers, -(-len(self.data) // self.chunksize)))
+            bounds = np.linspace(0, len(self.data), n_parts + 1).astype(int)
+            return [('rows', start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+        paths = self.loader.resolve_paths()
+        return [('files', paths[i::self.max_workers]) for i in range(min(self.max_workers, len(paths)))]
+
+    def _chunks(self, part, columns):
+        """Yield (chunk, source number, row positions in that source) for one part."""
+        if part[0] == 'rows':
+            for start in range(part[1], part[2], self.chunksize):
+                stop = min(start + self.chunksize, part[2])
+                yield self.data.iloc[start:stop][columns], 0, np.arange(start, stop)
+        else:
+            paths = self.loader.resolve_paths()
+            for path in part[1]:
+                offset = 0
+                for chunk in self.loader.iter_chunks(self.chunksize, shards=[path]):
+                    yield chunk[columns], paths.index(path), np.arange(offset, offset + len(chunk))
+                    offset += len(chunk)
+
+    def _priority(self, source, positions):
+        """Pseudo-random sketch priority of each row, from its source and position only.
+
+        Results are therefore the same whatever the chunk size or number of workers.
+        """
+        hashed = pd.util.hash_array(positions, hash_key=f'{self.seed % 10**8:08d}{source:08d}')
+        return hashed / np.float64(2 ** 64)
+
+    def _partial(self, part, by, values, sketch):
+        """Merged state of one part of the source, built chunk by chunk."""
+        state = PartialAggregate(by, values, self.sketch_size if sketch else None)
+        for chunk, source, positions in self._chunks(part, list(dict.fromkeys(by + values))):
+            priority = self._priority(source, positions) if sketch else None
+            state.merge(PartialAggregate.from_chunk(chunk, by, values, state.sketch_size, priority))
+        return state
+
+    def _compute(self, by, values, sketch):
+        parts = self._parts()
+        if len(parts) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            with ProcessPoolExecutor(max_workers=len(parts), mp_context=multiprocessing.get_context('fork'),
+                                     initializer=_init_worker, initargs=((self, by, values, sketch, parts),)) as pool:
+                states = list(pool.map(_run_part, range(len(parts))))
+        else:
+            states = [self._partial(part, by, values, sketch) for part in parts]
+        return states[0].merge(*states[1:])
+
+    def _remember(self, key, state):
+        self._cache[key] = state
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def state(self, by, values=None, sketch=False):
+        """Merged PartialAggregate for grouping by ``by``, from the cache when possible."""
+        by = [by] if isinstance(by, str) else list(by)
+        schema = self.data if self.data is not None else self.loader.read_schema()
+        if values is None:
+            values = [col for col in schema.select_dtypes(include='number').columns if col not in by]
+        values = [values] if isinstance(values, str) else list(values)
+        missing = [col for col in by + values if col not in schema.columns]
+        if missing:
+            raise KeyError(f"Columns not found: {missing}")
+        text = [col for col in values if not pd.api.types.is_numeric_dtype(schema[col])]
+        if text:
+            raise ValueError(f"Value columns must be numeric: {text}")
+
+        key = (tuple(by), tuple(values), sketch)
+        for (cached_by, cached_values, cached_sketch), state in reversed(self._cache.items()):
+            if set(by) <= set(cached_by) and set(values) <= set(cached_values) and (cached_sketch or not sketch):
+                if (tuple(by), tuple(values)) == (cached_by, cached_values):
+                    logging.info(Fore.GREEN + f"Aggregation by {by} served from the cache." + Fore.RESET)
+                    return state
+                logging.info(Fore.GREEN + f"Aggregation by {by} rolled up from the cached one by {list(cached_by)}." + Fore.RESET)
+                rolled = state.rollup(by, values)
+                self._remember(key, rolled)
+                return rolled
+        state = self._compute(by, values, sketch)
+        self._remember(key, state)
+        return state
+
+    def aggregate(self, by, values=None, stats=DEFAULT_STATS):
+        """Statistics per group, e.g. ``aggregate('Store', 'Weekly_Sales', ['mean', 'p90'])``.
+
+        Args:
+            by (str or list): Group columns. Missing keys form their own group.
+            values (str or list): Value columns; defaults to every other numeric column.
+            stats (list): Any of count, sum, mean, min, max, std, var, and approximate
+                quantiles as 'median' or 'pNN' (e.g. 'p95').
+        """
+        stats = [stats] if isinstance(stats, str) else list(stats)
+        sketch = any(parse_stat(stat) is not None for stat in stats)
+        return self.state(by, values, sketch).result(stats)
+
+    def pivot(self, index, columns, values, agg='sum', margins=False):
+        """Pivot table of one statistic of ``values``, with optional 'All' margins.
+
+        The margins are rolled up from the same state as the cells, so they are exact
+        aggregates of the underlying rows (not sums of cell values) for every statistic.
+        """
+        index = [index] if isinstance(index, str) else list(index)
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        state = self.state(index + columns, [values], sketch=parse_stat(agg) is not None)
+        table = state.result([agg])[(values, agg)].unstack(columns)
+        if margins:
+            # With several group columns the margin key fills the other levels with '', as pandas does
+            column_key = 'All' if len(columns) == 1 else ('All',) + ('',) * (len(columns) - 1)
+            table[column_key] = state.rollup(index).result([agg])[(values, agg)]
+            totals = state.rollup(columns).result([agg])[(values, agg)]
+            grand = state.rollup([]).result([agg])[(values, agg)].iloc[0]
+            if len(index) == 1:
+                row_key = pd.Index(['All'], name=table.index.name)
+            else:
+                row_key = pd.MultiIndex.from_tuples([('All',) + ('',) * (len(index) - 1)], names=table.index.names)
+            margin = pd.DataFrame([totals.reindex(table.columns[:-1]).tolist() + [grand]], index=row_key,
+                                  columns=table.columns)
+            table = pd.concat([table, margin])
+        return table
+
+    def clear(self):
+        self._cache.clear()
@@ -0,0 +1,116 @@
+# backends.py
+import logging
+import weakref
+import pandas as pd
+from colorama import Fore
+
+try:
+    import polars as pl
+except ImportError:  # Polars is optional; the pandas backend is always available
+    pl = None
+
+
+class PandasBackend:
+    """Compute backend for the heavy operations of the core stages.
+
+    Frames are pandas at every module boundary; a backend only changes how the
+    expensive parts (parsing, duplicate detection, quantiles, describe and
+    correlation) are computed.
+    """
+
+    name = 'pandas'
+
+    def read_csv(self, path, delimiter=',', usecols=None):
+        return pd.read_csv(path, delimiter=delimiter, usecols=usecols)
+
+    def duplicated(self, data):
+        """Boolean array marking every repeat of an earlier row."""
+        return data.duplicated().to_numpy()
+
+    def quantiles(self, series, qs):
+        return [series.quantile(q) for q in qs]
+
+    def describe(self, data, columns):
+        return data[columns].describe()
+
+    def corr(self, data, columns):
+        return data[columns].corr()
+
+
+class PolarsBackend(PandasBackend):
+    """Multi-threaded, Arrow-native implementation of the same operations using Polars.
+
+    Every stage gets its own backend, which keeps the Polars copy of the stage's frame
+    while that frame is alive. Each column is converted once per stage, e.g. once for
+    both describe and corr, rather than once per operation. A frame edited in place
+    must be handed to a new backend.
+    """
+
+    name = 'polars'
+
+    def __init__(self):
+        self._source = None  # Weak reference to the pandas frame the Polars copy was made from
+        self._copy = None
+
+    def _frame(self, data, columns=None):
+        columns = [str(col) for col in (data.columns if columns is None else columns)]
+        if self._source is None or self._source() is not data:
+            self._source, self._copy = weakref.ref(data), None
+        missing = [col for col in columns if self._copy is None or col not in self._copy.columns]
+        if missing:
+            converted = pl.from_pandas(data[missing])
+            self._copy = converted if self._copy is None else self._copy.hstack(converted)
+        return self._copy.select(columns)
+
+    def read_csv(self, path, delimiter=',', usecols=None):
+        data = pl.read_csv(path, separator=delimiter, columns=usecols, infer_schema_length=10_000)
+        data = data.to_pandas()
+        if usecols is not None:
+            data = data[[col for col in pd.read_csv(path, delimiter=delimiter, nrows=0).columns if col in usecols]]
+        return data
+
+    def duplicated(self, data):
+        frame = self._frame(data)
+        return ~frame.select(pl.struct(pl.all()).is_first_distinct()).to_series().to_numpy()
+
+    def quantiles(self, series, qs):
+        values = pl.from_pandas(series)
+        return [values.quantile(q, interpolation='linear') for q in qs]
+
+    def describe(self, data, columns):
+        frame = self._frame(data, columns)
+        stats = {
+            'count': pl.all().count(),
+            'mean': pl.all().mean(),
+            'std': pl.all().std(ddof=1),
+            'min': pl.all().min(),
+            '25%': pl.all().quantile(0.25, interpolation='linear'),
+            '50%': pl.all().quantile(0.5, interpolation='linear'),
+            '75%': pl.all().quantile(0.75, interpolation='linear'),
+            'max': pl.all().max(),
+        }
+        rows = {name: frame.select(expr.cast(pl.Float64)).row(0) for name, expr in stats.items()}
+        return pd.DataFrame.from_dict(rows, orient='index', columns=list(columns))
+
+    def corr(self, data, columns):
+        frame = self._frame(data, columns)
+        if any(frame.null_count().row(0)):
+            return super().corr(data, columns)  # pandas uses pairwise-complete rows; keep its semantics
+        matrix = frame.cast(pl.Float64).corr().to_numpy()
+        return pd.DataFrame(matrix, index=list(columns), columns=list(columns))
+
+
+BACKENDS = {'pandas': PandasBackend, 'polars': PolarsBackend}
+
+
+def get_backend(name='pandas'):
+    """Return the named backend, falling back to pandas when Polars is not installed."""
+    if isinstance(name, PandasBackend):
+        return name
+    if name not in BACKENDS:
+        logging.error(Fore.RED + f"Unknown backend '{name}'. Using pandas." + Fore.RESET)
+        return PandasBackend()
+    if name == 'polars' and pl is None:
+        logging.warning(Fore.YELLOW + "Polars is not installed (pip install polars). Using the pandas backend." + Fore.RESET)
+        return PandasBackend()
+    return BACKENDS[name]()
@@ -0,0 +1,56 @@
+# category_encoder.py
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+
+class CategoryEncoder(BaseEstimator, TransformerMixin):
+    """Encode a mixed DataFrame as one float column per input column, for tree models.
+
+    Numeric and boolean columns pass through with their missing values left as NaN, since
+    trees route missing values natively. Datetimes become seconds since the epoch.
+    Categorical columns are replaced by their position in a vocabulary fitted on the
+    training data (sorted, as pd.Categorical orders them); missing and unseen values
+    become NaN. The encoder is the first step of the model's Pipeline, so scoring uses
+    the training vocabulary.
+    """
+
+    def fit(self, X, y=None):
+        self.columns_ = list(X.columns)
+        self.datetime_columns_ = list(X.select_dtypes(include=['datetime', 'datetimetz']).columns)
+        numeric = set(X.select_dtypes(include=['number', 'bool']).columns) | set(self.datetime_columns_)
+        self.categorical_columns_ = [col for col in self.columns_ if col not in numeric]
+        self.vocabulary_ = {col: pd.Index(pd.Categorical(X[col]).categories) for col in self.categorical_columns_}
+        return self
+
+    @property
+    def categorical_mask_(self):
+        return np.array([col in self.vocabulary_ for col in self.columns_])
+
+    def cardinalities(self):
+        """Number of categories of each column (0 for numeric columns), in column order."""
+        return np.array([len(self.vocabulary_[col]) if col in self.vocabulary_ else 0 for col in self.columns_])
+
+    def frame(self, X):
+        """The encoded columns as a float64 DataFrame, with the input's index."""
+        encoded = {}
+        for col in self.columns_:
+            values = X[col]
+            if col in self.vocabulary_:
+                codes = self.vocabulary_[col].get_indexer(values).astype('float64')
+                codes[codes < 0] = np.nan
+                encoded[col] = codes
+            elif col in self.datetime_columns_:
+                if values.dt.tz is not None:
+                    values = values.dt.tz_convert('UTC').dt.tz_localize(None)
+                # Independent of the datetime resolution; NaT becomes NaN
+                encoded[col] = ((values - pd.Timestamp(0)) // pd.Timedelta(seconds=1)).astype('float64').to_numpy()
+            else:
+                encoded[col] = values.astype('float64').to_numpy()
+        return pd.DataFrame(encoded, index=X.index, columns=self.columns_)
+
+    def transform(self, X):
+        return self.frame(X).to_numpy()
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray([str(col) for col in self.columns_], dtype=object)
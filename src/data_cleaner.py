@@ -1,10 +1,18 @@
+import numpy as np
 import pandas as pd
 import logging
 from colorama import Fore
+from backends import get_backend
+from hashing import HashSet, row_hashes
 
 class DataCleaner:
-    def __init__(self, data):
+    def __init__(self, data, backend='pandas', chunksize=None):
         self.data = data
+        self.backend = get_backend(backend)
+        self.chunksize = chunksize  # Find duplicates this many rows at a time, to bound memory; None: all at once
+        self.strategy = None  # Choices actually applied, recorded for session replay
+        self.fill_method = None
+        self.state = {}  # Strategy and fill values, so the same cleaning can be reapplied to new rows
 
     def clean(self, strategy=None, fill_method=None):
         """Clean the dataset by removing duplicates and handling missing values.
@@ -19,7 +27,8 @@ class DataCleaner:
             return None
 
         initial_shape = self.data.shape
-        self.data.drop_duplicates(inplace=True)
+        duplicated = self.duplicated_in_chunks() if self.chunksize else self.backend.duplicated(self.data)
+        self.data = self.data[~duplicated]
         logging.info(Fore.GREEN + f"Removed duplicates: {initial_shape[0]} -> {self.data.shape[0]} rows." + Fore.RESET)
 
         logging.info(Fore.YELLOW + "Current missing values:\n" + Fore.RESET)
@@ -30,30 +39,10 @@ class DataCleaner:
         total_rows_filled = 0
 
         if strategy is None:
-            print(Fore.BLUE + "\nChoose an action for handling missing values:\n" + Fore.RESET)
-            print("1. Remove rows with missing values")
-            print("2. Fill missing values")
-            print("3. Skip to the next step")
-            action = input(Fore.BLUE + "\nEnter your choice (1, 2, or 3): " + Fore.RESET).strip()
-
-            if action == '1':
-                confirm = input(Fore.YELLOW + "\nAre you sure you want to remove rows with missing values? (y/n): " + Fore.RESET)
-                strategy = 'remove' if confirm.lower() == 'y' else 'skip'
-            elif action == '2':
-                strategy = 'fill'
-                print("Choose a filling method:")
-                print("1. Fill with mean")
-                print("2. Fill with mode")
-                print("3. Forward fill")
-                print("4. Backward fill")
-                print("5. Interpolate")
-                method_choice = input(Fore.BLUE + "Enter method number: " + Fore.RESET).strip()
-                fill_method = {'1': 'mean', '2': 'mode', '3': 'ffill', '4': 'bfill', '5': 'interpolate'}.get(method_choice)
-            elif action == '3':
-                strategy = 'skip'
-            else:
-                logging.error(Fore.RED + "Invalid input. Skipping missing value handling." + Fore.RESET)
-                strategy = 'skip'
+            strategy, fill_method = self.ask_strategy()
+
+        self.strategy, self.fill_method = strategy, fill_method
+        self.state = {'strategy': strategy, 'fill_method': fill_method, 'fill_values': {}}
 
         # Apply strategy
         if strategy == 'remove':
@@ -65,16 +54,10 @@ class DataCleaner:
             else:
                 for col in self.data.columns:
                     if self.data[col].isnull().sum() > 0:
-                        if fill_method == 'mean':
-                            self.data[col].fillna(self.data[col].mean(), inplace=True)
-                        elif fill_method == 'mode':
-                            self.data[col].fillna(self.data[col].mode()[0], inplace=True)
-                        elif fill_method == 'ffill':
-                            self.data[col].fillna(method='ffill', inplace=True)
-                        elif fill_method == 'bfill':
-                            self.data[col].fillna(method='bfill', inplace=True)
-                        elif fill_method == 'interpolate':
-                            self.data[col].interpolate(inplace=True)
+                        value = self.fill_constant(self.data[col], fill_method)
+                        if value is not None:
+                            self.state['fill_values'][col] = value
+                        self.data[col] = self.fill_series(self.data[col], fill_method, value)
                         total_rows_filled += self.data[col].isnull().sum()
                 logging.info(Fore.GREEN + f"Filled missing values using method '{fill_method}'." + Fore.RESET)
         elif strategy == 'skip':
@@ -84,3 +67,97 @@ class DataCleaner:
         logging.info(Fore.GREEN + f"Cleaning summary:\n\nInitial rows: {total_rows_initial}\nFinal rows: {total_rows_final}\nRows removed: {total_rows_initial - total_rows_final}\nRows filled: {total_rows_filled}" + Fore.RESET)
 
         return self.data
+
+    def duplicated_in_chunks(self):
+        """Mark repeated rows by hashing one slice of rows at a time.
+
+        Each row is reduced to a 64-bit hash that is checked against the hashes of earlier
+        rows, so the extra memory is about 8 bytes per row instead of a factorised copy of
+        every column.
+        """
+        seen = HashSet()
+        marks = [seen.repeats(row_hashes(self.data.iloc[start:start + self.chunksize]))
+                 for start in range(0, len(self.data), self.chunksize)]
+        return np.concatenate(marks) if marks else np.zeros(0, dtype=bool)
+
+    @staticmethod
+    def ask_strategy():
+        """Prompt for how to handle missing values. Returns (strategy, fill_method)."""
+        fill_method = None
+        print(Fore.BLUE + "\nChoose an action for handling missing values:\n" + Fore.RESET)
+        print("1. Remove rows with missing values")
+        print("2. Fill missing values")
+        print("3. Skip to the next step")
+        action = input(Fore.BLUE + "\nEnter your choice (1, 2, or 3): " + Fore.RESET).strip()
+
+        if action == '1':
+            confirm = input(Fore.YELLOW + "\nAre you sure you want to remove rows with missing values? (y/n): " + Fore.RESET)
+            strategy = 'remove' if confirm.lower() == 'y' else 'skip'
+        elif action == '2':
+            strategy = 'fill'
+            print("Choose a filling method:")
+            print("1. Fill with mean")
+            print("2. Fill with mode")
+            print("3. Forward fill")
+            print("4. Backward fill")
+            print("5. Interpolate")
+            method_choice = input(Fore.BLUE + "Enter method number: " + Fore.RESET).strip()
+            fill_method = {'1': 'mean', '2': 'mode', '3': 'ffill', '4': 'bfill', '5': 'interpolate'}.get(method_choice)
+        elif action == '3':
+            strategy = 'skip'
+        else:
+            logging.error(Fore.RED + "Invalid input. Skipping missing value handling." + Fore.RESET)
+            strategy = 'skip'
+        return strategy, fill_method
+
+    @staticmethod
+    def fill_constant(series, fill_method):
+        """The value 'mean' and 'mode' fill with; None for methods that depend on neighbouring rows."""
+        if fill_method == 'mean':
+            return series.mean()
+        elif fill_method == 'mode':
+            return series.mode()[0]
+        return None
+
+    @staticmethod
+    def fill_series(series, fill_method, value=None):
+        """Return the series with missing values filled using fill_method (or with value, if given)."""
+        if value is not None or fill_method in ('mean', 'mode'):
+            return series.fillna(DataCleaner.fill_constant(series, fill_method) if value is None else value)
+        elif fill_method == 'ffill':
+            return series.ffill()
+        elif fill_method == 'bfill':
+            return series.bfill()
+        elif fill_method == 'interpolate':
+            return series.interpolate()
+        return series
+
+    @staticmethod
+    def apply_state(data, state, context=None):
+        """Reapply a recorded cleaning to new, already deduplicated rows.
+
+        Mean and mode fills reuse the values fitted on the original data. Forward fill,
+        backward fill and interpolation run over ``context`` (the last cleaned rows) followed
+        by the new rows, so they continue from where the cleaned data ends.
+
+        Args:
+            data (DataFrame): New rows in the same raw layout as the cleaned data.
+            state (dict): A cleaner's ``state``, e.g. as restored from the session.
+            context (DataFrame): Rows that precede ``data``, already cleaned.
+        """
+        strategy, fill_method = state.get('strategy'), state.get('fill_method')
+        if strategy == 'remove':
+            return data.dropna()
+        if strategy != 'fill' or not fill_method:
+            return data
+        data = data.copy()
+        fill_values = state.get('fill_values', {})
+        framed = data if context is None else pd.concat([context, data])
+        for col in data.columns:
+            if data[col].isnull().any():
+                if col in fill_values:
+                    data[col] = data[col].fillna(fill_values[col])
+                else:
+                    filled = DataCleaner.fill_series(framed[col], fill_method)
+                    data[col] = filled.iloc[len(framed) - len(data):].set_axis(data.index)
+        return data
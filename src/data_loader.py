@@ -1,33 +1,235 @@
+import glob
+import io
+import json
+import os
+import numpy as np
 import pandas as pd
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from colorama import Fore
+from backends import get_backend
+from validation import Validator, ValidationError
+
+try:
+    import openpyxl
+except ImportError:  # Only needed to stream Excel workbooks
+    openpyxl = None
 
 class DataLoader:
-    def __init__(self, file_path, file_format='csv', delimiter=','):
+    EXTENSIONS = {'csv': ('.csv',), 'excel': ('.xlsx', '.xlsm', '.xls'), 'json': ('.json',), 'jsonl': ('.jsonl', '.ndjson')}
+    FORMATS = ('auto', 'csv', 'excel', 'json', 'jsonl')
+
+    def __init__(self, file_path, file_format='auto', delimiter=',', max_workers=None, partition_column='source_file',
+                 usecols=None, backend='pandas', sheet_name=0, rules=None, chunksize=100_000):
+        """Set up the loader.
+
+        Args:
+            file_path (str or list): A file, a glob pattern ('exports/*.csv'), a directory,
+                or a list of any of these.
+            file_format (str): 'csv', 'excel', 'json', 'jsonl' (JSON Lines), or 'auto' to detect
+                each file's format from its extension and first bytes.
+            delimiter (str): Field delimiter for CSV files.
+            max_workers (int): Threads used to parse shards in parallel. Defaults to one per CPU.
+            partition_column (str): Column that records the source file when several shards are
+                loaded. None to leave it out.
+            usecols (list): Only read these columns. None reads them all.
+            backend (str): 'pandas' or 'polars' (multi-threaded CSV parsing when installed).
+            sheet_name (int or str): Worksheet to read from Excel workbooks.
+            rules (Validator, dict or str): Data-quality rules checked while loading, as a
+                Validator, a spec dict or the path of a JSON spec. Data that breaks an
+                error-severity rule is rejected. None only runs the basic checks.
+            chunksize (int): Rows checked at a time by the validation rules.
+        """
         self.file_path = file_path
         self.file_format = file_format
         self.delimiter = delimiter
+        self.max_workers = max_workers or os.cpu_count()
+        self.partition_column = partition_column
+        self.usecols = usecols
+        self.backend = get_backend(backend)
+        self.sheet_name = sheet_name
+        self.rules = Validator.load(rules)
+        self.chunksize = chunksize
+
+    def resolve_paths(self):
+        """Expand globs and directories into a sorted list of shard files."""
+        sources = self.file_path if isinstance(self.file_path, (list, tuple)) else [self.file_path]
+        if self.file_format == 'auto':
+            extensions = tuple(ext for exts in self.EXTENSIONS.values() for ext in exts)
+        else:
+            extensions = self.EXTENSIONS.get(self.file_format, ())
+        paths = []
+        for source in sources:
+            if os.path.isdir(source):
+                paths.extend(sorted(
+                    os.path.join(source, name) for name in os.listdir(source)
+                    if name.lower().endswith(extensions)
+                ))
+            elif glob.has_magic(source):
+                paths.extend(sorted(glob.glob(source)))
+            else:
+                paths.append(source)
+        return list(dict.fromkeys(paths))  # Drop repeats, keep order
+
+    def _file_columns(self):
+        """Columns to request from each file; the partition column is added by the loader."""
+        if self.usecols is None:
+            return None
+        return [col for col in self.usecols if col != self.partition_column]
+
+    def detect_format(self, path):
+        """Format of one file: the configured one, or detected from its extension and first bytes."""
+        if self.file_format != 'auto':
+            return self.file_format
+        lower = path.lower()
+        for fmt in ('csv', 'excel', 'jsonl'):
+            if lower.endswith(self.EXTENSIONS[fmt]):
+                return fmt
+        with open(path, 'rb') as handle:
+            head = handle.read(8)
+            if head.startswith((b'PK\x03\x04', b'\xd0\xcf\x11\xe0')):  # xlsx (zip) or legacy xls
+                return 'excel'
+            handle.seek(0)
+            first_line = handle.readline().lstrip(b'\xef\xbb\xbf').strip()
+        if first_line.startswith(b'['):
+            return 'json'
+        if first_line.startswith(b'{'):
+            try:
+                json.loads(first_line)
+                return 'jsonl'  # A complete object on the first line: one record per line
+            except ValueError:
+                return 'json'
+        return 'csv'
+
+    @staticmethod
+    def _select(data, usecols):
+        """Keep only the requested columns, in file order, as pandas' usecols does."""
+        return data if usecols is None else data[[col for col in data.columns if col in usecols]]
+
+    def _read_file(self, path, nrows=None):
+        """Read a single file (or its first nrows rows) in its format."""
+        usecols = self._file_columns()
+        fmt = self.detect_format(path)
+        if fmt == 'csv' and nrows is None:
+            return self.backend.read_csv(path, delimiter=self.delimiter, usecols=usecols)
+        elif fmt == 'csv':
+            return pd.read_csv(path, delimiter=self.delimiter, usecols=usecols, nrows=nrows)
+        elif fmt == 'excel':
+            return pd.read_excel(path, sheet_name=self.sheet_name, usecols=usecols, nrows=nrows)
+        elif fmt == 'jsonl':
+            return self._select(pd.read_json(path, lines=True, nrows=nrows), usecols)
+        elif fmt == 'json':
+            data = pd.read_json(path)
+            return self._select(data if nrows is None else data.head(nrows), usecols)
+        raise ValueError(f"Unsupported file format: {fmt}. Please use 'csv', 'excel', 'json' or 'jsonl'.")
+
+    def _iter_file(self, path, chunksize):
+        """Yield one file as DataFrame chunks without reading it whole, where the format allows."""
+        usecols = self._file_columns()
+        fmt = self.detect_format(path)
+        if fmt == 'csv':
+            yield from pd.read_csv(path, delimiter=self.delimiter, usecols=usecols, chunksize=chunksize)
+        elif fmt == 'jsonl':
+            with pd.read_json(path, lines=True, chunksize=chunksize) as reader:
+                for chunk in reader:
+                    yield self._select(chunk, usecols)
+        elif fmt == 'excel' and not path.lower().endswith('.xls'):
+            yield from self._iter_excel(path, chunksize)
+        else:
+            # JSON arrays and legacy .xls files can only be parsed whole
+            data = self._read_file(path)
+            for start in range(0, len(data), chunksize):
+                yield data.iloc[start:start + chunksize]
+
+    def _iter_excel(self, path, chunksize):
+        """Stream rows of one worksheet with openpyxl's read-only mode."""
+        if openpyxl is None:
+            raise ImportError("Streaming Excel files requires openpyxl (pip install openpyxl).")
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            if isinstance(self.sheet_name, int):
+                sheet = workbook.worksheets[self.sheet_name]
+            else:
+                sheet = workbook[self.sheet_name]
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            header = [f'Unnamed: {i}' if name is None else str(name) for i, name in enumerate(header)]
+            batch, start = [], 0
+            for row in rows:
+                batch.append(row)
+                if len(batch) == chunksize:
+                    yield self._excel_chunk(batch, header, start)
+                    start += len(batch)
+                    batch = []
+            if batch:
+                yield self._excel_chunk(batch, header, start)
+        finally:
+            workbook.close()
+
+    def _excel_chunk(self, rows, header, start):
+        data = pd.DataFrame(rows, columns=header, index=pd.RangeIndex(start, start + len(rows)))
+        return self._select(data.infer_objects(), self._file_columns())
+
+    def _tag_partition(self, data, path, paths):
+        """Record the source file of each row as a categorical column shared by all shards."""
+        if self.partition_column and len(paths) > 1:
+            categories = pd.CategoricalDtype([os.path.basename(p) for p in paths])
+            codes = np.full(len(data), paths.index(path), dtype='int32')
+            data[self.partition_column] = pd.Categorical.from_codes(codes, dtype=categories)
+        return data
+
+    def check_schemas(self, frames, paths):
+        """Make sure every shard has the same columns as the first one; warn on dtype drift."""
+        reference = frames[0]
+        for frame, path in zip(frames[1:], paths[1:]):
+            if list(frame.columns) != list(reference.columns):
+                missing = set(reference.columns) - set(frame.columns)
+                extra = set(frame.columns) - set(reference.columns)
+                logging.error(Fore.RED + f"Schema mismatch in '{path}': missing {sorted(missing)}, unexpected {sorted(extra)}." + Fore.RESET)
+                return False
+            for col in reference.columns:
+                if frame[col].dtype != reference[col].dtype:
+                    logging.warning(Fore.YELLOW + f"Column '{col}' is {frame[col].dtype} in '{path}' but {reference[col].dtype} in '{paths[0]}'; it will be upcast." + Fore.RESET)
+        return True
 
     def load(self):
         """Load data from various file formats into a DataFrame."""
         try:
-            if self.file_format == 'csv':
-                data = pd.read_csv(self.file_path, delimiter=self.delimiter)
-            elif self.file_format == 'excel':
-                data = pd.read_excel(self.file_path)
-            elif self.file_format == 'json':
-                data = pd.read_json(self.file_path)
-            else:
-                logging.error(Fore.RED + f"Unsupported file format: {self.file_format}. Please use 'csv', 'excel', or 'json'." + Fore.RESET)
+            if self.file_format not in self.FORMATS:
+                logging.error(Fore.RED + f"Unsupported file format: {self.file_format}. Please use 'csv', 'excel', 'json', 'jsonl' or 'auto'." + Fore.RESET)
                 return None
-            
+
+            paths = self.resolve_paths()
+            if not paths:
+                logging.error(Fore.RED + f"No files matched '{self.file_path}'." + Fore.RESET)
+                return None
+
+            if self.rules is not None:
+                data = self._read_checked(paths)  # Each chunk is checked as it is parsed
+            elif len(paths) == 1:
+                data = self._read_file(paths[0])
+            else:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                    frames = list(pool.map(self._read_file, paths))
+                if not self.check_schemas(frames, paths):
+                    return None
+                frames = [self._tag_partition(frame, path, paths) for frame, path in zip(frames, paths)]
+                data = pd.concat(frames, ignore_index=True)  # Single concatenation, no incremental growth
+                logging.info(Fore.GREEN + f"Combined {len(paths)} files into {len(data)} rows." + Fore.RESET)
+
             if data.empty:
                 logging.error(Fore.RED + "The loaded data is empty." + Fore.RESET)
             else:
+                if self.rules is None:
+                    self.validate_data(data)
                 logging.info(Fore.GREEN + "Data loaded successfully." + Fore.RESET)
-                self.validate_data(data)  # Validate loaded data
 
             return data
+        except ValidationError as e:
+            logging.error(Fore.RED + f"Rejected '{self.file_path}': {e}" + Fore.RESET)
+            return None
         except FileNotFoundError:
             logging.error(Fore.RED + "File not found. Please check the path." + Fore.RESET)
             return None
@@ -38,11 +240,127 @@ class DataLoader:
             logging.error(Fore.RED + f"Error loading data: {e}" + Fore.RESET)
             return None
 
+    def _read_checked(self, paths):
+        """Read every shard in chunks of ``chunksize`` rows, checking each against the rules as it is
+        parsed, and build the frame from the checked chunks. Bad data is rejected in the same pass,
+        and with ``fail_fast`` at the first chunk that breaks a rule.
+        """
+        frames = list(self.iter_chunks(self.chunksize))
+        if not frames:
+            return self._read_file(paths[0])  # A header without rows
+        data = pd.concat(frames, ignore_index=True)
+        if len(paths) > 1:
+            logging.info(Fore.GREEN + f"Combined {len(paths)} files into {len(data)} rows." + Fore.RESET)
+        return data
+
+    def read_schema(self, nrows=100):
+        """Read the first rows of the first shard to learn column names and dtypes cheaply."""
+        paths = self.resolve_paths()
+        if not paths:
+            raise FileNotFoundError(f"No files matched '{self.file_path}'.")
+        sample = self._read_file(paths[0], nrows=nrows)
+        return self._tag_partition(sample, paths[0], paths)
+
+    def iter_shards(self):
+        """Lazily yield (path, DataFrame) one shard at a time, for stages that stream."""
+        paths = self.resolve_paths()
+        columns = None
+        for path in paths:
+            data = self._read_file(path)
+            if columns is None:
+                columns = list(data.columns)
+            elif list(data.columns) != columns:
+                raise ValueError(f"Schema mismatch in '{path}': expected columns {columns}.")
+            yield path, self._tag_partition(data, path, paths)
+
+    def iter_chunks(self, chunksize=100_000, shards=None):
+        """Yield DataFrame chunks of at most chunksize rows across all shards.
+
+        CSV, JSON Lines and .xlsx/.xlsm workbooks are streamed; JSON arrays and legacy
+        .xls files are read a shard at a time and then split. ``shards`` restricts the
+        scan to some of the resolved paths, e.g. to split it between workers.
+
+        With validation rules, every chunk is checked as it is read and ValidationError is
+        raised at the end of the scan (or at the first bad chunk, when failing fast). Shards
+        whose columns differ from the first one raise ValueError.
+        """
+        paths = self.resolve_paths()
+        columns = None
+        if self.rules is not None:
+            self.rules.begin(self.usecols)
+        for path in paths:
+            if shards is not None and path not in shards:
+                continue
+            for i, chunk in enumerate(self._iter_file(path, chunksize)):
+                if columns is None:
+                    columns = list(chunk.columns)
+                elif i == 0 and list(chunk.columns) != columns:
+                    raise ValueError(f"Schema mismatch in '{path}': expected columns {columns}.")
+                chunk = self._tag_partition(chunk, path, paths)
+                if self.rules is not None:
+                    self._checked(self.rules.update, chunk)
+                yield chunk
+        if self.rules is not None:
+            self._log_report()
+
+    def read_from(self, path, offset):
+        """Rows of one CSV or JSON Lines file that start at a byte offset, e.g. rows appended
+        since the file was last read. Only the bytes after the offset are parsed, and they are
+        checked against the validation rules like a full load.
+
+        Raises:
+            ValidationError: If the new rows break an error-severity rule.
+        """
+        fmt = self.detect_format(path)
+        if fmt not in ('csv', 'jsonl'):
+            raise ValueError(f"Reading from a byte offset needs a CSV or JSON Lines file, not {fmt}.")
+        with open(path, 'rb') as handle:
+            header = handle.readline() if fmt == 'csv' else b''
+            handle.seek(max(offset, len(header)))
+            body = handle.read()
+        if fmt == 'csv':
+            data = pd.read_csv(io.BytesIO(header + body), delimiter=self.delimiter, usecols=self._file_columns())
+        elif not body.strip():
+            data = pd.DataFrame()
+        else:
+            data = self._select(pd.read_json(io.BytesIO(body), lines=True), self._file_columns())
+        data = self._tag_partition(data, path, self.resolve_paths())
+        if self.rules is not None and not data.empty:
+            self.validate_data(data)
+        return data
+
     def validate_data(self, data):
-        """Perform basic data validation checks."""
-        expected_columns = []  # Updated expected columns
-        for col in expected_columns:
-            if col not in data.columns:
-                logging.warning(Fore.YELLOW + f"Expected column '{col}' not found in the dataset." + Fore.RESET)
+        """Check loaded data against the validation rules, one chunk at a time.
+
+        Returns:
+            ValidationReport: Violation counts and sample offending rows per rule, or None
+            when no rules are configured.
+
+        Raises:
+            ValidationError: If an error-severity rule failed.
+        """
+        if self.rules is None:
+            logging.info(Fore.GREEN + "Data validation complete." + Fore.RESET)
+            return None
+        self.rules.begin(self.usecols)
+        for start in range(0, len(data), self.chunksize):
+            self._checked(self.rules.update, data.iloc[start:start + self.chunksize])
+        return self._log_report()
+
+    @staticmethod
+    def _checked(step, *args):
+        """Run a validation step, logging the report if it rejects the data."""
+        try:
+            return step(*args)
+        except ValidationError as e:
+            logging.error(Fore.RED + f"Data validation failed on {e.report.rows} rows:\n{e.report.table().to_string(index=False)}" + Fore.RESET)
+            raise
 
-        logging.info(Fore.GREEN + "Data validation complete." + Fore.RESET)
+    def _log_report(self):
+        report = self._checked(self.rules.finish)
+        message = f"Data validation complete: {len(report.entries)} rules passed on {report.rows} rows."
+        if report.failed('warn'):
+            logging.warning(Fore.YELLOW + message + f" Warnings:\n{report.table().to_string(index=False)}" + Fore.RESET)
+        else:
+            logging.info(Fore.GREEN + message + Fore.RESET)
+        return report
@@ -1,24 +1,55 @@
+import time
 import pandas as pd
 import logging
-from sklearn.preprocessing import StandardScaler
 from colorama import Fore
+from backends import get_backend
+from date_inference import infer_date_format, parse_dates
+from scaling import Scaler
 
 class DataPreprocessor:
-    def __init__(self, data):
-        self.original_data = data.copy()  # Keep a copy of the original data
+    SCALE_METHODS = {'1': 'standard', '3': 'robust', '4': 'minmax'}  # Scale choice -> method; '2' skips scaling
+
+    def __init__(self, data, scale_choice=None, outlier_choice=None, fill_methods=None, backend='pandas',
+                 scale_dtype='float64', chunksize=100_000):
+        """Set up the preprocessor.
+
+        Args:
+            data (DataFrame): The data to preprocess.
+            scale_choice (str): '1' for standard scaling, '2' to skip, '3' for robust (median/IQR)
+                scaling, '4' for min-max scaling. If None, prompt interactively.
+            outlier_choice (str): '1' to remove outliers, '2' to keep them. If None, prompt interactively.
+            fill_methods (dict): Column name -> fill choice ('1'-'5', as in the interactive menu).
+                Columns not listed are skipped. If None, prompt interactively.
+            backend (str): 'pandas' or 'polars' for computing quantiles.
+            scale_dtype (str): 'float64', or 'float32' to halve the memory of the scaled columns.
+            chunksize (int): Rows per chunk when fitting and applying the scaler.
+        """
         self.data = data
-        self.scale_features_flag = self.ask_scale_option()
-        self.remove_outliers_flag = self.ask_remove_outliers_option()
+        self.backend = get_backend(backend)
+        self.fill_methods = fill_methods
+        self.fill_choices = {}  # Fill choice applied per column, recorded for session replay
+        # Fitted state, so the same transformation can be reapplied to new rows
+        self.state = {'date_columns': [], 'date_formats': {}, 'fill_values': {}, 'outlier_bounds': {}, 'scaler': None}
+        self.date_report = []  # Per converted column: format, seconds taken, values that didn't parse
+        scale_choice = self.ask_scale_option() if scale_choice is None else scale_choice
+        self.scale_method = self.SCALE_METHODS.get(scale_choice)
+        self.scale_features_flag = self.scale_method is not None
+        self.scale_dtype = scale_dtype
+        self.chunksize = chunksize
+        self.remove_outliers_flag = self.ask_remove_outliers_option() if outlier_choice is None else outlier_choice == '1'
 
-    def ask_scale_option(self):
+    @staticmethod
+    def ask_scale_option():
         """Ask the user if they want to scale the data or not."""
         print(Fore.BLUE + "\nChoose an option for scaling features:\n" + Fore.RESET)
-        print("1. Scale features")
+        print("1. Scale features (standardise to mean 0, standard deviation 1)")
         print("2. Do not scale features")
-        choice = input(Fore.BLUE + "\nEnter your choice (1 or 2): " + Fore.RESET).strip()
-        return choice == '1'
+        print("3. Robust scaling (median and interquartile range, for data with outliers)")
+        print("4. Min-max scaling (to the range 0-1)")
+        return input(Fore.BLUE + "\nEnter your choice (1-4): " + Fore.RESET).strip()
 
-    def ask_remove_outliers_option(self):
+    @staticmethod
+    def ask_remove_outliers_option():
         """Ask the user if they want to remove outliers or keep them."""
         print(Fore.BLUE + "\nChoose an option for handling outliers:\n" + Fore.RESET)
         print("1. Remove outliers")
@@ -41,14 +72,42 @@ class DataPreprocessor:
         return self.data
 
     def convert_date_columns(self):
-        """Convert object columns that represent dates into datetime."""
-        date_cols = self.data.select_dtypes(include=['object']).columns.tolist()
-        for col in date_cols:
-            if self.is_date(col):
-                self.data[col] = pd.to_datetime(self.data[col], errors='coerce')
-                logging.info(Fore.GREEN + f"Converted '{col}' to datetime." + Fore.RESET)
-
-    def is_date(self, column):
+        """Convert text columns that hold dates into datetime, parsing each with one inferred format."""
+        for col, fmt in self.infer_date_formats(self.data).items():
+            start = time.perf_counter()
+            missing = self.data[col].isnull().sum()
+            self.data[col] = parse_dates(self.data[col], fmt)
+            elapsed = time.perf_counter() - start
+            unparsed = int(self.data[col].isnull().sum() - missing)
+            self.state['date_columns'].append(col)
+            self.state['date_formats'][col] = fmt
+            self.date_report.append({'column': col, 'format': fmt, 'seconds': round(elapsed, 4), 'unparsed': unparsed})
+            message = f"Converted '{col}' to datetime (format {fmt or 'guessed by pandas'}) in {elapsed:.3f}s."
+            if unparsed:
+                message += f" {unparsed} values did not match and were set to NaT."
+            logging.info(Fore.GREEN + message + Fore.RESET)
+
+    @classmethod
+    def infer_date_formats(cls, data):
+        """Text columns that hold dates, mapped to the format to parse them with.
+
+        Columns are detected from a sample of their values. A column whose name marks it
+        as a date is converted even when no single format fits (the format is then None).
+        """
+        formats = {}
+        for col in data.select_dtypes(include=['object', 'string']).columns:
+            fmt = infer_date_format(data[col])
+            if fmt is not None or cls.is_date(col):
+                formats[col] = fmt
+        return formats
+
+    @staticmethod
+    def numeric_columns(data):
+        """Columns that outlier removal and scaling operate on."""
+        return data.select_dtypes(include=['float64', 'int64']).columns
+
+    @staticmethod
+    def is_date(column):
         """Check if a column can be converted to datetime."""
         date_keywords = ['date', 'timestamp', 'time']
         return any(keyword in column.lower() for keyword in date_keywords)
@@ -57,53 +116,116 @@ class DataPreprocessor:
         """Handle missing values based on user input."""
         for col in self.data.columns:
             if self.data[col].isnull().sum() > 0:
-                print(Fore.BLUE + f"\nColumn '{col}' has missing values. Choose a fill method:\n" + Fore.RESET)
-                print("1. Mean")
-                print("2. Median")
-                print("3. Mode")
-                print("4. Specific Value")
-                print("5. Skip")
-                
-                action = input(Fore.BLUE + "Enter your choice (1-5): " + Fore.RESET)
-                if action == '1':
-                    self.data[col].fillna(self.data[col].mean(), inplace=True)
-                    logging.info(Fore.GREEN + f"Filled missing values in '{col}' with mean." + Fore.RESET)
-                elif action == '2':
-                    self.data[col].fillna(self.data[col].median(), inplace=True)
-                    logging.info(Fore.GREEN + f"Filled missing values in '{col}' with median." + Fore.RESET)
-                elif action == '3':
-                    self.data[col].fillna(self.data[col].mode()[0], inplace=True)
-                    logging.info(Fore.GREEN + f"Filled missing values in '{col}' with mode." + Fore.RESET)
-                elif action == '4':
-                    fill_value = input(Fore.BLUE + "Enter the specific value to fill: " + Fore.RESET)
-                    self.data[col].fillna(fill_value, inplace=True)
-                    logging.info(Fore.GREEN + f"Filled missing values in '{col}' with specific value." + Fore.RESET)
-                elif action == '5':
-                    logging.info(Fore.YELLOW + f"Skipping filling for column '{col}'." + Fore.RESET)
+                if self.fill_methods is not None:
+                    action = self.fill_methods.get(col, '5')
+                else:
+                    action = self.ask_fill_method(col)
+                fill_value = self.fill_value(self.data[col], action)
+                self.fill_choices[col] = action
+                if fill_value is not None:
+                    self.data[col] = self.data[col].fillna(fill_value)
+                    self.state['fill_values'][col] = fill_value
+
+    @staticmethod
+    def ask_fill_method(col):
+        """Prompt for how to fill the missing values of one column."""
+        print(Fore.BLUE + f"\nColumn '{col}' has missing values. Choose a fill method:\n" + Fore.RESET)
+        print("1. Mean")
+        print("2. Median")
+        print("3. Mode")
+        print("4. Specific Value")
+        print("5. Skip")
+        return input(Fore.BLUE + "Enter your choice (1-5): " + Fore.RESET)
+
+    @staticmethod
+    def ask_fill_value():
+        """Prompt for the value that fill choice '4' fills with."""
+        return input(Fore.BLUE + "Enter the specific value to fill: " + Fore.RESET)
+
+    @staticmethod
+    def fill_value(series, action, specific=None):
+        """Value to fill the series' missing entries with for a fill choice, or None to skip.
+
+        Choice '4' fills with ``specific``, or asks for the value when it is None.
+        """
+        col = series.name
+        if action == '1':
+            logging.info(Fore.GREEN + f"Filled missing values in '{col}' with mean." + Fore.RESET)
+            return series.mean()
+        elif action == '2':
+            logging.info(Fore.GREEN + f"Filled missing values in '{col}' with median." + Fore.RESET)
+            return series.median()
+        elif action == '3':
+            logging.info(Fore.GREEN + f"Filled missing values in '{col}' with mode." + Fore.RESET)
+            return series.mode()[0]
+        elif action == '4':
+            fill_value = DataPreprocessor.ask_fill_value() if specific is None else specific
+            logging.info(Fore.GREEN + f"Filled missing values in '{col}' with specific value." + Fore.RESET)
+            return fill_value
+        elif action == '5':
+            logging.info(Fore.YELLOW + f"Skipping filling for column '{col}'." + Fore.RESET)
+        return None
+
+    @staticmethod
+    def iqr_bounds(series, backend=None):
+        """Lower and upper outlier bounds for a series using the 1.5 x IQR rule."""
+        Q1, Q3 = get_backend(backend or 'pandas').quantiles(series, [0.25, 0.75])
+        IQR = Q3 - Q1
+        return Q1 - 1.5 * IQR, Q3 + 1.5 * IQR
 
     def remove_outliers(self):
         """Remove outliers from numerical columns using the IQR method."""
-        for col in self.data.select_dtypes(include=['float64', 'int64']).columns:
+        for col in self.numeric_columns(self.data):
             if self.data[col].isnull().sum() == 0:
-                Q1 = self.data[col].quantile(0.25)
-                Q3 = self.data[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
+                lower_bound, upper_bound = self.iqr_bounds(self.data[col], self.backend)
+                self.state['outlier_bounds'][col] = (lower_bound, upper_bound)
                 initial_shape = self.data.shape
                 self.data = self.data[(self.data[col] >= lower_bound) & (self.data[col] <= upper_bound)]
                 logging.info(Fore.GREEN + f"Removed outliers from '{col}': {initial_shape[0]} -> {self.data.shape[0]} rows." + Fore.RESET)
 
     def scale_features(self):
-        """Scale numerical features using StandardScaler, if the flag is set."""
+        """Scale numerical features, if the flag is set.
+
+        The scaler's statistics are fitted in one pass over chunks of rows, and each column
+        is then replaced by its scaled copy, so memory grows by about one copy of the numeric
+        columns rather than two or three.
+        """
         if self.scale_features_flag:
-            numerical_cols = self.data.select_dtypes(include=['float64', 'int64']).columns
-            scaler = StandardScaler()
-            self.data[numerical_cols] = scaler.fit_transform(self.data[numerical_cols])
-            logging.info(Fore.GREEN + "Features scaled successfully." + Fore.RESET)
+            scaler = Scaler(self.scale_method, self.scale_dtype, self.chunksize)
+            self.data = scaler.fit_transform(self.data, self.numeric_columns(self.data))
+            self.state['scaler'] = scaler.state()
+            logging.info(Fore.GREEN + f"Features scaled successfully ({self.scale_method}, {self.scale_dtype})." + Fore.RESET)
         else:
-            self.data = self.original_data.copy()  # Restore original data
-            logging.info(Fore.YELLOW + "Skipping feature scaling. Original data retained." + Fore.RESET)
+            logging.info(Fore.YELLOW + "Skipping feature scaling." + Fore.RESET)
+
+    @staticmethod
+    def apply_state(data, state, remove_outliers=False):
+        """Reapply fitted preprocessing (date formats, fill values, outlier bounds, scaling) to new rows.
+
+        Args:
+            data (DataFrame): Rows in the same raw layout as the data the state was fitted on.
+                Columns the state mentions but the rows lack are skipped.
+            state (dict): A preprocessor's ``state``, e.g. as restored from the session.
+            remove_outliers (bool): Also drop rows outside the fitted outlier bounds.
+        """
+        data = data.copy()
+        formats = state.get('date_formats') or dict.fromkeys(state.get('date_columns', []))
+        for col, fmt in formats.items():
+            if col in data.columns and not pd.api.types.is_datetime64_any_dtype(data[col]):
+                data[col] = parse_dates(data[col], fmt)
+        for col, value in state.get('fill_values', {}).items():
+            if col in data.columns:
+                data[col] = data[col].fillna(value)
+        if remove_outliers:
+            for col, (lower, upper) in state.get('outlier_bounds', {}).items():
+                if col in data.columns:
+                    data = data[(data[col] >= lower) & (data[col] <= upper)]
+        scaler = state.get('scaler')
+        if scaler:
+            for col, mean, scale in zip(scaler['columns'], scaler['mean'], scaler['scale']):
+                if col in data.columns:
+                    data[col] = ((data[col] - mean) / scale).astype(scaler.get('dtype', 'float64'))
+        return data
 
 # Example usage:
 # if __name__ == "__main__":
@@ -113,10 +235,10 @@ class DataPreprocessor:
 #     processed_data = preprocessor.preprocess_data()
 #
 #     # For automated / testing mode:
-#     # preprocessor = DataPreprocessor(
-#     #     data,
-#     #     scale_choice='1',
-#     #     outlier_choice='2',
-#     #     fill_methods={'ColumnName': '1', 'AnotherColumn': '3'}
-#     # )
-#     # processed_data = preprocessor.preprocess_data()
+#     preprocessor = DataPreprocessor(
+#         data,
+#         scale_choice='1',
+#         outlier_choice='2',
+#         fill_methods={'ColumnName': '1', 'AnotherColumn': '3'}
+#     )
+#     processed_data = preprocessor.preprocess_data()
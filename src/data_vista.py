@@ -1,13 +1,30 @@
 # data_vista.py
 import argparse
+import json
 import logging
+import os
+import shutil
+import sys
+import tempfile
+import uuid
 from data_loader import DataLoader
 from data_cleaner import DataCleaner
 from data_preprocessor import DataPreprocessor
 from statistical_analysis import StatisticalAnalysis
-from machine_learning import MachineLearning
+from machine_learning import MachineLearning, TreeModels
 from visualization import Visualization
 from hypothesis_testing import HypothesisTesting
+from session import SessionWorkspace
+from feature_store import FeatureStore
+from sampling import ReservoirSampler, StratifiedSampler, mean_margins
+from jobs import JobScheduler
+from aggregation import AggregationEngine, DEFAULT_STATS
+from incremental import AppendRefresh, source_state
+from validation import ValidationError
+from governor import MemoryGovernor, MemoryBudgetExceeded
+from join import HashJoin, JOIN_TYPES
+from query_plan import LogicalPlan, Filter
+import serve
 from colorama import Fore
 
 # Define the app version
@@ -17,27 +34,457 @@ APP_VERSION = "1.1.0"  # Increment version for new features
 logging.basicConfig(level=logging.INFO)
 
 class DataVista:
-    def __init__(self):
-        self.data = None
+    def __init__(self, workspace=None, lazy=False, backend='pandas', sample_size=None, stratify=None, jobs=0, rules=None,
+                 memory_budget=None, workers=None, scale_dtype='float64'):
+        self.lazy = lazy  # Record stages as a LogicalPlan and run them only when consumed
+        self.plan = None
+        self._data = None
         self.ml = None  # Initialize the MachineLearning class instance
+        self.workspace = workspace  # Optional SessionWorkspace that keeps stages between launches
+        self.results = []  # Analysis results restored from or saved to the session
+        self.feature_store = FeatureStore()  # Design matrices shared by every model run on the same data
+        self.data_version = None  # Token for the current data, renewed whenever it changes; keys the feature store
+        self.backend = backend  # 'pandas' or 'polars' for parsing, dedup, quantiles, scaling and statistics
+        self.sample_size = sample_size  # Rows kept by the sampling mode; None loads everything
+        self.stratify = stratify  # Column to stratify the sample by
+        self.sample_info = None  # {'method', 'rows', 'population', ['strata']} while working on a sample
+        self._sample_loader = None
+        self._sample_steps = []  # Pipeline calls to replay on the full data when refining
+        self._last_sampled = None  # Last sampled result, rerun by refine()
+        self.scheduler = None  # Runs training, clustering and forecasting in worker processes
+        self.progress = None  # Called with (fraction, note) as models are trained; set in background jobs
+        self._aggregator = None  # Group-by engine over the current data, with its query cache
+        self.rules = rules  # Data-quality rules (Validator, spec dict or JSON path) checked while loading
+        # Picks in-memory, chunked or sampled execution per stage; None runs everything in memory
+        self.governor = MemoryGovernor(memory_budget) if memory_budget else None
+        self.workers = workers  # Processes for statistics over a shared-memory copy of the numeric columns
+        self.scale_dtype = scale_dtype  # 'float32' halves the memory of scaled columns
+        if jobs and JobScheduler.supported():
+            self.scheduler = JobScheduler(jobs)
+        elif jobs:
+            logging.warning(Fore.YELLOW + "Background jobs need fork(); tasks will run in the foreground." + Fore.RESET)
 
-    def load_data(self, file_path):
-        loader = DataLoader(file_path)
+    @property
+    def data(self):
+        """The current dataset; in lazy mode, accessing it runs the recorded plan."""
+        if self._data is None and self.plan is not None:
+            self._data = self.plan.collect()
+            self._data_changed()
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self._data_changed()
+
+    def _data_changed(self, version=None):
+        """Give the data a new version; call it after every in-place edit too."""
+        self.data_version = version or uuid.uuid4().hex
+        self._aggregator = None  # Its cached group-by states describe the old data
+        if self._data is not None:
+            self.feature_store.track(self._data, self.data_version)
+
+    def _version_by_stage(self, stage):
+        """Version the data by the session stage it was saved as or restored from, so feature
+        matrices kept in the workspace are reused on the next launch."""
+        record = self.workspace.stage_record(stage)
+        if record is not None and self._data is not None:
+            self._data_changed(f"{stage}-{record['fingerprint']}-{record['rows']}")
+
+    def _frame_for(self, columns):
+        """Data for a consumer that only needs some columns, so lazy mode can read just those."""
+        if self._data is None and self.plan is not None:
+            return self.plan.collect([col for col in dict.fromkeys(columns) if col in self.plan.schema.columns])
+        return self.data
+
+    def _record(self, step, *args):
+        """Append a step to the lazy plan and drop any materialised result."""
+        getattr(self.plan, step)(*args)
+        self._data = None
+
+    def _load_sample(self, loader):
+        """Keep a reservoir (or stratified) sample while streaming the source once."""
+        if self.stratify:
+            sampler, method = StratifiedSampler(self.sample_size, self.stratify), f"stratified (by {self.stratify})"
+        else:
+            sampler, method = ReservoirSampler(self.sample_size), "random"
+        for chunk in loader.iter_chunks():
+            sampler.update(chunk)
+        self.data = sampler.result()
+        self._sample_loader = loader
+        self._sample_steps = []
+        if self.data is not None and sampler.seen > len(self.data):
+            self.sample_info = {'method': method, 'rows': len(self.data), 'population': sampler.seen}
+            if self.stratify:
+                self.sample_info['strata'] = (sampler.strata, dict(sampler.counts))  # For stratified margins
+            logging.info(Fore.GREEN + f"Sampling mode: kept a {method} sample of {len(self.data):,} of {sampler.seen:,} rows." + Fore.RESET)
+        else:
+            self.sample_info = None  # The whole file fits in the sample
+
+    def _label_sampled(self, method, *args):
+        """Mark a result as approximate and remember it so refine() can redo it on the full data."""
+        if self.sample_info is None:
+            return
+        self._last_sampled = (method, args)
+        info = self.sample_info
+        print(Fore.YELLOW + f"\nApproximate result from a {info['method']} sample of {info['rows']:,} of "
+              f"{info['population']:,} rows. Choose R in the menu to refine it on the full data." + Fore.RESET)
+
+    def refine(self):
+        """Load the full data, replay the pipeline run on the sample and redo the last sampled result."""
+        if self.sample_info is None:
+            logging.info(Fore.GREEN + "Results already use the full data." + Fore.RESET)
+            return
+        if self.governor is not None:
+            try:
+                if self.governor.plan_load(self._sample_loader)['mode'] != 'memory':
+                    logging.error(Fore.RED + "The full data does not fit in the memory budget; keeping the sample." + Fore.RESET)
+                    return
+            except MemoryBudgetExceeded as e:
+                logging.error(Fore.RED + str(e) + Fore.RESET)
+                return
+        steps, last = self._sample_steps, self._last_sampled
+        logging.info(Fore.GREEN + f"Refining on all {self.sample_info['population']:,} rows..." + Fore.RESET)
+        self.sample_info = None
+        self._sample_steps, self._last_sampled = [], None
+        self.data = self._sample_loader.load()
+        for step, kwargs in steps:
+            getattr(self, step)(**kwargs)
+        if last is not None:
+            method, args = last
+            getattr(self, method)(*args)
+
+    def explain_plan(self, columns=None):
+        """Print the recorded plan and the optimised plan that will run."""
+        if self.plan is None:
+            logging.error(Fore.RED + "No lazy plan recorded. Start DataVista with --lazy." + Fore.RESET)
+            return
+        print(self.plan.explain(columns))
+
+    def get_ml(self):
+        """Return the MachineLearning instance for the current data, creating it if needed."""
+        if self.ml is None:
+            self.ml = MachineLearning(self.data, self.feature_store, progress=self.progress)
+        else:
+            self.ml.data = self.data
+        return self.ml
+
+    def _bind_workspace(self, loader, append=False):
+        """Attach the session workspace to the loader's source files, if they all exist."""
+        if self.workspace is None:
+            return False
+        paths = loader.resolve_paths()
+        if not paths or not all(os.path.isfile(path) for path in paths):
+            return False
+        if append or self.workspace.path is None or self.workspace.manifest['sources'] != paths:
+            self.workspace.bind(paths, append)
+            self.feature_store = FeatureStore(os.path.join(self.workspace.path, 'features'))
+        return True
+
+    def restore_session(self, file_path, file_format='auto'):
+        """Offer to resume from the stages a previous session saved.
+
+        Returns:
+            str: The last stage restored ('load', 'clean' or 'preprocess'), or None.
+        """
+        loader = DataLoader(file_path, file_format)
+        if not self._bind_workspace(loader):
+            return None
+        if self.governor is not None and self.governor.plan_load(loader)['mode'] != 'memory':
+            return None  # load_data samples the data instead
+        valid = self.workspace.valid_stages()
+        if not valid:
+            return None
+
+        print(Fore.BLUE + "\nA previous session was found for this data:\n" + Fore.RESET)
+        for stage in valid:
+            record = self.workspace.stage_record(stage)
+            print(f"- {stage}: {record['rows']} rows, saved {record['saved_at']}, options {record['params']}")
+        print(Fore.BLUE + "\nChoose an option:\n" + Fore.RESET)
+        print(f"1. Resume from the '{valid[-1]}' stage")
+        print("2. Redo preprocessing (keep cleaned data)" if 'clean' in valid else "2. Redo cleaning (keep loaded data)")
+        print("3. Start fresh")
+        choice = input(Fore.BLUE + "\nEnter your choice (1, 2, or 3): " + Fore.RESET).strip()
+
+        if choice == '1':
+            stage = valid[-1]
+        elif choice == '2':
+            stage = 'clean' if 'clean' in valid else 'load'
+        else:
+            return None
+
+        self.data = self.workspace.get_stage(stage)
+        if self.data is None:
+            return None
+        self._version_by_stage(stage)
+        if stage == 'preprocess':
+            self._restore_model()
+            self.results = self.workspace.analyses()
+            for result in self.results:
+                logging.info(Fore.GREEN + f"Saved {result['kind']} ({result['saved_at']}): {result['result']}" + Fore.RESET)
+        return stage
+
+    def _restore_model(self):
+        """Make the session's most recent model the current one."""
+        name, model = self.workspace.load_model()
+        if model is not None:
+            ml = self.get_ml()
+            ml.model, ml.model_info = model, self.workspace.manifest['models'][name]['metadata']
+            logging.info(Fore.GREEN + f"Restored model '{name}' from session." + Fore.RESET)
+
+    def refresh(self, file_path, file_format='auto', watermark=None):
+        """Fold rows appended to the source files since the last session into that session.
+
+        Only the new rows are cleaned and preprocessed, with the saved choices and fitted
+        state; statistics, models that learn incrementally and ARIMA forecasts are updated
+        with them (see AppendRefresh).
+
+        Args:
+            file_path (str or list): The session's data source.
+            file_format (str): As for load_data.
+            watermark (str): Key column whose growing values mark new rows. None finds new
+                rows by file offset.
+
+        Returns:
+            str: 'preprocess' once the session is up to date, or None if it has to be rebuilt.
+        """
+        loader = DataLoader(file_path, file_format, backend=self.backend, rules=self.rules)
+        if not self._bind_workspace(loader, append=True):
+            return None
+        try:
+            report = AppendRefresh(self.workspace, loader).run(watermark)
+        except KeyError as e:
+            logging.error(Fore.RED + str(e) + Fore.RESET)
+            return None
+        except ValidationError as e:
+            logging.error(Fore.RED + f"Rejected the rows appended to '{file_path}': {e}" + Fore.RESET)
+            return None
+        if report is None:
+            return None
+        self.data = self.workspace.get_stage('preprocess')
+        self._version_by_stage('preprocess')
+        self._restore_model()
+        self.results = self.workspace.analyses()
+        print(Fore.GREEN + f"\nRefreshed the session with {report['preprocessed_rows']} new rows "
+              f"({report['new_rows']} read, {report['duplicates']} duplicates)." + Fore.RESET)
+        if not report['statistics'].empty:
+            print(report['statistics'].round(4))
+        for name, status in report['models'].items():
+            print(f"Model {name}: {status}")
+        for target, forecast in report['forecasts'].items():
+            print(f"Forecast for {target}: {forecast.tolist()}")
+        return 'preprocess'
+
+    def load_data(self, file_path, max_workers=None, file_format='auto', sheet_name=0):
+        loader = DataLoader(file_path, file_format, max_workers=max_workers, backend=self.backend, sheet_name=sheet_name,
+                            rules=self.rules)
+        if self.lazy:
+            self.plan = LogicalPlan(loader)
+            self._data = None
+            logging.info(Fore.GREEN + f"Lazy mode: recorded scan of {file_path}." + Fore.RESET)
+            return
+        if self.governor is not None and not self.sample_size:
+            try:
+                decision = self.governor.plan_load(loader)
+            except MemoryBudgetExceeded as e:
+                logging.error(Fore.RED + str(e) + Fore.RESET)
+                self.data = None
+                return
+            if decision['mode'] == 'sampled':
+                self.sample_size = decision['rows']
+                self.workspace = None  # A sample doesn't match the source, so it isn't kept in the session
+        if self.sample_size:
+            try:
+                self._load_sample(loader)
+            except ValidationError as e:
+                logging.error(Fore.RED + f"Rejected '{file_path}': {e}" + Fore.RESET)
+                self.data = None
+            return
+        if self._bind_workspace(loader):
+            self.data = self.workspace.get_stage('load')
+            if self.data is not None:
+                self._version_by_stage('load')
+                return
         self.data = loader.load()
+        if self.workspace is not None and self.data is not None:
+            self.workspace.save_stage('load', self.data, state=source_state(loader, self.data))
+            self._version_by_stage('load')
+
+    def join_data(self, sources, on, how='inner', file_format='auto', max_workers=None):
+        """Load several datasets and join them on key columns, in order: ((first, second), third) ...
 
-    def clean_data(self):
-        cleaner = DataCleaner(self.data)
-        self.data = cleaner.clean()
+        Each join hashes the smaller side and streams the other past it in chunks. When the
+        memory governor finds that neither side fits, both are split into hash partitions
+        on disk first, and the joined rows are written to disk too. A result on disk is
+        then loaded as load_data loads a file, so it may be sampled. The joined data goes
+        through cleaning, preprocessing and analysis like any loaded file. Data-quality
+        rules are checked on the first dataset.
 
-    def preprocess_data(self):
-        preprocessor = DataPreprocessor(self.data)
+        Args:
+            sources (list): Two or more files, glob patterns or directories, one per dataset.
+            on (str or list): Key column(s) every dataset has.
+            how (str): 'inner', 'left' or 'outer'.
+            file_format (str): Format of the files, or 'auto'.
+            max_workers (int): Threads used to parse a dataset's shards.
+
+        Returns:
+            list: One report per join with its mode, row counts and timing ([] when the
+            joined data was restored from the session), or None.
+        """
+        if self.lazy:
+            logging.error(Fore.RED + "Joins are not supported in lazy mode." + Fore.RESET)
+            return None
+        on = [on] if isinstance(on, str) else list(on)
+        loaders = [DataLoader(source, file_format, max_workers=max_workers, backend=self.backend,
+                              rules=self.rules if i == 0 else None) for i, source in enumerate(sources)]
+        spec = {'join': [str(source) for source in sources], 'on': on, 'how': how}
+        paths = [path for loader in loaders for path in loader.resolve_paths()]
+        if self.workspace is not None and paths and all(os.path.isfile(path) for path in paths):
+            self.workspace.bind(paths, tag=json.dumps(spec, sort_keys=True))
+            self.feature_store = FeatureStore(os.path.join(self.workspace.path, 'features'))
+            self.data = self.workspace.get_stage('load', spec)
+            if self.data is not None:
+                self._version_by_stage('load')
+                return []
+
+        spill_dir = tempfile.mkdtemp(prefix='datavista-join-')
+        chunksize = self.governor.chunksize if self.governor is not None else 100_000
+        reports, result, keep_spill = [], loaders[0], False
+        try:
+            for i, loader in enumerate(loaders[1:], 1):
+                join = HashJoin(result, loader, on, how, chunksize=chunksize, governor=self.governor, spill_dir=spill_dir)
+                if join.plan()['mode'] == 'memory':
+                    result = join.collect()
+                else:  # The result is likely as large as its inputs, so it stays on disk
+                    result = DataLoader(join.to_csv(os.path.join(spill_dir, f'joined_{i}.csv')), 'csv', backend=self.backend)
+                reports.append({'left': spec['join'][0] if i == 1 else 'joined', 'right': spec['join'][i], **join.report})
+            if isinstance(result, DataLoader):
+                decision = self.governor.plan_load(result) if self.governor is not None else None
+                if decision is not None and decision['mode'] == 'sampled':
+                    self.sample_size = decision['rows']
+                    self.workspace = None  # A sample doesn't match the sources, so it isn't kept in the session
+                    self._load_sample(result)
+                    keep_spill = True  # Refining reads the joined file again
+                    return reports
+                result = result.load()
+        except (KeyError, ValueError, ValidationError, MemoryBudgetExceeded) as e:
+            message = str(e).strip('"')
+            logging.error(Fore.RED + f"Join failed: {message}" + Fore.RESET)
+            self.data = None
+            return None
+        finally:
+            if not keep_spill:
+                shutil.rmtree(spill_dir, ignore_errors=True)
+
+        self.data = result
+        if self.workspace is not None:
+            self.workspace.save_stage('load', self.data, spec)
+            self._version_by_stage('load')
+            self.workspace.save_analysis('join', {**spec, 'reports': reports})
+        return reports
+
+    def filter_data(self, expression):
+        """Keep only rows matching an expression such as "Store == 1"."""
+        if self.lazy:
+            self._record('filter', expression)
+        else:
+            rows = len(self.data)
+            self.data = Filter.parse(expression).execute(self.data)
+            if self.sample_info is not None:
+                self._sample_steps.append(('filter_data', {'expression': expression}))
+                # Scale the population by the share of the sample that passed the filter
+                self.sample_info['population'] = round(self.sample_info['population'] * len(self.data) / max(rows, 1))
+                self.sample_info['rows'] = len(self.data)
+
+    def clean_data(self, strategy=None, fill_method=None):
+        if self.lazy:
+            if strategy is None:
+                strategy, fill_method = DataCleaner.ask_strategy()
+            self._record('dedup')
+            self._record('handle_missing', strategy, fill_method)
+            return
+        if self.workspace is not None and strategy is not None:
+            cached = self.workspace.get_stage('clean', {'strategy': strategy, 'fill_method': fill_method})
+            if cached is not None:
+                self.data = cached
+                self._version_by_stage('clean')
+                return
+        chunksize = None
+        if self.governor is not None and self.governor.plan_clean(self.data)['mode'] == 'chunked':
+            chunksize = self.governor.chunksize
+        cleaner = DataCleaner(self.data, self.backend, chunksize)
+        self.data = cleaner.clean(strategy, fill_method)
+        params = {'strategy': cleaner.strategy, 'fill_method': cleaner.fill_method}
+        if self.workspace is not None:
+            self.workspace.save_stage('clean', self.data, params, cleaner.state)
+            self._version_by_stage('clean')
+        if self.sample_info is not None:
+            self._sample_steps.append(('clean_data', params))
+            self.sample_info['rows'] = len(self.data)
+
+    def preprocess_data(self, scale_choice=None, outlier_choice=None, fill_methods=None):
+        if self.lazy:
+            method = DataPreprocessor.SCALE_METHODS.get(DataPreprocessor.ask_scale_option() if scale_choice is None else scale_choice)
+            remove_outliers = DataPreprocessor.ask_remove_outliers_option() if outlier_choice is None else outlier_choice == '1'
+            self._record('convert_dates')
+            if fill_methods is None:  # Asked now rather than each time the plan runs
+                fill_methods = {col: DataPreprocessor.ask_fill_method(col) for col in self.plan.columns_with_missing()}
+            values = {col: DataPreprocessor.ask_fill_value() for col, action in fill_methods.items() if action == '4'}
+            self._record('fill_columns', fill_methods, values)
+            if remove_outliers:
+                self._record('remove_outliers')
+            if method:
+                self._record('scale', method, self.scale_dtype)
+            return
+        if self.workspace is not None and None not in (scale_choice, outlier_choice, fill_methods):
+            params = {'scale_choice': scale_choice, 'outlier_choice': outlier_choice, 'fill_methods': fill_methods}
+            cached = self.workspace.get_stage('preprocess', self._stage_params(params))
+            if cached is not None:
+                self.data = cached
+                self._version_by_stage('preprocess')
+                return
+        if self.governor is not None:
+            self.governor.plan_preprocess(self.data)  # Raises MemoryBudgetExceeded rather than running out of memory
+        preprocessor = DataPreprocessor(self.data, scale_choice, outlier_choice, fill_methods, self.backend, self.scale_dtype)
         self.data = preprocessor.preprocess_data()
+        scale_choices = {method: choice for choice, method in DataPreprocessor.SCALE_METHODS.items()}
+        params = {
+            'scale_choice': scale_choices.get(preprocessor.scale_method, '2'),
+            'outlier_choice': '1' if preprocessor.remove_outliers_flag else '2',
+            'fill_methods': preprocessor.fill_choices,
+        }
+        if self.workspace is not None:
+            self.workspace.save_stage('preprocess', self.data, self._stage_params(params), preprocessor.state)
+            self._version_by_stage('preprocess')
+        if self.sample_info is not None:
+            self._sample_steps.append(('preprocess_data', params))
+            self.sample_info['rows'] = len(self.data)
+
+    def _stage_params(self, params):
+        """Preprocess stage parameters as saved in the session; float32 scaling is a different stage."""
+        if params['scale_choice'] != '2' and self.scale_dtype != 'float64':
+            return {**params, 'scale_dtype': self.scale_dtype}
+        return params
 
     def statistical_analysis(self):
-        analysis = StatisticalAnalysis(self.data)
+        self._label_sampled('statistical_analysis')
+        chunksize = None
+        if self.governor is not None:
+            try:
+                if self.governor.plan_statistics(self.data)['mode'] == 'chunked':
+                    chunksize = self.governor.chunksize
+            except MemoryBudgetExceeded as e:
+                logging.error(Fore.RED + str(e) + Fore.RESET)
+                return
+        analysis = StatisticalAnalysis(self.data, self.backend, chunksize, self.workers)
         analysis.perform_analysis()
+        if self.sample_info is not None:
+            print(Fore.YELLOW + "\nMeans with 95% margins of error:\n" + Fore.RESET)
+            print(mean_margins(self.data, self.sample_info['population'], strata=self.sample_info.get('strata')))
+        if self.workspace is not None and analysis.summary_report:
+            self.workspace.save_analysis('statistics', analysis.summary_report)
 
-    def machine_learning(self, target_column, algorithm='linear_regression'):
+    def machine_learning(self, target_column, algorithm='linear_regression', encoding='auto'):
         try:
             if target_column not in self.data.columns:
                 raise KeyError(f"Target column '{target_column}' not found in the dataset.")
@@ -49,19 +496,25 @@ class DataVista:
             if self.data[target_column].dtype == 'object' or self.data[target_column].dtype.name == 'category':
                 if self.data[target_column].nunique() == 2:
                     self.data[target_column] = self.data[target_column].cat.codes
+                    self._data_changed()
                 else:
                     raise ValueError("Logistic regression requires a binary target variable.")
 
-            self.ml = MachineLearning(self.data)
+            data = self.data
+            if self.governor is not None:
+                decision = self.governor.plan_training(self.data, target_column, algorithm)
+                if decision['mode'] == 'sampled':
+                    data = self.data.sample(n=decision['rows'], random_state=42).sort_index()
+                    self.feature_store.track(data, f"{self.data_version}-sample-{decision['rows']}")  # Same rows each time
+            self.ml = MachineLearning(data, self.feature_store, progress=self.progress)
 
             # Check if target is numeric for regression
             if self.data[target_column].dtype in ['float64', 'int64']:
                 # Regression algorithms
                 if algorithm == 'linear_regression':
                     self.ml.linear_regression(target_column)
-                elif algorithm == 'decision_tree':
-                    logging.error(Fore.RED + "Decision Tree regression not implemented." + Fore.RESET)
-                    return None
+                elif algorithm in TreeModels.ALGORITHMS:
+                    self.ml.trees(target_column, algorithm, 'regression')
                 else:
                     logging.error(Fore.RED + "Invalid algorithm selected for regression." + Fore.RESET)
                     return None
@@ -69,7 +522,9 @@ class DataVista:
                 # For classification, only if target is binary numeric
                 if self.data[target_column].nunique() == 2:
                     if algorithm in ['logistic_regression', 'decision_tree']:
-                        self.ml.classification(target_column, algorithm)
+                        self.ml.classification(target_column, algorithm, encoding)
+                    elif algorithm in TreeModels.ALGORITHMS:
+                        self.ml.trees(target_column, algorithm, 'classification')
                     else:
                         logging.error(Fore.RED + "Invalid algorithm selected for classification." + Fore.RESET)
                         return None
@@ -77,18 +532,250 @@ class DataVista:
                     logging.error(Fore.RED + "Unsupported target column type or not binary." + Fore.RESET)
                     return None
 
+            if self.ml.model is not None:
+                self._attach_model(target_column, algorithm, self.ml.model, self.ml.model_info)
             return self.ml.model  # Return the trained model instance
 
-        except KeyError as e:
+        except (KeyError, MemoryBudgetExceeded) as e:
             logging.error(Fore.RED + str(e) + Fore.RESET)
         except Exception as e:
             logging.error(Fore.RED + f"An error occurred: {str(e)}" + Fore.RESET)
         return None
 
+    def batch_machine_learning(self, target_columns, algorithm='linear_regression', register=None):
+        """Train one model per target column in one run, over a feature matrix built once.
+
+        Targets are checked and coded once, as machine_learning does for one target. Every
+        model is kept in the session, and the combined metrics table is saved with them.
+
+        Args:
+            target_columns (list): Target columns; numeric targets are regressed, binary ones classified.
+            algorithm (str): One algorithm for every target.
+            register (str): If given, also register each model as '<register>_<target>'.
+
+        Returns:
+            DataFrame: One row per trained target with its metrics, or None.
+        """
+        algorithm = algorithm.lower().replace(' ', '_')
+        missing = [target for target in target_columns if target not in self.data.columns]
+        if missing:
+            logging.error(Fore.RED + f"Target column(s) {missing} not found in the dataset." + Fore.RESET)
+            return None
+        tasks = {}
+        for target in dict.fromkeys(target_columns):
+            values = self.data[target]
+            if values.dtype in ['float64', 'int64']:
+                tasks[target] = 'regression'
+            elif values.nunique() == 2:
+                if values.dtype.kind not in 'biuf':  # Text or categorical labels
+                    self.data[target] = values.astype('category').cat.codes
+                    self._data_changed()
+                tasks[target] = 'classification'
+            else:
+                logging.error(Fore.RED + f"Target '{target}' is neither numeric nor binary; skipping it." + Fore.RESET)
+        if not tasks:
+            return None
+
+        data = self.data
+        try:
+            if self.governor is not None:
+                decision = self.governor.plan_training(self.data.drop(columns=list(tasks)[1:]), list(tasks)[0], algorithm)
+                if decision['mode'] == 'sampled':
+                    data = self.data.sample(n=decision['rows'], random_state=42).sort_index()
+                    self.feature_store.track(data, f"{self.data_version}-sample-{decision['rows']}")  # Same rows each time
+            self.ml = MachineLearning(data, self.feature_store)
+            table = self.ml.batch(tasks, algorithm, self.workers)
+        except MemoryBudgetExceeded as e:
+            logging.error(Fore.RED + str(e) + Fore.RESET)
+            return None
+        for target, (model, info) in self.ml.batch_models.items():
+            self._attach_model(target, algorithm, model, info)
+        if self.workspace is not None:
+            self.workspace.save_analysis('batch_training', {'algorithm': algorithm, 'metrics': table.to_dict(orient='records')})
+        if register:
+            self.ml.save_batch(register)
+        print(Fore.GREEN + "\nBatch training results:\n" + Fore.RESET)
+        print(table.to_string(index=False))
+        return table
+
+    def _attach_model(self, target_column, algorithm, model, info=None):
+        """Make a trained model the current one and keep it in the session."""
+        algorithm = algorithm.lower().replace(' ', '_')
+        ml = self.get_ml()
+        ml.model, ml.model_info = model, info
+        if self.workspace is not None:
+            self.workspace.save_model(f"{algorithm}_{target_column}", model, {'target': target_column, 'algorithm': algorithm,
+                                                                            'features': (info or {}).get('features', []),
+                                                                            'metrics': (info or {}).get('metrics', {})})
+
+    def clustering(self, n_clusters):
+        clusters = self.get_ml().clustering(n_clusters)
+        self._attach_clusters(n_clusters, clusters)
+        return clusters
+
+    def _attach_clusters(self, n_clusters, clusters):
+        if self.workspace is not None and clusters is not None:
+            self.workspace.save_analysis('clustering', {'n_clusters': n_clusters, 'labels': clusters.tolist()})
+
+    def time_series(self, target_column, order=(1, 1, 1)):
+        forecast = self.get_ml().time_series(target_column, order)
+        self._attach_forecast(target_column, order, forecast, self.ml.forecast_fit)
+        return forecast
+
+    def backtest(self, target_column, orders, horizon=5, n_folds=5, window='expanding', train_size=None):
+        """Rank candidate ARIMA orders by their errors on rolling-origin folds, and keep the leaderboard.
+
+        Args:
+            target_column (str): The series to forecast.
+            orders (list): Candidate (p, d, q) orders.
+            horizon (int): Steps forecast by each fold.
+            n_folds (int): Number of folds, ending at the last observation.
+            window (str): 'expanding' or 'sliding' training window.
+            train_size (int): Points in a sliding window (default: the first fold's).
+
+        Returns:
+            DataFrame: The leaderboard, best order first, or None.
+        """
+        try:
+            board = self.get_ml().backtest(target_column, orders, horizon, n_folds, window, train_size, self.workers)
+        except ValueError as e:
+            logging.error(Fore.RED + str(e) + Fore.RESET)
+            return None
+        if board is None:
+            return None
+        print(Fore.GREEN + f"\nBacktest leaderboard ({n_folds} {window} folds of {horizon} steps):\n" + Fore.RESET)
+        print(board.to_string(index=False))
+        if self.workspace is not None:
+            self.workspace.save_analysis('backtest', {'target': target_column, 'window': window, 'horizon': horizon,
+                                                      'folds': n_folds, 'leaderboard': board.assign(
+                                                          order=board['order'].map(list)).to_dict(orient='records')})
+        return board
+
+    def _attach_forecast(self, target_column, order, forecast, fit=None):
+        if self.workspace is not None and forecast is not None:
+            self.workspace.save_analysis('forecast', {'target': target_column, 'order': list(order), 'forecast': forecast.tolist()})
+            if fit is not None:  # Kept so append mode can extend it with new observations
+                self.workspace.save_artifact(f'arima_{target_column}', {'target': target_column, 'order': list(order), 'fit': fit})
+
+    def _job(self, report, method, *args):
+        """Body of a background job, run in the forked worker."""
+        self.workspace = None  # Only the main process writes to the session, when the job is collected
+        self.progress = report  # Models report features built, fit done and scoring done
+        if self.ml is not None:
+            self.ml.progress = report
+        report(0.0, f"running {method.replace('_', ' ')}")
+        result = getattr(self, method)(*args)
+        if result is None:
+            raise RuntimeError(f"{method.replace('_', ' ')} produced no result")
+        if method == 'machine_learning':
+            return result, self.ml.model_info  # Metrics and input columns travel with the model
+        if method == 'time_series':
+            return result, self.ml.forecast_fit
+        return result
+
+    def submit_job(self, method, *args):
+        """Run machine_learning, clustering or time_series in the background.
+
+        Without a scheduler the method runs in the foreground and its result is returned.
+        Otherwise the Job is returned; its result is attached to the session when collected.
+        """
+        if self.scheduler is None:
+            return getattr(self, method)(*args)
+        attach = {
+            'machine_learning': lambda result: (self._attach_model(args[0], args[1], *result),
+                                                print(Fore.GREEN + f"Model trained: {result[0]}" + Fore.RESET)),
+            'clustering': lambda clusters: (self._attach_clusters(args[0], clusters),
+                                            print(Fore.GREEN + f"Clusters formed: {clusters}" + Fore.RESET)),
+            'time_series': lambda result: (self._attach_forecast(args[0], args[1], *result),
+                                           print(Fore.GREEN + f"Forecast: {result[0]}" + Fore.RESET)),
+        }[method]
+        self.data  # Materialise a lazy plan once here, so the workers share it
+        name = f"{method.replace('_', ' ')} ({', '.join(map(str, args))})"
+        return self.scheduler.submit(name, self._job, method, *args, on_done=attach)
+
+    def collect_jobs(self):
+        """Attach the results of finished background jobs and report them."""
+        if self.scheduler is None:
+            return []
+        finished = self.scheduler.collect_finished()
+        for job in finished:
+            colour = Fore.GREEN if job.status == 'done' else Fore.YELLOW
+            print(colour + f"Job {job.id} ({job.name}) {job.status} after {job.elapsed:.1f}s"
+                  + (f": {job.error}" if job.error else ".") + Fore.RESET)
+        return finished
+
     def visualize_data(self, columns, chart_type):
-        visualizer = Visualization(self.data)
+        self._label_sampled('visualize_data', columns, chart_type)
+        # The correlation heatmap uses every column; other charts only the selected ones
+        visualizer = Visualization(self.data if chart_type == '7' else self._frame_for(columns))
         visualizer.visualize(columns, chart_type)
 
+    def get_aggregator(self):
+        """Return the AggregationEngine for the current data; any change to the data starts an empty cache."""
+        if self._aggregator is None:
+            self._aggregator = AggregationEngine(self.data)
+        return self._aggregator
+
+    def aggregate(self, by, values=None, stats=DEFAULT_STATS):
+        """Statistics per group, e.g. ``app.aggregate(['Store'], ['Weekly_Sales'], ['mean', 'p90'])``."""
+        self._label_sampled('aggregate', by, values, stats)
+        try:
+            return self.get_aggregator().aggregate(by, values, stats)
+        except (KeyError, ValueError) as e:
+            logging.error(Fore.RED + str(e).strip('"') + Fore.RESET)
+            return None
+
+    def pivot(self, index, columns, values, agg='sum', margins=True):
+        """Pivot table of one statistic, e.g. ``app.pivot('Store', 'Is_Holiday', 'Weekly_Sales', 'mean')``."""
+        self._label_sampled('pivot', index, columns, values, agg, margins)
+        try:
+            return self.get_aggregator().pivot(index, columns, values, agg, margins)
+        except (KeyError, ValueError) as e:
+            logging.error(Fore.RED + str(e).strip('"') + Fore.RESET)
+            return None
+
+    def group_by(self):
+        """Menu flow for group-by aggregations and pivot tables."""
+        print(Fore.BLUE + "\nChoose a query:\n" + Fore.RESET)
+        print("1. Group-by Aggregation")
+        print("2. Pivot Table\n")
+        query = input(Fore.BLUE + "Enter the number corresponding to your choice: " + Fore.RESET).strip()
+        split = lambda text: [part.strip() for part in text.split(',') if part.strip()]
+
+        if query == '1':
+            by = split(input(Fore.BLUE + "\nEnter the column(s) to group by, comma-separated: " + Fore.RESET))
+            values = split(input(Fore.BLUE + "Enter the value column(s) (press Enter for all numeric columns): " + Fore.RESET))
+            stats = split(input(Fore.BLUE + f"Enter the statistics (press Enter for {', '.join(DEFAULT_STATS)}; "
+                                            "quantiles as median or p90): " + Fore.RESET))
+            result = self.aggregate(by, values or None, stats or DEFAULT_STATS)
+        elif query == '2':
+            index = split(input(Fore.BLUE + "\nEnter the row column(s), comma-separated: " + Fore.RESET))
+            columns = split(input(Fore.BLUE + "Enter the column(s) to spread across: " + Fore.RESET))
+            values = input(Fore.BLUE + "Enter the value column: " + Fore.RESET).strip()
+            agg = input(Fore.BLUE + "Enter the statistic (default sum): " + Fore.RESET).strip() or 'sum'
+            result = self.pivot(index, columns, values, agg)
+        else:
+            logging.error(Fore.RED + "Invalid choice. Please select 1 or 2." + Fore.RESET)
+            return None
+        if result is not None:
+            print(Fore.GREEN + "\nResult:\n" + Fore.RESET)
+            print(result.to_string())
+        return result
+
+    def explain_model(self, n_repeats=5, max_rows=5000):
+        """Rank the current model's input columns by permutation importance and keep the table."""
+        ml = self.get_ml()
+        table = ml.explain(n_repeats, max_rows)
+        if table is None:
+            return None
+        print(Fore.GREEN + f"\nFeature importance (drop in score when a column is shuffled):\n" + Fore.RESET)
+        print(table.to_string(index=False))
+        if self.workspace is not None:
+            info = ml.model_info or {}
+            self.workspace.save_analysis('importance', {'target': info.get('target'), 'algorithm': info.get('algorithm'),
+                                                        'table': table.to_dict(orient='records')})
+        return table
+
     def hypothesis_testing(self):
         print(Fore.BLUE + "\nChoose a test:\n" + Fore.RESET)
         print("1. T-Test")
@@ -101,36 +788,97 @@ class DataVista:
             column1 = input(Fore.BLUE + "\nEnter the first numeric column name for T-Test: " + Fore.RESET)
             column2 = input(Fore.BLUE + "\nEnter the second numeric column name for T-Test: " + Fore.RESET)
             alpha = float(input(Fore.BLUE + "\nEnter significance level (default 0.05): " + Fore.RESET) or 0.05)
-            tester = HypothesisTesting(self.data)
-            tester.t_test(column1, column2, alpha)
+            self.run_hypothesis_test('t_test', column1, column2, alpha)
 
         elif test_type == '2':
             print(Fore.GREEN + "\nChi-Squared Test Selected\n" + Fore.RESET)
             column1 = input(Fore.BLUE + "\nEnter the first categorical column name for Chi-Squared Test: " + Fore.RESET)
             column2 = input(Fore.BLUE + "\nEnter the second categorical column name for Chi-Squared Test: " + Fore.RESET)
             alpha = float(input(Fore.BLUE + "\nEnter significance level (default 0.05): " + Fore.RESET) or 0.05)
-            tester = HypothesisTesting(self.data)
-            tester.chi_squared_test(column1, column2, alpha)
+            self.run_hypothesis_test('chi_squared_test', column1, column2, alpha)
 
         else:
             logging.error(Fore.RED + "Invalid choice. Please select a valid test type." + Fore.RESET)
 
+    def run_hypothesis_test(self, test, column1, column2, alpha=0.05):
+        """Run 't_test' or 'chi_squared_test' on two columns."""
+        self._label_sampled('run_hypothesis_test', test, column1, column2, alpha)
+        tester = HypothesisTesting(self._frame_for([column1, column2]))
+        getattr(tester, test)(column1, column2, alpha)
+
 def main():
+    if sys.argv[1:2] == ['serve']:
+        return serve.main(sys.argv[2:])
     print(Fore.BLUE + f"\nWelcome to " + Fore.WHITE + "DataVista " + Fore.GREEN + "v" + APP_VERSION + Fore.RESET + "!" + Fore.RESET)
     print(Fore.BLUE + "Your companion for data analysis and visualization.\n" + Fore.RESET)
 
     parser = argparse.ArgumentParser(description="DataVista App")
-    parser.add_argument('--data', type=str, help='Path to the CSV file', default='data/walmart_grocery_data.csv')
+    parser.add_argument('--data', type=str, nargs='+', help='Data file(s), glob pattern(s) or directory of shards', default=['data/walmart_grocery_data.csv'])
+    parser.add_argument('--format', choices=DataLoader.FORMATS, default='auto', help='File format; auto detects it from each file')
+    parser.add_argument('--sheet', type=str, default='0', help='Excel worksheet name or index')
+    parser.add_argument('--workers', type=int, help='Threads used to parse multiple files in parallel, and processes used for statistics on large data', default=None)
+    parser.add_argument('--workspace', type=str, help='Directory where sessions are kept between launches', default='.datavista')
+    parser.add_argument('--no-session', action='store_true', help='Do not restore or save the session')
+    parser.add_argument('--lazy', action='store_true', help='Defer loading, cleaning and preprocessing until a result is needed')
+    parser.add_argument('--where', action='append', default=[], help='Row filter such as "Store == 1" (repeatable)')
+    parser.add_argument('--backend', choices=['pandas', 'polars'], default='pandas', help='Compute backend for loading, cleaning, preprocessing and statistics')
+    parser.add_argument('--sample', type=int, default=None, help='Work on a random sample of this many rows (refine on the full data from the menu)')
+    parser.add_argument('--stratify', type=str, default=None, help='Column to stratify the sample by (with --sample)')
+    parser.add_argument('--jobs', type=int, default=1, help='Worker processes for training, clustering and forecasting (0 runs them in the foreground)')
+    parser.add_argument('--explain', action='store_true', help='Print the execution plan before the menu (with --lazy)')
+    parser.add_argument('--rules', type=str, default=None, help='JSON file of data-quality rules; data that breaks them is rejected while loading')
+    parser.add_argument('--memory-budget', type=str, default='auto',
+                        help="Memory DataVista may use, e.g. 4G; stages that don't fit run chunked or on a sample. 'auto' uses 75%% of free memory, 'off' disables the checks")
+    parser.add_argument('--float32', action='store_true', help='Keep scaled features as float32, halving their memory')
+    parser.add_argument('--append', action='store_true', help='Fold rows appended to the data since the last session into it, without recomputing')
+    parser.add_argument('--watermark', type=str, default=None, help='Key column whose growing values mark new rows (with --append)')
+    parser.add_argument('--join', type=str, nargs='+', default=[], help='Other dataset(s) to join with --data, in order; each can be a file, glob pattern or directory')
+    parser.add_argument('--on', type=str, default=None, help='Join key column(s), comma-separated (with --join)')
+    parser.add_argument('--how', choices=JOIN_TYPES, default='inner', help='Join type (with --join)')
     args = parser.parse_args()
+    if args.sample and args.lazy:
+        parser.error("--sample cannot be combined with --lazy")
+    if args.join and (args.lazy or args.sample or args.append):
+        parser.error("--join cannot be combined with --lazy, --sample or --append")
+    if args.join and not args.on:
+        parser.error("--join needs the key column(s) in --on")
 
-    app = DataVista()
+    # Lazy runs never hold intermediate stages, and filtered or sampled runs don't match
+    # the source, so none of them is kept in the session
+    use_session = not (args.no_session or args.lazy or args.where or args.sample)
+    app = DataVista(workspace=SessionWorkspace(args.workspace) if use_session else None, lazy=args.lazy,
+                    backend=args.backend, sample_size=args.sample, stratify=args.stratify, jobs=args.jobs, rules=args.rules,
+                    memory_budget=None if args.memory_budget == 'off' else args.memory_budget, workers=args.workers,
+                    scale_dtype='float32' if args.float32 else 'float64')
+    data_source = args.data if len(args.data) > 1 else args.data[0]
     
     try:
-        app.load_data(args.data)
-        app.clean_data()
-        app.preprocess_data()
+        sheet = int(args.sheet) if args.sheet.isdigit() else args.sheet
+        if args.join:
+            restored = None  # A joined session is restored by join_data
+        elif args.append and use_session:
+            restored = app.refresh(data_source, args.format, args.watermark)
+        else:
+            restored = app.restore_session(data_source, args.format)
+        if restored is None:
+            if args.join:
+                keys = [key.strip() for key in args.on.split(',') if key.strip()]
+                app.join_data([data_source] + args.join, keys, args.how, args.format, args.workers)
+            else:
+                app.load_data(data_source, max_workers=args.workers, file_format=args.format, sheet_name=sheet)
+            if not args.lazy and app.data is None:
+                return  # Missing, unreadable or rejected data; the loader logged why
+            for expression in args.where:
+                app.filter_data(expression)
+        if restored in (None, 'load'):
+            app.clean_data()
+        if restored != 'preprocess':
+            app.preprocess_data()
+        if args.explain:
+            app.explain_plan()
 
         while True:
+            app.collect_jobs()
             print(Fore.BLUE + "\nAvailable options:\n" + Fore.RESET)
             print("1. Perform Statistical Analysis")
             print("2. Train Machine Learning Model")
@@ -142,20 +890,61 @@ def main():
             print("8. Time Series Forecasting")
             print("9. Perform Hypothesis Testing")
             print("10. Exit")
+            if app.sample_info is not None:
+                print("R. Refine Results on the Full Data")
+            if app.scheduler is not None:
+                print(f"J. Background Jobs ({len(app.scheduler.active())} active)")
+            if app.ml is not None and app.ml.model is not None:
+                print("E. Explain Model (Permutation Importance)")
+            print("G. Group-by Aggregation and Pivot Tables")
+            print("B. Backtest Forecasting Orders")
             
             choice = input(Fore.BLUE + "\nChoose an option (1-10): " + Fore.RESET)
             
-            if choice == '1':
+            if choice.strip().lower() == 'r':
+                app.refine()
+            elif choice.strip().lower() == 'e':
+                app.explain_model()
+            elif choice.strip().lower() == 'g':
+                app.group_by()
+            elif choice.strip().lower() == 'b':
+                target_column = input(Fore.BLUE + "\nEnter the target column for backtesting: " + Fore.RESET).strip()
+                orders = input(Fore.BLUE + "Enter candidate ARIMA orders as p d q, separated by commas "
+                                           "(e.g. 1 1 1, 2 1 0): " + Fore.RESET)
+                window = input(Fore.BLUE + "Enter the window, expanding or sliding (default expanding): " + Fore.RESET)
+                try:
+                    orders = [tuple(map(int, order.split())) for order in orders.split(',') if order.strip()]
+                    if not orders or any(len(order) != 3 for order in orders):
+                        raise ValueError
+                    horizon = int(input(Fore.BLUE + "Enter the forecast horizon per fold (default 5): " + Fore.RESET) or 5)
+                    n_folds = int(input(Fore.BLUE + "Enter the number of folds (default 5): " + Fore.RESET) or 5)
+                    app.backtest(target_column, orders, horizon, n_folds, window.strip().lower() or 'expanding')
+                except ValueError:
+                    logging.error(Fore.RED + "Invalid backtest settings. Orders need three integers each." + Fore.RESET)
+            elif choice.strip().lower() == 'j' and app.scheduler is not None:
+                print(Fore.BLUE + "\nBackground jobs:\n" + Fore.RESET)
+                print(app.scheduler.table())
+                job_id = input(Fore.BLUE + "\nEnter a job ID to cancel (or press Enter to go back): " + Fore.RESET).strip()
+                if job_id.isdigit():
+                    if app.scheduler.cancel(int(job_id)):
+                        logging.info(Fore.YELLOW + f"Job {job_id} cancelled." + Fore.RESET)
+                    else:
+                        logging.error(Fore.RED + f"Job {job_id} is not queued or running." + Fore.RESET)
+            elif choice == '1':
                 app.statistical_analysis()
             elif choice == '2':
-                target_column = input(Fore.BLUE + "\nEnter the target column name for machine learning: " + Fore.RESET)
+                target_column = input(Fore.BLUE + "\nEnter the target column name for machine learning "
+                                            "(several, comma-separated, to train one model per column): " + Fore.RESET)
+                targets = [col.strip() for col in target_column.split(',') if col.strip()]
                 
                 # Algorithm Selection Menu
                 print(Fore.BLUE + "\nChoose an algorithm:\n" + Fore.RESET)
                 algorithm_options = {
                     "1": "Linear Regression",
                     "2": "Decision Tree",
-                    "3": "Logistic Regression"
+                    "3": "Logistic Regression",
+                    "4": "Random Forest",
+                    "5": "Gradient Boosting"
                 }
                 
                 for key, value in algorithm_options.items():
@@ -165,8 +954,13 @@ def main():
                 
                 if algorithm_choice in algorithm_options:
                     algorithm = algorithm_options[algorithm_choice]
-                    model = app.machine_learning(target_column, algorithm)
-                    if model is None:
+                    if len(targets) > 1:
+                        prefix = input(Fore.BLUE + "Enter a name to register the models under as <name>_<target> "
+                                                   "(or press Enter to keep them in the session only): " + Fore.RESET).strip()
+                        app.batch_machine_learning(targets, algorithm, prefix or None)
+                    elif app.scheduler is not None:
+                        app.submit_job('machine_learning', target_column, algorithm)
+                    elif app.machine_learning(target_column, algorithm) is None:
                         logging.error(Fore.RED + "Model training failed. Please try again." + Fore.RESET)
                 else:
                     logging.error(Fore.RED + "Invalid choice. Please select a valid algorithm." + Fore.RESET)
@@ -201,18 +995,25 @@ def main():
                 if app.ml is None or app.ml.model is None:
                     logging.error(Fore.RED + "No model trained to save." + Fore.RESET)
                 else:
-                    filename = input(Fore.BLUE + "\nEnter filename to save the model: " + Fore.RESET)
+                    filename = input(Fore.BLUE + "\nEnter a name to register the model under (or a file such as model.joblib or file:path): " + Fore.RESET)
                     app.ml.save_model(filename)
             elif choice == '5':
-                filename = input(Fore.BLUE + "\nEnter filename to load the model: " + Fore.RESET)
-                app.ml.load_model(filename)
+                registered = app.get_ml().registry
+                if registered.list():
+                    print(Fore.BLUE + "\nRegistered models:\n" + Fore.RESET)
+                    print(registered.table())
+                filename = input(Fore.BLUE + "\nEnter a registered model (name or name:version) or a file (model.joblib or file:path) to load: " + Fore.RESET)
+                app.get_ml().load_model(filename)
             elif choice == '6':
-                app.ml.view_model()
+                app.get_ml().view_model()
             elif choice == '7':
                 try:
                     n_clusters = int(input(Fore.BLUE + "\nEnter the number of clusters for K-means: " + Fore.RESET))
-                    clusters = app.ml.clustering(n_clusters)
-                    print(Fore.GREEN + f"Clusters formed: {clusters}" + Fore.RESET)
+                    if app.scheduler is not None:
+                        app.submit_job('clustering', n_clusters)
+                    else:
+                        clusters = app.clustering(n_clusters)
+                        print(Fore.GREEN + f"Clusters formed: {clusters}" + Fore.RESET)
                 except ValueError:
                     logging.error(Fore.RED + "Please enter a valid integer for the number of clusters." + Fore.RESET)
             elif choice == '8':
@@ -220,14 +1021,19 @@ def main():
                 order = input(Fore.BLUE + "Enter ARIMA order as three integers (p, d, q) separated by space: " + Fore.RESET).split()
                 try:
                     order = tuple(map(int, order))
-                    forecast = app.ml.time_series(target_column, order)
-                    print(Fore.GREEN + f"Forecast: {forecast}" + Fore.RESET)
+                    if app.scheduler is not None:
+                        app.submit_job('time_series', target_column, order)
+                    else:
+                        forecast = app.time_series(target_column, order)
+                        print(Fore.GREEN + f"Forecast: {forecast}" + Fore.RESET)
                 except ValueError:
                     logging.error(Fore.RED + "Invalid ARIMA order format. Please enter three integers." + Fore.RESET)
             elif choice == '9':
                 app.hypothesis_testing()
             elif choice == '10':
                 if input(Fore.YELLOW + "\nAre you sure you want to exit? (y/n): " + Fore.RESET).lower() == 'y':
+                    if app.scheduler is not None:
+                        app.scheduler.shutdown()  # Unfinished jobs are cancelled
                     logging.info(Fore.BLUE + "Thanks for using " + Fore.WHITE + "DataVista" + "." + Fore.RESET + Fore.BLUE + " Goodbye!" + Fore.RESET)
                     break
             else:
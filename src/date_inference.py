@@ -0,0 +1,67 @@
+# date_inference.py
+import warnings
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+# Tried after pandas' own guesses, in order of preference (month-first before day-first, as pandas does)
+CANDIDATE_FORMATS = [
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S.%f', '%Y/%m/%d', '%Y/%m/%d %H:%M:%S',
+    '%m/%d/%Y', '%m/%d/%Y %H:%M', '%m/%d/%Y %H:%M:%S', '%d/%m/%Y', '%d/%m/%Y %H:%M', '%d/%m/%Y %H:%M:%S',
+    '%m-%d-%Y', '%d-%m-%Y', '%d.%m.%Y', '%d.%m.%Y %H:%M',
+    '%d %b %Y', '%d-%b-%Y', '%b %d, %Y', '%d %B %Y', '%B %d, %Y',
+]
+
+
+def sample_values(series, sample_size=200):
+    """Distinct non-null values taken evenly across the series, as strings."""
+    values = series.dropna()
+    if len(values) > sample_size:
+        values = values.iloc[np.linspace(0, len(values) - 1, sample_size).astype(int)]
+    return pd.Series(values.astype(str).unique())
+
+
+def infer_date_format(series, sample_size=200, threshold=0.95):
+    """Infer one explicit strptime format that parses a column's values.
+
+    Args:
+        series (Series): Text column to inspect.
+        sample_size (int): Values sampled evenly across the column.
+        threshold (float): Share of the sampled values the format must parse.
+
+    Returns:
+        str: The format, or None if the values don't look like dates.
+    """
+    sample = sample_values(series, sample_size)
+    if sample.empty or sample.str.contains(r'\d', regex=True).mean() < threshold:
+        return None
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)  # Day-first guesses are expected here
+        guesses = [guess_datetime_format(value) for value in sample.head(5)]
+    best, best_share = None, 0.0
+    for fmt in dict.fromkeys([guess for guess in guesses if guess] + CANDIDATE_FORMATS):
+        try:
+            share = pd.to_datetime(sample, format=fmt, errors='coerce').notna().mean()
+        except (ValueError, TypeError):
+            continue
+        if share > best_share:
+            best, best_share = fmt, share
+        if share == 1.0:
+            break
+    return best if best_share >= threshold else None
+
+
+def parse_dates(series, fmt=None):
+    """Parse a column with an explicit format, converting each distinct value only once.
+
+    Values that don't match the format become NaT. Without a format, pandas infers one
+    from the first value, as plain ``pd.to_datetime`` does.
+    """
+    codes, uniques = pd.factorize(series)
+    try:
+        parsed = pd.to_datetime(pd.Index(uniques), format=fmt, errors='coerce')
+    except ValueError:
+        parsed = pd.to_datetime(pd.Index(uniques), format=fmt, errors='coerce', utc=True)  # Mixed UTC offsets
+    values = parsed.take(codes, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(values, index=series.index, name=series.name)
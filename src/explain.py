@@ -0,0 +1,77 @@
+# explain.py
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+_worker_state = None  # (predict, X, y, metric, baseline), inherited by forked workers
+
+
+def _init_worker(state):
+    global _worker_state
+    _worker_state = state
+
+
+def _permute_column(column, n_repeats, seed):
+    """Score drops after shuffling one column ``n_repeats`` times."""
+    predict, X, y, metric, baseline = _worker_state
+    rng = np.random.default_rng([seed, X.columns.get_loc(column)])
+    shuffled = X.copy()
+    values = X[column].to_numpy()
+    drops = []
+    for _ in range(n_repeats):
+        shuffled[column] = values[rng.permutation(len(values))]
+        drops.append(baseline - metric(y, predict(shuffled)))
+    return column, drops
+
+
+def permutation_importance(predict, X, y, metric, n_repeats=5, max_rows=5000, n_jobs=None, seed=42):
+    """Rank the columns of ``X`` by how much shuffling each one hurts the model's score.
+
+    Columns are scored in parallel on a pool of forked worker processes, which inherit the
+    model and the holdout rows instead of receiving pickled copies. Holdouts larger than
+    ``max_rows`` are subsampled first, which bounds the cost of every permutation.
+
+    Args:
+        predict (callable): Maps a frame shaped like ``X`` to predictions.
+        X (DataFrame): Holdout rows, in the columns to rank.
+        y (Series): Holdout targets.
+        metric (callable): ``metric(y_true, y_pred)``, higher is better (e.g. R² or accuracy).
+        n_repeats (int): Shuffles per column.
+        max_rows (int): Most holdout rows used.
+        n_jobs (int): Worker processes; defaults to the number of CPUs. 1 runs in this process.
+        seed (int): Seed for the subsample and the shuffles.
+
+    Returns:
+        DataFrame: One row per column with the mean and standard deviation of the score
+        drop, ranked from most to least important.
+    """
+    if len(X) > max_rows:
+        rows = np.sort(np.random.default_rng(seed).choice(len(X), max_rows, replace=False))
+        X, y = X.iloc[rows], y.iloc[rows]
+    X, y = X.reset_index(drop=True), y.reset_index(drop=True)
+    baseline = metric(y, predict(X))
+    state = (predict, X, y, metric, baseline)
+
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(X.columns))
+    if n_jobs > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context('fork'),
+                                 initializer=_init_worker, initargs=(state,)) as pool:
+            results = list(pool.map(_permute_column, X.columns, [n_repeats] * len(X.columns),
+                                    [seed] * len(X.columns)))
+    else:
+        _init_worker(state)
+        try:
+            results = [_permute_column(column, n_repeats, seed) for column in X.columns]
+        finally:
+            _init_worker(None)
+
+    table = pd.DataFrame({
+        'feature': [str(column) for column, _ in results],
+        'importance': [np.mean(drops) for _, drops in results],
+        'std': [np.std(drops) for _, drops in results],
+    }).sort_values('importance', ascending=False, ignore_index=True)
+    table.insert(0, 'rank', np.arange(1, len(table) + 1))
+    table.attrs.update({'baseline_score': baseline, 'rows': len(X), 'n_repeats': n_repeats})
+    return table
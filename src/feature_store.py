@@ -0,0 +1,126 @@
+# feature_store.py
+import hashlib
+import json
+import logging
+import os
+import weakref
+import numpy as np
+import pandas as pd
+from colorama import Fore
+
+
+class FeatureStore:
+    """Cache of numeric design matrices, built once per dataset version and feature spec.
+
+    With a root directory, each matrix is written once as a contiguous ``.npy`` file
+    with a JSON sidecar holding its column names, then opened as a read-only memory
+    map. Repeated training on the same data skips the rebuild, and several processes
+    reading the same store share the same pages. Without a root, matrices are kept
+    in memory for the lifetime of the store.
+
+    A frame's version is the token its owner gave it with track(), or else a hash of
+    its contents. Tracking skips a full pass over the data on every lookup.
+    """
+
+    def __init__(self, root=None, dtype='float64', block_rows=100_000, max_entries=8):
+        self.root = root
+        self.dtype = np.dtype(dtype)
+        self.block_rows = block_rows  # Rows converted per write, so the build never holds a second full copy
+        self.max_entries = max_entries  # Matrices kept open; the oldest is dropped first
+        self._cache = {}
+        self._versions = {}  # id(frame) -> (weak reference to the frame, version token)
+        if root:
+            os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def fingerprint(data):
+        """Version of a dataset, from its column names, dtypes and row contents."""
+        digest = hashlib.sha256()
+        digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in data.dtypes.items()]).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def track(self, data, version):
+        """Use ``version`` as the version of this very frame instead of hashing it.
+
+        The owner must track the frame again with a new token whenever it edits it in place.
+        """
+        self._versions = {key: entry for key, entry in self._versions.items() if entry[0]() is not None}
+        self._versions[id(data)] = (weakref.ref(data), version)
+
+    def version(self, data):
+        """The tracked version of ``data``, or a hash of its contents when it isn't tracked."""
+        ref, version = self._versions.get(id(data), (None, None))
+        if ref is not None and ref() is data:
+            return version
+        return self.fingerprint(data)
+
+    def _key(self, version, spec):
+        return hashlib.sha256(f"{version}|{self.dtype.str}|{json.dumps(spec, sort_keys=True)}".encode()).hexdigest()[:24]
+
+    def _paths(self, key):
+        return os.path.join(self.root, f'{key}.npy'), os.path.join(self.root, f'{key}.json')
+
+    def matrix(self, data, spec, build, version=None):
+        """Return the design matrix for ``data`` as (read-only array, column names).
+
+        Args:
+            data (DataFrame): The dataset the features are built from.
+            spec (dict): Describes the feature preparation (model kind, target, ...). It is
+                part of the cache key, so different preparations never share a matrix.
+            build (callable): Turns ``data`` into a numeric feature DataFrame with one row per
+                input row. Only called when the matrix is not cached yet.
+            version (str): Dataset version, e.g. a session stage fingerprint. Defaults to the
+                version ``data`` is tracked with, or a hash of the data.
+        """
+        key = self._key(version or self.version(data), spec)
+        if key in self._cache:
+            return self._cache[key]
+
+        if self.root:
+            matrix_path, meta_path = self._paths(key)
+            if os.path.exists(matrix_path) and os.path.exists(meta_path):
+                with open(meta_path) as handle:
+                    meta = json.load(handle)
+                logging.info(Fore.GREEN + f"Reusing cached feature matrix {meta['shape']} for {spec}." + Fore.RESET)
+                return self._remember(key, (np.load(matrix_path, mmap_mode='r'), meta['columns']))
+
+        features = build(data)
+        columns = [str(col) for col in features.columns]
+        if self.root:
+            values = self._write(features, key)
+        else:
+            values = features.to_numpy(dtype=self.dtype)
+            values.flags.writeable = False  # Same contract as the read-only memory map
+        logging.info(Fore.GREEN + f"Built feature matrix {values.shape} for {spec}." + Fore.RESET)
+        return self._remember(key, (values, columns))
+
+    def _remember(self, key, entry):
+        while len(self._cache) >= self.max_entries:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = entry
+        return entry
+
+    def _write(self, features, key):
+        """Write features block by block into a .npy memmap, then reopen it read-only."""
+        os.makedirs(self.root, exist_ok=True)
+        matrix_path, meta_path = self._paths(key)
+        tmp_path = matrix_path + '.tmp'
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=self.dtype, shape=features.shape)
+        for start in range(0, len(features), self.block_rows):
+            out[start:start + self.block_rows] = features.iloc[start:start + self.block_rows].to_numpy(dtype=self.dtype)
+        out.flush()
+        del out
+        os.replace(tmp_path, matrix_path)
+        with open(meta_path, 'w') as handle:
+            json.dump({'columns': [str(col) for col in features.columns], 'dtype': self.dtype.str,
+                       'shape': list(features.shape)}, handle)
+        return np.load(matrix_path, mmap_mode='r')
+
+    def clear(self):
+        """Forget every cached matrix, on disk and in memory."""
+        self._cache = {}
+        if self.root and os.path.isdir(self.root):
+            for name in os.listdir(self.root):
+                if name.endswith(('.npy', '.json', '.tmp')):
+                    os.remove(os.path.join(self.root, name))
@@ -0,0 +1,241 @@
+# governor.py
+import logging
+import os
+import re
+import numpy as np
+import pandas as pd
+from colorama import Fore
+
+UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """A stage would not fit in the memory budget, even chunked or on a sample."""
+
+
+def parse_size(text):
+    """Bytes from a size such as '512M', '4G' or '1.5GB'; 'auto' and None give None."""
+    if text is None or isinstance(text, (int, float)):
+        return text
+    if text.strip().lower() == 'auto':
+        return None
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?\s*', text, re.IGNORECASE)
+    if match is None:
+        raise ValueError(f"Could not read the size '{text}'. Use a number of bytes or e.g. 512M or 4G.")
+    return int(float(match.group(1)) * UNITS[match.group(2).upper()])
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def available_memory():
+    """Memory the system can still hand out, in bytes, or None where it can't be read."""
+    try:
+        with open('/proc/meminfo') as handle:
+            for line in handle:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def process_memory():
+    """Resident memory of this process in bytes (0 where it can't be read)."""
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def frame_bytes(data, sample_rows=1000):
+    """In-memory size of a frame. Text columns are measured on a sample and scaled up, which
+    avoids walking every Python string the way memory_usage(deep=True) does.
+    """
+    if len(data) == 0:
+        return 0
+    total = 0
+    sample = data.iloc[np.linspace(0, len(data) - 1, min(sample_rows, len(data))).astype('int64')]
+    for col in data.columns:
+        if data[col].dtype == object or pd.api.types.is_string_dtype(data[col].dtype):
+            total += sample[col].memory_usage(deep=True, index=False) * len(data) / len(sample)
+        else:
+            total += data[col].memory_usage(deep=False, index=False)
+    return int(total)
+
+
+class MemoryGovernor:
+    """Pick in-memory, chunked or sampled execution for each stage from a memory budget.
+
+    Before a stage runs, its extra memory is estimated from the size of the data it works
+    on (for loading, from the file sizes and a sampled schema) and a peak factor per stage.
+    The stage runs in memory when that fits in what the budget leaves after this process's
+    current use; otherwise it runs chunked where the stage supports it, or on a sample sized
+    to fit. When nothing fits, MemoryBudgetExceeded is raised before any memory is allocated.
+    Every decision is logged and kept in ``decisions``.
+    """
+
+    LOAD_PEAK = 2.0  # Parse buffers, or every shard held while they are concatenated
+    TEXT_EXPANSION = {'excel': 8.0, 'json': 3.0}  # In-memory bytes per file byte, where rows can't be counted cheaply
+    STATS_PEAK = 3.0  # describe() copies the numeric columns and sorts them for quantiles
+    TRAIN_PEAK = 3.0  # Design matrix, its train/test split and the solver's working copies
+    JOIN_PEAK = 3.0  # Build rows, their hash table and the rows matched to a probe chunk
+    MAX_PARTITIONS = 1024  # Spill files per side of a partitioned join
+    MIN_SAMPLE_ROWS = 1000
+
+    def __init__(self, budget='auto', fraction=0.75, chunksize=100_000):
+        """
+        Args:
+            budget (int or str): Bytes, or a size such as '4G'. 'auto' uses ``fraction`` of the
+                memory available when the governor is created.
+            fraction (float): Share of the available memory used by an 'auto' budget.
+            chunksize (int): Rows per chunk in chunked stages.
+        """
+        self.budget = parse_size(budget)
+        if self.budget is None:
+            available = available_memory()
+            self.budget = int((available + process_memory()) * fraction) if available else None
+        self.chunksize = chunksize
+        self.decisions = []
+
+    def available(self):
+        return None if self.budget is None else self.budget - process_memory()
+
+    def _decide(self, stage, mode, estimate, available, rows=None, partitions=None):
+        decision = {'stage': stage, 'mode': mode, 'estimate': int(estimate), 'available': available, 'rows': rows}
+        if partitions is not None:
+            decision['partitions'] = partitions
+        self.decisions.append(decision)
+        if mode == 'abort':
+            raise MemoryBudgetExceeded(
+                f"{stage.capitalize()} needs about {format_size(estimate)}, but only {format_size(max(available, 0))} of the "
+                f"{format_size(self.budget)} memory budget is free. Use --sample or a larger --memory-budget.")
+        note = f" on a sample of {rows:,} rows" if mode == 'sampled' else (
+            f" in chunks of {self.chunksize:,} rows" if mode == 'chunked' else (
+                f" in {partitions} partitions spilled to disk" if mode == 'partitioned' else ""))
+        colour = Fore.GREEN if mode == 'memory' else Fore.YELLOW
+        logging.info(colour + f"Memory governor: {stage} needs about {format_size(estimate)} of "
+                     f"{format_size(available)} free; running {'in memory' if mode == 'memory' else mode}{note}." + Fore.RESET)
+        return decision
+
+    def _unlimited(self, stage, estimate):
+        decision = {'stage': stage, 'mode': 'memory', 'estimate': int(estimate), 'available': None, 'rows': None}
+        self.decisions.append(decision)
+        return decision
+
+    def estimate_source(self, loader, nrows=1000):
+        """Rows and in-memory bytes the loader's files will take, from their sizes and first rows."""
+        sample = loader.read_schema(nrows)
+        per_row = frame_bytes(sample) / max(len(sample), 1)
+        rows = 0.0
+        for path in loader.resolve_paths():
+            size = os.path.getsize(path)
+            fmt = loader.detect_format(path)
+            if fmt in ('csv', 'jsonl'):
+                rows += self._count_lines(path, size, nrows, header=fmt == 'csv')
+            else:
+                rows += size * self.TEXT_EXPANSION.get(fmt, 3.0) / max(per_row, 1)
+        return {'rows': int(rows), 'bytes_per_row': per_row, 'bytes': int(rows * per_row)}
+
+    @staticmethod
+    def _count_lines(path, size, nrows, header):
+        """Rows of a line-based file: counted when it is short, else extrapolated from its first lines."""
+        with open(path, 'rb') as handle:
+            skipped = len(handle.readline()) if header else 0
+            lengths = [len(line) for line in (handle.readline() for _ in range(nrows)) if line]
+        if len(lengths) < nrows:
+            return len(lengths)
+        return (size - skipped) / (sum(lengths) / len(lengths))
+
+    def plan_load(self, loader):
+        """'memory', or 'sampled' with the number of rows a sample may keep."""
+        source = self.estimate_source(loader)
+        estimate = source['bytes'] * self.LOAD_PEAK
+        available = self.available()
+        if available is None:
+            return self._unlimited('load', estimate)
+        if estimate <= available:
+            return self._decide('load', 'memory', estimate, available)
+        # Leave room for the copies cleaning and preprocessing make of the sample
+        rows = int(available / (source['bytes_per_row'] * self.LOAD_PEAK * 2))
+        mode = 'sampled' if rows >= self.MIN_SAMPLE_ROWS else 'abort'
+        return self._decide('load', mode, estimate, available, rows)
+
+    def plan_clean(self, data):
+        """'memory', or 'chunked' when only hashing rows slice by slice for deduplication fits."""
+        size, rows = frame_bytes(data), len(data)
+        # Deduplicating factorises every column (8 bytes per value) and keeping rows copies the frame
+        estimate = size + rows * (8 * len(data.columns) + 16)
+        chunked = size + rows * 9 + frame_bytes(data.iloc[:self.chunksize]) * 2
+        return self._choose('cleaning', estimate, chunked)
+
+    def plan_preprocess(self, data):
+        """'memory' or abort: filling, outlier filtering and scaling copy the frame once."""
+        numeric = data.select_dtypes(include=['float64', 'int64'])
+        return self._choose('preprocessing', frame_bytes(data) + 2 * frame_bytes(numeric), None)
+
+    def plan_statistics(self, data):
+        """'memory', or 'chunked' to merge per-chunk moments and quantile sketches."""
+        numeric = data.select_dtypes(include=[np.number])
+        chunked = frame_bytes(numeric.iloc[:self.chunksize]) * self.STATS_PEAK
+        return self._choose('statistics', frame_bytes(numeric) * self.STATS_PEAK, chunked)
+
+    def plan_training(self, data, target, algorithm):
+        """'memory', or 'sampled' with the number of rows the design matrix can hold."""
+        features = data.drop(columns=[target], errors='ignore')
+        categorical = features.select_dtypes(exclude=['number', 'bool', 'datetime', 'datetimetz'])
+        width = len(features.columns) - len(categorical.columns)
+        if algorithm in ('linear_regression', 'logistic_regression'):
+            dummies = int(categorical.nunique().sum())
+            # Wide one-hot encodings are stored sparse: one value and one index per categorical column
+            width += dummies if dummies <= 1000 else 1.5 * len(categorical.columns)
+        else:
+            width += len(categorical.columns)  # Trees encode each category column as one code column
+        per_row = max(width, 1) * 8 * self.TRAIN_PEAK
+        estimate = per_row * len(data)
+        available = self.available()
+        if available is None:
+            return self._unlimited('training', estimate)
+        if estimate <= available:
+            return self._decide('training', 'memory', estimate, available)
+        rows = int(available / per_row)
+        return self._decide('training', 'sampled' if rows >= self.MIN_SAMPLE_ROWS else 'abort', estimate, available, rows)
+
+    def plan_join(self, left_bytes, right_bytes):
+        """'memory' to hash the smaller side, or 'partitioned' with how many hash partitions
+        both sides are split into on disk, so the smaller side of each partition fits.
+        ``build`` names the side that is hashed.
+        """
+        build = 'left' if left_bytes <= right_bytes else 'right'
+        estimate = min(left_bytes, right_bytes) * self.JOIN_PEAK
+        available = self.available()
+        if available is None:
+            decision = self._unlimited('join', estimate)
+        elif estimate <= available:
+            decision = self._decide('join', 'memory', estimate, available)
+        else:
+            # Twice the even split, as keys don't spread over the partitions evenly
+            partitions = int(np.ceil(2 * estimate / max(available, 1)))
+            mode = 'partitioned' if 0 < available and partitions <= self.MAX_PARTITIONS else 'abort'
+            decision = self._decide('join', mode, estimate, available, partitions=partitions)
+        decision['build'] = build
+        return decision
+
+    def _choose(self, stage, estimate, chunked):
+        available = self.available()
+        if available is None:
+            return self._unlimited(stage, estimate)
+        if estimate <= available:
+            return self._decide(stage, 'memory', estimate, available)
+        if chunked is not None and chunked <= available:
+            return self._decide(stage, 'chunked', chunked, available)
+        return self._decide(stage, 'abort', estimate if chunked is None else chunked, available)
@@ -0,0 +1,46 @@
+# hashing.py
+import numpy as np
+import pandas as pd
+
+
+def row_hashes(data):
+    """One 64-bit hash per row over all of its values (per value, for a Series), for finding repeats."""
+    return pd.util.hash_pandas_object(data, index=False).to_numpy()
+
+
+class HashSet:
+    """Set of 64-bit hashes kept in a few sorted runs, merged as they grow.
+
+    Looking up a batch of hashes is a binary search per hash in each run, and memory is
+    8 bytes per distinct hash, so repeats are found across any number of chunks. Used to
+    drop duplicate rows while cleaning and to check uniqueness rules while loading.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def repeats(self, hashes, present=None):
+        """Mark the hashes already in the set or earlier in the batch, and add the others.
+
+        Args:
+            hashes (ndarray): uint64 hashes of one batch, e.g. from row_hashes.
+            present (ndarray): Booleans; hashes where it is False (e.g. of missing values)
+                are neither marked nor added. None counts every hash.
+        """
+        if present is None:
+            present = np.ones(len(hashes), dtype=bool)
+        repeated = present & pd.Series(hashes).duplicated().to_numpy()
+        for run in self.runs:
+            found = np.searchsorted(run, hashes).clip(max=len(run) - 1)
+            repeated |= present & (run[found] == hashes)
+        new = np.sort(hashes[present & ~repeated])
+        if len(new):
+            self.runs.append(new)
+            while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+                merged = np.concatenate(self.runs[-2:])
+                merged.sort()
+                self.runs[-2:] = [merged]
+        return repeated
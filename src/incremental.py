@@ -0,0 +1,281 @@
+# incremental.py
+import hashlib
+import logging
+import os
+import numpy as np
+import pandas as pd
+from colorama import Fore
+from sklearn.pipeline import Pipeline
+from data_cleaner import DataCleaner
+from data_preprocessor import DataPreprocessor
+from aggregation import PartialAggregate
+from hashing import row_hashes
+from serve import model_features
+
+TAIL_BYTES = 4096  # Bytes before a file's offset that are hashed to tell an append from a rewrite
+
+
+class SourceRewritten(ValueError):
+    """A source file changed before the offset that was read up to, so it wasn't only appended to."""
+
+
+def _tail_digest(path, offset):
+    with open(path, 'rb') as handle:
+        handle.seek(max(offset - TAIL_BYTES, 0))
+        return hashlib.sha256(handle.read(offset - max(offset - TAIL_BYTES, 0))).hexdigest()
+
+
+def file_offsets(loader, data=None):
+    """How far each source file has been read: its size, its row count and a hash of its last bytes.
+
+    Row counts come from ``data`` (the loaded frame, split by its partition column when
+    there are several files) and are only used for formats that can't be read from a byte
+    offset.
+    """
+    paths = loader.resolve_paths()
+    rows = dict.fromkeys(paths)
+    if data is not None and len(paths) == 1:
+        rows[paths[0]] = len(data)
+    elif data is not None and loader.partition_column in data.columns:
+        counts = data[loader.partition_column].value_counts()
+        rows = {path: int(counts.get(os.path.basename(path), 0)) for path in paths}
+    offsets = {}
+    for path in paths:
+        size = os.path.getsize(path)
+        offsets[path] = {'bytes': size, 'rows': rows[path], 'tail': _tail_digest(path, size)}
+    return offsets
+
+
+def source_state(loader, data):
+    """State of the 'load' stage that append mode needs: file offsets and column dtypes."""
+    return {'offsets': file_offsets(loader, data), 'dtypes': {col: str(dtype) for col, dtype in data.dtypes.items()}}
+
+
+def partial_update(model, rows, target):
+    """Update a model in place with new labelled rows, if its estimator supports partial_fit.
+
+    Returns:
+        bool: True if the model learned from the rows, False if it has to be retrained.
+    """
+    estimator = model[-1] if isinstance(model, Pipeline) else model
+    if not hasattr(estimator, 'partial_fit'):
+        return False
+    rows = rows[rows[target].notna()]
+    if rows.empty:
+        return True
+    if isinstance(model, Pipeline):
+        X = model[:-1].transform(rows.drop(columns=[target]))
+    else:
+        X = model_features(model, rows.drop(columns=[target]))
+    estimator.partial_fit(X, rows[target])
+    return True
+
+
+class AppendRefresh:
+    """Bring a saved session up to date with rows appended to its source files.
+
+    Only the new rows are read, cleaned and preprocessed, using the state each stage
+    recorded, and are then appended to the saved stages. Statistic accumulators, models
+    that support ``partial_fit`` and fitted ARIMA results are updated with them, so the
+    cost of a refresh follows the number of new rows rather than the size of the data.
+
+    New rows are found by byte offset for CSV and JSON Lines files (other formats are
+    reread and cut at the saved row count), or, with a watermark column, as the rows whose
+    key is above the largest key seen so far. Rows that duplicate earlier ones are dropped
+    against a stored hash per row.
+    """
+
+    STATS = ('count', 'mean', 'std', 'min', 'max', 'median')
+
+    def __init__(self, workspace, loader, sketch_size=2000, seed=42):
+        self.workspace = workspace
+        self.loader = loader
+        self.sketch_size = sketch_size
+        self.seed = seed
+
+    def run(self, watermark=None):
+        """Fold the new rows into every stage, accumulator and model of the session.
+
+        Args:
+            watermark (str): Key column (an id or timestamp that only grows) that marks new
+                rows. None finds them by file offset.
+
+        Returns:
+            dict: What was refreshed, or None when the session can't be refreshed and has to
+            be rebuilt (no complete session, or a source file that was rewritten).
+        """
+        workspace = self.workspace
+        if workspace.valid_stages() != workspace.STAGES:
+            return None
+        load_state = workspace.stage_record('load')['state']
+        if 'offsets' not in load_state:
+            logging.info(Fore.YELLOW + "The session was saved without source offsets; it will be rebuilt." + Fore.RESET)
+            return None
+        try:
+            if watermark:
+                raw, offsets, key = self.rows_above(watermark, load_state.get('watermark'))
+            else:
+                raw, offsets = self.rows_after(load_state['offsets'])
+                key = load_state.get('watermark')
+        except SourceRewritten as e:
+            logging.warning(Fore.YELLOW + f"{e} Rebuilding the session." + Fore.RESET)
+            workspace.invalidate('load')
+            return None
+
+        raw = self._cast(raw, load_state.get('dtypes', {}))
+        unique = self._deduplicate(raw)
+        clean_record = workspace.stage_record('clean')
+        clean_state = clean_record['state'] or clean_record['params']
+        context = workspace.load_artifact('clean_tail')
+        if context is None and clean_state.get('fill_method') in ('ffill', 'bfill', 'interpolate'):
+            context = workspace.get_stage('clean').tail(1)
+        clean = DataCleaner.apply_state(unique, clean_state, context)
+        processed = DataPreprocessor.apply_state(clean, workspace.stage_record('preprocess')['state'], remove_outliers=True)
+        statistics = self._statistics(processed)  # Seeded from the stage before the new rows are added
+
+        workspace.append_stage('load', raw, {**load_state, 'offsets': offsets, 'watermark': key})
+        workspace.append_stage('clean', clean)
+        workspace.append_stage('preprocess', processed)
+        if len(clean):
+            workspace.save_artifact('clean_tail', clean.tail(1))
+
+        report = {
+            'new_rows': len(raw),
+            'duplicates': len(raw) - len(unique),
+            'clean_rows': len(clean),
+            'preprocessed_rows': len(processed),
+            'statistics': statistics,
+            'models': self._update_models(processed),
+            'forecasts': self._update_forecasts(processed),
+        }
+        logging.info(Fore.GREEN + f"Appended {len(processed)} of {len(raw)} new rows to the session "
+                     f"({report['duplicates']} duplicates)." + Fore.RESET)
+        return report
+
+    def rows_after(self, offsets):
+        """Rows past each file's saved offset, and the new offsets."""
+        frames, current = [], file_offsets(self.loader)
+        for path, now in current.items():
+            saved = offsets.get(path)
+            if saved is None:
+                raise SourceRewritten(f"'{path}' is not part of the saved session.")
+            if now['bytes'] < saved['bytes'] or _tail_digest(path, saved['bytes']) != saved['tail']:
+                raise SourceRewritten(f"'{path}' was rewritten, not appended to.")
+            now['rows'] = saved['rows']
+            if now['bytes'] == saved['bytes']:
+                continue
+            if self.loader.detect_format(path) in ('csv', 'jsonl'):
+                with open(path, 'rb') as handle:
+                    handle.seek(max(saved['bytes'] - 1, 0))
+                    if saved['bytes'] and handle.read(1) != b'\n':
+                        raise SourceRewritten(f"The last row of '{path}' was extended, not followed by new rows.")
+                rows = self.loader.read_from(path, saved['bytes'])
+            elif saved['rows'] is None:
+                raise SourceRewritten(f"Row count of '{path}' is unknown.")
+            else:
+                rows = pd.concat(list(self.loader.iter_chunks(shards=[path])), ignore_index=True).iloc[saved['rows']:]
+            if now['rows'] is not None:
+                now['rows'] += len(rows)
+            frames.append(rows)
+        return self._concat(frames), current
+
+    def rows_above(self, column, saved):
+        """Rows whose watermark column is above the largest value seen, the new offsets and the new watermark."""
+        if saved and saved['column'] == column:
+            mark = saved['value']
+        else:
+            mark = self.workspace.get_stage('load', columns=[column])[column].max()
+        frames = []
+        for chunk in self.loader.iter_chunks():
+            if column not in chunk.columns:
+                raise KeyError(f"Watermark column '{column}' not found in the data.")
+            threshold = pd.Timestamp(mark) if pd.api.types.is_datetime64_any_dtype(chunk[column]) else mark
+            frames.append(chunk[chunk[column] > threshold])
+        rows = self._concat(frames)
+        if len(rows):
+            mark = rows[column].max()
+        return rows, file_offsets(self.loader), {'column': column, 'value': mark}
+
+    @staticmethod
+    def _concat(frames):
+        frames = [frame for frame in frames if len(frame.columns)]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def _cast(self, rows, dtypes):
+        """Give the new rows the column order and dtypes of the loaded data, where they convert."""
+        if rows.empty:
+            return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in dtypes.items()})
+        rows = rows.reindex(columns=list(dtypes) or rows.columns)
+        for col, dtype in dtypes.items():
+            if dtype != 'category' and str(rows[col].dtype) != dtype:
+                try:
+                    rows[col] = rows[col].astype(dtype)
+                except (TypeError, ValueError):
+                    pass  # Left as parsed; the stages upcast when they are read back
+        return rows
+
+    def _deduplicate(self, rows):
+        """Drop rows that repeat each other or a row already in the session, and store their hashes."""
+        hashes = self.workspace.load_artifact('row_hashes')
+        if hashes is None:
+            hashes = row_hashes(self.workspace.get_stage('load'))
+        new = row_hashes(rows)
+        keep = ~(np.isin(new, hashes) | pd.Series(new).duplicated().to_numpy())
+        self.workspace.save_artifact('row_hashes', np.concatenate([hashes, new[keep]]))
+        return rows[keep]
+
+    def _partial(self, data, values, start):
+        """State of some rows; sketch priorities are seeded by the position of the first row."""
+        priority = np.random.default_rng([self.seed, start]).random(len(data))
+        return PartialAggregate.from_chunk(data, [], values, self.sketch_size, priority)
+
+    def _statistics(self, rows):
+        """Fold the new rows into the running statistics of the numeric columns and return them."""
+        state = self.workspace.load_artifact('statistics')
+        if state is None:
+            stage = self.workspace.get_stage('preprocess')
+            state = self._partial(stage, list(stage.select_dtypes(include=[np.number]).columns), 0)
+        if len(rows) and set(state.values) <= set(rows.columns):
+            state.merge(self._partial(rows, state.values, self.workspace.stage_record('preprocess')['rows']))
+        self.workspace.save_artifact('statistics', state)
+        table = state.result(self.STATS).iloc[0].unstack()[list(self.STATS)] if state.values else pd.DataFrame()
+        self.workspace.save_analysis('statistics', {'rows': self.workspace.stage_record('preprocess')['rows'] + len(rows),
+                                                    'columns': table.to_dict('index')})
+        return table
+
+    def _update_models(self, rows):
+        """Update each session model with partial_fit, or flag it as stale. Returns {name: status}."""
+        statuses = {}
+        for name, record in self.workspace.manifest['models'].items():
+            metadata = record['metadata']
+            target = metadata.get('target')
+            if rows.empty:
+                statuses[name] = 'unchanged'
+                continue
+            _, model = self.workspace.load_model(name)
+            if target in rows.columns and partial_update(model, rows, target):
+                self.workspace.save_model(name, model, {**metadata, 'rows_seen': metadata.get('rows_seen', 0) + len(rows)})
+                statuses[name] = 'updated'
+            else:
+                self.workspace.set_model_metadata(name, stale=True)
+                statuses[name] = 'stale'
+                logging.warning(Fore.YELLOW + f"Model '{name}' can't learn incrementally; retrain it to include the new rows." + Fore.RESET)
+        return statuses
+
+    def _update_forecasts(self, rows):
+        """Extend fitted ARIMA results with the new observations and forecast again. Returns {target: forecast}."""
+        forecasts = {}
+        for name in self.workspace.artifacts('arima_'):
+            saved = self.workspace.load_artifact(name)
+            target = saved['target']
+            observations = rows[target].dropna().to_numpy() if target in rows.columns else []
+            if len(observations):
+                # Keeps the fitted parameters and only runs the filter over the new observations
+                saved['fit'] = saved['fit'].append(observations, refit=False)
+                self.workspace.save_artifact(name, saved)
+            forecast = saved['fit'].forecast(steps=5)
+            forecasts[target] = forecast
+            if len(observations):
+                self.workspace.save_analysis('forecast', {'target': target, 'order': list(saved['order']),
+                                                          'forecast': forecast.tolist()})
+        return forecasts
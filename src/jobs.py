@@ -0,0 +1,172 @@
+# jobs.py
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from colorama import Fore
+
+
+def _run_job(job_id, fn, args, messages):
+    """Worker process body: run the task and send its progress and outcome back."""
+    sys.stdout = open(os.devnull, 'w')  # Keep the worker's output from interleaving with the menu
+    logging.getLogger().setLevel(logging.WARNING)
+
+    def report(fraction, note=''):
+        messages.put((job_id, 'progress', fraction, note))
+
+    try:
+        messages.put((job_id, 'done', fn(report, *args), None))
+    except BaseException as e:
+        messages.put((job_id, 'failed', None, f"{type(e).__name__}: {e}"))
+
+
+class Job:
+    """A task submitted to the JobScheduler and its current state."""
+
+    def __init__(self, job_id, name, fn, args, on_done=None):
+        self.id = job_id
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.on_done = on_done  # Called with the result, in the main process, once the job succeeds
+        self.status = 'queued'  # queued -> running -> done / failed / cancelled
+        self.progress = 0.0
+        self.note = ''
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.process = None
+        self.delivered = False
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed', 'cancelled')
+
+
+class JobScheduler:
+    """Run long tasks (training, clustering, forecasting) in worker processes.
+
+    Jobs beyond ``max_workers`` wait in a queue. Workers are forked, so they see the
+    loaded data without copying or pickling it. The scheduler is only polled from the
+    main thread, when a job is submitted or cancelled and each time the menu is drawn,
+    so queued jobs start at the next of these after a slot frees up. Nothing runs from
+    a signal handler, so other process pools are unaffected. Results are handed to each
+    job's ``on_done`` callback by :meth:`collect_finished`, on the main thread, so they
+    can safely be attached to the session.
+    """
+
+    def __init__(self, max_workers=1):
+        self.max_workers = max_workers
+        self.context = multiprocessing.get_context('fork')
+        self.messages = self.context.Queue()
+        self.jobs = []
+        self._next_id = 1
+
+    @staticmethod
+    def supported():
+        """Workers are forked so they share the loaded data; platforms without fork run tasks in the foreground."""
+        return 'fork' in multiprocessing.get_all_start_methods()
+
+    def submit(self, name, fn, *args, on_done=None):
+        """Queue ``fn(report, *args)``; ``report(fraction, note)`` updates the job's progress."""
+        job = Job(self._next_id, name, fn, args, on_done)
+        self._next_id += 1
+        self.jobs.append(job)
+        self.poll()
+        logging.info(Fore.GREEN + f"Job {job.id} ({name}) {job.status}." + Fore.RESET)
+        return job
+
+    def _start(self, job):
+        job.process = self.context.Process(target=_run_job, args=(job.id, job.fn, job.args, self.messages), daemon=True)
+        job.status, job.started_at, job.note = 'running', time.time(), 'started'
+        job.process.start()
+
+    def _drain(self):
+        jobs = {job.id: job for job in self.jobs}
+        while True:
+            try:
+                job_id, kind, value, note = self.messages.get_nowait()
+            except queue.Empty:
+                return
+            job = jobs.get(job_id)
+            if job is None or job.finished:
+                continue
+            if kind == 'progress':
+                job.progress, job.note = value, note
+            elif kind == 'done':
+                job.status, job.result, job.progress, job.note = 'done', value, 1.0, 'finished'
+                job.finished_at = time.time()
+            else:
+                job.status, job.error, job.note = 'failed', note, note
+                job.finished_at = time.time()
+
+    def poll(self):
+        """Collect progress and outcomes, reap exited workers and start queued jobs."""
+        self._drain()
+        for job in self.jobs:
+            if job.status == 'running' and not job.process.is_alive():
+                self._drain()  # The final message may arrive just after the process exits
+                if job.status == 'running':
+                    job.status, job.finished_at = 'failed', time.time()
+                    job.error = job.note = f"worker exited with code {job.process.exitcode}"
+        running = sum(job.status == 'running' for job in self.jobs)
+        for job in self.jobs:
+            if running >= self.max_workers:
+                break
+            if job.status == 'queued':
+                self._start(job)
+                running += 1
+
+    def cancel(self, job_id):
+        """Cancel a queued job, or stop a running one. Returns True if the job was cancelled."""
+        self.poll()
+        job = next((job for job in self.jobs if job.id == job_id), None)
+        if job is None or job.finished:
+            return False
+        if job.status == 'running':
+            job.process.terminate()
+            job.process.join(timeout=5)
+        job.status, job.note, job.finished_at = 'cancelled', 'cancelled', time.time()
+        job.delivered = True
+        self.poll()  # The freed slot goes to the next queued job
+        return True
+
+    def collect_finished(self):
+        """Deliver results of newly finished jobs to their callbacks. Returns those jobs."""
+        self.poll()
+        finished = [job for job in self.jobs if job.finished and not job.delivered]
+        for job in finished:
+            job.delivered = True
+            if job.status == 'done' and job.on_done is not None:
+                try:
+                    job.on_done(job.result)
+                except Exception as e:
+                    job.status, job.error = 'failed', f"could not attach result: {e}"
+        return finished
+
+    def active(self):
+        return [job for job in self.jobs if not job.finished]
+
+    def table(self):
+        """Job list with status, progress and elapsed time."""
+        self.poll()
+        lines = [f"{'ID':>3}  {'Job':<34} {'Status':<10} {'Progress':>8}  {'Elapsed':>8}  Note"]
+        for job in self.jobs:
+            lines.append(f"{job.id:>3}  {job.name[:34]:<34} {job.status:<10} {job.progress:>8.0%}  "
+                         f"{job.elapsed:>7.1f}s  {job.error or job.note}")
+        return '\n'.join(lines)
+
+    def shutdown(self):
+        """Stop every running worker."""
+        for job in self.active():
+            self.cancel(job.id)
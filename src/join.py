@@ -0,0 +1,305 @@
+# join.py
+import itertools
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from colorama import Fore
+from governor import frame_bytes
+
+JOIN_TYPES = ('inner', 'left', 'outer')
+
+
+class KeyTable:
+    """Hash table over the join keys of the build side.
+
+    Each key column's distinct values are indexed once, and several key columns are
+    combined into one dense code per distinct key, so a probe chunk is matched with a
+    few hash lookups instead of rehashing the build side for every chunk. Rows of the
+    build side are kept grouped by key code. Missing keys match each other, as they
+    do in ``pandas.merge``.
+    """
+
+    def __init__(self, keys):
+        self.lookups = []  # Per key column: (its distinct values, the distinct combined codes so far)
+        codes = None
+        for col in keys.columns:
+            distinct = pd.Index(pd.unique(keys[col]))
+            column_codes = distinct.get_indexer(keys[col])
+            combined = None
+            if codes is not None:
+                combined = pd.Index(pd.unique(codes * len(distinct) + column_codes))
+                codes = combined.get_indexer(codes * len(distinct) + column_codes)
+            else:
+                codes = column_codes
+            self.lookups.append((distinct, combined))
+        groups = len(self.lookups[-1][1] if self.lookups[-1][1] is not None else self.lookups[-1][0])
+        self.order = np.argsort(codes, kind='stable')
+        self.counts = np.bincount(codes, minlength=groups)
+        self.starts = np.cumsum(self.counts) - self.counts
+
+    def lookup(self, keys):
+        """Key code of every probe row, -1 where no build row has its key."""
+        codes = None
+        for col, (distinct, combined) in zip(keys.columns, self.lookups):
+            column_codes = distinct.get_indexer(keys[col])
+            if codes is None:
+                codes = column_codes
+            else:
+                found = (codes >= 0) & (column_codes >= 0)
+                codes = combined.get_indexer(np.where(found, codes * len(distinct) + column_codes, -1))
+        return codes
+
+    def matches(self, codes):
+        """(probe rows, build rows) of every matching pair, in probe order."""
+        found = codes >= 0
+        counts, starts = np.zeros(len(codes), dtype='int64'), np.zeros(len(codes), dtype='int64')
+        counts[found], starts[found] = self.counts[codes[found]], self.starts[codes[found]]
+        probe_rows = np.repeat(np.arange(len(codes)), counts)
+        offsets = np.arange(len(probe_rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return probe_rows, self.order[np.repeat(starts, counts) + offsets]
+
+
+def partition_ids(keys, partitions):
+    """Hash partition of every row. Equal keys land in the same partition whatever their dtype on either side."""
+    normalised = pd.DataFrame({
+        col: values.astype('float64') if pd.api.types.is_numeric_dtype(values) else values.astype(str)
+        for col, values in keys.items()})
+    return pd.util.hash_pandas_object(normalised, index=False).to_numpy() % partitions
+
+
+def _take(frame, rows):
+    """Rows of a frame by position, with an all-missing row where the position is -1."""
+    if len(rows) and rows.min() < 0:
+        return frame.reindex(rows).reset_index(drop=True)
+    return frame.take(rows).reset_index(drop=True)
+
+
+def _chunks(source, chunksize):
+    """Chunks of a DataFrame, or of the files a DataLoader reads."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, max(len(source), 1), chunksize):
+            yield source.iloc[start:start + chunksize]
+    else:
+        yield from source.iter_chunks(chunksize)
+
+
+def _read_spill(path):
+    """The chunks pickled one after another into a spill file."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as handle:
+        while True:
+            try:
+                yield pickle.load(handle)
+            except EOFError:
+                return
+
+
+class HashJoin:
+    """Inner, left or full outer join of two datasets on one or more key columns, out of core.
+
+    Either side is a DataFrame or a DataLoader, read ``chunksize`` rows at a time. The
+    smaller side (the build side) is loaded and indexed in a KeyTable, and the other side
+    is streamed past it one chunk at a time. When even the build side doesn't fit, as the
+    memory governor decides, both sides are first split into hash partitions spilled to
+    disk (a grace hash join). Each pair of partitions is then joined the same way: only
+    one build partition and one probe chunk are in memory at a time.
+
+    The result has the columns ``pandas.merge`` gives: every left column, with the keys
+    filled from the right side for right-only rows, then the right side's other columns.
+    Overlapping names get ``suffixes``. Rows come in probe order, not sorted by key. After
+    a run, ``report`` holds the mode, row counts and timing.
+    """
+
+    def __init__(self, left, right, on, how='inner', suffixes=('_x', '_y'), chunksize=100_000, governor=None,
+                 partitions=None, spill_dir=None):
+        """
+        Args:
+            left, right (DataFrame or DataLoader): The two sides.
+            on (str or list): Key column(s), present on both sides.
+            how (str): 'inner', 'left' or 'outer'.
+            suffixes (tuple): Added to non-key column names found on both sides.
+            chunksize (int): Rows read at a time.
+            governor (MemoryGovernor): Decides between hashing in memory and partitioning.
+                None hashes the smaller side in memory.
+            partitions (int): Partition both sides into this many spill files, whatever the
+                governor says.
+            spill_dir (str): Where partitions are spilled (default: the system temp directory).
+        """
+        if how not in JOIN_TYPES:
+            raise ValueError(f"Unknown join type '{how}'. Choose from {', '.join(JOIN_TYPES)}.")
+        self.left, self.right = left, right
+        self.on = [on] if isinstance(on, str) else list(on)
+        if not self.on:
+            raise ValueError("A join needs at least one key column.")
+        self.how = how
+        self.suffixes = suffixes
+        self.chunksize = chunksize
+        self.governor = governor
+        self.partitions = partitions
+        self.spill_dir = spill_dir
+        self.build = None  # 'left' or 'right': the side that is hashed
+        self.decision = None
+        self.report = None
+        self._names = None
+
+    def _size(self, source):
+        if isinstance(source, pd.DataFrame):
+            return frame_bytes(source)
+        if self.governor is not None:
+            return self.governor.estimate_source(source)['bytes']
+        return sum(os.path.getsize(path) for path in source.resolve_paths())
+
+    def plan(self):
+        """How the join will run: {'mode': 'memory' or 'partitioned', 'build': side, 'partitions': n}."""
+        if self.decision is not None:
+            return self.decision
+        left_bytes, right_bytes = self._size(self.left), self._size(self.right)
+        if self.governor is not None:
+            decision = self.governor.plan_join(left_bytes, right_bytes)  # Raises when nothing fits
+        else:
+            decision = {'mode': 'memory', 'build': 'left' if left_bytes <= right_bytes else 'right'}
+        if self.partitions:
+            decision = {**decision, 'mode': 'partitioned', 'partitions': self.partitions}
+        self.decision = decision
+        return decision
+
+    def _peek(self, side, chunks):
+        """An empty frame with the side's columns, checked for the keys, and its chunks."""
+        first = next(chunks, None)
+        if first is None:
+            raise ValueError(f"The {side} side of the join has no columns.")
+        missing = [key for key in self.on if key not in first.columns]
+        if missing:
+            raise KeyError(f"Join key(s) {missing} not found in the {side} data.")
+        return first.iloc[:0], itertools.chain([first], chunks)
+
+    def _column_names(self, left_columns, right_columns):
+        overlap = (set(left_columns) & set(right_columns)) - set(self.on)
+        left = [f"{col}{self.suffixes[0]}" if col in overlap else col for col in left_columns]
+        right = [f"{col}{self.suffixes[1]}" if col in overlap else col for col in right_columns if col not in self.on]
+        return left, right
+
+    def _combine(self, probe, probe_rows, build, build_rows):
+        """Joined rows from matching positions on both sides, -1 standing for a missing partner."""
+        if self.build == 'left':
+            left, left_rows, right, right_rows = build, build_rows, probe, probe_rows
+        else:
+            left, left_rows, right, right_rows = probe, probe_rows, build, build_rows
+        joined_left = _take(left, left_rows)
+        if len(left_rows) and left_rows.min() < 0:  # Right-only rows take their keys from the right
+            right_keys = _take(right[self.on], right_rows)
+            for key in self.on:
+                joined_left[key] = joined_left[key].where(left_rows >= 0, right_keys[key])
+        joined_right = _take(right.drop(columns=self.on), right_rows)
+        joined_left.columns, joined_right.columns = self._names
+        return pd.concat([joined_left, joined_right], axis=1)
+
+    def _probe(self, build, probe_schema, probe_chunks):
+        """Stream probe chunks past the hashed build rows, yielding joined chunks."""
+        build = build.reset_index(drop=True)
+        table = KeyTable(build[self.on])
+        keep_build = self.how == 'outer' or (self.how == 'left' and self.build == 'left')
+        keep_probe = self.how == 'outer' or (self.how == 'left' and self.build == 'right')
+        matched = np.zeros(len(build), dtype=bool)
+        for chunk in probe_chunks:
+            chunk = chunk.reset_index(drop=True)
+            self.report['probe_rows'] += len(chunk)
+            probe_rows, build_rows = table.matches(table.lookup(chunk[self.on]))
+            matched[build_rows] = True
+            if keep_probe:
+                unmatched = np.flatnonzero(np.bincount(probe_rows, minlength=len(chunk)) == 0)
+                order = np.argsort(np.concatenate([probe_rows, unmatched]), kind='stable')
+                probe_rows = np.concatenate([probe_rows, unmatched])[order]
+                build_rows = np.concatenate([build_rows, np.full(len(unmatched), -1)])[order]
+            if len(probe_rows):
+                yield self._combine(chunk, probe_rows, build, build_rows)
+        if keep_build and not matched.all():
+            rest = np.flatnonzero(~matched)
+            yield self._combine(probe_schema, np.full(len(rest), -1), build, rest)
+
+    def _spill(self, chunks, directory, side, partitions):
+        """Split a side's chunks into hash partitions, one spill file each. Returns the row count."""
+        handles = [open(os.path.join(directory, f'{side}-{p:04d}.pkl'), 'wb') for p in range(partitions)]
+        rows = 0
+        try:
+            for chunk in chunks:
+                rows += len(chunk)
+                for p, part in chunk.groupby(partition_ids(chunk[self.on], partitions), sort=False):
+                    pickle.dump(part, handles[p], protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            for handle in handles:
+                handle.close()
+        return rows
+
+    def iter_chunks(self):
+        """Yield the joined rows chunk by chunk. ``report`` is complete once the last chunk is out."""
+        start = time.perf_counter()
+        decision = self.plan()
+        self.build = decision['build']
+        left_schema, left_chunks = self._peek('left', _chunks(self.left, self.chunksize))
+        right_schema, right_chunks = self._peek('right', _chunks(self.right, self.chunksize))
+        self._names = self._column_names(left_schema.columns, right_schema.columns)
+        if self.build == 'left':
+            build_schema, build_chunks, probe_schema, probe_chunks = left_schema, left_chunks, right_schema, right_chunks
+        else:
+            build_schema, build_chunks, probe_schema, probe_chunks = right_schema, right_chunks, left_schema, left_chunks
+        self.report = {'how': self.how, 'on': self.on, 'mode': decision['mode'], 'build': self.build,
+                       'partitions': decision.get('partitions', 1), 'build_rows': 0, 'probe_rows': 0, 'rows': 0,
+                       'spilled_bytes': 0, 'seconds': 0.0}
+
+        if decision['mode'] == 'memory':
+            source = self.left if self.build == 'left' else self.right
+            build = source if isinstance(source, pd.DataFrame) else pd.concat(list(build_chunks), ignore_index=True)
+            self.report['build_rows'] = len(build)
+            joined = self._probe(build, probe_schema, probe_chunks)
+        else:
+            joined = self._partitioned(build_schema, build_chunks, probe_schema, probe_chunks, decision['partitions'])
+        for chunk in joined:
+            self.report['rows'] += len(chunk)
+            yield chunk
+
+        self.report['seconds'] = time.perf_counter() - start
+        self.report['left_rows'], self.report['right_rows'] = (
+            (self.report['build_rows'], self.report['probe_rows']) if self.build == 'left'
+            else (self.report['probe_rows'], self.report['build_rows']))
+        method = 'hash join' if decision['mode'] == 'memory' else f"grace hash join, {self.report['partitions']} partitions"
+        logging.info(Fore.GREEN + f"{self.how.capitalize()} join on {', '.join(self.on)}: {self.report['left_rows']:,} and "
+                     f"{self.report['right_rows']:,} rows -> {self.report['rows']:,} rows in {self.report['seconds']:.2f}s "
+                     f"({method}, {self.build} side hashed)." + Fore.RESET)
+
+    def _partitioned(self, build_schema, build_chunks, probe_schema, probe_chunks, partitions):
+        directory = tempfile.mkdtemp(prefix='datavista-join-', dir=self.spill_dir)
+        try:
+            self.report['build_rows'] = self._spill(build_chunks, directory, 'build', partitions)
+            self._spill(probe_chunks, directory, 'probe', partitions)
+            self.report['spilled_bytes'] = sum(entry.stat().st_size for entry in os.scandir(directory))
+            for p in range(partitions):
+                parts = list(_read_spill(os.path.join(directory, f'build-{p:04d}.pkl')))
+                build = pd.concat(parts, ignore_index=True) if parts else build_schema
+                yield from self._probe(build, probe_schema, _read_spill(os.path.join(directory, f'probe-{p:04d}.pkl')))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def collect(self):
+        """The whole joined result as one DataFrame."""
+        chunks = list(self.iter_chunks())
+        if not chunks:
+            left, right = self._names
+            return pd.DataFrame(columns=left + right)
+        return pd.concat(chunks, ignore_index=True)
+
+    def to_csv(self, path):
+        """Write the joined result to a CSV file chunk by chunk, without holding it in memory. Returns the path."""
+        with open(path, 'w', newline='') as handle:
+            for i, chunk in enumerate(self.iter_chunks()):
+                chunk.to_csv(handle, index=False, header=i == 0)
+            if self.report['rows'] == 0:
+                left, right = self._names
+                pd.DataFrame(columns=left + right).to_csv(handle, index=False)
+        return path
@@ -1,78 +1,155 @@
 # machine_learning.py
 import logging
+import time
+import warnings
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression, LogisticRegression
-from sklearn.tree import DecisionTreeClassifier
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+from sklearn.ensemble import (HistGradientBoostingClassifier, HistGradientBoostingRegressor,
+                              RandomForestClassifier, RandomForestRegressor)
 from sklearn.metrics import mean_squared_error, r2_score, accuracy_score
 from sklearn.cluster import KMeans
+from sklearn.pipeline import Pipeline
+from sklearn.base import BaseEstimator, RegressorMixin, is_classifier
 from statsmodels.tsa.arima.model import ARIMA
 from colorama import Fore
 import joblib
+import os
+from feature_store import FeatureStore
+from model_registry import ModelRegistry
+from sparse_encoder import SparseEncoder
+from category_encoder import CategoryEncoder
+from explain import permutation_importance
+from parallel import SharedPool
+from serve import model_features
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+
+def no_progress(fraction, note=''):
+    """Progress callback for runs nobody is watching: ``progress(fraction, note)`` does nothing."""
+
+
 class LinearRegressionModel:
-    def __init__(self, data):
+    def __init__(self, data, feature_store=None, progress=None):
         self.data = data
         self.model = LinearRegression()
+        self.feature_store = feature_store or FeatureStore()
+        self.progress = progress or no_progress  # Called with (fraction, note) at each stage of training
+        self.metrics = {}
+        self.input_columns = []
+        self.holdout = None  # Index labels of the rows held out for scoring
 
-    def train(self, target_column):
-        # Separate features and target
-        X = self.data.drop(columns=[target_column])
-        y = self.data[target_column]
+    @staticmethod
+    def build_features(data, target_column):
+        X = data.drop(columns=[target_column])
 
         # Convert DateTime columns to numeric
         for col in X.select_dtypes(include=['datetime64']).columns:
             X[col] = X[col].astype('int64') // 10**9  # Convert to seconds since epoch
-        
+
         # Drop non-numeric columns
-        X = X.select_dtypes(include=['float64', 'int64'])
+        return X.select_dtypes(include=['float64', 'int64'])
+
+    def train(self, target_column):
+        # Separate features and target; the design matrix is reused while the data is unchanged
+        X, columns = self.feature_store.matrix(self.data, {'model': 'linear_regression', 'target': target_column},
+                                               lambda data: self.build_features(data, target_column))
+        X = pd.DataFrame(X, columns=columns, copy=False)  # Fitted with column names, so DataFrames are scored by name
+        y = self.data[target_column]
+        self.progress(0.3, 'features built')
 
         # Split the dataset
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        self.holdout = y_test.index
 
         # Train the model
         self.model.fit(X_train, y_train)
+        self.progress(0.8, 'fit done')
 
         # Evaluate the model
         y_pred = self.model.predict(X_test)
         mse = mean_squared_error(y_test, y_pred)
         r2 = r2_score(y_test, y_pred)
+        self.progress(0.95, 'scoring done')
         logging.info(Fore.GREEN + f'Model trained with MSE: {mse}, R^2: {r2}' + Fore.RESET)
+        self.metrics = {'mse': mse, 'r2': r2}
+        self.input_columns = list(columns)
 
     def predict(self, X):
         return self.model.predict(X)
 
 
 class ClassificationModels:
-    def __init__(self, data):
+    SPARSE_THRESHOLD = 1000  # One-hot columns above which 'auto' encoding switches to sparse
+
+    def __init__(self, data, feature_store=None, progress=None):
         self.data = data
         self.model = None
-
-    def train(self, target_column, algorithm='logistic_regression'):
-        # Prepare features and target
-        feature_columns = self.data.columns.difference([target_column])
-        X = self.data[feature_columns].copy()
-        y = self.data[target_column]
+        self.feature_store = feature_store or FeatureStore()
+        self.progress = progress or no_progress  # Called with (fraction, note) at each stage of training
+        self.metrics = {}
+        self.input_columns = []
+        self.holdout = None  # Index labels of the rows held out for scoring
+        self.fill_values = None  # Column means that filled missing inputs in training (dense encoding only)
+
+    @staticmethod
+    def build_features(data, target_column):
+        feature_columns = data.columns.difference([target_column])
+        X = data[feature_columns].copy()
 
         # Drop datetime columns
         datetime_columns = X.select_dtypes(include=['datetime64']).columns
         X.drop(columns=datetime_columns, inplace=True)
 
         # Handle missing values
-        X.fillna(X.mean(), inplace=True)
-        y.fillna(y.mean(), inplace=True)
-
-        # Align features and target
-        X, y = X.align(y, join='inner', axis=0)
+        X = X.fillna(X.mean(numeric_only=True))
 
         # Convert categorical variables to numeric
-        X = pd.get_dummies(X, drop_first=True)
+        return pd.get_dummies(X, drop_first=True)
+
+    def choose_encoding(self, target_column):
+        """'sparse' when one-hot encoding would create more than SPARSE_THRESHOLD columns, else 'dense'."""
+        categorical = self.data.drop(columns=[target_column]).select_dtypes(exclude=['number', 'bool', 'datetime', 'datetimetz'])
+        width = int(categorical.nunique().sum())
+        return 'sparse' if width > self.SPARSE_THRESHOLD else 'dense'
+
+    def train(self, target_column, algorithm='logistic_regression', encoding='auto'):
+        """Train a classifier.
+
+        Args:
+            target_column (str): Binary target column.
+            algorithm (str): 'logistic_regression' or 'decision_tree'.
+            encoding (str): How categorical columns are encoded: 'dense' (pd.get_dummies),
+                'sparse' (CSR one-hot with a fitted vocabulary), 'hash' (CSR hashing trick for
+                unbounded cardinality) or 'auto' (sparse once one-hot encoding gets wide).
+        """
+        if encoding == 'auto':
+            encoding = self.choose_encoding(target_column)
+
+        # Prepare features and target; rows stay aligned because the features keep every row
+        encoder = None
+        if encoding == 'dense':
+            X, columns = self.feature_store.matrix(self.data, {'model': 'classification', 'target': target_column},
+                                                   lambda data: self.build_features(data, target_column))
+            X = pd.DataFrame(X, columns=columns, copy=False)
+        elif encoding in ('sparse', 'hash'):
+            encoder = SparseEncoder('hash' if encoding == 'hash' else 'onehot')
+            X = encoder.fit_transform(self.data.drop(columns=[target_column]))
+            logging.info(Fore.GREEN + f"Encoded features as a sparse {X.shape} matrix with {X.nnz} stored values." + Fore.RESET)
+        else:
+            logging.error(Fore.RED + f"Invalid encoding '{encoding}'. Choose dense, sparse, hash or auto." + Fore.RESET)
+            return
+        y = self.data[target_column]
+        y = y.fillna(y.mean())
+        self.progress(0.3, 'features built')
 
         # Split the dataset
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        self.holdout = y_test.index
 
         # Select the model based on user input
         if algorithm == 'logistic_regression':
@@ -89,31 +166,415 @@ class ClassificationModels:
         except ValueError as e:
             logging.error(Fore.RED + f"Error during model training: {e}" + Fore.RESET)
             return
+        self.progress(0.8, 'fit done')
 
         # Evaluate the model
         predictions = self.model.predict(X_test)
         accuracy = accuracy_score(y_test, predictions)
+        self.progress(0.95, 'scoring done')
+
+        if encoder is None:
+            inputs = self.data.drop(columns=[target_column])
+            self.input_columns = list(inputs.columns.difference(inputs.select_dtypes(include=['datetime64']).columns))
+            self.fill_values = inputs[self.input_columns].mean(numeric_only=True).to_dict()  # As build_features filled
+        else:
+            # Keep the fitted vocabulary with the model so scoring encodes the same way
+            self.model = Pipeline([('encoder', encoder), ('classifier', self.model)])
+            self.input_columns = encoder.numeric_columns_ + encoder.categorical_columns_
+        self.metrics = {'accuracy': accuracy}
 
         logging.info(Fore.GREEN + f"Model trained successfully with accuracy: {accuracy:.2f}" + Fore.RESET)
 
 
+class TreeModels:
+    """Decision trees, random forests and histogram gradient boosting, for regression and classification.
+
+    Rows are used as they are: trees route missing values natively, so nothing is imputed.
+    Categorical columns are ordinal-encoded against a fitted vocabulary. Gradient boosting
+    treats those codes as categories (up to MAX_CATEGORIES per column), bins the features,
+    and stops adding trees once the validation score stops improving. Forests grow their
+    trees on every core, each from a bootstrap sample of at most MAX_FOREST_SAMPLES rows.
+    """
+
+    ALGORITHMS = ('decision_tree', 'random_forest', 'gradient_boosting')
+    MAX_CATEGORIES = 255  # Gradient boosting's limit; wider columns are split on as ordinal codes
+    MAX_FOREST_SAMPLES = 200_000
+
+    def __init__(self, data, feature_store=None, progress=None):
+        self.data = data
+        self.model = None
+        self.feature_store = feature_store or FeatureStore()
+        self.progress = progress or no_progress  # Called with (fraction, note) at each stage of training
+        self.metrics = {}
+        self.input_columns = []
+        self.holdout = None  # Index labels of the rows held out for scoring
+
+    def build_estimator(self, algorithm, task, categorical_mask, n_rows):
+        classification = task == 'classification'
+        if algorithm == 'decision_tree':
+            return DecisionTreeClassifier(random_state=42) if classification else DecisionTreeRegressor(random_state=42)
+        if algorithm == 'random_forest':
+            forest = RandomForestClassifier if classification else RandomForestRegressor
+            return forest(n_estimators=100, n_jobs=-1, random_state=42,
+                          max_samples=min(1.0, self.MAX_FOREST_SAMPLES / max(n_rows, 1)))
+        if algorithm == 'gradient_boosting':
+            boosting = HistGradientBoostingClassifier if classification else HistGradientBoostingRegressor
+            return boosting(max_iter=500, early_stopping=True, validation_fraction=0.1, n_iter_no_change=10,
+                            categorical_features=categorical_mask if categorical_mask.any() else None, random_state=42)
+        raise ValueError(f"Invalid algorithm '{algorithm}'. Choose from {', '.join(self.ALGORITHMS)}.")
+
+    def train(self, target_column, algorithm='gradient_boosting', task='regression'):
+        """Train a tree model.
+
+        Args:
+            target_column (str): Target column; rows where it is missing are left out.
+            algorithm (str): 'decision_tree', 'random_forest' or 'gradient_boosting'.
+            task (str): 'regression' or 'classification'.
+        """
+        encoder = CategoryEncoder().fit(self.data.drop(columns=[target_column]))
+        X, columns = self.feature_store.matrix(self.data, {'model': 'trees', 'target': target_column},
+                                               lambda data: encoder.frame(data.drop(columns=[target_column])))
+        y = self.data[target_column]
+        labelled = y.notna().to_numpy()
+        X, y = X[labelled], y[labelled]
+        self.progress(0.3, 'features built')
+
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        self.holdout = y_test.index
+
+        categorical_mask = encoder.categorical_mask_ & (encoder.cardinalities() <= self.MAX_CATEGORIES)
+        try:
+            estimator = self.build_estimator(algorithm, task, categorical_mask, len(X_train))
+        except ValueError as e:
+            logging.error(Fore.RED + str(e) + Fore.RESET)
+            return
+        start = time.perf_counter()
+        try:
+            estimator.fit(X_train, y_train)
+        except ValueError as e:
+            logging.error(Fore.RED + f"Error during model training: {e}" + Fore.RESET)
+            return
+        elapsed = time.perf_counter() - start
+        throughput = len(X_train) / elapsed if elapsed > 0 else float('inf')
+        self.progress(0.8, 'fit done')
+
+        predictions = estimator.predict(X_test)
+        if task == 'classification':
+            self.metrics = {'accuracy': accuracy_score(y_test, predictions)}
+            scores = f"accuracy: {self.metrics['accuracy']:.2f}"
+        else:
+            self.metrics = {'mse': mean_squared_error(y_test, predictions), 'r2': r2_score(y_test, predictions)}
+            scores = f"MSE: {self.metrics['mse']}, R^2: {self.metrics['r2']}"
+        self.metrics.update({'fit_seconds': elapsed, 'train_rows_per_second': throughput})
+        self.progress(0.95, 'scoring done')
+        if algorithm == 'gradient_boosting':
+            logging.info(Fore.GREEN + f"Gradient boosting stopped after {estimator.n_iter_} of {estimator.max_iter} iterations "
+                         f"({int(categorical_mask.sum())} categorical features)." + Fore.RESET)
+
+        # Keep the fitted vocabulary with the model so scoring encodes the same way
+        self.model = Pipeline([('encoder', encoder), ('classifier' if task == 'classification' else 'regressor', estimator)])
+        self.input_columns = list(columns)
+        logging.info(Fore.GREEN + f"{algorithm.replace('_', ' ').capitalize()} {task} trained on {len(X_train):,} rows in "
+                     f"{elapsed:.2f}s ({throughput:,.0f} rows/s) with {scores}" + Fore.RESET)
+
+
+class OutputSelector(RegressorMixin, BaseEstimator):
+    """One output of a fitted multi-output regressor, used as that target's own model.
+
+    Every target of a joint solve shares the one fitted model; ``predict`` returns the
+    column of its target, and ``coef_`` and ``intercept_`` are that target's.
+    """
+
+    def __init__(self, estimator, output):
+        self.estimator = estimator
+        self.output = output
+
+    def predict(self, X):
+        return self.estimator.predict(X)[:, self.output]
+
+    @property
+    def feature_names_in_(self):
+        return self.estimator.feature_names_in_
+
+    @property
+    def n_features_in_(self):
+        return self.estimator.n_features_in_
+
+    @property
+    def coef_(self):
+        return self.estimator.coef_[self.output]
+
+    @property
+    def intercept_(self):
+        return self.estimator.intercept_[self.output]
+
+
+def _fit_target(shared, task):
+    """Fit and score one target's model on the shared feature matrix, in a pool worker."""
+    target, algorithm, task_kind, features, columns, categorical_mask = task
+    X, y = shared.matrix(features), shared.column(target)
+    labelled = ~np.isnan(y)
+    positions = np.flatnonzero(labelled)
+    if not labelled.all():
+        X, y = X[labelled], y[labelled]
+    if categorical_mask is None:
+        X = pd.DataFrame(X, columns=columns, copy=False)  # One-hot features are scored by name, as in single training
+    if task_kind == 'classification':
+        y = y.astype('int64')
+    X_train, X_test, y_train, y_test, _, test_rows = train_test_split(X, y, positions, test_size=0.2, random_state=42)
+
+    if algorithm == 'logistic_regression':
+        estimator = LogisticRegression()
+    elif algorithm == 'decision_tree' and categorical_mask is None:
+        estimator = DecisionTreeClassifier()  # On one-hot features, as ClassificationModels trains it
+    else:
+        estimator = TreeModels(None).build_estimator(algorithm, task_kind, categorical_mask, len(X_train))
+    start = time.perf_counter()
+    estimator.fit(X_train, y_train)
+    elapsed = time.perf_counter() - start
+
+    predictions = estimator.predict(X_test)
+    if task_kind == 'classification':
+        metrics = {'accuracy': accuracy_score(y_test, predictions)}
+    else:
+        metrics = {'mse': mean_squared_error(y_test, predictions), 'r2': r2_score(y_test, predictions)}
+    metrics['fit_seconds'] = elapsed
+    return target, estimator, metrics, len(X_train), test_rows
+
+
+class BatchTraining:
+    """Train one model per target column over feature matrices built once for the whole batch.
+
+    Features are every column except the targets. Targets that need the same feature
+    preparation share one matrix from the feature store. Linear regression fits all its
+    targets in one multi-output least-squares solve, one solve per pattern of missing
+    target values, and each target's model is an OutputSelector over the joint fit. Every
+    other model is fitted in a SharedPool, where the workers read the feature matrix and
+    the target columns from shared memory. Each model takes its inputs by name, or is
+    wrapped with its encoder, exactly as single-target training does, so it can be saved,
+    served and explained in the same way.
+    """
+
+    REGRESSION = ('linear_regression',) + TreeModels.ALGORITHMS
+    CLASSIFICATION = ('logistic_regression',) + TreeModels.ALGORITHMS
+
+    def __init__(self, data, feature_store=None, workers=None):
+        self.data = data
+        self.feature_store = feature_store or FeatureStore()
+        self.workers = workers
+        self.models = {}  # target -> (model, model_info)
+        self.metrics = None
+
+    @staticmethod
+    def feature_kind(algorithm, task):
+        """Which feature preparation a model uses: 'linear', 'dummies' or 'trees' (None: not supported)."""
+        if algorithm not in (BatchTraining.REGRESSION if task == 'regression' else BatchTraining.CLASSIFICATION):
+            return None
+        if algorithm == 'linear_regression':
+            return 'linear'
+        if task == 'classification' and algorithm in ('logistic_regression', 'decision_tree'):
+            return 'dummies'
+        return 'trees'
+
+    def train(self, tasks, algorithm='linear_regression'):
+        """Train ``algorithm`` for every target.
+
+        Args:
+            tasks (dict): Target column -> 'regression' or 'classification'. Classification
+                targets must already be coded as 0/1.
+            algorithm (str): One algorithm for every target.
+
+        Returns:
+            DataFrame: One row per target with its task, training rows and metrics.
+        """
+        targets = list(tasks)
+        groups = {}
+        for target, task in tasks.items():
+            kind = self.feature_kind(algorithm, task)
+            if kind is None:
+                logging.error(Fore.RED + f"{algorithm.replace('_', ' ').capitalize()} can't be trained for the "
+                              f"{task} target '{target}'; skipping it." + Fore.RESET)
+                continue
+            groups.setdefault(kind, []).append(target)
+
+        rows = []
+        for kind, group in groups.items():
+            features = self.data.drop(columns=targets)
+            if kind == 'linear':
+                rows += self._train_linear(features, group, targets)
+            elif kind == 'dummies' and ClassificationModels(features.assign(_target=0)).choose_encoding('_target') == 'sparse':
+                rows += self._train_sparse(features, group, algorithm)
+            else:
+                rows += self._train_shared(features, group, targets, algorithm, kind, tasks)
+        self.metrics = pd.DataFrame(rows, columns=['target', 'algorithm', 'task', 'train_rows', 'mse', 'r2', 'accuracy',
+                                                   'fit_seconds']).dropna(axis=1, how='all')
+        return self.metrics
+
+    def _matrix(self, targets, kind, build):
+        return self.feature_store.matrix(self.data, {'model': f'batch_{kind}', 'targets': sorted(targets)},
+                                         lambda data: build(data.drop(columns=targets)))
+
+    def _record(self, target, algorithm, task, model, features, metrics, train_rows, holdout):
+        self.models[target] = (model, {'target': target, 'algorithm': algorithm, 'features': list(features),
+                                       'metrics': metrics, 'holdout': holdout})
+        return {'target': target, 'algorithm': algorithm, 'task': task, 'train_rows': train_rows, **metrics}
+
+    def _train_linear(self, features, group, targets):
+        """Multi-output least squares, one solve per pattern of missing target values."""
+        X, columns = self._matrix(targets, 'linear',
+                                  lambda data: LinearRegressionModel.build_features(data.assign(_target=0), '_target'))
+        Y = self.data[group]
+        missing = Y.isna().to_numpy()
+        patterns = {}
+        for i, target in enumerate(group):
+            patterns.setdefault(missing[:, i].tobytes(), []).append(target)
+
+        rows = []
+        for shared_targets in patterns.values():
+            labelled = Y[shared_targets[0]].notna().to_numpy()
+            X_train, X_test, y_train, y_test, _, holdout = train_test_split(
+                pd.DataFrame(X[labelled], columns=columns, copy=False), Y.loc[labelled, shared_targets].to_numpy(),
+                Y.index[labelled], test_size=0.2, random_state=42)
+            start = time.perf_counter()
+            joint = LinearRegression().fit(X_train, y_train)
+            elapsed = time.perf_counter() - start
+            predictions = joint.predict(X_test)
+            for i, target in enumerate(shared_targets):
+                model = OutputSelector(joint, i)
+                metrics = {'mse': mean_squared_error(y_test[:, i], predictions[:, i]),
+                           'r2': r2_score(y_test[:, i], predictions[:, i]), 'fit_seconds': elapsed}
+                rows.append(self._record(target, 'linear_regression', 'regression', model, columns, metrics, len(X_train),
+                                         holdout))
+        logging.info(Fore.GREEN + f"Linear regression fitted for {len(group)} targets in {len(patterns)} "
+                     f"multi-output solve(s) on {X.shape[1]} features." + Fore.RESET)
+        return rows
+
+    def _train_sparse(self, features, group, algorithm):
+        """Wide categorical features are one-hot encoded sparse, which isn't shared: one model at a time."""
+        rows = []
+        for target in group:
+            model = ClassificationModels(features.assign(**{target: self.data[target]}), self.feature_store)
+            model.train(target, algorithm, 'sparse')
+            if model.model is not None:
+                rows.append(self._record(target, algorithm, 'classification', model.model, model.input_columns,
+                                         model.metrics, int(self.data[target].notna().sum() * 0.8), model.holdout))
+        return rows
+
+    def _train_shared(self, features, group, targets, algorithm, kind, tasks):
+        """Fit each target's model in a SharedPool over one shared feature matrix."""
+        encoder, mask = None, None
+        if kind == 'trees':
+            encoder = CategoryEncoder().fit(features)
+            X, columns = self._matrix(targets, kind, encoder.frame)
+            mask = encoder.categorical_mask_ & (encoder.cardinalities() <= TreeModels.MAX_CATEGORIES)
+        else:
+            X, columns = self._matrix(targets, kind,
+                                      lambda data: ClassificationModels.build_features(data.assign(_target=0), '_target'))
+        names = [f'f{i}' for i in range(len(columns))]  # Positional names can't collide with a target
+        shared = pd.DataFrame(X, columns=names, copy=False).assign(
+            **{target: self.data[target].to_numpy(dtype='float64', na_value=np.nan) for target in group})
+        workers = min(self.workers or os.cpu_count() or 1, len(group))
+        with SharedPool(shared, workers=workers) as pool:
+            fitted = pool.map(_fit_target, [(target, algorithm, tasks[target], names, columns, mask) for target in group])
+        del shared
+
+        rows = []
+        for target, estimator, metrics, train_rows, test_rows in fitted:
+            task = tasks[target]
+            if encoder is not None:
+                # Keep the fitted vocabulary with the model so scoring encodes the same way
+                model = Pipeline([('encoder', encoder), ('classifier' if task == 'classification' else 'regressor', estimator)])
+                inputs = columns
+            else:
+                model = estimator
+                inputs = features.columns.difference(features.select_dtypes(include=['datetime64']).columns)
+            rows.append(self._record(target, algorithm, task, model, inputs, metrics, train_rows,
+                                     self.data.index[np.sort(test_rows)]))
+        logging.info(Fore.GREEN + f"{algorithm.replace('_', ' ').capitalize()} trained for {len(fitted)} targets on "
+                     f"{workers} worker(s) over one {X.shape} feature matrix." + Fore.RESET)
+        return rows
+
+
 class ClusterAnalysis:
-    def __init__(self, data):
+    def __init__(self, data, feature_store=None, progress=None):
         self.data = data
+        self.feature_store = feature_store or FeatureStore()
+        self.progress = progress or no_progress
 
     def kmeans_clustering(self, n_clusters):
         """Perform K-means clustering."""
-        X = self.data.select_dtypes(include=[float, int]).fillna(0)  # Select numeric columns and handle NaNs
+        X, _ = self.feature_store.matrix(self.data, {'model': 'kmeans'},  # Select numeric columns and handle NaNs
+                                         lambda data: data.select_dtypes(include=[float, int]).fillna(0))
+        self.progress(0.3, 'features built')
         kmeans = KMeans(n_clusters=n_clusters, random_state=42)
         clusters = kmeans.fit_predict(X)
+        self.progress(0.95, 'fit done')
 
         logging.info(Fore.GREEN + f"K-Means clustering performed with {n_clusters} clusters." + Fore.RESET)
         return clusters
 
 
+def rolling_origin_folds(length, horizon=5, n_folds=5, window='expanding', train_size=None):
+    """(train_start, origin, stop) of each rolling-origin fold over a series of ``length`` points.
+
+    The last fold forecasts the final ``horizon`` points and each earlier fold's origin is
+    ``horizon`` points before the next. An 'expanding' window trains on everything before
+    the origin; a 'sliding' one on the ``train_size`` points just before it (default: as
+    many as the first fold has).
+    """
+    if window not in ('expanding', 'sliding'):
+        raise ValueError(f"Unknown backtest window '{window}'. Choose expanding or sliding.")
+    first_origin = length - horizon * n_folds
+    train_size = train_size or first_origin
+    if horizon < 1 or n_folds < 1 or first_origin < max(train_size if window == 'sliding' else 1, 3):
+        raise ValueError(f"{length} points are too few for {n_folds} folds of {horizon} steps.")
+    origins = [first_origin + i * horizon for i in range(n_folds)]
+    return [(0 if window == 'expanding' else origin - train_size, origin, origin + horizon) for origin in origins]
+
+
+def forecast_errors(actual, forecast):
+    """MAE, RMSE and MAPE (in percent) of a forecast. Failed (NaN) points are left out, and zero actuals from MAPE."""
+    scored = ~np.isnan(forecast)
+    errors, actual = forecast[scored] - actual[scored], actual[scored]
+    nonzero = actual != 0
+    if not errors.size:
+        return {'mae': np.nan, 'rmse': np.nan, 'mape': np.nan}
+    return {'mae': np.abs(errors).mean(), 'rmse': np.sqrt(np.mean(errors ** 2)),
+            'mape': np.mean(np.abs(errors[nonzero] / actual[nonzero])) * 100 if nonzero.any() else np.nan}
+
+
+def _backtest_folds(shared, task):
+    """Fit one ARIMA order on a run of neighbouring folds, in a pool worker.
+
+    Each fit starts from the previous fold's parameters, which sit close to the optimum
+    since the training windows differ by a few points.
+    """
+    order, folds, warm_start = task
+    params, results = None, []
+    for fold, (train_start, origin, stop) in folds:
+        train = np.array(shared.column('series', train_start, origin))  # Fits keep their data, not the shared block
+        start = time.perf_counter()
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')  # Convergence and start-parameter warnings, scored as is
+                fit = ARIMA(train, order=order).fit(start_params=params)
+            forecast = np.asarray(fit.forecast(stop - origin))
+            iterations = fit.mle_retvals.get('iterations', np.nan) if fit.mle_retvals else np.nan
+            params = fit.params if warm_start else None
+        except (ValueError, np.linalg.LinAlgError):
+            forecast, iterations, params = np.full(stop - origin, np.nan), np.nan, None
+        results.append((fold, forecast, iterations, time.perf_counter() - start))
+    return order, results
+
+
 class TimeSeriesAnalysis:
-    def __init__(self, data):
+    MIN_RUN_FOLDS = 2  # Fewest neighbouring folds a backtest task fits, the first cold and the rest warm
+
+    def __init__(self, data, progress=None):
         self.data = data
+        self.progress = progress or no_progress
+        self.results = None  # Fitted ARIMA results, which new observations can be appended to
+        self.fold_scores = None  # Errors of every (order, fold) of the last backtest
 
     def forecast(self, target_column, order=(1, 1, 1)):
         """Forecast time series data using ARIMA."""
@@ -124,57 +585,274 @@ class TimeSeriesAnalysis:
         ts_data = self.data[target_column].dropna()
         model = ARIMA(ts_data, order=order)
         model_fit = model.fit()
+        self.results = model_fit
+        self.progress(0.8, 'fit done')
 
         forecast = model_fit.forecast(steps=5)  # Forecast next 5 time steps
+        self.progress(0.95, 'forecast done')
         logging.info(Fore.GREEN + f"Time series forecast for {target_column}: {forecast}" + Fore.RESET)
         return forecast
 
+    def backtest(self, target_column, orders, horizon=5, n_folds=5, window='expanding', train_size=None,
+                 workers=None, warm_start=True):
+        """Score candidate ARIMA orders on rolling-origin folds of the series.
+
+        Each fold fits on the points before its origin and forecasts the next ``horizon``.
+        Orders, and runs of at least MIN_RUN_FOLDS neighbouring folds when there are fewer
+        orders than workers, are fitted in parallel over the series in shared memory. Within
+        a run every fold after the first warm-starts from the previous fold's parameters.
+
+        Args:
+            target_column (str): The series to forecast.
+            orders (list): Candidate (p, d, q) orders.
+            horizon (int): Steps forecast by each fold.
+            n_folds (int): Number of folds, ending at the last observation.
+            window (str): 'expanding' or 'sliding' training window.
+            train_size (int): Points in a sliding window (default: the first fold's).
+            workers (int): Worker processes (default: one per CPU).
+            warm_start (bool): Start each fold's fit from the previous fold's parameters.
+
+        Returns:
+            DataFrame: The leaderboard, one row per order ranked by RMSE, with MAE, RMSE and
+            MAPE (in percent) over every forecast point, failed folds and fitting time.
+        """
+        if target_column not in self.data.columns:
+            logging.error(Fore.RED + "Target column not found for time series backtesting." + Fore.RESET)
+            return
+        series = self.data[target_column].dropna().to_numpy(dtype='float64')
+        folds = list(enumerate(rolling_origin_folds(len(series), horizon, n_folds, window, train_size)))
+        orders = [tuple(order) for order in dict.fromkeys(map(tuple, orders))]
+        workers = workers or os.cpu_count() or 1
+        # Split each order's folds into runs only to keep every worker busy, and never below
+        # MIN_RUN_FOLDS folds a run, so that most fits still warm-start from a neighbour
+        runs = max(1, min(-(-workers // len(orders)), n_folds // self.MIN_RUN_FOLDS))
+        size = -(-n_folds // runs)
+        tasks = [(order, folds[start:start + size], warm_start) for order in orders for start in range(0, n_folds, size)]
+
+        with SharedPool(pd.DataFrame({'series': series}), workers=min(workers, len(tasks))) as pool:
+            fitted = pool.map(_backtest_folds, tasks)
+
+        rows = []
+        for order, results in fitted:
+            for fold, forecast, iterations, seconds in results:
+                train_start, origin, stop = folds[fold][1]
+                rows.append({'order': order, 'fold': fold, 'origin': origin, 'train_rows': origin - train_start,
+                             **forecast_errors(series[origin:stop], forecast), 'iterations': iterations,
+                             'fit_seconds': seconds, 'actual': series[origin:stop], 'forecast': forecast})
+        self.fold_scores = pd.DataFrame(rows)
+        board = pd.DataFrame([self._score(order, group) for order, group in self.fold_scores.groupby('order', sort=False)])
+        board = board.sort_values(['rmse', 'mae'], na_position='last', kind='stable').reset_index(drop=True)
+        board.insert(0, 'rank', range(1, len(board) + 1))
+        self.fold_scores = self.fold_scores.drop(columns=['actual', 'forecast'])
+        logging.info(Fore.GREEN + f"Backtested {len(orders)} ARIMA order(s) on {n_folds} {window} folds of "
+                     f"{horizon} steps; best order {board['order'].iloc[0]}." + Fore.RESET)
+        return board
+
+    @staticmethod
+    def _score(order, group):
+        actual, forecast = np.concatenate(group['actual'].tolist()), np.concatenate(group['forecast'].tolist())
+        return {'order': order, 'folds': len(group), 'failed': int(group['mae'].isna().sum()),
+                **forecast_errors(actual, forecast),
+                'mean_iterations': group['iterations'].mean(), 'fit_seconds': group['fit_seconds'].sum()}
+
 
 class MachineLearning:
-    def __init__(self, data):
+    def __init__(self, data, feature_store=None, registry=None, progress=None):
         self.data = data
+        self.progress = progress or no_progress  # Passed to every model, which reports its stages through it
         self.model = None
+        self.model_info = None  # Target, algorithm, input columns and metrics of the current model
+        self.forecast_fit = None  # ARIMA results of the last forecast
+        self.backtest_folds = None  # Per-fold errors of the last backtest
+        self.importance = None  # Permutation importance of the current model, once explained
+        self.batch_models, self.batch_metrics = {}, None  # Models and metrics table of the last batch training
+        self.feature_store = feature_store or FeatureStore()  # Shared by every model path, so features are built once
+        self.registry = registry or ModelRegistry()
 
     def linear_regression(self, target_column):
-        lr_model = LinearRegressionModel(self.data)
+        lr_model = LinearRegressionModel(self.data, self.feature_store, self.progress)
         lr_model.train(target_column)
         self.model = lr_model.model  # Store the trained model
+        self.importance = None
+        self.model_info = {'target': target_column, 'algorithm': 'linear_regression',
+                           'features': lr_model.input_columns, 'metrics': lr_model.metrics, 'holdout': lr_model.holdout}
 
-    def classification(self, target_column, algorithm='logistic_regression'):
-        clf_model = ClassificationModels(self.data)
-        clf_model.train(target_column, algorithm)
+    def classification(self, target_column, algorithm='logistic_regression', encoding='auto'):
+        clf_model = ClassificationModels(self.data, self.feature_store, self.progress)
+        clf_model.train(target_column, algorithm, encoding)
         self.model = clf_model.model  # Store the trained model
+        self.importance = None
+        self.model_info = {'target': target_column, 'algorithm': algorithm,
+                           'features': clf_model.input_columns, 'metrics': clf_model.metrics, 'holdout': clf_model.holdout,
+                           'fill_values': clf_model.fill_values}
+
+    def trees(self, target_column, algorithm='gradient_boosting', task='regression'):
+        tree_model = TreeModels(self.data, self.feature_store, self.progress)
+        tree_model.train(target_column, algorithm, task)
+        self.model = tree_model.model  # Store the trained model
+        self.importance = None
+        self.model_info = {'target': target_column, 'algorithm': algorithm,
+                           'features': tree_model.input_columns, 'metrics': tree_model.metrics,
+                           'holdout': tree_model.holdout}
+
+    def batch(self, tasks, algorithm='linear_regression', workers=None):
+        """Train one model per target over shared feature matrices. Returns the combined metrics table."""
+        trainer = BatchTraining(self.data, self.feature_store, workers)
+        table = trainer.train(tasks, algorithm)
+        self.batch_models, self.batch_metrics = trainer.models, table
+        return table
+
+    def save_batch(self, prefix):
+        """Register every model of the last batch as '<prefix>_<target>', each with the combined metrics table."""
+        metas = []
+        for target, (model, info) in self.batch_models.items():
+            meta = self.registry.register(f"{prefix}_{target}", model, self.data, target, info['features'], info['metrics'],
+                                          {'algorithm': info['algorithm'], 'batch': prefix},
+                                          {'batch_metrics.csv': self.batch_metrics})
+            metas.append(meta)
+        logging.info(Fore.GREEN + f"Registered {len(metas)} models as '{prefix}_<target>'." + Fore.RESET)
+        return metas
 
     def clustering(self, n_clusters):
-        cluster_model = ClusterAnalysis(self.data)
+        cluster_model = ClusterAnalysis(self.data, self.feature_store, self.progress)
         return cluster_model.kmeans_clustering(n_clusters)
 
     def time_series(self, target_column, order=(1, 1, 1)):
+        ts_model = TimeSeriesAnalysis(self.data, self.progress)
+        forecast = ts_model.forecast(target_column, order)
+        self.forecast_fit = ts_model.results
+        return forecast
+
+    def backtest(self, target_column, orders, horizon=5, n_folds=5, window='expanding', train_size=None, workers=None):
+        """Rolling-origin backtest of candidate ARIMA orders. Returns the leaderboard."""
         ts_model = TimeSeriesAnalysis(self.data)
-        return ts_model.forecast(target_column, order)
+        board = ts_model.backtest(target_column, orders, horizon, n_folds, window, train_size, workers)
+        self.backtest_folds = ts_model.fold_scores
+        return board
 
     def save_model(self, filename):
-        """Save the trained model to a file."""
+        """Register the trained model under a name, or save it to a file.
+
+        A name (e.g. 'sales_forecast' or 'sales.v2') stores a new version in the model
+        registry with its feature schema, training-data fingerprint and metrics, and returns
+        that metadata. A model file (e.g. 'model.joblib' or 'file:exports/sales') is written
+        as is; see ModelRegistry.file_path.
+        """
         if self.model is None:
             logging.error(Fore.RED + "No model trained to save." + Fore.RESET)
             return
         
         try:
-            joblib.dump(self.model, filename)
-            logging.info(Fore.GREEN + f"Model saved to {filename}." + Fore.RESET)
+            path = self.registry.file_path(filename)
+            if path is not None:
+                joblib.dump(self.model, path)
+                logging.info(Fore.GREEN + f"Model saved to {path}." + Fore.RESET)
+                return
+            info = self.model_info or {}
+            tables = {'importance.csv': self.importance} if self.importance is not None else None
+            # A model saved or loaded before carries registry metadata: a feature schema and params
+            features = list(info['features']) if info.get('features') is not None else None
+            algorithm = info.get('algorithm', info.get('params', {}).get('algorithm'))
+            meta = self.registry.register(filename, self.model, self.data, info.get('target'), features,
+                                          info.get('metrics'), {'algorithm': algorithm}, tables)
+            # The holdout and training fill values only live in memory
+            self.model_info = {**meta, 'holdout': info.get('holdout'), 'fill_values': info.get('fill_values')}
+            logging.info(Fore.GREEN + f"Model registered as '{meta['name']}' version {meta['version']}." + Fore.RESET)
+            return meta
         except Exception as e:
             logging.error(Fore.RED + f"Error saving model: {e}" + Fore.RESET)
 
     def load_model(self, filename):
-        """Load a model from a file."""
+        """Load a model from the registry by 'name' or 'name:version', or from a file.
+
+        Registered names are looked up first, so dotted names such as 'sales.v2' reach the
+        registry; see ModelRegistry.file_path. Registered models are checked against the
+        current data: missing input columns and changed dtypes are reported, and so is
+        training on different data.
+        """
         try:
-            self.model = joblib.load(filename)
-            logging.info(Fore.GREEN + f"Model loaded from {filename}." + Fore.RESET)
+            path = self.registry.file_path(filename)
+            if path is not None:
+                self.model = joblib.load(path)
+                self.model_info, self.importance = None, None
+                logging.info(Fore.GREEN + f"Model loaded from {path}." + Fore.RESET)
+                return
+            name, version = ModelRegistry.parse_ref(filename)
+            self.model, meta = self.registry.load(name, version)
+            self.model_info, self.importance = meta, None
+            logging.info(Fore.GREEN + f"Model '{name}' version {meta['version']} loaded from the registry." + Fore.RESET)
+            if self.data is not None:
+                for problem in ModelRegistry.check(meta, self.data):
+                    logging.warning(Fore.YELLOW + f"Model input mismatch: {problem}" + Fore.RESET)
+                if meta.get('data_fingerprint') and meta['data_fingerprint'] != FeatureStore.fingerprint(self.data):
+                    logging.info(Fore.YELLOW + "The model was trained on different data than is loaded now." + Fore.RESET)
         except FileNotFoundError:
             logging.error(Fore.RED + "Model file not found." + Fore.RESET)
+        except KeyError as e:
+            logging.error(Fore.RED + str(e).strip('"') + Fore.RESET)
         except Exception as e:
             logging.error(Fore.RED + f"Error loading model: {e}" + Fore.RESET)
 
+    def _input_predictor(self, target_column):
+        """Map raw input columns to the current model's predictions, featurising them as training did.
+
+        Rows are encoded as serving encodes them (serve.model_features): every category gets
+        a dummy and the columns are aligned to the model's, so a batch missing a category
+        level still lines up. Classifiers' missing values are filled with the means used in
+        training; a model loaded without them falls back to the means of the loaded data.
+        """
+        model = self.model
+        if isinstance(model, Pipeline):
+            return model.predict  # The encoder step featurises raw rows itself
+        fill = None
+        if is_classifier(model):
+            fill = (self.model_info or {}).get('fill_values')
+            if fill is None:
+                fill = self.data.drop(columns=[target_column]).mean(numeric_only=True).to_dict()
+        return lambda X: model.predict(model_features(model, X if fill is None else X.fillna(fill)))
+
+    def explain(self, n_repeats=5, max_rows=5000, n_jobs=None):
+        """Permutation importance of the current model's input columns, on the rows training held out.
+
+        Each column is shuffled ``n_repeats`` times and the drop in R² (regression) or accuracy
+        (classification) is recorded, in parallel across columns. The ranked table is kept
+        with the model: saved next to it in the registry now, or when it is registered.
+        """
+        if self.model is None:
+            logging.error(Fore.RED + "No model loaded." + Fore.RESET)
+            return None
+        target_column = (self.model_info or {}).get('target')
+        if target_column not in self.data.columns:
+            logging.error(Fore.RED + "Explaining needs a model trained or registered with its target column." + Fore.RESET)
+            return None
+
+        data = self.data[self.data[target_column].notna()]
+        holdout = self.model_info.get('holdout')
+        if holdout is None:
+            logging.warning(Fore.YELLOW + "The rows held out in training are not known for this model, so importance "
+                            "is measured on every row with a target, including rows it was trained on." + Fore.RESET)
+        else:
+            data = data[data.index.isin(holdout)]
+            if data.empty:
+                logging.error(Fore.RED + "The rows held out in training are no longer in the data." + Fore.RESET)
+                return None
+        columns = [col for col in (self.model_info.get('features') or data.columns.drop(target_column)) if col in data.columns]
+        metric = accuracy_score if is_classifier(self.model) else r2_score
+        try:
+            table = permutation_importance(self._input_predictor(target_column), data[columns], data[target_column],
+                                           metric, n_repeats, max_rows, n_jobs)
+        except Exception as e:
+            logging.error(Fore.RED + f"Error computing feature importance: {e}" + Fore.RESET)
+            return None
+        self.importance = table
+        logging.info(Fore.GREEN + f"Permutation importance on {table.attrs['rows']} {'' if holdout is None else 'holdout '}rows "
+                     f"(baseline {metric.__name__.replace('_score', '')} {table.attrs['baseline_score']:.4f})." + Fore.RESET)
+
+        if 'version' in self.model_info:
+            path = self.registry.save_table(self.model_info['name'], self.model_info['version'], 'importance.csv', table)
+            logging.info(Fore.GREEN + f"Feature importance saved to {path}." + Fore.RESET)
+        return table
+
     def view_model(self):
         """View details of the loaded model."""
         if self.model is None:
@@ -183,8 +861,29 @@ class MachineLearning:
         
         logging.info(Fore.GREEN + f"Model type: {type(self.model)}" + Fore.RESET)
         logging.info(Fore.GREEN + f"Model parameters: {self.model.get_params()}" + Fore.RESET)
-
-        if hasattr(self.model, 'coef_'):
-            logging.info(Fore.GREEN + f"Coefficients: {self.model.coef_}" + Fore.RESET)
-        elif hasattr(self.model, 'feature_importances_'):
-            logging.info(Fore.GREEN + f"Feature importances: {self.model.feature_importances_}" + Fore.RESET)
+        if self.model_info and 'version' in self.model_info:
+            meta = self.model_info
+            logging.info(Fore.GREEN + f"Registered as '{meta['name']}' version {meta['version']} on {meta['created_at']}, "
+                         f"target '{meta['target']}', {len(meta['features'])} input columns, metrics {meta['metrics']}" + Fore.RESET)
+
+        estimator = self.model
+        if isinstance(self.model, Pipeline):
+            encoder, estimator = self.model[0], self.model[-1]
+            if isinstance(encoder, SparseEncoder):
+                logging.info(Fore.GREEN + f"Sparse encoding: {encoder.method}, {len(encoder.get_feature_names_out())} features" + Fore.RESET)
+            else:
+                logging.info(Fore.GREEN + f"Ordinal encoding of {len(encoder.categorical_columns_)} categorical columns, "
+                             f"{len(encoder.columns_)} features" + Fore.RESET)
+
+        names = self.model[0].get_feature_names_out() if isinstance(self.model, Pipeline) \
+            else getattr(estimator, 'feature_names_in_', None)
+        values = estimator.coef_ if hasattr(estimator, 'coef_') else getattr(estimator, 'feature_importances_', None)
+        if values is not None:
+            label = 'Coefficients' if hasattr(estimator, 'coef_') else 'Impurity importances'
+            values = np.ravel(values)
+            if names is not None and len(names) == len(values):
+                values = pd.Series(values, index=names)
+                values = values.reindex(values.abs().sort_values(ascending=False).index).head(20)  # Largest first
+            logging.info(Fore.GREEN + f"{label}:\n{values}" + Fore.RESET)
+        if self.importance is not None:
+            logging.info(Fore.GREEN + f"Permutation importance:\n{self.importance.to_string(index=False)}" + Fore.RESET)
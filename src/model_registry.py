@@ -0,0 +1,192 @@
+# model_registry.py
+import json
+import logging
+import os
+import re
+from datetime import datetime
+import joblib
+from colorama import Fore
+from feature_store import FeatureStore
+from session import _to_jsonable
+
+
+class ModelRegistry:
+    """Versioned store of trained models with the metadata needed to use them safely.
+
+    Each registration writes ``<root>/<name>/v<version>/model.joblib`` and appends its
+    metadata (version, target, feature schema, training-data fingerprint, metrics and
+    creation time) to a single JSON index, so listing models never unpickles one. Models
+    are dumped uncompressed, which lets ``joblib.load(mmap_mode='r')`` map their large
+    arrays read-only: the pages are shared between processes serving the same model.
+    """
+
+    INDEX = 'registry.json'
+    MMAP_MIN_BYTES = 1 << 20  # Smaller models load faster into memory than through a memory map
+    FILE_PREFIX = 'file:'
+    FILE_EXTENSIONS = ('.joblib', '.pkl', '.pickle')
+
+    def __init__(self, root='models'):
+        self.root = root
+        self._index = None
+        self._index_mtime = None
+
+    @staticmethod
+    def parse_ref(ref):
+        """Split 'name', 'name:3' or 'name@v3' into (name, version or None)."""
+        match = re.fullmatch(r'(.+?)(?:[:@]v?(\d+))?', ref.strip())
+        return match.group(1), int(match.group(2)) if match.group(2) else None
+
+    def file_path(self, ref):
+        """The file a model reference names, or None when it names a registered model.
+
+        'file:<path>' is always a file. Otherwise a registered name is a model of this
+        registry, dots and all (e.g. 'sales.v2' or 'sales.v2:1'), and so is any other name,
+        unless it has a directory, a model-file extension (.joblib, .pkl, .pickle) or is
+        an existing file.
+        """
+        ref = ref.strip()
+        if ref.startswith(self.FILE_PREFIX):
+            return ref[len(self.FILE_PREFIX):]
+        if self.get(self.parse_ref(ref)[0]) is not None:
+            return None
+        if os.path.dirname(ref) or ref.lower().endswith(self.FILE_EXTENSIONS) or os.path.isfile(ref):
+            return ref
+        return None
+
+    @staticmethod
+    def schema(data, target=None):
+        """Input columns and dtypes a model trained on ``data`` expects."""
+        return {str(col): str(dtype) for col, dtype in data.dtypes.items() if col != target}
+
+    @staticmethod
+    def check(meta, data):
+        """Problems scoring ``data`` with a registered model: missing columns or changed dtypes."""
+        problems = []
+        for col, dtype in meta.get('features', {}).items():
+            if col not in data.columns:
+                problems.append(f"missing column '{col}'")
+            elif str(data[col].dtype) != dtype:
+                problems.append(f"column '{col}' is {data[col].dtype}, trained on {dtype}")
+        return problems
+
+    def _index_path(self):
+        return os.path.join(self.root, self.INDEX)
+
+    def _read_index(self):
+        path = self._index_path()
+        if not os.path.exists(path):
+            return {}
+        mtime = os.path.getmtime(path)
+        if self._index is None or mtime != self._index_mtime:
+            try:
+                with open(path) as handle:
+                    self._index = json.load(handle)
+                self._index_mtime = mtime
+            except (OSError, ValueError) as e:
+                logging.warning(Fore.YELLOW + f"Ignoring unreadable model registry: {e}" + Fore.RESET)
+                return {}
+        return self._index
+
+    def _write_index(self, index):
+        tmp = self._index_path() + '.tmp'
+        with open(tmp, 'w') as handle:
+            json.dump(index, handle, indent=2)
+        os.replace(tmp, self._index_path())  # Readers never see a half-written index
+        self._index, self._index_mtime = index, os.path.getmtime(self._index_path())
+
+    def register(self, name, model, data=None, target=None, features=None, metrics=None, params=None, tables=None):
+        """Store a new version of ``name`` and return its metadata.
+
+        Args:
+            name (str): Registry name; letters, digits, '_', '-' and '.'.
+            model: The fitted estimator (or Pipeline).
+            data (DataFrame): Training data, for the feature schema and fingerprint.
+            target (str): Target column, left out of the feature schema.
+            features (list): Input columns the model uses. Defaults to every other column.
+            metrics (dict): Evaluation scores, e.g. {'r2': 0.91}.
+            params (dict): Anything else worth keeping, e.g. the algorithm.
+            tables (dict): DataFrames saved as CSV next to the model, by file name.
+        """
+        if not re.fullmatch(r'[\w.-]+', name or ''):
+            raise ValueError(f"Invalid model name '{name}'. Use letters, digits, '_', '-' or '.'.")
+        os.makedirs(self.root, exist_ok=True)
+        index = dict(self._read_index())
+        versions = index.get(name, [])
+        version = max((meta['version'] for meta in versions), default=0) + 1
+        filename = os.path.join(name, f'v{version}', 'model.joblib')
+        path = os.path.join(self.root, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump(model, path)  # Uncompressed, so numpy arrays can be memory-mapped on load
+
+        meta = _to_jsonable({
+            'name': name,
+            'version': version,
+            'type': type(model).__name__,
+            'target': target,
+            'features': self.schema(data[features] if features else data, target) if data is not None else {},
+            'data_fingerprint': FeatureStore.fingerprint(data) if data is not None else None,
+            'rows': len(data) if data is not None else None,
+            'metrics': metrics or {},
+            'params': params or {},
+            'file': filename,
+            'size_bytes': os.path.getsize(path),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'tables': {},
+        })
+        index[name] = versions + [meta]
+        self._write_index(index)
+        for filename, table in (tables or {}).items():
+            self.save_table(name, version, filename, table)
+        return self.get(name, version)
+
+    def save_table(self, name, version, filename, table):
+        """Save a DataFrame (e.g. feature importances) as CSV next to a registered model. Returns its path."""
+        index = dict(self._read_index())
+        meta = next((meta for meta in index.get(name, []) if meta['version'] == version), None)
+        if meta is None:
+            raise KeyError(f"Model '{name}' version {version} is not registered.")
+        relative = os.path.join(os.path.dirname(meta['file']), filename)
+        table.to_csv(os.path.join(self.root, relative), index=False)
+        meta.setdefault('tables', {})[os.path.splitext(filename)[0]] = relative
+        self._write_index(index)
+        return os.path.join(self.root, relative)
+
+    def list(self, name=None):
+        """Metadata of every registered version (or of one model's versions), newest first."""
+        index = self._read_index()
+        names = [name] if name is not None else index
+        metas = [meta for key in names for meta in index.get(key, [])]
+        # The index is in registration order, so ties within the same second keep the newest first
+        return sorted(reversed(metas), key=lambda meta: meta['created_at'], reverse=True)
+
+    def get(self, name, version=None):
+        """Metadata of one version (the latest by default), or None."""
+        versions = self._read_index().get(name, [])
+        if version is None:
+            return max(versions, key=lambda meta: meta['version'], default=None)
+        return next((meta for meta in versions if meta['version'] == version), None)
+
+    def load(self, name, version=None, mmap=None):
+        """Load a registered model. Returns (model, metadata).
+
+        Args:
+            mmap (bool): Memory-map the model's arrays read-only. By default only models
+                of at least MMAP_MIN_BYTES are mapped.
+        """
+        meta = self.get(name, version)
+        if meta is None:
+            raise KeyError(f"Model '{name}'" + (f" version {version}" if version else '') + " is not registered.")
+        path = os.path.join(self.root, meta['file'])
+        if mmap is None:
+            mmap = meta.get('size_bytes', 0) >= self.MMAP_MIN_BYTES
+        return joblib.load(path, mmap_mode='r' if mmap else None), meta
+
+    def table(self):
+        """Registered models with their version, type, metrics and creation time."""
+        lines = [f"{'Model':<32} {'Ver':>3}  {'Type':<24} {'Created':<19}  Metrics"]
+        for meta in self.list():
+            metrics = ', '.join(f"{key}={value:.4g}" if isinstance(value, float) else f"{key}={value}"
+                                for key, value in meta['metrics'].items())
+            lines.append(f"{meta['name'][:32]:<32} {meta['version']:>3}  {meta['type'][:24]:<24} "
+                         f"{meta['created_at']:<19}  {metrics}")
+        return '\n'.join(lines)
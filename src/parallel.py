@@ -0,0 +1,185 @@
+# parallel.py
+import functools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+ALIGNMENT = 64  # Each column starts on a cache line
+
+_shared = None  # The SharedFrame a worker attached to, set by the pool's initializer
+
+
+def shared_columns(data):
+    """Columns of ``data`` that can be shared: numbers and booleans."""
+    return data.select_dtypes(include=['number', 'bool']).columns.tolist()
+
+
+def _plain_dtype(values):
+    """The NumPy dtype a column is stored as. Nullable columns become float64 with NaN for missing values."""
+    dtype = values.dtype
+    if isinstance(dtype, np.dtype):
+        return dtype
+    if pd.api.types.is_bool_dtype(dtype) and not values.hasnans:
+        return np.dtype(bool)
+    if pd.api.types.is_integer_dtype(dtype) and not values.hasnans:
+        return np.dtype('int64')
+    return np.dtype('float64')
+
+
+class SharedFrame:
+    """Numeric columns of a DataFrame, copied once into a shared memory block.
+
+    Each column is stored contiguously, so any process that attaches to the block reads
+    a column or a range of rows as a NumPy view, without copying or unpickling anything.
+    Only the creating process owns the block and frees it, in :meth:`close`.
+    """
+
+    def __init__(self, spec, block, owner):
+        self.spec = spec
+        self.block = block
+        self.owner = owner
+        self.rows = spec['rows']
+        self.columns = [name for name, _, _ in spec['columns']]
+        self._layout = {name: (np.dtype(dtype), offset) for name, dtype, offset in spec['columns']}
+
+    @classmethod
+    def create(cls, data, columns=None):
+        """Copy ``columns`` of ``data`` (default: every numeric column) into a new block."""
+        columns = shared_columns(data) if columns is None else list(columns)
+        layout, size = [], 0
+        for col in columns:
+            dtype = _plain_dtype(data[col])
+            layout.append((col, dtype.str, size))
+            size += -(-len(data) * dtype.itemsize // ALIGNMENT) * ALIGNMENT
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        shared = cls({'name': block.name, 'rows': len(data), 'columns': layout}, block, owner=True)
+        for col in columns:
+            dtype = shared._layout[col][0]
+            if dtype.kind == 'f':
+                shared.column(col)[:] = data[col].to_numpy(dtype=dtype, na_value=np.nan)
+            else:
+                shared.column(col)[:] = data[col].to_numpy(dtype=dtype)
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        """Open a block created elsewhere, from its ``spec``."""
+        return cls(spec, shared_memory.SharedMemory(name=spec['name']), owner=False)
+
+    def column(self, name, start=0, stop=None):
+        """A view of one column's rows [start, stop)."""
+        dtype, offset = self._layout[name]
+        values = np.ndarray((self.rows,), dtype=dtype, buffer=self.block.buf, offset=offset)
+        return values[start:stop]
+
+    def matrix(self, columns=None, start=0, stop=None):
+        """Rows [start, stop) of some columns as a 2-D array.
+
+        Columns of one dtype that sit next to each other in the block, such as a feature
+        matrix shared as a whole, come back as a strided view without a copy. Other
+        selections are stacked into a new array.
+        """
+        columns = self.columns if columns is None else list(columns)
+        layout = [self._layout[col] for col in columns]
+        dtype, first = layout[0]
+        stride = layout[1][1] - first if len(layout) > 1 else dtype.itemsize * self.rows
+        if stride > 0 and all(d == dtype and offset == first + i * stride for i, (d, offset) in enumerate(layout)):
+            values = np.ndarray((self.rows, len(columns)), dtype=dtype, buffer=self.block.buf, offset=first,
+                                strides=(dtype.itemsize, stride))
+            return values[start:stop]
+        return np.column_stack([self.column(col, start, stop) for col in columns])
+
+    def frame(self, columns=None, start=0, stop=None):
+        """Rows [start, stop) of some columns as a DataFrame, indexed by row position. Copies the slice."""
+        columns = self.columns if columns is None else columns
+        stop = self.rows if stop is None else min(stop, self.rows)
+        return pd.DataFrame({col: self.column(col, start, stop) for col in columns}, index=pd.RangeIndex(start, stop))
+
+    def close(self):
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _attach(spec):
+    global _shared
+    _shared = SharedFrame.attach(spec)
+
+
+def _call(fn, task):
+    return fn(_shared, task)
+
+
+class SharedPool:
+    """Map functions over a DataFrame's numeric columns in worker processes, without pickling the data.
+
+    The columns are copied into shared memory once. Workers attach to it when they start
+    and then receive only small task descriptors, such as a column name or a row range,
+    which ``fn(shared, task)`` resolves to NumPy views with :meth:`SharedFrame.column` or
+    :meth:`SharedFrame.frame`. ``fn`` has to be a module-level function, since it is
+    sent to the workers by reference. With one worker, or where processes can't be
+    forked, tasks run in this process against the same block.
+
+    Use it as a context manager, so the workers and the block are released::
+
+        with SharedPool(data, workers=4) as pool:
+            partials = pool.map(summarise_rows, pool.row_ranges(100_000))
+    """
+
+    def __init__(self, data, columns=None, workers=None):
+        self.shared = SharedFrame.create(data, columns)
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+        if self.workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('fork'),
+                                                 initializer=_attach, initargs=(self.shared.spec,))
+
+    @property
+    def columns(self):
+        return self.shared.columns
+
+    @property
+    def rows(self):
+        return self.shared.rows
+
+    def row_ranges(self, size=None):
+        """(start, stop) ranges covering every row, ``size`` rows each (default: one per worker)."""
+        size = size or -(-self.rows // self.workers)
+        return [(start, min(start + size, self.rows)) for start in range(0, self.rows, max(size, 1))]
+
+    def map(self, fn, tasks):
+        """``[fn(shared, task) for task in tasks]``, computed in the workers. Results keep the order of the tasks."""
+        if self._executor is None:
+            return [fn(self.shared, task) for task in tasks]
+        return list(self._executor.map(functools.partial(_call, fn), tasks))
+
+    def map_reduce(self, fn, tasks, reduce, initial=None):
+        """Fold the results of ``fn`` over the tasks with ``reduce(accumulated, result)``, in task order."""
+        if self._executor is None:
+            results = (fn(self.shared, task) for task in tasks)
+        else:
+            results = self._executor.map(functools.partial(_call, fn), tasks)
+        if initial is None:
+            return functools.reduce(reduce, results)
+        return functools.reduce(reduce, results, initial)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
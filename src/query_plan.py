@@ -0,0 +1,476 @@
+# query_plan.py
+import logging
+import operator
+import re
+import time
+import numpy as np
+import pandas as pd
+from colorama import Fore
+from data_cleaner import DataCleaner
+from data_preprocessor import DataPreprocessor
+from date_inference import parse_dates
+from scaling import Scaler
+
+OPERATORS = {
+    '==': operator.eq, '!=': operator.ne,
+    '<=': operator.le, '>=': operator.ge,
+    '<': operator.lt, '>': operator.gt,
+}
+
+
+class PlanNode:
+    """One step of a logical plan."""
+
+    fusable = False  # Whether the step can run inside a FusedClean pass
+    rows = None  # Index labels a barrier step kept on its first run over every column
+
+    @property
+    def barrier(self):
+        """Whether the rows this step keeps depend on every column, so they are cached after one full run."""
+        return False
+
+    def keep_cached(self, data):
+        """Apply a barrier step by taking the rows it kept on its first run."""
+        return data[data.index.isin(self.rows)]
+
+    def required_columns(self, needed, schema):
+        """Input columns this step needs so that `needed` is available after it (None means all)."""
+        return needed
+
+    def commutes_with_filter(self, column):
+        """Whether a filter on `column` may run before this step without changing the result."""
+        return False
+
+    def execute(self, data):
+        raise NotImplementedError
+
+    def describe(self):
+        return type(self).__name__
+
+
+class Filter(PlanNode):
+    def __init__(self, column, op, value):
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported operator '{op}'. Use one of {list(OPERATORS)}.")
+        self.column, self.op, self.value = column, op, value
+
+    @classmethod
+    def parse(cls, expression):
+        """Build a filter from text such as "Store == 1" or "category != 'Sports'"."""
+        match = re.match(r"^\s*(.+?)\s*(==|!=|<=|>=|<|>)\s*(.+?)\s*$", expression)
+        if not match:
+            raise ValueError(f"Could not parse filter '{expression}'. Expected '<column> <op> <value>'.")
+        column, op, raw = match.groups()
+        if raw[0] == raw[-1] and raw[0] in '"\'':
+            value = raw[1:-1]
+        else:
+            try:
+                value = pd.to_numeric(raw).item()
+            except ValueError:
+                value = raw
+        return cls(column, op, value)
+
+    def required_columns(self, needed, schema):
+        return None if needed is None else needed | {self.column}
+
+    def commutes_with_filter(self, column):
+        return True
+
+    def mask(self, data):
+        return OPERATORS[self.op](data[self.column], self.value)
+
+    def execute(self, data):
+        return data[self.mask(data)]
+
+    def describe(self):
+        return f"Filter {self.column} {self.op} {self.value!r}"
+
+
+class Dedup(PlanNode):
+    fusable = True
+
+    def __init__(self, subset=None):
+        self.subset = subset
+
+    @property
+    def barrier(self):
+        return self.subset is None  # Whole-row duplicates depend on every column
+
+    def required_columns(self, needed, schema):
+        if self.barrier:
+            return None if self.rows is None else needed
+        return None if needed is None else needed | set(self.subset)
+
+    def commutes_with_filter(self, column):
+        # Filtering whole rows and dropping whole-row duplicates commute; with a subset,
+        # filtering first could change which duplicate is kept.
+        return self.subset is None
+
+    def execute(self, data):
+        if self.barrier and self.rows is not None:
+            return self.keep_cached(data)
+        data = data.drop_duplicates(subset=self.subset)
+        if self.barrier:
+            self.rows = data.index
+        return data
+
+    def describe(self):
+        return f"Dedup ({'all columns' if self.subset is None else ', '.join(self.subset)})"
+
+
+class HandleMissing(PlanNode):
+    """Missing-value strategy of DataCleaner: 'remove', 'fill' or 'skip'."""
+
+    fusable = True
+
+    def __init__(self, strategy, fill_method=None):
+        self.strategy, self.fill_method = strategy, fill_method
+
+    @property
+    def barrier(self):
+        return self.strategy == 'remove'  # A missing value in any column drops the row
+
+    def required_columns(self, needed, schema):
+        return None if self.barrier and self.rows is None else needed
+
+    def commutes_with_filter(self, column):
+        # Fill statistics and forward/backward fills depend on which rows are present.
+        return self.strategy != 'fill' or not self.fill_method
+
+    def execute(self, data):
+        if self.strategy == 'remove' and self.rows is not None:
+            return self.keep_cached(data)
+        if self.strategy == 'remove':
+            data = data.dropna()
+            self.rows = data.index
+            return data
+        if self.strategy == 'fill' and self.fill_method:
+            for col in data.columns:
+                if data[col].isnull().any():
+                    data[col] = DataCleaner.fill_series(data[col], self.fill_method)
+        return data
+
+    def describe(self):
+        return f"HandleMissing ({self.strategy}{', ' + self.fill_method if self.fill_method else ''})"
+
+
+class ConvertDates(PlanNode):
+    fusable = True
+
+    def __init__(self, formats):
+        self.formats = dict(formats)  # Column -> inferred format (None lets pandas guess)
+        self.columns = list(self.formats)
+
+    def commutes_with_filter(self, column):
+        return column not in self.columns
+
+    def execute(self, data):
+        for col, fmt in self.formats.items():
+            if col in data.columns:
+                data[col] = parse_dates(data[col], fmt)
+        return data
+
+    def describe(self):
+        return f"ConvertDates [{', '.join(f'{col} {fmt}' if fmt else col for col, fmt in self.formats.items())}]"
+
+
+class FillColumns(PlanNode):
+    """Per-column fill choices of DataPreprocessor ('1'-'5'), with the values for choice '4'.
+
+    Choices are settled when the step is recorded, so running the plan never prompts.
+    """
+
+    fusable = True
+
+    def __init__(self, fill_methods, values=None):
+        self.fill_methods = dict(fill_methods)
+        self.values = dict(values or {})  # Column -> specific value for choice '4'
+
+    def commutes_with_filter(self, column):
+        # Only constant fills ('4') and skips ('5') are independent of the rows present.
+        return all(action in ('4', '5') for action in self.fill_methods.values()) and self.fill_methods.get(column) != '4'
+
+    def fill_value(self, series):
+        col = series.name
+        return DataPreprocessor.fill_value(series, self.fill_methods.get(col, '5'), self.values.get(col))
+
+    def execute(self, data):
+        for col in data.columns:
+            if data[col].isnull().any():
+                fill_value = self.fill_value(data[col])
+                if fill_value is not None:
+                    data[col] = data[col].fillna(fill_value)
+        return data
+
+    def describe(self):
+        return f"FillColumns ({self.fill_methods})"
+
+
+class RemoveOutliers(PlanNode):
+    fusable = True
+
+    def required_columns(self, needed, schema):
+        if needed is None:
+            return None
+        return needed | set(DataPreprocessor.numeric_columns(schema))
+
+    def execute(self, data):
+        mask = np.ones(len(data), dtype=bool)
+        for col in DataPreprocessor.numeric_columns(data):
+            values = data[col][mask]
+            if values.isnull().sum() == 0:
+                lower_bound, upper_bound = DataPreprocessor.iqr_bounds(values)
+                mask &= ((data[col] >= lower_bound) & (data[col] <= upper_bound)).to_numpy()
+        return data[mask]
+
+    def describe(self):
+        return "RemoveOutliers (IQR)"
+
+
+class Scale(PlanNode):
+    def __init__(self, method='standard', dtype='float64'):
+        self.method = method
+        self.dtype = dtype
+
+    def execute(self, data):
+        numerical_cols = DataPreprocessor.numeric_columns(data)
+        if len(numerical_cols):
+            data = Scaler(self.method, self.dtype).fit_transform(data, numerical_cols)
+        return data
+
+    def describe(self):
+        return f"Scale ({self.method}, {self.dtype})"
+
+
+class FusedClean(PlanNode):
+    """Dedup, missing-value handling, fills and outlier removal in one pass.
+
+    Row-removing steps only narrow a boolean mask, and fill statistics and outlier
+    bounds are computed over the rows still in the mask, so the result matches
+    running the steps one after another while the frame is copied only once.
+    """
+
+    def __init__(self, steps):
+        self.steps = steps
+
+    def required_columns(self, needed, schema):
+        for step in reversed(self.steps):
+            needed = step.required_columns(needed, schema)
+        return needed
+
+    def commutes_with_filter(self, column):
+        return all(step.commutes_with_filter(column) for step in self.steps)
+
+    def execute(self, data):
+        mask = np.ones(len(data), dtype=bool)
+        for step in self.steps:
+            if step.barrier and step.rows is not None:
+                mask &= data.index.isin(step.rows)
+            elif isinstance(step, Dedup):
+                duplicated = (data if mask.all() else data[mask]).duplicated(subset=step.subset).to_numpy()
+                mask[np.flatnonzero(mask)[duplicated]] = False
+            elif isinstance(step, HandleMissing) and step.strategy == 'remove':
+                mask &= data.notna().all(axis=1).to_numpy()
+            elif isinstance(step, HandleMissing):
+                if step.strategy == 'fill' and step.fill_method:
+                    for col in data.columns:
+                        kept = data.loc[mask, col]
+                        if kept.isnull().any():
+                            data.loc[mask, col] = DataCleaner.fill_series(kept, step.fill_method)
+            elif isinstance(step, FillColumns):
+                for col in data.columns:
+                    kept = data.loc[mask, col]
+                    if kept.isnull().any():
+                        fill_value = step.fill_value(kept)
+                        if fill_value is not None:
+                            data[col] = data[col].fillna(fill_value)
+            elif isinstance(step, RemoveOutliers):
+                for col in DataPreprocessor.numeric_columns(data):
+                    values = data[col][mask]
+                    if values.isnull().sum() == 0:
+                        lower_bound, upper_bound = DataPreprocessor.iqr_bounds(values)
+                        mask &= ((data[col] >= lower_bound) & (data[col] <= upper_bound)).to_numpy()
+            else:
+                data = step.execute(data)  # Column-local steps such as date conversion
+            if step.barrier and step.rows is None:
+                step.rows = data.index[mask]
+        return data if mask.all() else data[mask]
+
+    def describe(self):
+        return "FusedClean [" + " -> ".join(step.describe() for step in self.steps) + "]"
+
+
+class Scan:
+    """Read the source through a DataLoader, with pushed-down columns and predicates."""
+
+    def __init__(self, loader, chunksize=200_000):
+        self.loader = loader
+        self.chunksize = chunksize
+        self.usecols = None
+        self.predicates = []
+
+    def execute(self):
+        self.loader.usecols = self.usecols
+        if not self.predicates:
+            return self.loader.load()
+        # Filter each chunk while reading so rejected rows are never held in memory
+        chunks, start = [], 0
+        for chunk in self.loader.iter_chunks(self.chunksize):
+            chunk.index = pd.RangeIndex(start, start + len(chunk))  # Row numbers across shards, as load() gives
+            start += len(chunk)
+            for predicate in self.predicates:
+                chunk = chunk[predicate.mask(chunk)]
+            chunks.append(chunk)
+        return pd.concat(chunks) if chunks else None
+
+    def describe(self):
+        text = f"Scan {self.loader.file_path}"
+        text += f" usecols={self.usecols}" if self.usecols is not None else " usecols=*"
+        if self.predicates:
+            text += " where " + " and ".join(p.describe()[len('Filter '):] for p in self.predicates)
+        return text
+
+
+class LogicalPlan:
+    """Deferred DataVista pipeline.
+
+    Steps are only recorded until collect() is called by an analysis, model or chart.
+    Before running, the plan is optimised: filters move as early as they can without
+    changing the result (into the CSV scan when possible), runs of cleaning steps are
+    fused into a single pass, and the columns the consumer needs are pushed down to
+    read_csv(usecols=...) unless a step needs every column. Whole-row dedup and dropping
+    rows with any missing value are barriers: their first run reads every column and
+    caches the row labels they keep, and later runs read only the needed columns and
+    take those rows.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.schema = loader.read_schema()
+        self.nodes = []
+        self._cache = None  # (columns or None for all, frame)
+
+    def _add(self, node):
+        self.nodes.append(node)
+        self._cache = None
+        return self
+
+    def filter(self, expression):
+        return self._add(Filter.parse(expression) if isinstance(expression, str) else expression)
+
+    def dedup(self, subset=None):
+        return self._add(Dedup(subset))
+
+    def handle_missing(self, strategy, fill_method=None):
+        return self._add(HandleMissing(strategy, fill_method))
+
+    def convert_dates(self):
+        return self._add(ConvertDates(DataPreprocessor.infer_date_formats(self.schema)))
+
+    def fill_columns(self, fill_methods, values=None):
+        return self._add(FillColumns(fill_methods, values))
+
+    def columns_with_missing(self):
+        """Columns that may hold missing values when the fills run, found in one streaming pass.
+
+        These are the source columns with gaps plus the text columns converted to dates so
+        far, whose unparseable values become NaT. Steps before the fills can only remove gaps.
+        """
+        self.loader.usecols = None
+        missing = pd.Series(False, index=self.schema.columns)
+        for chunk in self.loader.iter_chunks(Scan(self.loader).chunksize):
+            missing |= chunk.isna().any().reindex(missing.index, fill_value=False)
+        converted = {col for node in self.nodes if isinstance(node, ConvertDates) for col in node.columns}
+        return [col for col in missing.index if missing[col] or col in converted]
+
+    def remove_outliers(self):
+        return self._add(RemoveOutliers())
+
+    def scale(self, method='standard', dtype='float64'):
+        return self._add(Scale(method, dtype))
+
+    def optimize(self, columns=None):
+        """Return (scan, nodes, notes) for producing `columns` (None for every column)."""
+        scan = Scan(self.loader)
+        notes = []
+
+        # Predicate pushdown: move each filter before the steps it commutes with
+        nodes = []
+        for node in self.nodes:
+            if not isinstance(node, Filter):
+                nodes.append(node)
+                continue
+            position = len(nodes)
+            while position > 0 and nodes[position - 1].commutes_with_filter(node.column):
+                position -= 1
+            if position == 0:
+                scan.predicates.append(node)
+                notes.append(f"{node.describe()} pushed into the scan.")
+            else:
+                nodes.insert(position, node)
+                notes.append(f"{node.describe()} kept after {nodes[position - 1].describe()}.")
+
+        # Fusion: run consecutive cleaning steps as a single pass
+        fused = []
+        for node in nodes:
+            if node.fusable and fused and isinstance(fused[-1], FusedClean):
+                fused[-1].steps.append(node)
+            elif node.fusable:
+                fused.append(FusedClean([node]))
+            else:
+                fused.append(node)
+        nodes = [node.steps[0] if isinstance(node, FusedClean) and len(node.steps) == 1 else node for node in fused]
+
+        # Projection pushdown: walk back from the consumer to find the columns to read
+        needed = set(columns) if columns is not None else None
+        for node in reversed(nodes):
+            required = node.required_columns(needed, self.schema)
+            barriers = [step for step in getattr(node, 'steps', [node]) if step.barrier]
+            if needed is not None and required is None and any(step.rows is None for step in barriers):
+                notes.append(f"Projection stopped at {node.describe()}; every column is read once and the rows it keeps are cached.")
+            elif needed is not None and required is None:
+                notes.append(f"Projection stopped at {node.describe()}; every column is read.")
+            elif needed is not None and barriers:
+                notes.append(f"{' and '.join(step.describe() for step in barriers)} reuse the "
+                             f"{len(barriers[-1].rows):,} rows kept on the first run; projection continues past them.")
+            needed = required
+        for predicate in scan.predicates:
+            needed = predicate.required_columns(needed, self.schema)
+        if needed is not None:
+            scan.usecols = [col for col in self.schema.columns if col in needed]
+        return scan, nodes, notes
+
+    def explain(self, columns=None):
+        """Describe the recorded plan and the optimised plan that would run."""
+        scan, nodes, notes = self.optimize(columns)
+        lines = ["Logical plan:", f"  Scan {self.loader.file_path}"]
+        lines += [f"  {node.describe()}" for node in self.nodes]
+        lines += ["", "Optimized plan:", f"  {scan.describe()}"]
+        lines += [f"  {node.describe()}" for node in nodes]
+        if columns is not None:
+            lines.append(f"  Project {list(columns)}")
+        if notes:
+            lines += ["", "Notes:"] + [f"  - {note}" for note in notes]
+        return "\n".join(lines)
+
+    def collect(self, columns=None):
+        """Run the optimised plan and return the result, reusing the last result when possible."""
+        if self._cache is not None:
+            cached_columns, frame = self._cache
+            if cached_columns is None and columns is None:
+                return frame
+            if columns is not None and (cached_columns is None or set(columns) <= cached_columns):
+                return frame[list(columns)]
+
+        start = time.perf_counter()
+        scan, nodes, _ = self.optimize(columns)
+        data = scan.execute()
+        if data is None:
+            return None
+        for node in nodes:
+            data = node.execute(data)
+        if columns is not None:
+            data = data[list(columns)]
+        self._cache = (set(columns) if columns is not None else None, data)
+        logging.info(Fore.GREEN + f"Materialized {len(data)} rows x {data.shape[1]} columns in {time.perf_counter() - start:.2f}s." + Fore.RESET)
+        return data
@@ -0,0 +1,190 @@
+# sampling.py
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+class ReservoirSampler:
+    """Uniform random sample of a fixed number of rows from a stream of DataFrame chunks.
+
+    Implements reservoir sampling (Algorithm R), vectorised per chunk. The stream is
+    read once and only the rows that enter the reservoir are kept, so memory stays
+    proportional to the sample size rather than the file.
+    """
+
+    def __init__(self, size, seed=42):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.seen = 0
+        self._kept = []  # Chunks of rows that entered the reservoir, in stream order
+        self._kept_rows = 0
+        self._slots = np.zeros(size, dtype='int64')  # Position, among the kept rows, held by each reservoir slot
+
+    def update(self, chunk):
+        rows = len(chunk)
+        if rows == 0:
+            return
+        position = self.seen + np.arange(1, rows + 1)  # 1-based position of each row in the stream
+        candidate = (self.rng.random(rows) * position).astype('int64')
+        slot = np.where(position <= self.size, position - 1, candidate)
+        accepted = np.flatnonzero(slot < self.size)
+        if len(accepted):
+            slots = slot[accepted]
+            kept_at = self._kept_rows + np.arange(len(accepted))
+            # When a chunk replaces the same slot twice, the later row wins, as in the sequential algorithm
+            last = len(slots) - 1 - np.unique(slots[::-1], return_index=True)[1]
+            self._slots[slots[last]] = kept_at[last]
+            self._kept.append(chunk.iloc[accepted])
+            self._kept_rows += len(accepted)
+        self.seen += rows
+        if self._kept_rows > 4 * self.size:
+            self._compact()
+
+    def _compact(self):
+        """Drop kept rows that were replaced since."""
+        sample = self.result()
+        self._kept = [sample]
+        self._kept_rows = len(sample)
+        self._slots[:len(sample)] = np.arange(len(sample))
+
+    def result(self):
+        """The sample, in stream order, or None if nothing was seen."""
+        if not self._kept:
+            return None
+        rows = min(self.size, self.seen)
+        return pd.concat(self._kept).iloc[np.sort(self._slots[:rows])].reset_index(drop=True)
+
+
+class StratifiedSampler:
+    """Proportionally allocated sample of at most ``size`` rows, stratified by one column, in a single pass.
+
+    Every row draws a random priority on one scale shared by all strata. While streaming,
+    only the rows among the 2 x ``size`` lowest priorities overall are kept, plus the
+    lowest of each stratum, so memory stays near ``size`` plus one row per stratum however
+    many strata there are. Once the stratum sizes are known, each stratum gets its
+    proportional share of ``size``, and at least one row while there are no more strata
+    than rows. The share is filled with the stratum's lowest-priority rows, which is a
+    simple random sample within it. The rare stratum that kept fewer rows than its share
+    passes the rest to the lowest-priority rows of the others.
+    """
+
+    SLACK = 2  # Rows kept per sample row, so strata rarely fall short of their share
+
+    def __init__(self, size, column, seed=42):
+        self.size = size
+        self.column = column
+        self.rng = np.random.default_rng(seed)
+        self.seen = 0
+        self.counts = {}  # Stratum -> rows seen
+        self.strata = None  # Stratum of each row of the last result()
+        self._threshold = 1.0  # Priorities above it can no longer be sampled, except a stratum's lowest
+        self._rows, self._priority, self._keys, self._positions = [], [], [], []
+        self._kept_rows = 0
+
+    def update(self, chunk):
+        rows = len(chunk)
+        if rows == 0:
+            return
+        keys = chunk[self.column].astype(str).to_numpy()  # Missing values form their own stratum
+        for key, count in pd.Series(keys).value_counts(sort=False).items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        priority = self.rng.random(rows)
+        keep = priority <= self._threshold
+        keep[self._lowest(priority, keys)] = True  # No stratum can lose all its rows
+        kept = np.flatnonzero(keep)
+        self._rows.append(chunk.iloc[kept])
+        self._priority.append(priority[kept])
+        self._keys.append(keys[kept])
+        self._positions.append(self.seen + kept)
+        self._kept_rows += len(kept)
+        self.seen += rows
+        if self._kept_rows > 2 * (self.SLACK * self.size + len(self.counts)):
+            self._compact()
+
+    @staticmethod
+    def _lowest(priority, keys):
+        """Position of the lowest priority in each stratum."""
+        return pd.Series(priority).groupby(keys, sort=False).idxmin().to_numpy()
+
+    def _compact(self):
+        """Drop the rows that can no longer be sampled."""
+        rows = pd.concat(self._rows) if len(self._rows) > 1 else self._rows[0]
+        priority, keys, positions = (np.concatenate(parts) for parts in (self._priority, self._keys, self._positions))
+        capacity = self.SLACK * self.size
+        if len(priority) > capacity:
+            self._threshold = np.partition(priority, capacity - 1)[capacity - 1]
+        keep = priority <= self._threshold
+        keep[self._lowest(priority, keys)] = True
+        kept = np.flatnonzero(keep)
+        self._rows, self._priority, self._keys, self._positions = [rows.iloc[kept]], [priority[kept]], [keys[kept]], [positions[kept]]
+        self._kept_rows = len(kept)
+
+    def allocation(self):
+        """Rows of the sample per stratum: proportional shares of ``size`` by largest remainder."""
+        strata = list(self.counts)
+        sizes = np.array([self.counts[key] for key in strata], dtype='float64')
+        total = min(self.size, self.seen)
+        exact = total * sizes / sizes.sum()
+        quota = np.floor(exact).astype('int64')
+        quota[np.argsort(quota - exact, kind='stable')[:total - quota.sum()]] += 1
+        for stratum in np.flatnonzero(quota == 0):  # One row each, taken from the largest shares
+            donor = np.argmax(quota)
+            if quota[donor] <= 1:
+                break
+            quota[donor] -= 1
+            quota[stratum] += 1
+        return dict(zip(strata, quota))
+
+    def result(self):
+        """The sample, in stream order, or None if nothing was seen."""
+        if self.seen == 0:
+            return None
+        self._compact()
+        rows, priority, keys, positions = self._rows[0], self._priority[0], self._keys[0], self._positions[0]
+        rank = pd.Series(priority).groupby(keys, sort=False).rank(method='first').to_numpy()
+        chosen = rank <= pd.Series(keys).map(self.allocation()).to_numpy()
+        shortfall = min(self.size, self.seen) - chosen.sum()
+        if shortfall > 0:
+            spare = np.flatnonzero(~chosen)
+            chosen[spare[np.argsort(priority[spare])[:shortfall]]] = True
+        order = np.flatnonzero(chosen)[np.argsort(positions[chosen])]
+        self.strata = pd.Series(keys[order])
+        return rows.iloc[order].reset_index(drop=True)
+
+
+def mean_margins(data, population, confidence=0.95, strata=None):
+    """Means of the numeric columns with their margins of error, as estimated from a random sample.
+
+    For a stratified sample, each mean weights the stratum means by the strata's shares of
+    the population, and its variance adds up the within-stratum variances. A stratum with
+    a single sampled row adds no variance.
+
+    Args:
+        data (DataFrame): The sample.
+        population (int): Rows in the full data, for the finite population correction.
+        confidence (float): Confidence level of the interval.
+        strata (tuple): For a stratified sample, (stratum of each sampled row, indexed like
+            the rows as sampled; rows seen per stratum while sampling).
+    """
+    numeric = data.select_dtypes(include='number')
+    z = stats.norm.ppf(0.5 + confidence / 2)
+    if strata is None:
+        n = numeric.count()
+        correction = np.sqrt(np.clip(1 - n / population, 0, 1))
+        mean = numeric.mean()
+        margin = z * numeric.std() / np.sqrt(n) * correction
+        return pd.DataFrame({'mean': mean, 'margin': margin, 'lower': mean - margin, 'upper': mean + margin, 'n': n})
+
+    labels, counts = strata
+    grouped = numeric.groupby(labels.reindex(numeric.index).to_numpy())
+    n_h = grouped.count()
+    sizes = pd.Series(counts, dtype='float64').reindex(n_h.index)
+    sizes *= population / sum(counts.values())  # Filters shrink every stratum alike
+    weights = (n_h > 0).mul(sizes, axis=0)
+    weights /= weights.sum()  # Per column, over the strata it has values in
+    mean = (grouped.mean() * weights).sum()
+    correction = np.clip(1 - n_h.div(sizes, axis=0), 0, 1)
+    variance = (weights ** 2 * correction * grouped.var().fillna(0) / n_h.where(n_h > 0)).sum()
+    margin = z * np.sqrt(variance)
+    return pd.DataFrame({'mean': mean, 'margin': margin, 'lower': mean - margin, 'upper': mean + margin,
+                         'n': n_h.sum()})
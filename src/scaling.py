@@ -0,0 +1,96 @@
+# scaling.py
+import numpy as np
+import pandas as pd
+from aggregation import PartialAggregate
+
+METHODS = ('standard', 'robust', 'minmax')
+DTYPES = ('float64', 'float32')
+
+
+class Scaler:
+    """Standard, robust (median/IQR) or min-max scaling, fitted in one streaming pass.
+
+    ``partial_fit`` folds chunks of rows into a single-group PartialAggregate, the mergeable
+    state group-by queries use: exact moments, minimum and maximum, and a bottom-k row
+    sample for the robust quartiles. ``transform`` writes each
+    scaled column into one new array of the chosen dtype. The arithmetic runs a chunk at a
+    time in float64, so no full-size temporaries are made. With ``dtype='float32'`` the
+    scaled columns take half the memory. Constant columns get a scale of 1, as in
+    scikit-learn's scalers.
+    """
+
+    def __init__(self, method='standard', dtype='float64', chunksize=100_000, sketch_size=100_000, seed=42):
+        if method not in METHODS:
+            raise ValueError(f"Unknown scaling method '{method}'. Choose from {', '.join(METHODS)}.")
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown scaling dtype '{dtype}'. Choose float64 or float32.")
+        self.method = method
+        self.dtype = np.dtype(dtype)
+        self.chunksize = chunksize
+        self.sketch_size = sketch_size
+        self.seed = seed
+        self.stats = None
+        self.rows_seen = 0
+
+    def partial_fit(self, chunk):
+        """Fold a chunk of rows (a DataFrame of the columns to scale) into the statistics."""
+        values = pd.DataFrame(chunk.to_numpy(dtype='float64', na_value=np.nan), columns=chunk.columns)
+        priority = np.random.default_rng([self.seed, self.rows_seen]).random(len(values))
+        state = PartialAggregate.from_chunk(values, [], list(chunk.columns), self.sketch_size, priority)
+        self.stats = state if self.stats is None else self.stats.merge(state)
+        self.rows_seen += len(values)
+        return self
+
+    def fit(self, data, columns=None):
+        """Fit on ``columns`` of ``data`` (default: float64 and int64 columns), ``chunksize`` rows at a time."""
+        columns = list(data.select_dtypes(include=['float64', 'int64']).columns if columns is None else columns)
+        self.stats, self.rows_seen = None, 0
+        for start in range(0, max(len(data), 1), self.chunksize):
+            self.partial_fit(data.iloc[start:start + self.chunksize][columns])
+        return self
+
+    @property
+    def columns(self):
+        return self.stats.values
+
+    def center_scale(self):
+        """Per-column (center, scale): values are transformed as (x - center) / scale."""
+        moments = {name: frame.iloc[0].to_numpy(dtype='float64') for name, frame in self.stats.moments.items()}
+        if self.method == 'standard':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                count = moments['count']
+                center, scale = moments['sum'] / count, np.sqrt(moments['m2'] / count)  # Population std, as scikit-learn
+        elif self.method == 'robust':
+            quartiles = self.stats.result(('p25', 'median', 'p75')).iloc[0].to_numpy(dtype='float64')
+            q25, center, q75 = quartiles.reshape(len(self.columns), 3).T
+            scale = q75 - q25
+        else:
+            center, scale = moments['min'], moments['max'] - moments['min']
+        scale = np.where(np.isfinite(scale) & (np.abs(scale) >= 10 * np.finfo('float64').eps), scale, 1.0)
+        return center, scale
+
+    def transform(self, data):
+        """Scale the fitted columns of ``data``, replacing each one in the frame. Returns ``data``."""
+        center, scale = self.center_scale()
+        buffer = np.empty(min(self.chunksize, len(data)))
+        for col, c, s in zip(self.columns, center, scale):
+            values = data[col]
+            # A view of the column where its dtype allows; nullable columns are converted once
+            source = values.to_numpy() if isinstance(values.dtype, np.dtype) else values.to_numpy('float64', na_value=np.nan)
+            scaled = np.empty(len(data), dtype=self.dtype)
+            for start in range(0, len(data), self.chunksize):
+                part = buffer[:len(source[start:start + self.chunksize])]
+                np.subtract(source[start:start + self.chunksize], c, out=part, casting='unsafe')
+                np.divide(part, s, out=part)
+                scaled[start:start + len(part)] = part
+            data[col] = scaled
+        return data
+
+    def fit_transform(self, data, columns=None):
+        return self.fit(data, columns).transform(data)
+
+    def state(self):
+        """Fitted parameters, as kept in the preprocessing state for replaying on new rows."""
+        center, scale = self.center_scale()
+        return {'method': self.method, 'dtype': self.dtype.name, 'columns': list(self.columns),
+                'mean': center.tolist(), 'scale': scale.tolist()}
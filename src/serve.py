@@ -0,0 +1,300 @@
+# serve.py
+import argparse
+import io
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from colorama import Fore
+from data_loader import DataLoader
+from data_preprocessor import DataPreprocessor
+from model_registry import ModelRegistry
+from session import SessionWorkspace, _to_jsonable
+
+
+def model_features(model, data):
+    """Build the feature matrix a trained model expects from raw (preprocessed) rows.
+
+    Sparse-encoded models are Pipelines that encode rows themselves. For the others,
+    datetimes become epoch seconds and categorical columns are one-hot encoded, then the
+    columns are aligned to the names the model was trained with. Dummy columns for
+    categories absent from the request are zero; a missing plain column is an error.
+    """
+    if isinstance(model, Pipeline):
+        return data
+    X = data.copy()
+    for col in X.select_dtypes(include=['datetime64']).columns:
+        X[col] = X[col].astype('int64') // 10**9
+    names = getattr(model, 'feature_names_in_', None)
+    if names is None:
+        return X.select_dtypes(include=['number', 'bool'])
+    categorical = list(X.select_dtypes(exclude=['number', 'bool']).columns)
+    # Only encode the columns the model has dummies for; every category, the trained ones are picked below
+    used = [col for col in categorical if any(str(name).startswith(f'{col}_') for name in names)]
+    X = pd.get_dummies(X.drop(columns=[col for col in categorical if col not in used]), columns=used)
+    missing = [name for name in names if name not in X.columns
+               and not any(str(name).startswith(f'{col}_') for col in used)]
+    if missing:
+        raise ValueError(f"Missing feature columns: {missing}")
+    return X.reindex(columns=names, fill_value=0).astype('float64')
+
+
+class ModelBundle:
+    """A loaded model with the preprocessing state of the data it was trained on."""
+
+    def __init__(self, name, model, state=None, target=None):
+        self.name = name
+        self.model = model
+        self.state = state or {}
+        self.target = target
+
+    def predict(self, rows):
+        data = DataPreprocessor.apply_state(rows, self.state) if self.state else rows
+        predictions = np.asarray(self.model.predict(model_features(self.model, data)))
+        scaler = self.state.get('scaler') or {}
+        if self.target in scaler.get('columns', []):
+            # The target was standardised with the features; report predictions in original units
+            index = scaler['columns'].index(self.target)
+            predictions = predictions * scaler['scale'][index] + scaler['mean'][index]
+        return predictions
+
+    def describe(self):
+        return {'name': self.name, 'type': type(self.model).__name__, 'target': self.target,
+                'features': [str(name) for name in getattr(self.model, 'feature_names_in_', [])],
+                'preprocessing': bool(self.state)}
+
+
+class MicroBatcher:
+    """Coalesce concurrent prediction requests into one vectorised predict call.
+
+    Requests are queued; a dispatcher thread takes the first waiting request, then keeps
+    collecting for up to ``max_wait`` seconds or until ``max_batch`` rows, and hands the
+    batch to the worker pool. If a batch fails, its requests are retried one by one so a
+    single bad request only fails itself.
+    """
+
+    def __init__(self, predict, pool, max_batch=1024, max_wait=0.005):
+        self.predict = predict
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.batches = 0
+        self.rows = 0
+        threading.Thread(target=self._dispatch, daemon=True).start()
+
+    def submit(self, rows):
+        future = Future()
+        self.queue.put((rows, future))
+        return future
+
+    def _dispatch(self):
+        while True:
+            batch = [self.queue.get()]
+            size = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size += len(item[0])
+            self.pool.submit(self._run, batch)
+
+    def _run(self, batch):
+        frames = [rows for rows, _ in batch]
+        self.batches += 1
+        self.rows += sum(len(frame) for frame in frames)
+        try:
+            predictions = self.predict(pd.concat(frames, ignore_index=True))
+            splits = np.cumsum([len(frame) for frame in frames])[:-1]
+            for (_, future), part in zip(batch, np.split(predictions, splits)):
+                future.set_result(part)
+        except Exception:
+            for rows, future in batch:
+                try:
+                    future.set_result(self.predict(rows))
+                except Exception as e:
+                    future.set_exception(e)
+
+
+class ModelServer:
+    """Keeps models warm and answers prediction and statistics requests."""
+
+    def __init__(self, bundles, data=None, workers=4, max_batch=1024, max_wait=0.005, timeout=30):
+        self.bundles = {bundle.name: bundle for bundle in bundles}
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.batchers = {name: MicroBatcher(bundle.predict, self.pool, max_batch, max_wait)
+                         for name, bundle in self.bundles.items()}
+        self.data = data
+        self.timeout = timeout
+        self.dataset_stats = self.summary(data) if data is not None else None  # Computed once, served from memory
+
+    @staticmethod
+    def summary(data):
+        numeric = data.select_dtypes(include='number')
+        return {'rows': len(data), 'columns': list(map(str, data.columns)),
+                'numeric': _to_jsonable(numeric.describe().to_dict()) if not numeric.empty else {}}
+
+    def predict(self, name, rows):
+        if name is None and len(self.bundles) == 1:
+            name = next(iter(self.bundles))
+        if name not in self.batchers:
+            raise KeyError(f"Unknown model '{name}'. Available: {sorted(self.bundles)}")
+        return name, self.batchers[name].submit(rows).result(timeout=self.timeout)
+
+
+def parse_rows(body, content_type):
+    """Rows from a JSON body (a list of records, or {"rows": [...]}) or a CSV body."""
+    if 'csv' in content_type:
+        return pd.read_csv(io.StringIO(body.decode()))
+    payload = json.loads(body or b'[]')
+    if isinstance(payload, dict):
+        payload = payload.get('rows', [payload])
+    return pd.DataFrame.from_records(payload)
+
+
+class ModelHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # The default backlog of 5 makes bursts of clients wait on TCP retries
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """GET /health, /models, /stats; POST /predict[/<model>] and /stats (JSON or CSV)."""
+
+    server_version = 'DataVista'
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+    def _send(self, status, payload, csv=False):
+        if csv:
+            body, content_type = payload.encode(), 'text/csv'
+        else:
+            body, content_type = json.dumps(payload).encode(), 'application/json'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def do_GET(self):
+        app = self.server.app
+        path = urlparse(self.path).path.rstrip('/')
+        if path == '/health':
+            self._send(200, {'status': 'ok', 'models': sorted(app.bundles)})
+        elif path == '/models':
+            self._send(200, [bundle.describe() for bundle in app.bundles.values()])
+        elif path == '/stats' and app.dataset_stats is not None:
+            self._send(200, app.dataset_stats)
+        else:
+            self._send(404, {'error': f"Not found: {path}"})
+
+    def do_POST(self):
+        app = self.server.app
+        url = urlparse(self.path)
+        path, query = url.path.rstrip('/'), parse_qs(url.query)
+        want_csv = 'csv' in self.headers.get('Accept', '') or query.get('format') == ['csv']
+        try:
+            rows = parse_rows(self._body(), self.headers.get('Content-Type', 'application/json'))
+            if path == '/stats':
+                self._send(200, app.summary(rows))
+            elif path == '/predict' or path.startswith('/predict/'):
+                name = path[len('/predict/'):] or query.get('model', [None])[0]
+                name, predictions = app.predict(name, rows)
+                if want_csv:
+                    self._send(200, pd.DataFrame({'prediction': predictions}).to_csv(index=False), csv=True)
+                else:
+                    self._send(200, {'model': name, 'rows': len(rows), 'predictions': predictions.tolist()})
+            else:
+                self._send(404, {'error': f"Not found: {path}"})
+        except KeyError as e:
+            self._send(404, {'error': str(e).strip('"')})
+        except (ValueError, TypeError) as e:
+            self._send(400, {'error': str(e)})
+        except Exception as e:
+            logging.error(Fore.RED + f"Error serving {path}: {e}" + Fore.RESET)
+            self._send(500, {'error': str(e)})
+
+
+def load_bundles(model_paths=(), data=None, workspace_root='.datavista', registry_root='models'):
+    """Load registered models ('name' or 'name:version') or model files (see ModelRegistry.file_path),
+    plus every model of the session for ``data`` with its preprocessing.
+
+    Returns the bundles and the cleaned (unscaled) data, or None without ``data``.
+    """
+    bundles = []
+    registry = ModelRegistry(registry_root)
+    for ref in model_paths:
+        path = registry.file_path(ref)
+        if path is not None:
+            bundles.append(ModelBundle(os.path.splitext(os.path.basename(path))[0], joblib.load(path)))
+        else:
+            model, meta = registry.load(*ModelRegistry.parse_ref(ref))  # Large models are memory-mapped
+            bundles.append(ModelBundle(meta['name'], model, target=meta['target']))
+    frame = None
+    if data is not None:
+        loader = DataLoader(data)
+        workspace = SessionWorkspace(workspace_root)
+        workspace.bind(loader.resolve_paths())
+        record = workspace.stage_record('preprocess') or {}
+        for name, model_record in workspace.manifest['models'].items():
+            _, model = workspace.load_model(name)
+            bundles.append(ModelBundle(name, model, record.get('state'), model_record['metadata'].get('target')))
+        frame = workspace.get_stage('clean')  # Statistics in the units requests arrive in
+        if frame is None:
+            frame = loader.load()
+    return bundles, frame
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='data_vista.py serve', description="Serve DataVista models over HTTP")
+    parser.add_argument('--model', action='append', default=[],
+                        help='Model file, or registered model as name or name:version (repeatable)')
+    parser.add_argument('--registry', type=str, default='models', help='Directory of the model registry')
+    parser.add_argument('--data', type=str, nargs='+', default=None,
+                        help='Serve the models of this data\'s session, with its preprocessing, and its summary statistics')
+    parser.add_argument('--workspace', type=str, default='.datavista', help='Directory where sessions are kept')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=4, help='Threads running batched predictions')
+    parser.add_argument('--max-batch', type=int, default=1024, help='Most rows scored in one predict call')
+    parser.add_argument('--max-wait-ms', type=float, default=5.0, help='How long a request waits for others to batch with')
+    args = parser.parse_args(argv)
+
+    data = args.data if args.data is None or len(args.data) > 1 else args.data[0]
+    bundles, frame = load_bundles(args.model, data, args.workspace, args.registry)
+    if not bundles and frame is None:
+        parser.error("nothing to serve: pass --model and/or --data with a saved session")
+    app = ModelServer(bundles, frame, args.workers, args.max_batch, args.max_wait_ms / 1000)
+    server = ModelHTTPServer((args.host, args.port), RequestHandler)
+    server.app = app
+    logging.info(Fore.GREEN + f"Serving {sorted(app.bundles)} on http://{args.host}:{server.server_port} "
+                 f"({args.workers} workers). Press Ctrl+C to stop." + Fore.RESET)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        app.pool.shutdown(wait=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,285 @@
+# session.py
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+import joblib
+import numpy as np
+import pandas as pd
+from colorama import Fore
+
+
+def _to_jsonable(value):
+    """Convert numpy/pandas scalars and containers so they can be written to the manifest."""
+    if isinstance(value, dict):
+        return {str(k): _to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+class SessionWorkspace:
+    """On-disk workspace that keeps each pipeline stage's output between launches.
+
+    Stages form a chain: load -> clean -> preprocess. Each stage records the
+    parameters it ran with and is tied to the fingerprint of the source files,
+    so a changed file invalidates everything while a changed preprocessing choice
+    only invalidates the preprocess stage and the models and analysis results built on it.
+    In append mode, rows added to the source files are appended to every stage instead.
+    """
+
+    STAGES = ['load', 'clean', 'preprocess']
+    MANIFEST = 'manifest.json'
+    MAX_PARTS = 32  # Appended parts a stage collects before they are compacted into one file
+
+    def __init__(self, root='.datavista'):
+        self.root = root
+        self.path = None
+        self.manifest = None
+        self.source_fingerprint = None
+
+    def bind(self, paths, append=False, tag=None):
+        """Attach the workspace to a set of source files and read any previous session.
+
+        Changed source files invalidate the saved stages, unless ``append`` is set: the
+        stages are then kept for the new rows to be appended to them. A ``tag``, such as a
+        join's spec, keeps data derived from the same files in a session of its own.
+        """
+        key = hashlib.sha256('\n'.join([os.path.abspath(p) for p in paths] + ([tag] if tag else [])).encode()).hexdigest()[:16]
+        self.path = os.path.join(self.root, key)
+        os.makedirs(os.path.join(self.path, 'models'), exist_ok=True)
+        self.source_fingerprint = self.fingerprint_sources(paths)
+
+        manifest_path = os.path.join(self.path, self.MANIFEST)
+        self.manifest = {'sources': list(paths), 'stages': {}, 'models': {}, 'analyses': [], 'artifacts': {}}
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path) as handle:
+                    self.manifest = json.load(handle)
+            except (OSError, ValueError) as e:
+                logging.warning(Fore.YELLOW + f"Ignoring unreadable session manifest: {e}" + Fore.RESET)
+        self.manifest.setdefault('artifacts', {})  # Missing from sessions saved by older versions
+
+        load = self.manifest['stages'].get('load')
+        if load and load['fingerprint'] != self.source_fingerprint and append:
+            logging.info(Fore.YELLOW + "Source data changed since the last session. Looking for appended rows." + Fore.RESET)
+        elif load and load['fingerprint'] != self.source_fingerprint:
+            logging.info(Fore.YELLOW + "Source data changed since the last session. Saved stages were invalidated." + Fore.RESET)
+            self.invalidate('load')
+
+    @staticmethod
+    def fingerprint_sources(paths):
+        """Cheap fingerprint of the source files from their path, size and modification time."""
+        digest = hashlib.sha256()
+        for path in paths:
+            stat = os.stat(path)
+            digest.update(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+        return digest.hexdigest()
+
+    def _save_manifest(self):
+        with open(os.path.join(self.path, self.MANIFEST), 'w') as handle:
+            json.dump(self.manifest, handle, indent=2)
+
+    def _write_frame(self, data, stage):
+        """Write a frame as Parquet, falling back to pickle when Parquet can't represent it."""
+        try:
+            filename = f'{stage}.parquet'
+            data.to_parquet(os.path.join(self.path, filename))
+        except Exception as e:
+            logging.warning(Fore.YELLOW + f"Could not store '{stage}' as Parquet ({e}); using pickle instead." + Fore.RESET)
+            filename = f'{stage}.pkl'
+            data.to_pickle(os.path.join(self.path, filename))
+        return filename
+
+    def _read_frame(self, filename, columns=None):
+        path = os.path.join(self.path, filename)
+        if filename.endswith('.parquet'):
+            return pd.read_parquet(path, columns=columns)
+        data = pd.read_pickle(path)
+        return data if columns is None else data[columns]
+
+    def _read_stage(self, record, columns=None):
+        """A stage's frame: its file plus the parts appended to it since."""
+        parts = record.get('parts', [])
+        data = self._read_frame(record['file'], columns)
+        if parts:
+            data = pd.concat([data] + [self._read_frame(part, columns) for part in parts], ignore_index=True)
+        return data
+
+    def valid_stages(self):
+        """Names of the stages that can be restored, in pipeline order."""
+        valid = []
+        for stage in self.STAGES:
+            if stage not in self.manifest['stages']:
+                break
+            valid.append(stage)
+        return valid
+
+    def stage_record(self, stage):
+        return self.manifest['stages'].get(stage) if self.manifest else None
+
+    def get_stage(self, stage, params=None, columns=None):
+        """Return the saved output of a stage, or None if it is missing or ran with other params.
+
+        Args:
+            stage (str): 'load', 'clean', or 'preprocess'.
+            params (dict): Parameters the caller is about to run with. None accepts whatever
+                the saved stage ran with.
+            columns (list): Only read these columns. None reads them all.
+        """
+        if self.manifest is None or stage not in self.valid_stages():
+            return None
+        record = self.manifest['stages'][stage]
+        if params is not None and record['params'] != _to_jsonable(params):
+            return None
+        try:
+            data = self._read_stage(record, columns)
+        except Exception as e:
+            logging.warning(Fore.YELLOW + f"Could not restore stage '{stage}': {e}" + Fore.RESET)
+            self.invalidate(stage)
+            return None
+        logging.info(Fore.GREEN + f"Restored '{stage}' stage from session ({len(data)} rows)." + Fore.RESET)
+        return data
+
+    def save_stage(self, stage, data, params=None, state=None):
+        """Store a stage's output and drop every stage, model and result downstream of it."""
+        if self.manifest is None or data is None:
+            return
+        self.invalidate(stage)
+        upstream = self.STAGES[self.STAGES.index(stage) - 1] if stage != 'load' else None
+        upstream_fingerprint = self.manifest['stages'][upstream]['fingerprint'] if upstream else None
+        params = _to_jsonable(params or {})
+        fingerprint = self.source_fingerprint if stage == 'load' else hashlib.sha256(
+            f"{upstream_fingerprint}|{json.dumps(params, sort_keys=True)}".encode()).hexdigest()
+        self.manifest['stages'][stage] = {
+            'fingerprint': fingerprint,
+            'params': params,
+            'state': _to_jsonable(state or {}),
+            'file': self._write_frame(data, stage),
+            'rows': len(data),
+            'saved_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        self._save_manifest()
+
+    def append_stage(self, stage, data, state=None):
+        """Add rows to the end of a saved stage without rewriting it.
+
+        The rows are written as a separate part file, so the cost follows the number of new
+        rows. Once a stage has collected MAX_PARTS parts they are compacted into one file.
+        Models and analysis results are kept; the caller brings them up to date.
+
+        Args:
+            stage (str): 'load', 'clean', or 'preprocess'.
+            data (DataFrame): The new rows, already through this stage.
+            state (dict): Replaces the stage's recorded state, e.g. the source offsets of 'load'.
+        """
+        record = self.manifest['stages'][stage]
+        if stage == 'load':
+            record['fingerprint'] = self.source_fingerprint
+        if state is not None:
+            record['state'] = _to_jsonable(state)
+        if len(data):
+            parts = record.setdefault('parts', [])
+            parts.append(self._write_frame(data, f"{stage}.{len(parts) + 1}"))
+            record['rows'] += len(data)
+            if len(parts) >= self.MAX_PARTS:
+                self._compact(stage, record)
+        record['saved_at'] = datetime.now().isoformat(timespec='seconds')
+        self._save_manifest()
+
+    def _compact(self, stage, record):
+        data = self._read_stage(record)
+        self._remove_files(record)
+        record['file'], record['parts'] = self._write_frame(data, stage), []
+
+    def _remove_files(self, record):
+        for filename in [record['file']] + record.get('parts', []):
+            path = os.path.join(self.path, filename)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def invalidate(self, stage):
+        """Forget a stage and everything that depends on it."""
+        for name in self.STAGES[self.STAGES.index(stage):]:
+            record = self.manifest['stages'].pop(name, None)
+            if record:
+                self._remove_files(record)
+        for directory in ('models', 'features', 'artifacts'):
+            shutil.rmtree(os.path.join(self.path, directory), ignore_errors=True)
+        os.makedirs(os.path.join(self.path, 'models'), exist_ok=True)
+        self.manifest['models'] = {}
+        self.manifest['analyses'] = []
+        self.manifest['artifacts'] = {}
+        self._save_manifest()
+
+    def save_model(self, name, model, metadata=None):
+        """Store a trained model alongside the data it was trained on."""
+        if self.manifest is None:
+            return
+        filename = os.path.join('models', f'{name}.joblib')
+        joblib.dump(model, os.path.join(self.path, filename))
+        self.manifest['models'][name] = {
+            'file': filename,
+            'metadata': _to_jsonable(metadata or {}),
+            'saved_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        self._save_manifest()
+
+    def set_model_metadata(self, name, **values):
+        """Update some metadata of a saved model, e.g. to flag it as stale, without rewriting it."""
+        self.manifest['models'][name]['metadata'].update(_to_jsonable(values))
+        self._save_manifest()
+
+    def load_model(self, name=None):
+        """Load a model by name, or the most recently saved one. Returns (name, model)."""
+        if not self.manifest or not self.manifest['models']:
+            return None, None
+        if name is None:
+            name = max(self.manifest['models'], key=lambda n: self.manifest['models'][n]['saved_at'])
+        record = self.manifest['models'].get(name)
+        if record is None:
+            return None, None
+        return name, joblib.load(os.path.join(self.path, record['file']))
+
+    def save_analysis(self, kind, result):
+        """Append an analysis result (statistics, forecast, clusters) to the session."""
+        if self.manifest is None:
+            return
+        self.manifest['analyses'].append({
+            'kind': kind,
+            'result': _to_jsonable(result),
+            'saved_at': datetime.now().isoformat(timespec='seconds'),
+        })
+        self._save_manifest()
+
+    def analyses(self):
+        return list(self.manifest['analyses']) if self.manifest else []
+
+    def save_artifact(self, name, value):
+        """Store state that later refreshes build on, such as statistic accumulators or fitted ARIMA results."""
+        if self.manifest is None:
+            return
+        filename = os.path.join('artifacts', f'{name}.joblib')
+        os.makedirs(os.path.join(self.path, 'artifacts'), exist_ok=True)
+        joblib.dump(value, os.path.join(self.path, filename))
+        self.manifest['artifacts'][name] = {'file': filename, 'saved_at': datetime.now().isoformat(timespec='seconds')}
+        self._save_manifest()
+
+    def load_artifact(self, name):
+        """A stored artifact, or None if there is none under that name."""
+        record = self.manifest['artifacts'].get(name) if self.manifest else None
+        if record is None:
+            return None
+        return joblib.load(os.path.join(self.path, record['file']))
+
+    def artifacts(self, prefix=''):
+        """Names of the stored artifacts that start with prefix."""
+        return [name for name in self.manifest['artifacts'] if name.startswith(prefix)] if self.manifest else []
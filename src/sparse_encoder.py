@@ -0,0 +1,78 @@
+# sparse_encoder.py
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.base import BaseEstimator, TransformerMixin
+
+
+class SparseEncoder(BaseEstimator, TransformerMixin):
+    """Encode a mixed DataFrame as a scipy CSR matrix without building dense dummy columns.
+
+    Numeric and boolean columns are kept as they are, with missing values filled by
+    their training mean. Categorical columns are either one-hot encoded against a
+    vocabulary fitted on the training data ('onehot'), or hashed into a fixed number
+    of columns ('hash') for unbounded cardinality. Datetime columns are dropped. The
+    fitted state is pickled with the model (the encoder is the first step of its
+    Pipeline), so scoring encodes exactly the way training did.
+    """
+
+    def __init__(self, method='onehot', n_features=2 ** 18, drop_first=True):
+        self.method = method
+        self.n_features = n_features  # Width of the hashed block ('hash' only)
+        self.drop_first = drop_first  # Match pd.get_dummies(drop_first=True) ('onehot' only)
+
+    def fit(self, X, y=None):
+        X = X.drop(columns=X.select_dtypes(include=['datetime', 'datetimetz']).columns)
+        self.numeric_columns_ = list(X.select_dtypes(include=['number', 'bool']).columns)
+        self.categorical_columns_ = [col for col in X.columns if col not in self.numeric_columns_]
+        self.fill_values_ = X[self.numeric_columns_].astype('float64').mean().to_dict()
+        if self.method == 'onehot':
+            # Sorted categories, missing values excluded, as pd.get_dummies does
+            self.vocabulary_ = {col: pd.Categorical(X[col]).categories.tolist() for col in self.categorical_columns_}
+        elif self.method != 'hash':
+            raise ValueError(f"Unknown encoding method '{self.method}'. Use 'onehot' or 'hash'.")
+        return self
+
+    def _numeric_block(self, X):
+        values = X[self.numeric_columns_].astype('float64').fillna(self.fill_values_).to_numpy()
+        return sparse.csr_matrix(values)
+
+    def _onehot_block(self, column, categories):
+        codes = pd.Index(categories).get_indexer(column).astype('int64')  # Unseen and missing values -> -1
+        width = len(categories)
+        if self.drop_first:
+            codes -= 1
+            width = max(width - 1, 0)
+        rows = np.flatnonzero(codes >= 0)
+        return sparse.csr_matrix((np.ones(len(rows)), (rows, codes[rows])), shape=(len(column), width))
+
+    def _hashed_block(self, X):
+        rows, cols, signs = [], [], []
+        for col in self.categorical_columns_:
+            present = X[col].notna().to_numpy()
+            keys = (f'{col}=' + X[col][present].astype(str)).to_numpy(dtype=object)
+            hashed = pd.util.hash_array(keys)
+            rows.append(np.flatnonzero(present))
+            cols.append((hashed % np.uint64(self.n_features)).astype('int64'))
+            signs.append(np.where(hashed >> np.uint64(63), -1.0, 1.0))  # Alternating signs keep collisions unbiased
+        if not rows:
+            return sparse.csr_matrix((len(X), self.n_features))
+        return sparse.csr_matrix((np.concatenate(signs), (np.concatenate(rows), np.concatenate(cols))),
+                                 shape=(len(X), self.n_features))
+
+    def transform(self, X):
+        blocks = [self._numeric_block(X)]
+        if self.method == 'onehot':
+            blocks += [self._onehot_block(X[col], self.vocabulary_[col]) for col in self.categorical_columns_]
+        else:
+            blocks.append(self._hashed_block(X))
+        return sparse.hstack(blocks, format='csr')
+
+    def get_feature_names_out(self, input_features=None):
+        names = [str(col) for col in self.numeric_columns_]
+        if self.method == 'hash':
+            return np.asarray(names + [f'hash_{i}' for i in range(self.n_features)], dtype=object)
+        for col in self.categorical_columns_:
+            categories = self.vocabulary_[col][1:] if self.drop_first else self.vocabulary_[col]
+            names += [f'{col}_{category}' for category in categories]
+        return np.asarray(names, dtype=object)
@@ -1,12 +1,82 @@
+import functools
 import logging
+import warnings
 import pandas as pd
 import numpy as np
 from colorama import Fore
 from scipy import stats
+from backends import get_backend
+from aggregation import PartialAggregate
+from parallel import SharedPool
+
+SKETCH_SIZE = 10_000  # Rows sampled for the quartiles in chunked mode
+
+
+def _describe_chunk(chunk, start):
+    priority = np.random.default_rng([42, start]).random(len(chunk))
+    return PartialAggregate.from_chunk(chunk, [], list(chunk.columns), SKETCH_SIZE, priority)
+
+
+def _corr_chunk(chunk, start, shift):
+    """Sums for every pair of columns over the rows both have values in, centred on ``shift``.
+
+    Returns the pair counts, the sums and sums of squares of column i over the rows where
+    column j is present too (at [i, j]), and the sums of products.
+    """
+    values = chunk.to_numpy(dtype='float64', na_value=np.nan) - shift
+    present = ~np.isnan(values)
+    values = np.where(present, values, 0.0)
+    present = present.astype('float64')
+    return present.T @ present, values.T @ present, (values ** 2).T @ present, values.T @ values
+
+
+def _describe_column(shared, column):
+    """Exact describe() of one shared column, in a worker."""
+    return pd.Series(shared.column(column), name=column).describe()
+
+
+def _corr_column(shared, task):
+    """Pearson correlations of one column with some others, each over the rows both have values in."""
+    column, others = task
+    x = shared.column(column).astype('float64', copy=False)
+    row = []
+    for other in others:
+        y = shared.column(other).astype('float64', copy=False)
+        complete = ~(np.isnan(x) | np.isnan(y))
+        if complete.sum() < 2:
+            row.append(np.nan)
+            continue
+        a, b = x[complete], y[complete]
+        a, b = a - a.mean(), b - b.mean()
+        divisor = np.sqrt((a @ a) * (b @ b))
+        row.append(a @ b / divisor if divisor else np.nan)
+    return row
+
+
+def _merge(state, other):
+    state.merge(other)
+    return state
+
+
+def _add(totals, other):
+    return tuple(a + b for a, b in zip(totals, other))
+
+
+def _shared_chunk(shared, task):
+    """Run a chunk function on a row range of the shared columns, in a worker."""
+    fn, start, stop, extra = task
+    return fn(shared.frame(start=start, stop=stop), start, *extra)
+
 
 class StatisticalAnalysis:
-    def __init__(self, data):
+    SKETCH_SIZE = SKETCH_SIZE
+    PARALLEL_CHUNK = 250_000  # Rows per task when summarising in worker processes
+
+    def __init__(self, data, backend='pandas', chunksize=None, workers=None):
         self.data = data
+        self.backend = get_backend(backend)
+        self.chunksize = chunksize  # Summarise this many rows at a time, to bound memory; None: all at once
+        self.workers = workers  # Processes that summarise columns (or row ranges, in chunks) of a shared copy of the data
         self.summary_report = []
 
     def perform_analysis(self):
@@ -28,7 +98,14 @@ class StatisticalAnalysis:
             return
 
         # Numeric summary using describe() for all numeric columns
-        numeric_summary = self.data[numeric_columns].describe()
+        if self.chunksize:
+            numeric_summary = self.describe_in_chunks(numeric_columns)
+            logging.info(Fore.YELLOW + f"Summarised {self.chunksize:,} rows at a time to bound memory: quartiles are "
+                         f"estimated from a random sample of {self.SKETCH_SIZE:,} rows, the other statistics are exact." + Fore.RESET)
+        elif self._parallel():
+            numeric_summary = self.describe_by_column(numeric_columns)
+        else:
+            numeric_summary = self.backend.describe(self.data, numeric_columns)
         format_str = "{:<12}" + "{:>12}" * len(numeric_summary.columns)
 
         logging.info(format_str.format(Fore.GREEN + "Variable", *numeric_summary.columns) + Fore.RESET)
@@ -93,9 +170,67 @@ class StatisticalAnalysis:
             return
 
         logging.info(Fore.GREEN + "Correlation Analysis:\n" + Fore.RESET)
-        correlation_matrix = self.data[numeric_cols].corr()
+        if self.chunksize:
+            correlation_matrix = self.corr_in_chunks(numeric_cols)
+        elif self._parallel():
+            correlation_matrix = self.corr_by_column(numeric_cols)
+        else:
+            correlation_matrix = self.backend.corr(self.data, numeric_cols)
         logging.info(Fore.GREEN + str(correlation_matrix) + Fore.RESET)
 
+    def _parallel(self):
+        return bool(self.workers and self.workers > 1 and len(self.data) > (self.chunksize or self.PARALLEL_CHUNK))
+
+    def _chunks(self, columns):
+        size = self.chunksize or len(self.data) or 1
+        for start in range(0, len(self.data), size):
+            yield start, self.data[columns].iloc[start:start + size]
+
+    def _reduce(self, columns, fn, reduce, extra=()):
+        """Fold ``fn(chunk, start, *extra)`` over the row chunks, in worker processes when parallel."""
+        if not self._parallel():
+            return functools.reduce(reduce, (fn(chunk, start, *extra) for start, chunk in self._chunks(columns)))
+        with SharedPool(self.data, columns, self.workers) as pool:
+            tasks = [(fn, start, stop, extra) for start, stop in pool.row_ranges(self.chunksize or self.PARALLEL_CHUNK)]
+            return pool.map_reduce(_shared_chunk, tasks, reduce)
+
+    def describe_by_column(self, columns):
+        """describe() with each column summarised exactly in a worker process."""
+        with SharedPool(self.data, columns, self.workers) as pool:
+            return pd.concat(pool.map(_describe_column, columns), axis=1)
+
+    def corr_by_column(self, columns):
+        """corr() with each row of the matrix computed in a worker process, over pairwise-complete rows as pandas does."""
+        with SharedPool(self.data, columns, self.workers) as pool:
+            rows = pool.map(_corr_column, [(col, columns[i:]) for i, col in enumerate(columns)])
+        matrix = np.full((len(columns), len(columns)), np.nan)
+        for i, row in enumerate(rows):
+            matrix[i, i:] = matrix[i:, i] = row
+        return pd.DataFrame(matrix, index=columns, columns=columns)
+
+    def describe_in_chunks(self, columns):
+        """describe() merged from per-chunk moments; quartiles come from a bounded random sample."""
+        state = self._reduce(columns, _describe_chunk, _merge)
+        stats = ['count', 'mean', 'std', 'min', 'p25', 'median', 'p75', 'max']
+        table = state.result(stats).iloc[0].unstack()[stats]
+        table.columns = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+        return table.T[columns]
+
+    def corr_in_chunks(self, columns):
+        """Pearson correlations from sums accumulated per chunk, each pair over the rows both
+        columns have values in, as DataFrame.corr computes them."""
+        # Centring near the mean keeps the sums of products accurate
+        head = self.data[columns].iloc[:self.chunksize or self.PARALLEL_CHUNK].to_numpy(dtype='float64', na_value=np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # A column with no values in the first chunk
+            shift = np.nan_to_num(np.nanmean(head, axis=0))
+        count, sums, squares, products = self._reduce(columns, _corr_chunk, _add, (shift,))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            count = np.where(count > 1, count, np.nan)  # A single shared row has no correlation
+            covariance = products - sums * sums.T / count
+            variance = squares - sums ** 2 / count
+            return pd.DataFrame(covariance / np.sqrt(variance * variance.T), index=columns, columns=columns)
+
     def print_summary_report(self):
         """Print a summary report of all analyses performed."""
         logging.info(Fore.GREEN + "\nSummary Report of Statistical Analysis:\n" + Fore.RESET)
@@ -0,0 +1,314 @@
+# validation.py
+import json
+import re
+import warnings
+import numpy as np
+import pandas as pd
+from hashing import HashSet, row_hashes
+
+SEVERITIES = ('error', 'warn')
+
+
+class ValidationError(ValueError):
+    """Raised when data breaks an error-severity rule. The full report is in ``report``."""
+
+    def __init__(self, report):
+        self.report = report
+        failed = [entry['rule'] for entry in report.failed()]
+        super().__init__(f"Data failed {len(failed)} validation rule(s): {', '.join(failed)}.")
+
+
+class Rule:
+    """One check on a column, evaluated as a vectorised mask of offending rows per chunk."""
+
+    aggregate = False  # Decided over the whole data in finish() rather than row by row
+
+    def __init__(self, column, severity='error'):
+        if severity not in SEVERITIES:
+            raise ValueError(f"Unknown severity '{severity}'. Use one of {list(SEVERITIES)}.")
+        self.column = column
+        self.severity = severity
+
+    def violations(self, values):
+        """Boolean mask of the offending values of one chunk's column. Missing values never offend."""
+        raise NotImplementedError
+
+    def describe(self):
+        return f"{type(self).__name__.lower()}({self.column})"
+
+
+class Required(Rule):
+    """The column must be present. Checked against each chunk's columns rather than its values."""
+
+    def violations(self, values):
+        return np.zeros(len(values), dtype=bool)
+
+
+class DType(Rule):
+    """Every value must be readable as a type: 'integer', 'numeric', 'datetime' or 'bool'."""
+
+    KINDS = ('integer', 'numeric', 'datetime', 'bool')
+    BOOLEANS = [True, False, 0, 1, 'true', 'false', 'True', 'False', 'TRUE', 'FALSE']
+
+    def __init__(self, column, kind, date_format=None, severity='error'):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown dtype '{kind}'. Use one of {list(self.KINDS)}.")
+        super().__init__(column, severity)
+        self.kind = kind
+        self.date_format = date_format
+
+    def violations(self, values):
+        present = values.notna().to_numpy()
+        if self.kind == 'bool':
+            return present & ~values.isin(self.BOOLEANS).to_numpy()
+        if self.kind == 'datetime':
+            if pd.api.types.is_datetime64_any_dtype(values):
+                return np.zeros(len(values), dtype=bool)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')  # Format inference warnings, once per chunk
+                parsed = pd.to_datetime(values, errors='coerce', format=self.date_format)
+            return present & parsed.isna().to_numpy()
+        parsed = values if pd.api.types.is_numeric_dtype(values) else pd.to_numeric(values, errors='coerce')
+        bad = present & parsed.isna().to_numpy()
+        if self.kind == 'integer':
+            numbers = parsed.astype('float64').to_numpy()
+            with np.errstate(invalid='ignore'):
+                bad |= present & ~np.isnan(numbers) & (np.mod(numbers, 1) != 0)
+        return bad
+
+    def describe(self):
+        return f"dtype({self.column}={self.kind})"
+
+
+class Range(Rule):
+    """Values must lie within [min, max]. Either bound may be None."""
+
+    def __init__(self, column, min=None, max=None, severity='error'):
+        super().__init__(column, severity)
+        self.min, self.max = min, max
+
+    def violations(self, values):
+        low, high = self.min, self.max
+        if pd.api.types.is_datetime64_any_dtype(values):
+            low = None if low is None else pd.Timestamp(low)
+            high = None if high is None else pd.Timestamp(high)
+        elif not pd.api.types.is_numeric_dtype(values) and isinstance(low if low is not None else high, (int, float)):
+            values = pd.to_numeric(values, errors='coerce')  # Unreadable values are the dtype rule's concern
+        bad = np.zeros(len(values), dtype=bool)
+        if low is not None:
+            bad |= (values < low).fillna(False).to_numpy(dtype=bool)
+        if high is not None:
+            bad |= (values > high).fillna(False).to_numpy(dtype=bool)
+        return bad
+
+    def describe(self):
+        return f"range({self.column} in [{self.min}, {self.max}])"
+
+
+class Allowed(Rule):
+    """Values must be one of a fixed set."""
+
+    def __init__(self, column, values, severity='error'):
+        super().__init__(column, severity)
+        self.values = list(values)
+
+    def violations(self, values):
+        return (values.notna() & ~values.isin(self.values)).to_numpy()
+
+    def describe(self):
+        shown = self.values if len(self.values) <= 5 else self.values[:5] + ['...']
+        return f"allowed({self.column} in {shown})"
+
+
+class Unique(Rule):
+    """No value may repeat, across all chunks.
+
+    Seen values are kept as 64-bit hashes in a HashSet, so checking a chunk is a binary
+    search per value and memory is 8 bytes per distinct value.
+    """
+
+    def __init__(self, column, severity='error'):
+        super().__init__(column, severity)
+        self.hashes = HashSet()
+
+    def reset(self):
+        self.hashes = HashSet()
+
+    def violations(self, values):
+        return self.hashes.repeats(row_hashes(values), values.notna().to_numpy())
+
+
+class Pattern(Rule):
+    """Values, as text, must match a regular expression in full."""
+
+    def __init__(self, column, pattern, severity='error'):
+        super().__init__(column, severity)
+        self.pattern = pattern
+        re.compile(pattern)  # Reject a bad pattern when the rules are built, not mid-load
+
+    def violations(self, values):
+        matched = values.astype('string').str.fullmatch(self.pattern)
+        return (values.notna() & ~matched.fillna(False)).to_numpy(dtype=bool)
+
+    def describe(self):
+        return f"pattern({self.column} ~ {self.pattern})"
+
+
+class NullRate(Rule):
+    """At most a share of the column's values may be missing."""
+
+    aggregate = True
+
+    def __init__(self, column, max_rate, severity='error'):
+        super().__init__(column, severity)
+        self.max_rate = max_rate
+
+    def violations(self, values):
+        return values.isna().to_numpy()
+
+    def passes(self, count, rows):
+        return rows == 0 or count / rows <= self.max_rate
+
+    def describe(self):
+        return f"null_rate({self.column} <= {self.max_rate:g})"
+
+
+class ValidationReport:
+    """Counts and sample offending rows per rule, for one pass over the data.
+
+    Whole-data rules stay undecided (``passed`` is None) until the pass is finished.
+    """
+
+    def __init__(self, rules, max_samples):
+        self.rows = 0
+        self.max_samples = max_samples
+        self.entries = [{'rule': rule.describe(), 'column': rule.column, 'severity': rule.severity,
+                         'violations': 0, 'samples': [], 'passed': None if rule.aggregate else True} for rule in rules]
+
+    def failed(self, severity='error'):
+        return [entry for entry in self.entries if entry['passed'] is False and entry['severity'] == severity]
+
+    @property
+    def passed(self):
+        return not self.failed()
+
+    def table(self):
+        """One row per rule with its violation count and the first offending rows."""
+        return pd.DataFrame([{
+            'rule': entry['rule'],
+            'severity': entry['severity'],
+            'violations': entry['violations'],
+            'status': {True: 'ok', None: 'pending'}.get(entry['passed'],
+                                                        'FAILED' if entry['severity'] == 'error' else 'warning'),
+            'examples': ', '.join(f"row {s['row']}: {s['value']!r}" for s in entry['samples']),
+        } for entry in self.entries])
+
+
+class Validator:
+    """Declarative data-quality rules, checked chunk by chunk while the data is read.
+
+    Each rule turns a chunk's column into a boolean mask of offending rows. Only the
+    counts and the first few offending rows are kept, so memory stays bounded by the chunk
+    size (plus 8 bytes per distinct value for uniqueness rules). Null-rate rules are decided
+    once every chunk has been seen. With ``fail_fast`` the first chunk that breaks an
+    error-severity row rule stops the pass.
+
+    Rules are usually built from a spec, a dict or JSON file such as::
+
+        {"fail_fast": false, "max_samples": 5,
+         "columns": {"Store": {"dtype": "integer", "min": 1, "max": 45},
+                     "Date": {"dtype": "datetime", "max_null_rate": 0},
+                     "Is_Holiday": {"allowed": [0, 1], "severity": "warn"},
+                     "Order_ID": {"unique": true, "pattern": "[A-Z]{2}\\\\d{6}", "required": false}}}
+
+    Listed columns are required unless ``"required": false``.
+    """
+
+    def __init__(self, rules, max_samples=5, fail_fast=False):
+        self.rules = list(rules)
+        self.max_samples = max_samples
+        self.fail_fast = fail_fast
+        self.report = None
+        self._active = self.rules
+
+    @classmethod
+    def from_spec(cls, spec):
+        rules = []
+        for column, options in spec.get('columns', {}).items():
+            options = dict(options)
+            severity = options.pop('severity', 'error')
+            if options.pop('required', True):
+                rules.append(Required(column, severity))
+            if 'dtype' in options:
+                rules.append(DType(column, options.pop('dtype'), options.pop('date_format', None), severity))
+            if 'min' in options or 'max' in options:
+                rules.append(Range(column, options.pop('min', None), options.pop('max', None), severity))
+            if 'allowed' in options:
+                rules.append(Allowed(column, options.pop('allowed'), severity))
+            if options.pop('unique', False):
+                rules.append(Unique(column, severity))
+            if 'pattern' in options:
+                rules.append(Pattern(column, options.pop('pattern'), severity))
+            if 'max_null_rate' in options:
+                rules.append(NullRate(column, options.pop('max_null_rate'), severity))
+            if options:
+                raise ValueError(f"Unknown validation options for '{column}': {sorted(options)}.")
+        return cls(rules, spec.get('max_samples', 5), spec.get('fail_fast', False))
+
+    @classmethod
+    def load(cls, rules):
+        """A Validator from a Validator, a spec dict or the path of a JSON spec."""
+        if rules is None or isinstance(rules, Validator):
+            return rules
+        if isinstance(rules, str):
+            with open(rules) as handle:
+                rules = json.load(handle)
+        return cls.from_spec(rules)
+
+    def begin(self, columns=None):
+        """Start a pass. ``columns`` limits the rules to the columns being read (None: all)."""
+        self._active = [rule for rule in self.rules if columns is None or rule.column in columns]
+        for rule in self._active:
+            if isinstance(rule, Unique):
+                rule.reset()
+        self._counts = np.zeros(len(self._active), dtype='int64')
+        self.report = ValidationReport(self._active, self.max_samples)
+
+    def update(self, chunk):
+        """Check one chunk; raises ValidationError when failing fast."""
+        start = self.report.rows
+        for i, (rule, entry) in enumerate(zip(self._active, self.report.entries)):
+            if rule.column not in chunk.columns:
+                if isinstance(rule, Required) and entry['passed']:
+                    entry['passed'] = False
+                    entry['samples'].append({'row': start, 'value': 'column missing'})
+                continue
+            bad = rule.violations(chunk[rule.column])
+            count = int(bad.sum())
+            entry['violations'] += count
+            if count and not rule.aggregate:
+                entry['passed'] = False
+                room = self.max_samples - len(entry['samples'])
+                if room > 0:
+                    positions = np.flatnonzero(bad)[:room]
+                    values = chunk[rule.column].iloc[positions].tolist()
+                    entry['samples'].extend({'row': start + int(p), 'value': v} for p, v in zip(positions, values))
+        self.report.rows += len(chunk)
+        if self.fail_fast and not self.report.passed:
+            raise ValidationError(self.report)
+
+    def finish(self):
+        """Decide the whole-data rules and return the report; raises ValidationError if an error rule failed."""
+        for rule, entry in zip(self._active, self.report.entries):
+            if rule.aggregate:
+                entry['passed'] = rule.passes(entry['violations'], self.report.rows)
+        if not self.report.passed:
+            raise ValidationError(self.report)
+        return self.report
+
+    def validate(self, chunks, columns=None):
+        """Check an iterable of chunks in one pass and return the report."""
+        self.begin(columns)
+        for chunk in chunks:
+            self.update(chunk)
+        return self.finish()
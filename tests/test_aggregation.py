@@ -0,0 +1,94 @@
+# test_aggregation.py
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from aggregation import AggregationEngine, PartialAggregate
+from data_loader import DataLoader
+from data_vista import DataVista
+
+
+class TestAggregation(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 20_000
+        self.data = pd.DataFrame({'store': rng.integers(0, 5, n), 'dept': rng.choice(['a', 'b', None], n),
+                                  'sales': rng.normal(100, 20, n), 'qty': rng.integers(0, 10, n)})
+        self.data.loc[::9, 'sales'] = np.nan
+
+    def test_matches_pandas_in_parallel(self):
+        engine = AggregationEngine(self.data, chunksize=3000, max_workers=3)
+        result = engine.aggregate(['store', 'dept'], ['sales', 'qty'])
+        expected = self.data.groupby(['store', 'dept'], dropna=False)[['sales', 'qty']].agg(
+            ['count', 'sum', 'mean', 'min', 'max', 'std'])
+        np.testing.assert_allclose(result.to_numpy(dtype=float), expected.to_numpy(dtype=float))
+
+    def test_merged_states_and_quantile_sketch(self):
+        halves = [PartialAggregate.from_chunk(part, ['store'], ['sales'], sketch_size=100_000)
+                  for part in (self.data.iloc[:7000], self.data.iloc[7000:])]
+        merged = halves[0].merge(halves[1]).result(['std', 'median'])
+        expected = self.data.groupby('store')['sales'].agg(['std', 'median'])
+        np.testing.assert_allclose(merged.to_numpy(), expected.to_numpy())  # Exact while groups fit the sketch
+
+        approximate = AggregationEngine(self.data, sketch_size=500).aggregate('store', 'sales', ['p90'])
+        exact = self.data.groupby('store')['sales'].quantile(0.9)
+        self.assertLess(np.abs(approximate[('sales', 'p90')] - exact).max(), 5)
+
+    def test_cache_rollup_and_pivot_margins(self):
+        engine = AggregationEngine(self.data)
+        fine = engine.state(['store', 'dept'], ['sales'])
+        self.assertIs(engine.state(['store', 'dept'], ['sales']), fine)
+        with self.assertLogs(level='INFO') as logs:
+            by_store = engine.aggregate('store', 'sales', ['mean', 'std'])
+        self.assertIn('rolled up', logs.output[0])
+        np.testing.assert_allclose(by_store.to_numpy(), self.data.groupby('store')['sales'].agg(['mean', 'std']).to_numpy())
+
+        table = engine.pivot('store', 'dept', 'sales', 'mean', margins=True)
+        self.assertAlmostEqual(table.loc['All', 'All'], self.data['sales'].mean())
+        np.testing.assert_allclose(table['All'].iloc[:-1], self.data.groupby('store')['sales'].mean())
+
+        data = self.data.assign(region=np.where(self.data['store'] < 2, 'north', 'south'),
+                                qty_band=np.where(self.data['qty'] < 5, 'low', 'high'),
+                                dept=self.data['dept'].fillna('none'))  # pivot_table leaves out missing keys
+        table = AggregationEngine(data).pivot(['region', 'store'], ['dept', 'qty_band'], 'sales', 'mean', margins=True)
+        expected = data.pivot_table('sales', ['region', 'store'], ['dept', 'qty_band'], 'mean', margins=True)
+        self.assertEqual(table.index[-1], ('All', ''))
+        self.assertEqual(table.columns[-1], ('All', ''))
+        pd.testing.assert_frame_equal(table, expected, check_names=False, check_like=True)
+
+    def test_data_vista_cache_follows_edits(self):
+        app = DataVista()
+        app.data = self.data.assign(label=pd.Categorical(np.where(self.data['qty'] < 5, 'low', 'high')))
+        engine = app.get_aggregator()
+        before = app.aggregate('store', 'qty', ['sum'])
+        app.machine_learning('label', 'Logistic Regression')  # Codes the label in place
+        self.assertIsNot(app.get_aggregator(), engine)  # The cached states were dropped with the edit
+        coded = app.aggregate('store', 'label', ['sum'])
+        np.testing.assert_allclose(coded[('label', 'sum')], app.data.groupby('store')['label'].sum())
+        pd.testing.assert_frame_equal(app.aggregate('store', 'qty', ['sum']), before)
+
+    def test_streams_files(self):
+        root = tempfile.mkdtemp()
+        try:
+            frame = self.data.drop(columns='dept')
+            for i, start in enumerate(range(0, len(frame), 7000)):
+                frame.iloc[start:start + 7000].to_csv(os.path.join(root, f'part_{i}.csv'), index=False)
+            engine = AggregationEngine(loader=DataLoader(root), chunksize=2500, max_workers=2)
+            result = engine.aggregate('store', 'qty', ['count', 'sum'])
+            expected = self.data.groupby('store')['qty'].agg(['count', 'sum'])
+            np.testing.assert_array_equal(result.to_numpy(), expected.to_numpy())
+            with self.assertRaises(KeyError):
+                engine.aggregate('region', 'qty')
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
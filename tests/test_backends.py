@@ -0,0 +1,68 @@
+# test_backends.py
+import sys
+import os
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from backends import pl, get_backend
+from data_loader import DataLoader
+from data_cleaner import DataCleaner
+from data_preprocessor import DataPreprocessor
+
+DATA_FILES = ['data/walmart_grocery_data.csv', 'data/customer_churn.csv', 'data/market_research.csv', 'data/test_data_with_duplicates.csv']
+
+
+@unittest.skipUnless(pl is not None, "polars is not installed")
+class TestBackendParity(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({
+            'a': rng.normal(size=200),
+            'b': rng.integers(0, 5, size=200).astype('float64'),
+            'c': rng.choice(['x', 'y'], size=200),
+        })
+        self.data.loc[::7, 'a'] = np.nan
+        self.data = pd.concat([self.data, self.data.iloc[:20]], ignore_index=True)
+
+    def run_pipeline(self, path, backend):
+        data = DataLoader(path, backend=backend).load()
+        data = DataCleaner(data, backend).clean('fill', 'mean')
+        return DataPreprocessor(data, '1', '1', {}, backend).preprocess_data()
+
+    def test_pipeline_matches_pandas(self):
+        for path in DATA_FILES:
+            with self.subTest(path=path):
+                pd.testing.assert_frame_equal(self.run_pipeline(path, 'polars'), self.run_pipeline(path, 'pandas'),
+                                              check_dtype=False, check_index_type=False)
+
+    def test_duplicates_and_quantiles(self):
+        pandas, polars = get_backend('pandas'), get_backend('polars')
+        np.testing.assert_array_equal(polars.duplicated(self.data), pandas.duplicated(self.data))
+        np.testing.assert_allclose(polars.quantiles(self.data['a'], [0.25, 0.75]), pandas.quantiles(self.data['a'], [0.25, 0.75]))
+
+    def test_statistics_match_pandas(self):
+        pandas, polars = get_backend('pandas'), get_backend('polars')
+        columns = ['a', 'b']
+        pd.testing.assert_frame_equal(polars.describe(self.data, columns), pandas.describe(self.data, columns))
+        pd.testing.assert_frame_equal(polars.corr(self.data.dropna(), columns), pandas.corr(self.data.dropna(), columns))
+
+    def test_stage_converts_each_column_once(self):
+        polars = get_backend('polars')
+        data = self.data.dropna()
+        with mock.patch.object(pl, 'from_pandas', wraps=pl.from_pandas) as from_pandas:
+            polars.describe(data, ['a', 'b'])
+            polars.corr(data, ['a', 'b'])
+            polars.corr(data, ['b', 'a'])
+            self.assertEqual(from_pandas.call_count, 1)
+            polars.duplicated(data)  # Adds the remaining column only
+            self.assertEqual(list(from_pandas.call_args[0][0].columns), ['c'])
+            polars.describe(data.copy(), ['a'])  # Another frame is converted afresh
+            self.assertEqual(from_pandas.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# test_backtest.py
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from data_vista import DataVista
+from machine_learning import TimeSeriesAnalysis, forecast_errors, rolling_origin_folds
+from session import SessionWorkspace
+
+
+class TestBacktest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(0)
+        changes = np.zeros(240)
+        for t in range(1, 240):
+            changes[t] = 0.7 * changes[t - 1] + rng.normal()
+        self.data = pd.DataFrame({'sales': 100 + np.cumsum(changes)})  # An ARIMA(1, 1, 0) series
+        self.orders = [(1, 1, 0), (0, 1, 1), (2, 1, 2)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_folds_and_errors(self):
+        self.assertEqual(rolling_origin_folds(50, 5, 3), [(0, 35, 40), (0, 40, 45), (0, 45, 50)])
+        self.assertEqual(rolling_origin_folds(50, 5, 3, 'sliding', 20), [(15, 35, 40), (20, 40, 45), (25, 45, 50)])
+        with self.assertRaises(ValueError):
+            rolling_origin_folds(20, 5, 4)
+        with self.assertRaises(ValueError):
+            rolling_origin_folds(50, 5, 3, 'rolling')
+
+        errors = forecast_errors(np.array([10.0, 0.0, 20.0, 5.0]), np.array([12.0, 1.0, 17.0, np.nan]))
+        self.assertAlmostEqual(errors['mae'], 2.0)
+        self.assertAlmostEqual(errors['rmse'], np.sqrt(14 / 3))
+        self.assertAlmostEqual(errors['mape'], (20 + 15) / 2)  # The zero actual is left out
+
+    def test_leaderboard_in_parallel_matches_single_fits(self):
+        ts = TimeSeriesAnalysis(self.data)
+        cold = ts.backtest('sales', self.orders, horizon=4, n_folds=6, workers=1, warm_start=False)
+        self.assertEqual(cold['rank'].tolist(), [1, 2, 3])
+        self.assertTrue(cold['rmse'].is_monotonic_increasing)
+        self.assertEqual(cold['failed'].sum(), 0)
+
+        # Each fold is an ordinary fit on the points before its origin
+        series = self.data['sales'].to_numpy()
+        scores = ts.fold_scores
+        fold = scores[(scores['order'].map(str) == '(0, 1, 1)') & (scores['fold'] == 2)].iloc[0]
+        forecast = ARIMA(series[:fold['origin']], order=(0, 1, 1)).fit().forecast(4)
+        self.assertAlmostEqual(fold['mae'], np.abs(forecast - series[fold['origin']:fold['origin'] + 4]).mean())
+
+        warm = ts.backtest('sales', self.orders, horizon=4, n_folds=6, workers=2)
+        self.assertEqual(len(ts.fold_scores), 18)
+        pd.testing.assert_frame_equal(warm[['order', 'folds', 'failed']], cold[['order', 'folds', 'failed']])
+        np.testing.assert_allclose(warm['rmse'], cold['rmse'], rtol=0.02)  # Same optimum, other starting point
+
+    def test_warm_start_when_workers_outnumber_orders(self):
+        ts = TimeSeriesAnalysis(self.data)
+        cold = ts.backtest('sales', [(2, 1, 2)], horizon=4, n_folds=6, workers=8, warm_start=False)
+        cold_iterations = ts.fold_scores['iterations'].to_numpy()
+        warm = ts.backtest('sales', [(2, 1, 2)], horizon=4, n_folds=6, workers=8)
+        unchanged = ts.fold_scores['iterations'].to_numpy() == cold_iterations
+        self.assertLessEqual(unchanged.sum(), 6 // TimeSeriesAnalysis.MIN_RUN_FOLDS)  # Only each run's first fold is cold
+        self.assertLess(warm['mean_iterations'].iloc[0], cold['mean_iterations'].iloc[0])
+
+    def test_data_vista_saves_the_leaderboard(self):
+        app = DataVista(workspace=SessionWorkspace(os.path.join(self.tmp_dir, 'workspace')))
+        path = os.path.join(self.tmp_dir, 'sales.csv')
+        self.data.to_csv(path, index=False)
+        app.load_data(path)
+        board = app.backtest('sales', [(1, 1, 0), (0, 1, 1)], horizon=5, n_folds=4, window='sliding', train_size=60)
+        self.assertEqual(len(board), 2)
+        saved = app.workspace.analyses()[-1]
+        self.assertEqual((saved['kind'], saved['result']['window']), ('backtest', 'sliding'))
+        self.assertEqual(saved['result']['leaderboard'][0]['order'], list(board['order'].iloc[0]))
+        self.assertEqual(set(app.ml.backtest_folds['train_rows']), {60})
+
+        self.assertIsNone(app.backtest('sales', [(1, 1, 0)], horizon=100, n_folds=3))  # Too short
+
+
+if __name__ == '__main__':
+    unittest.main()
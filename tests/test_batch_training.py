@@ -0,0 +1,93 @@
+# test_batch_training.py
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from data_vista import DataVista
+from machine_learning import MachineLearning
+from model_registry import ModelRegistry
+from session import SessionWorkspace
+
+
+class TestBatchTraining(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(0)
+        n = 3000
+        self.data = pd.DataFrame({
+            'price': rng.normal(10, 2, n),
+            'promo': rng.integers(0, 2, n).astype('float64'),
+            'region': rng.choice(['north', 'south', 'east'], n),
+        })
+        self.data['units'] = 5 * self.data['price'] + 3 * self.data['promo'] + rng.normal(size=n)
+        self.data['revenue'] = self.data['units'] * self.data['price']
+        self.data['margin'] = 0.2 * self.data['revenue'] + rng.normal(size=n)
+        self.data.loc[::9, 'margin'] = np.nan  # Fitted in a solve of its own
+        self.data['churn'] = np.where(self.data['price'] + rng.normal(size=n) > 10, 'yes', 'no')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_multi_output_linear_matches_single_fits(self):
+        targets = ['units', 'revenue', 'margin']
+        ml = MachineLearning(self.data)
+        table = ml.batch(dict.fromkeys(targets, 'regression'), 'linear_regression')
+        self.assertEqual(table['target'].tolist(), targets)
+        self.assertEqual(table['train_rows'].tolist(), [2400, 2400, 2132])
+        self.assertNotIn('accuracy', table.columns)
+
+        features = self.data[['price', 'promo']]
+        for target in targets:
+            labelled = self.data[target].notna()
+            X_train, _, y_train, _ = train_test_split(features[labelled], self.data.loc[labelled, target],
+                                                      test_size=0.2, random_state=42)
+            single = LinearRegression().fit(X_train, y_train)
+            model, info = ml.batch_models[target]
+            np.testing.assert_allclose(model.coef_, single.coef_)
+            self.assertAlmostEqual(model.intercept_, single.intercept_)
+            self.assertEqual(info['features'], ['price', 'promo'])
+            np.testing.assert_allclose(model.predict(features.head(3)), single.predict(features.head(3)))
+        self.assertIs(ml.batch_models['units'][0].estimator, ml.batch_models['revenue'][0].estimator)  # One joint fit
+
+    def test_trees_train_in_shared_workers(self):
+        data = self.data.assign(churn=(self.data['churn'] == 'yes').astype('int8'))
+        ml = MachineLearning(data)
+        tasks = {'units': 'regression', 'churn': 'classification', 'margin': 'regression'}
+        table = ml.batch(tasks, 'gradient_boosting', workers=2).set_index('target')
+        self.assertGreater(table.loc['units', 'r2'], 0.9)
+        self.assertGreater(table.loc['churn', 'accuracy'], 0.6)
+        self.assertEqual(table.loc['margin', 'train_rows'], 2132)
+        model, info = ml.batch_models['churn']
+        self.assertIsInstance(model, Pipeline)
+        self.assertEqual(info['features'], ['price', 'promo', 'region', 'revenue'])
+        self.assertEqual(set(model.predict(data[info['features']].head(20))), {0, 1})
+
+    def test_data_vista_saves_every_model_and_the_table(self):
+        app = DataVista(workspace=SessionWorkspace(os.path.join(self.tmp_dir, 'workspace')))
+        path = os.path.join(self.tmp_dir, 'sales.csv')
+        self.data.to_csv(path, index=False)
+        app.load_data(path)
+        table = app.batch_machine_learning(['units', 'churn', 'region'], 'Decision Tree')
+        self.assertEqual(table['task'].tolist(), ['regression', 'classification'])  # 'region' isn't binary
+        self.assertEqual(sorted(app.workspace.manifest['models']), ['decision_tree_churn', 'decision_tree_units'])
+        saved = app.workspace.analyses()[-1]
+        self.assertEqual((saved['kind'], len(saved['result']['metrics'])), ('batch_training', 2))
+
+        app.ml.registry = ModelRegistry(os.path.join(self.tmp_dir, 'models'))
+        metas = app.ml.save_batch('kpi')
+        self.assertEqual([meta['name'] for meta in metas], ['kpi_units', 'kpi_churn'])
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, 'models', 'kpi_churn', 'v1', 'batch_metrics.csv')))
+
+
+if __name__ == '__main__':
+    unittest.main()
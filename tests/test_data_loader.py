@@ -0,0 +1,76 @@
+# test_data_loader.py
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from data_loader import DataLoader
+
+
+class TestDataLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        source = pd.read_csv('data/walmart_grocery_data.csv')
+        self.shard_rows = []
+        for i, shard in enumerate([source.iloc[:10], source.iloc[10:25], source.iloc[25:30]]):
+            shard.to_csv(os.path.join(self.tmp_dir, f'day_{i}.csv'), index=False)
+            self.shard_rows.append(len(shard))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_load_glob(self):
+        data = DataLoader(os.path.join(self.tmp_dir, 'day_*.csv')).load()
+        self.assertEqual(len(data), sum(self.shard_rows))
+        self.assertEqual(data['source_file'].value_counts()['day_1.csv'], self.shard_rows[1])
+
+    def test_load_directory_and_list(self):
+        from_dir = DataLoader(self.tmp_dir).load()
+        from_list = DataLoader([os.path.join(self.tmp_dir, 'day_0.csv'), os.path.join(self.tmp_dir, 'day_2.csv')]).load()
+        self.assertEqual(len(from_dir), sum(self.shard_rows))
+        self.assertEqual(len(from_list), self.shard_rows[0] + self.shard_rows[2])
+
+    def test_schema_mismatch(self):
+        pd.DataFrame({'Other': [1, 2]}).to_csv(os.path.join(self.tmp_dir, 'day_3.csv'), index=False)
+        self.assertIsNone(DataLoader(self.tmp_dir).load())
+
+    def test_iter_chunks(self):
+        chunks = list(DataLoader(self.tmp_dir).iter_chunks(chunksize=4))
+        self.assertTrue(all(len(chunk) <= 4 for chunk in chunks))
+        self.assertEqual(sum(len(chunk) for chunk in chunks), sum(self.shard_rows))
+
+    def test_detect_format(self):
+        source = pd.read_csv(os.path.join(self.tmp_dir, 'day_1.csv'))
+        source.to_json(os.path.join(self.tmp_dir, 'records.json'), orient='records', lines=True)
+        source.to_json(os.path.join(self.tmp_dir, 'array.json'), orient='records')
+        loader = DataLoader([])
+        self.assertEqual(loader.detect_format(os.path.join(self.tmp_dir, 'records.json')), 'jsonl')
+        self.assertEqual(loader.detect_format(os.path.join(self.tmp_dir, 'array.json')), 'json')
+        self.assertEqual(loader.detect_format(os.path.join(self.tmp_dir, 'day_1.csv')), 'csv')
+        self.assertEqual(len(DataLoader(os.path.join(self.tmp_dir, 'records.json')).load()), self.shard_rows[1])
+
+    def test_stream_jsonl_and_excel(self):
+        source = pd.read_csv('data/walmart_grocery_data.csv')
+        jsonl_path = os.path.join(self.tmp_dir, 'sales.ndjson')
+        excel_path = os.path.join(self.tmp_dir, 'sales.xlsx')
+        source.to_json(jsonl_path, orient='records', lines=True)
+        with pd.ExcelWriter(excel_path) as writer:
+            pd.DataFrame({'Note': ['cover sheet']}).to_excel(writer, sheet_name='Cover', index=False)
+            source.to_excel(writer, sheet_name='Sales', index=False)
+
+        for loader in (DataLoader(jsonl_path), DataLoader(excel_path, sheet_name='Sales')):
+            chunks = list(loader.iter_chunks(chunksize=7))
+            self.assertTrue(all(len(chunk) <= 7 for chunk in chunks))
+            data = pd.concat(chunks)
+            self.assertEqual(list(data.columns), list(source.columns))
+            pd.testing.assert_series_equal(data['Weekly_Sales'], source['Weekly_Sales'], check_index=False)
+        schema = DataLoader(excel_path, sheet_name='Sales', usecols=['Store', 'Weekly_Sales']).read_schema(nrows=5)
+        self.assertEqual(list(schema.columns), ['Store', 'Weekly_Sales'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+# test_date_inference.py
+import sys
+import os
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from date_inference import infer_date_format, parse_dates
+from data_preprocessor import DataPreprocessor
+
+
+class TestDateInference(unittest.TestCase):
+    def test_infer_format(self):
+        days = pd.date_range('2023-01-01', periods=60, freq='D')
+        self.assertEqual(infer_date_format(pd.Series(days.strftime('%Y-%m-%d'))), '%Y-%m-%d')
+        self.assertEqual(infer_date_format(pd.Series(days.strftime('%d/%m/%Y %H:%M'))), '%d/%m/%Y %H:%M')
+        self.assertEqual(infer_date_format(pd.Series(days.strftime('%m/%d/%Y'))), '%m/%d/%Y')
+        self.assertIsNone(infer_date_format(pd.Series(['apple', 'pear', 'plum'])))
+        self.assertIsNone(infer_date_format(pd.Series(['12', '17', '23'])))
+
+    def test_parse_dates_matches_to_datetime(self):
+        values = pd.Series(['2023-01-05', None, '2023-02-01', 'not a date', '2023-01-05'] * 20, name='when')
+        expected = pd.to_datetime(values, format='%Y-%m-%d', errors='coerce')
+        pd.testing.assert_series_equal(parse_dates(values, '%Y-%m-%d'), expected)
+
+    def test_preprocessor_detects_by_content(self):
+        data = pd.DataFrame({
+            'event': pd.date_range('2023-03-01 08:30', periods=40, freq='D').strftime('%d.%m.%Y %H:%M'),
+            'label': np.resize(['a', 'b'], 40),
+        })
+        preprocessor = DataPreprocessor(data, '2', '2', {})
+        result = preprocessor.preprocess_data()
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(result['event']))
+        self.assertFalse(pd.api.types.is_datetime64_any_dtype(result['label']))
+        self.assertEqual(preprocessor.state['date_formats'], {'event': '%d.%m.%Y %H:%M'})
+        self.assertEqual(preprocessor.date_report[0]['unparsed'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# test_explain.py
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, r2_score
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from explain import permutation_importance
+from machine_learning import MachineLearning
+from model_registry import ModelRegistry
+
+
+class TestExplain(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 3000
+        self.data = pd.DataFrame({'signal': rng.normal(size=n), 'weak': rng.normal(size=n), 'noise': rng.normal(size=n),
+                                  'store': rng.choice(['a', 'b'], n)})
+        self.data['sales'] = 3 * self.data['signal'] + 0.5 * self.data['weak'] + np.where(self.data['store'] == 'a', 2, 0)
+
+    def test_ranking_in_parallel_matches_serial(self):
+        X, y = self.data[['signal', 'weak', 'noise']], self.data['sales']
+        predict = lambda frame: 3 * frame['signal'] + 0.5 * frame['weak']
+        parallel = permutation_importance(predict, X, y, r2_score, n_repeats=3, max_rows=1000, n_jobs=2)
+        serial = permutation_importance(predict, X, y, r2_score, n_repeats=3, max_rows=1000, n_jobs=1)
+        self.assertEqual(parallel['feature'].tolist(), ['signal', 'weak', 'noise'])
+        self.assertEqual(parallel['rank'].tolist(), [1, 2, 3])
+        self.assertEqual(parallel.attrs['rows'], 1000)
+        self.assertAlmostEqual(parallel.loc[2, 'importance'], 0.0)
+        pd.testing.assert_frame_equal(parallel, serial)
+
+    def test_explain_models_and_save_next_to_registered_model(self):
+        root = tempfile.mkdtemp()
+        try:
+            ml = MachineLearning(self.data, registry=ModelRegistry(root))
+            ml.trees('sales', 'gradient_boosting', 'regression')
+            meta = ml.save_model('sales')
+            table = ml.explain(n_repeats=2, n_jobs=1)
+            self.assertEqual(table['feature'].iloc[0], 'signal')
+            self.assertIn('store', table['feature'].tolist())  # Raw columns, before encoding
+            saved = pd.read_csv(os.path.join(root, 'sales', f"v{meta['version']}", 'importance.csv'))
+            self.assertEqual(saved['feature'].tolist(), table['feature'].tolist())
+
+            ml.linear_regression('sales')  # Dense model featurised from raw columns
+            self.assertEqual(ml.explain(n_repeats=2, n_jobs=1)['feature'].iloc[0], 'signal')
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    def test_explain_uses_the_rows_training_held_out(self):
+        data = self.data.copy()
+        data.loc[::7, 'sales'] = np.nan  # Unlabelled rows are left out of the split
+        ml = MachineLearning(data)
+        ml.trees('sales', 'decision_tree', 'regression')
+        holdout = ml.model_info['holdout']
+        self.assertTrue(data.loc[holdout, 'sales'].notna().all())
+        self.assertEqual(len(holdout), int(np.ceil(data['sales'].notna().sum() * 0.2)))
+        self.assertEqual(ml.explain(n_repeats=1, n_jobs=1).attrs['rows'], len(holdout))
+
+        del ml.model_info['holdout']  # E.g. a model loaded from a file
+        with self.assertLogs(level='WARNING'):
+            table = ml.explain(n_repeats=1, n_jobs=1)
+        self.assertEqual(table.attrs['rows'], data['sales'].notna().sum())
+
+    def test_explain_encodes_rows_missing_the_first_category(self):
+        data = pd.DataFrame({'store': np.resize(['a', 'b', 'c'], 600), 'noise': np.resize([1.0, np.nan, 3.0, 4.0], 600)})
+        data['sold_out'] = (data['store'] == 'b').astype('int64')
+        ml = MachineLearning(data)
+        ml.classification('sold_out', 'decision_tree', 'dense')
+        self.assertEqual(ml.model_info['fill_values'], {'noise': data['noise'].mean()})
+        ml.model_info['holdout'] = data.index[data['store'] != 'a']  # No rows of the level get_dummies drops first
+        predict = ml._input_predictor('sold_out')
+        held_out = data.loc[ml.model_info['holdout']]
+        self.assertEqual(accuracy_score(held_out['sold_out'], predict(held_out[['noise', 'store']])), 1.0)
+        table = ml.explain(n_repeats=2, n_jobs=1)
+        self.assertEqual(table['feature'].iloc[0], 'store')
+        self.assertGreater(table['importance'].iloc[0], 0.3)
+
+
+if __name__ == '__main__':
+    unittest.main()
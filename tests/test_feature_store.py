@@ -0,0 +1,104 @@
+# test_feature_store.py
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from data_vista import DataVista
+from feature_store import FeatureStore
+from machine_learning import MachineLearning
+from session import SessionWorkspace
+
+
+class TestFeatureStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.data = pd.read_csv('data/walmart_grocery_data.csv')
+        self.builds = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def build(self, data):
+        self.builds += 1
+        return data.select_dtypes(include=['float64', 'int64'])
+
+    def test_matrix_is_built_once(self):
+        store = FeatureStore()
+        first, columns = store.matrix(self.data, {'model': 'test'}, self.build)
+        second, _ = store.matrix(self.data, {'model': 'test'}, self.build)
+        self.assertEqual(self.builds, 1)
+        self.assertIs(first, second)
+        self.assertFalse(first.flags.writeable)
+        np.testing.assert_array_equal(first, self.data[columns].to_numpy(dtype='float64'))
+
+        changed = self.data.copy()
+        changed.loc[0, 'Weekly_Sales'] += 1
+        store.matrix(changed, {'model': 'test'}, self.build)
+        self.assertEqual(self.builds, 2)
+
+    def test_tracked_versions_skip_hashing(self):
+        store = FeatureStore()
+        data = self.data.copy()
+        store.track(data, 'v1')
+        with mock.patch.object(FeatureStore, 'fingerprint', side_effect=AssertionError('hashed')):
+            store.matrix(data, {'model': 'test'}, self.build)
+            store.matrix(data, {'model': 'test'}, self.build)
+            self.assertEqual(self.builds, 1)
+            data.loc[0, 'Weekly_Sales'] += 1  # Edited in place, so its owner tracks it again
+            store.track(data, 'v2')
+            store.matrix(data, {'model': 'test'}, self.build)
+            self.assertEqual(self.builds, 2)
+        store.matrix(data.copy(), {'model': 'test'}, self.build)  # Untracked frames are hashed
+        self.assertEqual(self.builds, 3)
+
+        app = DataVista()
+        app.load_data('data/walmart_grocery_data.csv')
+        with mock.patch.object(FeatureStore, 'fingerprint', wraps=FeatureStore.fingerprint) as fingerprint:
+            app.machine_learning('Weekly_Sales', 'Linear Regression')
+            app.machine_learning('Weekly_Sales', 'Linear Regression')
+            version = app.data_version
+            app.data = app.data[app.data['Store'] == 1]
+            app.machine_learning('Weekly_Sales', 'Linear Regression')
+        fingerprint.assert_not_called()
+        self.assertNotEqual(app.data_version, version)
+        self.assertEqual(len(app.feature_store._cache), 2)
+
+        # Data restored from a session stage keeps its version, so the workspace's matrices are reused
+        data_path = os.path.join(self.tmp_dir, 'sales.csv')
+        self.data.to_csv(data_path, index=False)
+        for launch in range(2):
+            app = DataVista(workspace=SessionWorkspace(os.path.join(self.tmp_dir, 'workspace')))
+            app.load_data(data_path)
+            with self.assertLogs(level='INFO') as logs:
+                app.machine_learning('Weekly_Sales', 'Linear Regression')
+            built = any('Built feature matrix' in line for line in logs.output)
+            self.assertEqual(built, launch == 0)
+
+    def test_memmap_shared_between_stores(self):
+        FeatureStore(self.tmp_dir, dtype='float32').matrix(self.data, {'model': 'test'}, self.build)
+        values, columns = FeatureStore(self.tmp_dir, dtype='float32').matrix(self.data, {'model': 'test'}, self.build)
+        self.assertEqual(self.builds, 1)
+        self.assertIsInstance(values, np.memmap)
+        self.assertEqual(values.dtype, np.float32)
+        self.assertEqual(values.shape, (len(self.data), len(columns)))
+
+    def test_model_paths_reuse_store(self):
+        store = FeatureStore(self.tmp_dir)
+        ml = MachineLearning(self.data, store)
+        ml.linear_regression('Weekly_Sales')
+        self.assertEqual(list(ml.model.feature_names_in_), ['Store', 'Department', 'Is_Holiday'])
+        ml.clustering(3)
+        entries = len(os.listdir(self.tmp_dir))
+        MachineLearning(self.data, store).linear_regression('Weekly_Sales')
+        self.assertEqual(len(os.listdir(self.tmp_dir)), entries)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# test_governor.py
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from data_loader import DataLoader
+from data_cleaner import DataCleaner
+from data_vista import DataVista
+from governor import MemoryGovernor, MemoryBudgetExceeded, parse_size, process_memory
+from statistical_analysis import StatisticalAnalysis
+
+
+class TestMemoryGovernor(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.tmp_dir, 'sales.csv')
+        rng = np.random.default_rng(0)
+        self.rows = pd.DataFrame({
+            'store': rng.integers(1, 20, size=20_000),
+            'x': rng.normal(size=20_000),
+            'label': rng.choice(['a', 'b', 'c'], size=20_000),
+        })
+        self.rows['y'] = 3 * self.rows['x'] + rng.normal(scale=0.1, size=20_000)
+        self.rows.to_csv(self.data_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def budget(self, extra):
+        """A budget leaving ``extra`` bytes above what this process already uses."""
+        return process_memory() + extra
+
+    def test_sizes_and_source_estimate(self):
+        self.assertEqual(parse_size('512M'), 512 << 20)
+        self.assertEqual(parse_size('1.5GB'), int(1.5 * (1 << 30)))
+        self.assertIsNone(parse_size('auto'))
+        with self.assertRaises(ValueError):
+            parse_size('lots')
+        source = MemoryGovernor(1 << 40).estimate_source(DataLoader(self.data_path))
+        self.assertAlmostEqual(source['rows'], 20_000, delta=200)  # Extrapolated from the first 1000 lines
+        actual = self.rows.memory_usage(deep=True, index=False).sum()
+        self.assertAlmostEqual(source['bytes'] / actual, 1, delta=0.2)
+
+    def test_tight_budget_samples_and_chunks(self):
+        governor = MemoryGovernor(self.budget(1 << 20), chunksize=5000)
+        self.assertEqual(governor.plan_load(DataLoader(self.data_path))['mode'], 'sampled')
+
+        app = DataVista(memory_budget=self.budget(1 << 20))
+        app.load_data(self.data_path)
+        rows = app.governor.decisions[0]['rows']
+        self.assertLess(len(app.data), 20_000)
+        self.assertEqual(len(app.data), rows)
+        self.assertIsNotNone(app.sample_info)
+
+        data = self.rows.copy()
+        governor = MemoryGovernor(self.budget(1_350_000), chunksize=5000)
+        self.assertEqual(governor.plan_clean(data)['mode'], 'chunked')
+        self.assertEqual(governor.plan_statistics(data)['mode'], 'chunked')
+        self.assertEqual(governor.plan_training(data, 'y', 'linear_regression')['mode'], 'sampled')
+        with self.assertRaises(MemoryBudgetExceeded):
+            MemoryGovernor(self.budget(1000)).plan_preprocess(data)
+        self.assertEqual([d['mode'] for d in governor.decisions], ['chunked', 'chunked', 'sampled'])
+
+    def test_chunked_paths_match_in_memory(self):
+        data = pd.concat([self.rows, self.rows.iloc[[3, 15_000, 7]]], ignore_index=True)
+        cleaner = DataCleaner(data, chunksize=4096)
+        np.testing.assert_array_equal(cleaner.duplicated_in_chunks(), data.duplicated().to_numpy())
+
+        numeric = ['store', 'x', 'y']
+        chunked = StatisticalAnalysis(self.rows, chunksize=3000)
+        table = chunked.describe_in_chunks(numeric)
+        expected = self.rows[numeric].describe()
+        pd.testing.assert_frame_equal(table.loc[['count', 'mean', 'std', 'min', 'max']],
+                                      expected.loc[['count', 'mean', 'std', 'min', 'max']], check_dtype=False)
+        np.testing.assert_allclose(table.loc['50%'], expected.loc['50%'], atol=0.05)
+        pd.testing.assert_frame_equal(chunked.corr_in_chunks(numeric), self.rows[numeric].corr(), atol=1e-12)
+
+        gappy = self.rows[numeric].copy()
+        gappy.loc[::5, 'x'] = np.nan
+        gappy.loc[::7, 'y'] = np.nan  # Each pair has its own complete rows
+        pd.testing.assert_frame_equal(StatisticalAnalysis(gappy, chunksize=3000).corr_in_chunks(numeric), gappy.corr(),
+                                      atol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
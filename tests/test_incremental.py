@@ -0,0 +1,108 @@
+# test_incremental.py
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDRegressor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from data_vista import DataVista
+from data_cleaner import DataCleaner
+from session import SessionWorkspace
+
+
+class TestAppendRefresh(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.tmp_dir, 'sales.csv')
+        self.workspace_root = os.path.join(self.tmp_dir, 'workspace')
+        rng = np.random.default_rng(0)
+        self.rows = pd.DataFrame({
+            'Date': pd.date_range('2020-01-01', periods=300).strftime('%Y-%m-%d'),
+            'x': rng.normal(size=300),
+        })
+        self.rows['y'] = 2 * self.rows['x'] + rng.normal(scale=0.1, size=300)
+        self.rows.loc[[5, 210], 'x'] = np.nan
+        self.rows.iloc[:200].to_csv(self.data_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def append(self, rows):
+        with open(self.data_path, 'a') as handle:
+            rows.to_csv(handle, header=False, index=False)
+
+    def run_pipeline(self):
+        app = DataVista(workspace=SessionWorkspace(self.workspace_root))
+        app.load_data(self.data_path)
+        app.clean_data(strategy='fill', fill_method='mean')
+        app.preprocess_data(scale_choice='1', outlier_choice='2', fill_methods={})
+        return app
+
+    def test_appended_rows_are_folded_in(self):
+        first = self.run_pipeline()
+        first.time_series('y', (1, 0, 0))
+        sgd = SGDRegressor(random_state=0).fit(first.data[['x']], first.data['y'])
+        first._attach_model('y', 'sgd', sgd, {'features': ['x']})
+        first.machine_learning('y', 'linear_regression')
+        self.append(self.rows.iloc[200:])
+        self.append(self.rows.iloc[250:251])  # A repeated row
+
+        app = DataVista(workspace=SessionWorkspace(self.workspace_root))
+        self.assertEqual(app.refresh(self.data_path), 'preprocess')
+        self.assertEqual(len(app.data), 300)
+        pd.testing.assert_frame_equal(app.data.iloc[:200], first.data.reset_index(drop=True), check_dtype=False)
+        record = app.workspace.stage_record('load')
+        self.assertEqual((record['rows'], len(record['parts'])), (301, 1))
+
+        # The new rows were cleaned and scaled with the state fitted on the first 200
+        scaler = app.workspace.stage_record('preprocess')['state']['scaler']
+        i = scaler['columns'].index('x')
+        clean_mean = app.workspace.stage_record('clean')['state']['fill_values']['x']
+        self.assertAlmostEqual(app.data.loc[210, 'x'], (clean_mean - scaler['mean'][i]) / scaler['scale'][i])
+
+        statistics = app.workspace.load_artifact('statistics').result(('count', 'mean', 'std'))
+        np.testing.assert_allclose(statistics[('x', 'mean')].iloc[0], app.data['x'].mean())
+        np.testing.assert_allclose(statistics[('y', 'std')].iloc[0], app.data['y'].std())
+
+        models = app.workspace.manifest['models']
+        self.assertEqual(models['sgd_y']['metadata']['rows_seen'], 100)
+        self.assertTrue(models['linear_regression_y']['metadata']['stale'])
+        fit = app.workspace.load_artifact('arima_y')['fit']
+        self.assertEqual(fit.nobs, 300)
+        self.assertEqual(app.workspace.analyses()[-1]['kind'], 'forecast')
+
+        again = DataVista(workspace=SessionWorkspace(self.workspace_root))
+        self.assertEqual(again.refresh(self.data_path), 'preprocess')
+        self.assertEqual(again.workspace.stage_record('preprocess')['rows'], 300)
+
+    def test_watermark_and_rewritten_source(self):
+        self.run_pipeline()
+        self.rows.iloc[100:300].to_csv(self.data_path, index=False)  # A re-export with a moving window
+
+        app = DataVista(workspace=SessionWorkspace(self.workspace_root))
+        self.assertEqual(app.refresh(self.data_path, watermark='Date'), 'preprocess')
+        self.assertEqual(len(app.data), 300)
+        self.assertEqual(app.workspace.stage_record('load')['state']['watermark'], {'column': 'Date', 'value': '2020-10-26'})
+
+        self.rows.iloc[:10].to_csv(self.data_path, index=False)
+        stale = DataVista(workspace=SessionWorkspace(self.workspace_root))
+        self.assertIsNone(stale.refresh(self.data_path))  # Not an append: the session is rebuilt
+        self.assertEqual(stale.workspace.valid_stages(), [])
+
+    def test_cleaning_continues_from_context(self):
+        context = pd.DataFrame({'x': [4.0]}, index=[9])
+        rows = pd.DataFrame({'x': [np.nan, 6.0, np.nan]}, index=[10, 11, 12])
+        filled = DataCleaner.apply_state(rows, {'strategy': 'fill', 'fill_method': 'ffill'}, context)
+        self.assertEqual(filled['x'].tolist(), [4.0, 6.0, 6.0])
+        filled = DataCleaner.apply_state(rows, {'strategy': 'fill', 'fill_method': 'mean', 'fill_values': {'x': 1.5}})
+        self.assertEqual(filled['x'].tolist(), [1.5, 6.0, 1.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
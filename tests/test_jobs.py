@@ -0,0 +1,86 @@
+# test_jobs.py
+import sys
+import os
+import time
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from jobs import JobScheduler
+from data_vista import DataVista
+
+
+def square(report, value):
+    report(0.5, 'halfway')
+    return value * value
+
+
+def sleep_forever(report):
+    while True:
+        time.sleep(0.1)
+
+
+def fail(report):
+    raise ValueError("bad input")
+
+
+def wait_for(scheduler, job, timeout=30):
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        scheduler.poll()
+        time.sleep(0.05)
+
+
+@unittest.skipUnless(JobScheduler.supported(), "background jobs need fork()")
+class TestJobScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = JobScheduler(max_workers=1)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def test_queue_and_results(self):
+        results = []
+        first = self.scheduler.submit('first', square, 3, on_done=results.append)
+        second = self.scheduler.submit('second', square, 4, on_done=results.append)
+        self.assertEqual(second.status, 'queued')
+        wait_for(self.scheduler, second)
+        self.scheduler.collect_finished()
+        self.assertEqual((first.status, second.status), ('done', 'done'))
+        self.assertEqual(results, [9, 16])
+
+    def test_cancel_and_failure(self):
+        blocker = self.scheduler.submit('blocker', sleep_forever)
+        queued = self.scheduler.submit('queued', fail)
+        self.assertTrue(self.scheduler.cancel(blocker.id))
+        self.assertEqual(blocker.status, 'cancelled')
+        wait_for(self.scheduler, queued)
+        self.assertEqual(queued.status, 'failed')
+        self.assertIn('bad input', queued.error)
+        self.assertIn('cancelled', self.scheduler.table())
+
+    def test_training_job_attaches_model(self):
+        app = DataVista(jobs=1)
+        app.load_data('data/walmart_grocery_data.csv')
+        job = app.submit_job('machine_learning', 'Weekly_Sales', 'Linear Regression')
+        wait_for(app.scheduler, job)
+        app.collect_jobs()
+        self.assertEqual(job.status, 'done')
+        self.assertIsNotNone(app.get_ml().model)
+        self.assertEqual((job.progress, job.note), (1.0, 'finished'))
+        app.scheduler.shutdown()
+
+    def test_training_reports_its_stages(self):
+        updates = []
+        app = DataVista()
+        app.progress = lambda fraction, note='': updates.append((fraction, note))
+        app.load_data('data/walmart_grocery_data.csv')
+        app.machine_learning('Weekly_Sales', 'Linear Regression')
+        self.assertEqual(updates, [(0.3, 'features built'), (0.8, 'fit done'), (0.95, 'scoring done')])
+        updates.clear()
+        app.clustering(3)
+        self.assertEqual([note for _, note in updates], ['features built', 'fit done'])
+
+
+if __name__ == '__main__':
+    unittest.main()
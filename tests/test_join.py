@@ -0,0 +1,120 @@
+# test_join.py
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from data_loader import DataLoader
+from data_vista import DataVista
+from governor import MemoryBudgetExceeded, MemoryGovernor, process_memory
+from join import HashJoin
+from session import SessionWorkspace
+
+
+def canonical(data):
+    return data.sort_values(list(data.columns), na_position='last').reset_index(drop=True)
+
+
+class TestHashJoin(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(0)
+        self.transactions = pd.DataFrame({
+            'customer': rng.integers(0, 1500, 12_000),
+            'region': rng.choice(['north', 'south', None], 12_000),
+            'amount': rng.gamma(2.0, 30.0, 12_000).round(2),
+        })
+        self.transactions.loc[::97, 'customer'] = -1  # No such customer
+        customers = pd.DataFrame({
+            'customer': np.arange(2000).astype('float64'),  # Keys of another dtype on this side
+            'region': rng.choice(['north', 'south'], 2000),
+            'churn': rng.choice(['yes', 'no'], 2000),
+        })
+        self.customers = pd.concat([customers, customers.head(300)], ignore_index=True)  # Some keys twice
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_joins_match_pandas_merge(self):
+        small = self.transactions.head(800)  # Smaller than the customers, so it is the side hashed
+        for on in (['customer'], ['customer', 'region']):
+            for how in ('inner', 'left', 'outer'):
+                for left, partitions in [(self.transactions, None), (self.transactions, 6), (small, None)]:
+                    join = HashJoin(left, self.customers, on, how, chunksize=2500, partitions=partitions)
+                    joined = canonical(join.collect())
+                    expected = canonical(pd.merge(left, self.customers, on=on, how=how))
+                    pd.testing.assert_frame_equal(joined, expected, check_dtype=False,
+                                                  obj=f"{how} join on {on}, {join.build} side hashed")
+                    self.assertEqual((join.report['left_rows'], join.report['right_rows'], join.report['rows']),
+                                     (len(left), len(self.customers), len(joined)))
+        self.assertEqual(join.build, 'left')
+
+        joined = HashJoin(self.transactions, self.customers, 'customer', 'left').collect()
+        self.assertEqual(list(joined.columns), ['customer', 'region_x', 'amount', 'region_y', 'churn'])
+        merged = pd.merge(self.transactions, self.customers, on='customer', how='left')
+        self.assertEqual(joined['amount'].tolist(), merged['amount'].tolist())  # Left rows keep their order
+
+    def test_grace_join_spills_partitions_from_files(self):
+        paths = {}
+        for name, data in [('transactions', self.transactions), ('customers', self.customers)]:
+            paths[name] = os.path.join(self.tmp_dir, f'{name}.csv')
+            data.to_csv(paths[name], index=False)
+        spill_dir = os.path.join(self.tmp_dir, 'spill')
+        os.makedirs(spill_dir)
+        join = HashJoin(DataLoader(paths['transactions']), DataLoader(paths['customers']), 'customer', 'outer',
+                        chunksize=1000, partitions=8, spill_dir=spill_dir)
+        output = join.to_csv(os.path.join(self.tmp_dir, 'joined.csv'))
+        expected = pd.merge(pd.read_csv(paths['transactions']), pd.read_csv(paths['customers']), on='customer', how='outer')
+        pd.testing.assert_frame_equal(canonical(pd.read_csv(output)), canonical(expected), check_dtype=False)
+        self.assertEqual((join.report['mode'], join.report['partitions']), ('partitioned', 8))
+        self.assertGreater(join.report['spilled_bytes'], 0)
+        self.assertEqual(os.listdir(spill_dir), [])  # Partitions are removed once joined
+
+        governor = MemoryGovernor(process_memory() + (4 << 20))
+        self.assertEqual(governor.plan_join(50 << 20, 100 << 10)['build'], 'right')
+        decision = governor.plan_join(10 << 20, 50 << 20)
+        self.assertEqual((decision['mode'], decision['build']), ('partitioned', 'left'))
+        self.assertGreater(decision['partitions'], 1)
+        with self.assertRaises(MemoryBudgetExceeded):
+            governor.plan_join(1 << 40, 1 << 40)
+
+    def test_data_vista_joins_several_datasets(self):
+        profiles = pd.DataFrame({'customer': np.arange(0, 2000, 2), 'segment': np.resize(['retail', 'business'], 1000)})
+        paths = []
+        for name, data in [('transactions', self.transactions), ('customers', self.customers.drop(columns='region')),
+                           ('profiles', profiles)]:
+            paths.append(os.path.join(self.tmp_dir, f'{name}.csv'))
+            data.to_csv(paths[-1], index=False)
+        expected = pd.merge(pd.merge(self.transactions, self.customers.drop(columns='region'), on='customer', how='left'),
+                            profiles, on='customer', how='left')
+
+        workspace = os.path.join(self.tmp_dir, 'workspace')
+        app = DataVista(workspace=SessionWorkspace(workspace))
+        reports = app.join_data(paths, 'customer', 'left')
+        self.assertEqual([report['rows'] for report in reports], [len(expected)] * 2)
+        self.assertEqual(list(app.data.columns), list(expected.columns))
+        self.assertEqual(app.workspace.analyses()[-1]['kind'], 'join')
+        app.clean_data(strategy='remove')  # Unknown customers and missing regions leave gaps in the joined rows
+        self.assertEqual(len(app.data), len(expected.drop_duplicates().dropna()))
+        self.assertFalse(app.data.isna().any().any())
+        app.preprocess_data(scale_choice='2', outlier_choice='2', fill_methods={})
+        self.assertIn('segment', app.data.columns)
+
+        again = DataVista(workspace=SessionWorkspace(workspace))
+        self.assertEqual(again.join_data(paths, 'customer', 'left'), [])  # Restored from the session
+        self.assertEqual(len(again.data), len(expected))
+        plain = DataVista(workspace=SessionWorkspace(workspace))
+        plain.load_data(paths)
+        self.assertNotEqual(plain.workspace.path, again.workspace.path)  # Not mixed up with the files' own session
+
+        self.assertIsNone(DataVista().join_data(paths[:2], 'region'))  # Not a column of the customers file
+
+
+if __name__ == '__main__':
+    unittest.main()
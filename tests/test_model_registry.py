@@ -0,0 +1,90 @@
+# test_model_registry.py
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from model_registry import ModelRegistry
+from machine_learning import MachineLearning
+
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.registry = ModelRegistry(self.root)
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({'x': rng.normal(size=100), 'z': rng.normal(size=100)})
+        self.data['y'] = 2 * self.data['x'] + self.data['z']
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_versions_and_metadata(self):
+        model = LinearRegression().fit(self.data[['x', 'z']], self.data['y'])
+        first = self.registry.register('sales', model, self.data, 'y', metrics={'r2': 1.0})
+        second = self.registry.register('sales', model, self.data, 'y', features=['x'])
+        self.assertEqual((first['version'], second['version']), (1, 2))
+        self.assertEqual(first['features'], {'x': 'float64', 'z': 'float64'})
+        self.assertEqual(second['features'], {'x': 'float64'})
+        self.assertEqual(self.registry.get('sales')['version'], 2)
+        self.assertEqual(self.registry.parse_ref('sales:1'), ('sales', 1))
+
+        loaded, meta = self.registry.load('sales', 1, mmap=True)
+        self.assertEqual(meta['metrics'], {'r2': 1.0})
+        self.assertFalse(loaded.coef_.flags.writeable)  # Memory-mapped read-only
+        np.testing.assert_allclose(loaded.predict(self.data[['x', 'z']]), model.predict(self.data[['x', 'z']]))
+        self.assertEqual(ModelRegistry.check(meta, self.data.drop(columns=['z'])), ["missing column 'z'"])
+        with self.assertRaises(KeyError):
+            self.registry.load('sales', 7)
+
+    def test_listing_does_not_unpickle(self):
+        model = LinearRegression().fit(self.data[['x', 'z']], self.data['y'])
+        self.registry.register('a', model, self.data, 'y')
+        self.registry.register('b', model, self.data, 'y')
+        with patch('joblib.load', side_effect=AssertionError('unpickled')):
+            listing = ModelRegistry(self.root).list()
+        self.assertEqual([meta['name'] for meta in listing], ['b', 'a'])
+
+    def test_machine_learning_save_and_load(self):
+        ml = MachineLearning(self.data, registry=self.registry)
+        ml.linear_regression('y')
+        meta = ml.save_model('sales')
+        self.assertEqual(meta['target'], 'y')
+        self.assertIn('r2', meta['metrics'])
+
+        fresh = MachineLearning(self.data, registry=self.registry)
+        fresh.load_model('sales:1')
+        self.assertEqual(fresh.model_info['version'], 1)
+        self.assertIsNotNone(fresh.model)
+
+    def test_dotted_names_reach_the_registry(self):
+        ml = MachineLearning(self.data, registry=self.registry)
+        ml.linear_regression('y')
+        self.assertEqual(ml.save_model('sales.v2')['name'], 'sales.v2')
+        self.assertEqual(ml.save_model('sales.v2')['version'], 2)
+
+        fresh = MachineLearning(self.data, registry=self.registry)
+        fresh.load_model('sales.v2:1')
+        self.assertEqual((fresh.model_info['name'], fresh.model_info['version']), ('sales.v2', 1))
+
+        path = os.path.join(self.root, 'exports', 'sales.v3')
+        os.makedirs(os.path.dirname(path))
+        self.assertIsNone(ml.save_model(f'file:{path}'))
+        self.assertTrue(os.path.isfile(path))
+        self.assertIsNone(self.registry.get('sales.v3'))
+        self.assertEqual(self.registry.file_path('model.joblib'), 'model.joblib')
+        self.assertIsNone(self.registry.file_path('sales.v3'))  # Not a file here, so a name to register
+        fresh.load_model(f'file:{path}')
+        self.assertIsNone(fresh.model_info)
+
+
+if __name__ == '__main__':
+    unittest.main()
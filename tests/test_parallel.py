@@ -0,0 +1,93 @@
+# test_parallel.py
+import sys
+import os
+import unittest
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from parallel import SharedFrame, SharedPool
+from statistical_analysis import StatisticalAnalysis
+
+
+def column_total(shared, column):
+    return column, float(np.nansum(shared.column(column)))
+
+
+def range_sums(shared, task):
+    start, stop = task
+    return shared.frame(['x', 'n'], start, stop).sum().to_numpy()
+
+
+def worker_pid(shared, task):
+    return os.getpid()
+
+
+class TestSharedPool(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({
+            'x': rng.normal(size=50_000),
+            'n': pd.array(np.where(rng.random(50_000) < 0.1, None, rng.integers(0, 100, 50_000)), dtype='Int64'),
+            'flag': rng.random(50_000) < 0.5,
+            'label': rng.choice(['a', 'b'], size=50_000),
+        })
+
+    def test_columns_are_shared_as_views(self):
+        with SharedFrame.create(self.data) as shared:
+            self.assertEqual(shared.columns, ['x', 'n', 'flag'])  # Text columns are not shared
+            self.assertEqual([dtype for _, dtype, _ in shared.spec['columns']], ['<f8', '<f8', '|b1'])
+            attached = SharedFrame.attach(shared.spec)
+            view = attached.column('x', 10, 20)
+            self.assertIs(view.base.base, attached.column('x').base.base)  # No copy of the block
+            np.testing.assert_array_equal(view, self.data['x'].to_numpy()[10:20])
+            self.assertEqual(int(np.isnan(attached.column('n')).sum()), int(self.data['n'].isna().sum()))
+            pd.testing.assert_frame_equal(attached.frame(['flag'], 49_998),
+                                          self.data[['flag']].iloc[49_998:], check_index_type=False)
+            del view
+            attached.close()
+            name = shared.spec['name']
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)  # The owner unlinked the block
+
+    def test_map_and_map_reduce_in_workers(self):
+        with SharedPool(self.data, ['x', 'n'], workers=2) as pool:
+            totals = dict(pool.map(column_total, pool.columns))
+            ranges = pool.row_ranges(7000)
+            sums = pool.map_reduce(range_sums, ranges, lambda a, b: a + b)
+            pids = set(pool.map(worker_pid, ranges))
+        self.assertAlmostEqual(totals['x'], self.data['x'].sum())
+        self.assertEqual(len(ranges), 8)
+        np.testing.assert_allclose(sums, [self.data['x'].sum(), self.data['n'].sum()])
+        self.assertNotIn(os.getpid(), pids)
+
+        with SharedPool(self.data, ['x'], workers=1) as pool:  # In this process, same results
+            self.assertEqual(pool.map(column_total, ['x']), [('x', totals['x'])])
+
+    def test_parallel_statistics_match_serial(self):
+        numeric = ['x', 'n']
+        data = self.data[numeric].astype('float64')
+        serial = StatisticalAnalysis(data, chunksize=6000)
+        parallel = StatisticalAnalysis(data, chunksize=6000, workers=2)
+        self.assertTrue(parallel._parallel())
+        pd.testing.assert_frame_equal(parallel.describe_in_chunks(numeric), serial.describe_in_chunks(numeric))
+        pd.testing.assert_frame_equal(parallel.corr_in_chunks(numeric), serial.corr_in_chunks(numeric))
+
+    def test_workers_do_not_change_statistics(self):
+        data = self.data[['x', 'n']].copy()
+        data['y'] = data['x'] * 2 + np.random.default_rng(1).normal(size=len(data))
+        data.loc[::7, 'x'] = np.nan
+        data.loc[::11, 'y'] = np.nan  # Missing in other rows, so pairs have different complete rows
+        numeric = ['x', 'n', 'y']
+        analysis = StatisticalAnalysis(data, workers=2)
+        analysis.PARALLEL_CHUNK = 5000
+        self.assertTrue(analysis._parallel())
+        pd.testing.assert_frame_equal(analysis.describe_by_column(numeric), data.describe(), check_dtype=False)
+        pd.testing.assert_frame_equal(analysis.corr_by_column(numeric), data.corr())
+
+
+if __name__ == '__main__':
+    unittest.main()
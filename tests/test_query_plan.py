@@ -0,0 +1,99 @@
+# test_query_plan.py
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from data_vista import DataVista
+
+
+class TestLogicalPlan(unittest.TestCase):
+    data_path = 'data/test_data_with_duplicates.csv'
+
+    def run_pipeline(self, lazy, where=None, strategy='remove', outlier_choice='1', scale_choice='1'):
+        app = DataVista(lazy=lazy)
+        app.load_data(self.data_path)
+        if where:
+            app.filter_data(where)
+        app.clean_data(strategy=strategy)
+        app.preprocess_data(scale_choice=scale_choice, outlier_choice=outlier_choice, fill_methods={})
+        return app
+
+    def test_lazy_matches_eager(self):
+        for where in [None, 'Store == 1', 'Weekly_Sales > 30000']:
+            for strategy in ['remove', 'skip']:
+                eager = self.run_pipeline(False, where, strategy).data
+                lazy = self.run_pipeline(True, where, strategy).data
+                pd.testing.assert_frame_equal(eager, lazy)
+
+    def test_nothing_runs_until_consumed(self):
+        app = self.run_pipeline(True)
+        self.assertIsNone(app._data)
+        self.assertIsNotNone(app.data)
+
+    def test_predicate_and_projection_pushdown(self):
+        app = DataVista(lazy=True)
+        app.load_data(self.data_path)
+        app.filter_data('Store == 1')
+        app.preprocess_data(scale_choice='2', outlier_choice='2', fill_methods={})
+        scan, _, _ = app.plan.optimize(['Weekly_Sales'])
+        self.assertEqual(scan.usecols, ['Store', 'Weekly_Sales'])
+        self.assertEqual([p.column for p in scan.predicates], ['Store'])
+        self.assertEqual(list(app._frame_for(['Weekly_Sales']).columns), ['Weekly_Sales'])
+
+    def test_projection_after_cleaning_reads_needed_columns(self):
+        for strategy in ['remove', 'skip']:
+            app = self.run_pipeline(True, strategy=strategy, outlier_choice='2', scale_choice='2')
+            scan, _, notes = app.plan.optimize(['Weekly_Sales'])
+            self.assertIsNone(scan.usecols)  # Dedup and dropna need every column the first time
+            self.assertIn('rows it keeps are cached', ' '.join(notes))
+
+            first = app._frame_for(['Weekly_Sales'])
+            app.filter_data('Store == 1')  # Filters added later still move past the cached steps
+            scan, _, notes = app.plan.optimize(['Weekly_Sales', 'Department'])
+            self.assertEqual(scan.usecols, ['Store', 'Department', 'Weekly_Sales'])
+            self.assertIn('projection continues', ' '.join(notes))
+
+            eager = self.run_pipeline(False, strategy=strategy, outlier_choice='2', scale_choice='2')
+            self.assertEqual(len(first), len(eager.data))
+            eager.filter_data('Store == 1')
+            pd.testing.assert_frame_equal(app._frame_for(['Weekly_Sales', 'Department']),
+                                          eager.data[['Weekly_Sales', 'Department']])
+
+    def test_filter_not_pushed_past_outliers(self):
+        app = self.run_pipeline(True, outlier_choice='1')
+        app.filter_data('Store == 1')
+        scan, nodes, _ = app.plan.optimize()
+        self.assertEqual(scan.predicates, [])
+        self.assertIn('Filter', app.plan.explain().split('Optimized plan:')[1])
+
+    def test_fill_choices_are_asked_once_when_recorded(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'gaps.csv')
+            pd.DataFrame({'Store': [1, 1, 2, 2], 'Sales': [10.0, np.nan, 30.0, np.nan],
+                          'Region': ['north', None, 'south', 'east']}).to_csv(path, index=False)
+            app = DataVista(lazy=True)
+            app.load_data(path)
+            with patch('builtins.input', side_effect=['1', '4', 'unknown']) as answers:  # Sales, Region, its value
+                app.preprocess_data(scale_choice='2', outlier_choice='2')
+                self.assertEqual(answers.call_count, 3)
+            self.assertIn("{'Sales': '1', 'Region': '4'}", app.plan.explain())
+
+            with patch('builtins.input', side_effect=AssertionError("prompted while running the plan")):
+                self.assertEqual(app._frame_for(['Sales'])['Sales'].tolist(), [10.0, 20.0, 30.0, 20.0])
+                self.assertEqual(app.data['Region'].tolist(), ['north', 'unknown', 'south', 'east'])
+                app.filter_data('Store == 2')  # Runs the plan again; the mean fill stays before the filter
+                self.assertEqual(app.data['Sales'].tolist(), [30.0, 20.0])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# test_sampling.py
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from sampling import ReservoirSampler, StratifiedSampler, mean_margins
+from data_vista import DataVista
+
+
+class TestSampling(unittest.TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({
+            'group': np.repeat(['large', 'medium', 'small'], [9000, 900, 100]),
+            'value': np.arange(10_000, dtype='float64'),
+        })
+
+    def stream(self, sampler, chunksize=777):
+        for start in range(0, len(self.data), chunksize):
+            sampler.update(self.data.iloc[start:start + chunksize])
+        return sampler.result()
+
+    def test_reservoir(self):
+        sample = self.stream(ReservoirSampler(500, seed=1))
+        self.assertEqual(len(sample), 500)
+        self.assertTrue(sample['value'].is_unique)
+        self.assertTrue(sample['value'].is_monotonic_increasing)  # Stream order is kept
+        pd.testing.assert_frame_equal(sample, self.stream(ReservoirSampler(500, seed=1)))
+        self.assertEqual(len(self.stream(ReservoirSampler(50_000))), len(self.data))
+
+    def test_stratified_keeps_small_groups(self):
+        sample = self.stream(StratifiedSampler(500, 'group'))
+        self.assertEqual(sample['group'].value_counts().to_dict(), {'large': 450, 'medium': 45, 'small': 5})
+        self.assertTrue(sample['value'].is_monotonic_increasing)
+
+    def test_stratified_sample_and_memory_are_capped(self):
+        self.data['group'] = self.data['value'] % 2000  # More strata than sample rows
+        sampler = StratifiedSampler(500, 'group')
+        for start in range(0, len(self.data), 777):
+            sampler.update(self.data.iloc[start:start + 777])
+            self.assertLessEqual(sampler._kept_rows, 2 * (2 * 500 + 2000))
+        sample = sampler.result()
+        self.assertEqual(len(sample), 500)
+        self.assertTrue(sample['group'].is_unique)
+
+        self.data['group'] = self.data['value'] % 300  # 300 strata still get a row each
+        sample = self.stream(StratifiedSampler(500, 'group'))
+        self.assertEqual(len(sample), 500)
+        self.assertEqual(sample['group'].nunique(), 300)
+
+    def test_stratified_margins(self):
+        rng = np.random.default_rng(0)
+        self.data['value'] = np.where(self.data['group'] == 'large', 0.0, 1000.0) + rng.normal(size=len(self.data))
+        sampler = StratifiedSampler(500, 'group')
+        sample = self.stream(sampler)
+        strata = (sampler.strata, sampler.counts)
+        margins = mean_margins(sample, len(self.data), strata=strata).loc['value']
+        groups = sample.groupby('group')['value']
+        weights, sizes = pd.Series({'large': 0.9, 'medium': 0.09, 'small': 0.01}), pd.Series(sampler.counts)
+        n = groups.count()
+        self.assertAlmostEqual(margins['mean'], (weights * groups.mean()).sum())
+        variance = (weights ** 2 * (1 - n / sizes) * groups.var() / n).sum()
+        self.assertAlmostEqual(margins['margin'], 1.959964 * np.sqrt(variance), places=5)
+        # Within-stratum spread only, far below the spread of a simple random sample across the groups
+        self.assertLess(margins['margin'], mean_margins(sample, len(self.data)).loc['value', 'margin'] / 10)
+        self.assertEqual(margins['n'], 500)
+
+    def test_margins_cover_true_mean(self):
+        sample = self.stream(ReservoirSampler(1000, seed=3))
+        margins = mean_margins(sample, len(self.data)).loc['value']
+        self.assertLessEqual(margins['lower'], self.data['value'].mean())
+        self.assertGreaterEqual(margins['upper'], self.data['value'].mean())
+
+
+class TestSamplingMode(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'sales.csv')
+        source = pd.read_csv('data/walmart_grocery_data.csv')
+        data = pd.concat([source] * 50, ignore_index=True)
+        data['Weekly_Sales'] += np.arange(len(data))  # Keep rows distinct so cleaning drops none
+        data.to_csv(self.path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_sample_then_refine(self):
+        app = DataVista(sample_size=100)
+        app.load_data(self.path)
+        app.clean_data(strategy='skip')
+        app.preprocess_data(scale_choice='2', outlier_choice='2', fill_methods={})
+        self.assertEqual(app.sample_info['rows'], 100)
+        self.assertEqual(app.sample_info['population'], 1000)
+
+        with patch('builtins.print'):
+            app.run_hypothesis_test('t_test', 'Store', 'Department')
+            app.refine()
+        self.assertIsNone(app.sample_info)
+        self.assertEqual(len(app.data), 1000)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(app.data['Date']))
+
+    def test_stratified_sample_reports_stratified_margins(self):
+        app = DataVista(sample_size=100, stratify='Store')
+        app.load_data(self.path)
+        app.filter_data('Weekly_Sales > 0')
+        labels, counts = app.sample_info['strata']
+        self.assertEqual(sum(counts.values()), 1000)
+        self.assertTrue(labels.index.equals(pd.RangeIndex(100)))
+        margins = mean_margins(app.data, app.sample_info['population'], strata=app.sample_info['strata'])
+        self.assertEqual(margins.loc['Weekly_Sales', 'n'], len(app.data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# test_scaling.py
+import sys
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler, RobustScaler, StandardScaler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from data_preprocessor import DataPreprocessor
+from data_vista import DataVista
+from scaling import Scaler
+
+
+class TestScaling(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({
+            'sales': rng.gamma(2.0, 1000.0, 20_000),
+            'store': rng.integers(1, 46, 20_000),
+            'constant': np.full(20_000, 3.0),
+            'region': rng.choice(['north', 'south'], 20_000),
+        })
+        self.columns = ['sales', 'store', 'constant']
+
+    def test_chunked_fit_matches_scikit_learn(self):
+        for method, reference in [('standard', StandardScaler()), ('robust', RobustScaler()), ('minmax', MinMaxScaler())]:
+            expected = reference.fit_transform(self.data[self.columns])
+            scaled = Scaler(method, chunksize=3000).fit_transform(self.data.copy(), self.columns)
+            np.testing.assert_allclose(scaled[self.columns].to_numpy(), expected, atol=1e-12, err_msg=method)
+            self.assertEqual(scaled['region'].tolist(), self.data['region'].tolist())
+
+        # Statistics of two halves merge into those of the whole, missing values left out
+        values = self.data[self.columns].to_numpy(dtype='float64')
+        values[::7, 0] = np.nan
+        frame = pd.DataFrame(values, columns=self.columns)
+        halves = Scaler().partial_fit(frame.iloc[:5000]).partial_fit(frame.iloc[5000:])
+        stats = halves.stats.result(('count', 'mean', 'var')).iloc[0].unstack().loc[self.columns]
+        np.testing.assert_allclose(stats['mean'], np.nanmean(values, axis=0))
+        np.testing.assert_allclose(stats['var'], np.nanvar(values, axis=0, ddof=1))
+        np.testing.assert_array_equal(stats['count'], np.sum(~np.isnan(values), axis=0))
+
+    def test_float32_and_state_replay(self):
+        scaler = Scaler('standard', 'float32', chunksize=4096)
+        for start in range(0, 20_000, 5000):  # Streamed in by hand, e.g. from a reader
+            scaler.partial_fit(self.data[self.columns].iloc[start:start + 5000])
+        scaled = scaler.transform(self.data.copy())
+        self.assertEqual(scaled['sales'].dtype, np.float32)
+        self.assertTrue(np.isfinite(scaled[self.columns].to_numpy()).all())
+        self.assertAlmostEqual(float(scaled['sales'].mean()), 0.0, places=5)
+        self.assertEqual(scaler.state()['scale'][2], 1.0)  # Constant column
+
+        preprocessor = DataPreprocessor(self.data.copy(), scale_choice='3', outlier_choice='2', fill_methods={},
+                                        scale_dtype='float32', chunksize=4096)
+        processed = preprocessor.preprocess_data()
+        state = preprocessor.state['scaler']
+        self.assertEqual((state['method'], state['dtype']), ('robust', 'float32'))
+        replayed = DataPreprocessor.apply_state(self.data.tail(100), preprocessor.state)
+        pd.testing.assert_frame_equal(replayed, processed.tail(100))
+
+    def test_data_vista_min_max_scaling(self):
+        app = DataVista(scale_dtype='float32')
+        app.data = self.data.copy()
+        app.preprocess_data(scale_choice='4', outlier_choice='2', fill_methods={})
+        self.assertEqual(app.data['sales'].dtype, np.float32)
+        self.assertAlmostEqual(float(app.data['sales'].min()), 0.0)
+        self.assertAlmostEqual(float(app.data['sales'].max()), 1.0, places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+# test_serve.py
+import sys
+import os
+import json
+import threading
+import unittest
+import urllib.request
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from serve import MicroBatcher, ModelBundle, ModelHTTPServer, ModelServer, RequestHandler
+
+
+class TestServe(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({'x': rng.normal(size=200), 'store': rng.choice(['a', 'b'], 200)})
+        self.data['y'] = 3 * self.data['x'] + (self.data['store'] == 'b') * 2
+        features = pd.get_dummies(self.data[['x', 'store']], drop_first=True).astype('float64')
+        # Trained on a scaled target, as after the preprocess stage; predictions come back unscaled
+        state = {'scaler': {'columns': ['x', 'y'], 'mean': [0.0, 1.0], 'scale': [1.0, 2.0]}}
+        model = LinearRegression().fit(features, (self.data['y'] - 1.0) / 2.0)
+        self.app = ModelServer([ModelBundle('sales', model, state, target='y')], self.data, workers=2)
+        self.server = ModelHTTPServer(('127.0.0.1', 0), RequestHandler)
+        self.server.app = self.app
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.app.pool.shutdown()
+
+    def request(self, path, body=None, content_type='application/json', accept='application/json'):
+        request = urllib.request.Request(self.url + path, data=body,
+                                         headers={'Content-Type': content_type, 'Accept': accept})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.read().decode()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode()
+
+    def test_predict_json_and_csv(self):
+        rows = [{'x': 1.0, 'store': 'a'}, {'x': 0.0, 'store': 'b'}]
+        status, body = self.request('/predict/sales', json.dumps(rows).encode())
+        self.assertEqual(status, 200)
+        np.testing.assert_allclose(json.loads(body)['predictions'], [3.0, 2.0], atol=1e-6)
+
+        status, body = self.request('/predict', b'x,store\n1.0,b\n', content_type='text/csv', accept='text/csv')
+        self.assertEqual(status, 200)
+        self.assertAlmostEqual(float(body.splitlines()[1]), 5.0, places=6)
+
+    def test_concurrent_requests_are_batched(self):
+        batcher = self.app.batchers['sales']
+        batcher.max_wait, batcher.max_batch = 2.0, 20  # Hold each batch until all 20 requests are queued
+        rows = json.dumps([{'x': 2.0, 'store': 'a'}]).encode()
+        threads = [threading.Thread(target=self.request, args=('/predict', rows)) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(batcher.rows, 20)
+        self.assertLess(batcher.batches, 20)
+
+    def test_micro_batcher_coalesces_and_isolates_failures(self):
+        def predict(frame):
+            if frame['x'].isna().any():
+                raise ValueError('missing x')
+            return frame['x'].to_numpy() * 2
+
+        batcher = MicroBatcher(predict, self.app.pool, max_batch=10, max_wait=2.0)
+        futures = [batcher.submit(pd.DataFrame({'x': [float(i)]})) for i in range(10)]
+        self.assertEqual([future.result(timeout=5)[0] for future in futures], [2.0 * i for i in range(10)])
+        self.assertEqual((batcher.batches, batcher.rows), (1, 10))
+
+        batcher.max_batch = 3
+        futures = [batcher.submit(pd.DataFrame({'x': [value]})) for value in (1.0, np.nan, 3.0)]
+        self.assertEqual(futures[0].result(timeout=5)[0], 2.0)
+        with self.assertRaises(ValueError):
+            futures[1].result(timeout=5)
+        self.assertEqual(futures[2].result(timeout=5)[0], 6.0)
+        self.assertEqual(batcher.batches, 2)  # Retried one by one inside the same batch
+
+    def test_errors_and_stats(self):
+        status, body = self.request('/predict/missing', b'[{"x": 1}]')
+        self.assertEqual(status, 404)
+        status, body = self.request('/predict', b'[{"store": "a"}]')
+        self.assertEqual(status, 400)
+        self.assertIn('x', json.loads(body)['error'])
+
+        status, body = self.request('/stats')
+        self.assertEqual(json.loads(body)['rows'], 200)
+        status, body = self.request('/stats', b'[{"x": 1}, {"x": 3}]')
+        self.assertEqual(json.loads(body)['numeric']['x']['mean'], 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+# test_session.py
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from data_vista import DataVista
+from session import SessionWorkspace
+
+
+class TestSessionWorkspace(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.tmp_dir, 'sales.csv')
+        shutil.copy('data/walmart_grocery_data.csv', self.data_path)
+        self.workspace_root = os.path.join(self.tmp_dir, 'workspace')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def run_pipeline(self, scale_choice='2'):
+        app = DataVista(workspace=SessionWorkspace(self.workspace_root))
+        app.load_data(self.data_path)
+        app.clean_data(strategy='skip')
+        app.preprocess_data(scale_choice=scale_choice, outlier_choice='2', fill_methods={})
+        return app
+
+    def test_stages_are_restored(self):
+        first = self.run_pipeline()
+        first.machine_learning('Weekly_Sales', 'linear_regression')
+
+        workspace = SessionWorkspace(self.workspace_root)
+        workspace.bind([self.data_path])
+        self.assertEqual(workspace.valid_stages(), ['load', 'clean', 'preprocess'])
+        pd.testing.assert_frame_equal(workspace.get_stage('preprocess'), first.data.reset_index(drop=True), check_dtype=False)
+        name, model = workspace.load_model()
+        self.assertEqual(name, 'linear_regression_Weekly_Sales')
+        self.assertIsNotNone(model)
+
+    def test_changed_choice_only_invalidates_preprocess(self):
+        self.run_pipeline(scale_choice='2')
+        workspace = SessionWorkspace(self.workspace_root)
+        workspace.bind([self.data_path])
+        clean_saved_at = workspace.stage_record('clean')['saved_at']
+        clean_file = os.path.join(workspace.path, workspace.stage_record('clean')['file'])
+        clean_mtime = os.path.getmtime(clean_file)
+
+        self.run_pipeline(scale_choice='1')
+        workspace.bind([self.data_path])
+        self.assertEqual(workspace.stage_record('clean')['saved_at'], clean_saved_at)
+        self.assertEqual(os.path.getmtime(clean_file), clean_mtime)
+        self.assertEqual(workspace.stage_record('preprocess')['params']['scale_choice'], '1')
+
+    def test_changed_source_invalidates_everything(self):
+        self.run_pipeline()
+        with open(self.data_path, 'a') as handle:
+            handle.write('2012-10-26,2,1,12345.67,0\n')
+        workspace = SessionWorkspace(self.workspace_root)
+        workspace.bind([self.data_path])
+        self.assertEqual(workspace.valid_stages(), [])
+
+    def test_ml_available_without_training(self):
+        app = DataVista()
+        app.load_data(self.data_path)
+        self.assertIsNotNone(app.get_ml())
+        self.assertIsNone(app.get_ml().model)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+# test_sparse_encoder.py
+import sys
+import os
+import tempfile
+import unittest
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from sparse_encoder import SparseEncoder
+from machine_learning import ClassificationModels
+
+
+class TestSparseEncoder(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 3000
+        self.data = pd.DataFrame({
+            'price': rng.normal(10, 2, size=n),
+            'store': rng.choice(['s1', 's2', 's3'], size=n),
+            'sku': [f'sku_{i}' for i in rng.integers(0, 1500, size=n)],
+            'churn': rng.integers(0, 2, size=n),
+        })
+        self.data.loc[::50, 'store'] = np.nan
+
+    def test_onehot_matches_get_dummies(self):
+        features = self.data.drop(columns=['churn'])
+        encoder = SparseEncoder().fit(features)
+        encoded = encoder.transform(features)
+        expected = pd.get_dummies(features, drop_first=True)
+        self.assertTrue(sparse.isspmatrix_csr(encoded) or sparse.issparse(encoded))
+        self.assertEqual(list(encoder.get_feature_names_out()), list(expected.columns))
+        np.testing.assert_allclose(encoded.toarray(), expected.to_numpy(dtype='float64'))
+
+    def test_unseen_categories_encode_as_zeros(self):
+        encoder = SparseEncoder().fit(self.data[['store', 'sku']])
+        row = encoder.transform(pd.DataFrame({'store': ['s9'], 'sku': ['sku_new']}))
+        self.assertEqual(row.nnz, 0)
+
+    def test_hashing_is_deterministic(self):
+        features = self.data.drop(columns=['churn'])
+        first = SparseEncoder('hash', n_features=256).fit_transform(features)
+        second = SparseEncoder('hash', n_features=256).fit_transform(features)
+        self.assertEqual(first.shape, (len(features), 1 + 256))
+        self.assertEqual((first != second).nnz, 0)
+
+    def test_sparse_model_scores_raw_frames(self):
+        clf = ClassificationModels(self.data)
+        self.assertEqual(clf.choose_encoding('churn'), 'sparse')
+        clf.train('churn', 'logistic_regression')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'model.joblib')
+            joblib.dump(clf.model, path)
+            model = joblib.load(path)
+        predictions = model.predict(self.data.drop(columns=['churn']).head(10))
+        self.assertEqual(len(predictions), 10)
+        self.assertEqual(model[0].vocabulary_['store'], ['s1', 's2', 's3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# test_tree_models.py
+import sys
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from machine_learning import MachineLearning
+from category_encoder import CategoryEncoder
+
+
+class TestTreeModels(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 2000
+        self.data = pd.DataFrame({
+            'x': rng.normal(size=n),
+            'store': rng.choice(['north', 'south', 'east'], n),
+            'date': pd.date_range('2020-01-01', periods=n, freq='D'),
+        })
+        self.data['sales'] = 3 * self.data['x'] + self.data['store'].map({'north': 5, 'south': 0, 'east': -5})
+        self.data['churn'] = (self.data['sales'] > 0).astype('int64')
+        self.data.loc[::10, 'x'] = np.nan  # Left for the trees to route, not imputed
+        self.data.loc[::15, 'store'] = None
+
+    def test_encoder(self):
+        encoder = CategoryEncoder().fit(self.data[['x', 'store', 'date']])
+        encoded = encoder.transform(pd.DataFrame({'x': [1.0], 'store': ['west'], 'date': [pd.Timestamp('1970-01-02')]}))
+        self.assertEqual(encoder.categorical_columns_, ['store'])
+        np.testing.assert_array_equal(encoded[0, [0, 2]], [1.0, 86400.0])
+        self.assertTrue(np.isnan(encoded[0, 1]))  # Unseen category
+
+    def test_regression_and_classification(self):
+        for algorithm in ('random_forest', 'gradient_boosting', 'decision_tree'):
+            ml = MachineLearning(self.data.drop(columns=['churn']))
+            ml.trees('sales', algorithm, 'regression')
+            self.assertGreater(ml.model_info['metrics']['r2'], 0.8, algorithm)
+            self.assertIn('train_rows_per_second', ml.model_info['metrics'])
+            predictions = ml.model.predict(self.data.drop(columns=['sales', 'churn']).head(5))  # Raw rows, NaNs included
+            self.assertEqual(len(predictions), 5)
+
+        ml = MachineLearning(self.data.drop(columns=['sales']))
+        ml.trees('churn', 'gradient_boosting', 'classification')
+        self.assertGreater(ml.model_info['metrics']['accuracy'], 0.8)
+        self.assertLess(ml.model[-1].n_iter_, 500)  # Early stopping
+        self.assertTrue(ml.model[-1].is_categorical_[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
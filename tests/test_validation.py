@@ -0,0 +1,128 @@
+# test_validation.py
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from data_loader import DataLoader
+from data_vista import DataVista
+from session import SessionWorkspace
+from validation import Validator, ValidationError
+
+
+class TestValidation(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.tmp_dir, 'sales.csv')
+        self.spec = {'columns': {
+            'Store': {'dtype': 'integer', 'min': 1, 'max': 45},
+            'Date': {'dtype': 'datetime', 'max_null_rate': 0},
+            'Is_Holiday': {'allowed': [0, 1]},
+            'Weekly_Sales': {'dtype': 'numeric', 'min': 0},
+        }}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_rules_count_and_sample_offending_rows(self):
+        data = pd.DataFrame({
+            'Store': ['1', '2', 'x', '3.5', None, '99'] * 5,
+            'Code': ['A1', 'b2', 'C3', None, 'AA', 'D4'] * 5,
+        })
+        validator = Validator.from_spec({'max_samples': 3, 'columns': {
+            'Store': {'dtype': 'integer', 'max': 45, 'max_null_rate': 0.5},
+            'Code': {'pattern': r'[A-Z]\d', 'severity': 'warn'},
+            'Region': {'required': True},
+        }})
+        with self.assertRaises(ValidationError) as raised:
+            validator.validate(data.iloc[i:i + 4] for i in range(0, len(data), 4))
+        report = raised.exception.report
+        entries = {entry['rule']: entry for entry in report.entries}
+        self.assertEqual(report.rows, 30)
+        self.assertEqual(entries['dtype(Store=integer)']['violations'], 10)
+        self.assertEqual([s['row'] for s in entries['dtype(Store=integer)']['samples']], [2, 3, 8])  # Bounded at 3
+        self.assertEqual(entries['range(Store in [None, 45])']['violations'], 5)
+        self.assertTrue(entries['null_rate(Store <= 0.5)']['passed'])
+        self.assertEqual(entries['pattern(Code ~ [A-Z]\\d)']['violations'], 10)
+        self.assertEqual(entries['required(Region)']['samples'], [{'row': 0, 'value': 'column missing'}])
+        self.assertEqual([entry['rule'] for entry in report.failed('warn')], ['pattern(Code ~ [A-Z]\\d)'])
+
+    def test_uniqueness_across_chunks(self):
+        validator = Validator.from_spec({'columns': {'id': {'unique': True}}})
+        ids = np.arange(10_000)
+        ids[[5000, 9999]] = [17, 4000]  # Repeats of values seen in earlier chunks
+        with self.assertRaises(ValidationError) as raised:
+            validator.validate(pd.DataFrame({'id': ids[i:i + 1000]}) for i in range(0, len(ids), 1000))
+        entry = raised.exception.report.entries[1]
+        self.assertEqual(entry['violations'], 2)
+        self.assertEqual([s['row'] for s in entry['samples']], [5000, 9999])
+        self.assertLessEqual(len(validator.rules[1].hashes.runs), 4)  # Sorted runs are merged as they grow
+
+    def test_loader_rejects_bad_deliveries(self):
+        source = pd.read_csv('data/walmart_grocery_data.csv')
+        source.to_csv(self.data_path, index=False)
+        rules_path = os.path.join(self.tmp_dir, 'rules.json')
+        with open(rules_path, 'w') as handle:
+            json.dump(self.spec, handle)
+        report = DataLoader(self.data_path, rules=rules_path, chunksize=7).validate_data(source)
+        self.assertTrue(report.passed)
+
+        source.loc[12, 'Store'] = 46
+        source.loc[3, 'Date'] = None
+        source.to_csv(self.data_path, index=False)
+        loader = DataLoader(self.data_path, rules=rules_path)
+        self.assertIsNone(loader.load())
+        self.assertEqual([entry['rule'] for entry in loader.rules.report.failed()],
+                         ['range(Store in [1, 45])', 'null_rate(Date <= 0)'])
+
+        streamed = DataLoader(self.data_path, rules={**self.spec, 'fail_fast': True})
+        chunks = []
+        with self.assertRaises(ValidationError):
+            for chunk in streamed.iter_chunks(chunksize=5):
+                chunks.append(chunk)
+        self.assertEqual(len(chunks), 2)  # Stopped at the third chunk, which holds row 12
+
+    def test_load_checks_chunks_as_they_are_parsed(self):
+        source = pd.read_csv('data/walmart_grocery_data.csv')
+        source.to_csv(self.data_path, index=False)
+        loaded = DataLoader(self.data_path, rules=self.spec, chunksize=5).load()
+        pd.testing.assert_frame_equal(loaded, source)
+
+        source.loc[7, 'Store'] = 46
+        source.to_csv(self.data_path, index=False)
+        loader = DataLoader(self.data_path, rules={**self.spec, 'fail_fast': True}, chunksize=5)
+        parsed = []
+        read = loader._iter_file
+        with patch.object(loader, '_iter_file', lambda *args: (parsed.append(chunk) or chunk for chunk in read(*args))):
+            self.assertIsNone(loader.load())
+        self.assertEqual(len(parsed), 2)  # The rest of the file is never parsed
+        self.assertEqual(loader.rules.report.rows, 10)
+
+    def test_appended_rows_are_checked(self):
+        source = pd.read_csv('data/walmart_grocery_data.csv')
+        source.to_csv(self.data_path, index=False)
+        workspace = os.path.join(self.tmp_dir, 'workspace')
+        app = DataVista(workspace=SessionWorkspace(workspace), rules=self.spec)
+        app.load_data(self.data_path)
+        app.clean_data(strategy='skip')
+        app.preprocess_data(scale_choice='2', outlier_choice='2', fill_methods={})
+        bad = source.tail(1).assign(Store=99)
+        bad.to_csv(self.data_path, mode='a', header=False, index=False)
+
+        again = DataVista(workspace=SessionWorkspace(workspace), rules=self.spec)
+        with self.assertLogs(level='ERROR') as logs:
+            self.assertIsNone(again.refresh(self.data_path))
+        self.assertIn('Rejected the rows appended', ' '.join(logs.output))
+        self.assertEqual(again.workspace.stage_record('load')['rows'], len(source))  # Nothing folded in
+
+
+if __name__ == '__main__':
+    unittest.main()